@@ -24,12 +24,17 @@ class CodeAgent(BaseAgent):
         return [
             "list_agents",
             "invoke_agent",
+            "invoke_agents",
             "list_files",
             "read_file",
             "grep",
             "edit_file",
             "delete_file",
             "agent_run_shell_command",
+            "list_background_jobs",
+            "tail_background_job",
+            "wait_for_background_output",
+            "kill_background_job",
             "ask_user_question",
             "activate_skill",
             "list_or_search_skills",
@@ -73,6 +78,7 @@ System Operations:
 Agent Management:
    - list_agents(): List available sub-agents
    - invoke_agent(agent_name, prompt, session_id): Invoke a sub-agent. Use session_id from previous response to continue conversations.
+   - invoke_agents(tasks): Invoke several sub-agents in parallel for independent tasks; returns all their results at once.
 
 User Interaction:
    - ask_user_question(questions): Interactive TUI for multiple-choice questions when you need user input.
@@ -188,6 +188,13 @@ def _ensure_session_cache_loaded() -> None:
             _SESSION_FILE_LOADED = True
 
 
+def _clear_subagent_pool() -> None:
+    """Drop warm sub-agents so they are rebuilt from reloaded definitions."""
+    from newcode.agents.subagent_pool import clear_subagent_pool
+
+    clear_subagent_pool()
+
+
 def _discover_agents(message_group_id: Optional[str] = None):
     """Dynamically discover all agent classes and JSON agents."""
     # Always clear the registry to force refresh
@@ -442,6 +449,7 @@ def set_current_agent(agent_name: str) -> bool:
     if agent_obj.name in _AGENT_HISTORIES:
         # Restore a copy to avoid sharing the same list instance
         agent_obj.set_message_history(list(_AGENT_HISTORIES[agent_obj.name]))
+    _clear_subagent_pool()
     on_agent_reload(agent_obj.id, agent_name)
     return True
 
@@ -555,6 +563,7 @@ def refresh_agents():
     # Generate a message group ID for agent refreshing
     message_group_id = str(uuid.uuid4())
     _discover_agents(message_group_id=message_group_id)
+    _clear_subagent_pool()
 
 
 _CLONE_NAME_PATTERN = re.compile(r"^(?P<base>.+)-clone-(?P<index>\d+)$")
@@ -31,6 +31,7 @@ class PlanningAgent(BaseAgent):
             "ask_user_question",
             "list_agents",
             "invoke_agent",
+            "invoke_agents",
             "list_or_search_skills",
         ]
 
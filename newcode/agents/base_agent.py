@@ -71,6 +71,7 @@ from newcode.error_logging import log_error
 from newcode.image_utils import constrain_image_dimensions
 from newcode.keymap import cancel_agent_uses_signal, get_cancel_agent_char_code
 from newcode.mcp_ import get_mcp_manager
+from newcode.mcp_.tool_cache import get_cached_tool_definitions
 from newcode.messaging import (
     emit_error,
     emit_info,
@@ -623,18 +624,25 @@ class BaseAgent(ABC):
 
     def update_mcp_tool_cache_sync(self) -> None:
         """
-        Synchronously clear the MCP tool cache.
+        Synchronously reset the MCP tool cache from the on-disk tool cache.
 
-        This clears the cache so that token counts will be recalculated on the next
-        agent run. Call this after starting/stopping MCP servers.
+        Call this after starting/stopping MCP servers. Servers whose tool lists
+        are not on disk yet are counted after the next successful agent run.
 
         Note: We don't try to fetch tools synchronously because MCP servers require
-        async context management that doesn't work well from sync code. The cache
-        will be repopulated on the next successful agent run.
+        async context management that doesn't work well from sync code.
         """
-        # Simply clear the cache - it will be repopulated on the next agent run
-        # This is safer than trying to call async methods from sync context
         self._mcp_tool_definitions_cache = []
+        self._preload_mcp_tool_cache(getattr(self, "_mcp_servers", None))
+
+    def _preload_mcp_tool_cache(self, mcp_servers: Optional[List[Any]]) -> None:
+        """Fill the MCP tool cache from definitions persisted by earlier sessions."""
+        try:
+            tool_definitions = get_cached_tool_definitions(mcp_servers or [])
+        except Exception:
+            return
+        if tool_definitions:
+            self._mcp_tool_definitions_cache = tool_definitions
 
     def _is_tool_call_part(self, part: Any) -> bool:
         if isinstance(part, (ToolCallPart, ToolCallPartDelta)):
@@ -1253,7 +1261,9 @@ class BaseAgent(ABC):
         manager = get_mcp_manager()
         manager.sync_from_config()
 
-        return manager.get_servers_for_agent()
+        mcp_servers = manager.get_servers_for_agent()
+        self._preload_mcp_tool_cache(mcp_servers)
+        return mcp_servers
 
     def _load_model_with_fallback(
         self,
@@ -1322,6 +1332,11 @@ class BaseAgent(ABC):
         # different project that has its own AGENT.md (or none at all).
         self._agent_rules = None
 
+        # Sub-agents pooled under the old config (or cwd) are stale as well
+        from newcode.agents.subagent_pool import clear_subagent_pool
+
+        clear_subagent_pool()
+
         if message_group is None:
             message_group = str(uuid.uuid4())
 
@@ -1352,6 +1367,12 @@ class BaseAgent(ABC):
         instructions = prepared.instructions
 
         self.cur_model = model
+        # Open connections to the (possibly new) model endpoint while the
+        # rest of the agent is assembled and the user types
+        from newcode.connection_warmup import schedule_connection_warmup
+
+        schedule_connection_warmup(model)
+
         p_agent = PydanticAgent(
             model=model,
             instructions=instructions,
@@ -1439,6 +1460,8 @@ class BaseAgent(ABC):
         self.pydantic_agent = p_agent
         self._code_generation_agent = p_agent
         self._mcp_servers = filtered_mcp_servers
+        if not self._mcp_tool_definitions_cache:
+            self._preload_mcp_tool_cache(mcp_servers)
         return self._code_generation_agent
 
     def _reload_live_agent_after_token_refresh(
@@ -26,26 +26,27 @@ logger = logging.getLogger(__name__)
 
 
 def _fire_stream_event(event_type: str, event_data: Any) -> None:
-    """Fire a stream event callback asynchronously (non-blocking).
+    """Publish a stream event on the stream event bus (non-blocking).
+
+    Returns immediately when nothing subscribes to ``event_type``.
 
     Args:
         event_type: Type of the event (e.g., 'part_start', 'part_delta', 'part_end')
         event_data: Data associated with the event
     """
     try:
-        from newcode import callbacks
-        from newcode.messaging import get_session_context
+        from newcode.stream_events import has_stream_subscribers, publish_stream_event
+
+        if not has_stream_subscribers(event_type):
+            return
 
-        agent_session_id = get_session_context()
+        from newcode.messaging import get_session_context
 
-        # Use create_task to fire callback without blocking
-        asyncio.create_task(
-            callbacks.on_stream_event(event_type, event_data, agent_session_id)
-        )
+        publish_stream_event(event_type, event_data, get_session_context())
     except ImportError:
-        logger.debug("callbacks or messaging module not available for stream event")
+        logger.debug("stream_events or messaging module not available for stream event")
     except Exception as e:
-        logger.debug(f"Error firing stream event callback: {e}")
+        logger.debug(f"Error publishing stream event: {e}")
 
 
 # Module-level console for streaming output
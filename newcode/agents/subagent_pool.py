@@ -0,0 +1,210 @@
+"""Warm pool of pydantic-ai Agents for sub-agent invocations.
+
+Building a sub-agent from scratch means rediscovering every agent, creating
+the model client, looking up MCP servers, constructing a pydantic-ai
+``Agent`` and registering every tool (wrappers and JSON schemas). This pool
+does that once per (agent name, model, tool set, MCP servers) and hands the
+same ``Agent`` to later invocations.
+
+Pooled Agents carry no per-run state:
+- Instructions and model settings are passed to ``Agent.run`` for each
+  invocation, so prompt additions and AGENTS.md are applied as before.
+- The history processor forwards to a fresh copy of the agent config bound
+  with ``subagent_run_state``, so concurrent and successive runs do not
+  share message history.
+
+The pool is cleared when agents are reloaded (agent switch, ``refresh_agents``,
+main agent reload) and when the config or model files change on disk.
+
+Usage:
+    >>> pooled = get_pooled_subagent("code-reviewer")
+    >>> with subagent_run_state(pooled):
+    ...     result = await pooled.agent.run(prompt, instructions=instructions)
+"""
+
+import copy
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic_ai import Agent, RunContext
+
+from newcode import config as cp_config
+
+if TYPE_CHECKING:
+    from newcode.agents.base_agent import BaseAgent
+
+__all__ = [
+    "PooledSubagent",
+    "get_pooled_subagent",
+    "subagent_run_state",
+    "clear_subagent_pool",
+    "get_subagent_pool_size",
+]
+
+# Distinct (agent, model, tools, MCP servers) combinations kept warm
+POOL_MAX_SIZE = 16
+
+# Config and model files whose changes invalidate the pool
+_WATCHED_FILES = (
+    "CONFIG_FILE",
+    "EXTRA_MODELS_FILE",
+    "CHATGPT_MODELS_FILE",
+    "CLAUDE_MODELS_FILE",
+    "GEMINI_MODELS_FILE",
+)
+
+
+@dataclass
+class PooledSubagent:
+    """A ready-to-run sub-agent and the config it was built from."""
+
+    config: "BaseAgent"
+    model_name: str
+    agent: Agent
+
+
+_POOL: "OrderedDict[Tuple[Any, ...], PooledSubagent]" = OrderedDict()
+# Agent configs by requested name, so lookups skip agent discovery
+_CONFIGS: Dict[str, "BaseAgent"] = {}
+# Model instances by model name, shared by every pooled Agent using them
+_MODELS: Dict[str, Any] = {}
+_files_stamp: Optional[Tuple[Optional[int], ...]] = None
+
+_run_config: ContextVar[Optional["BaseAgent"]] = ContextVar(
+    "subagent_run_config", default=None
+)
+
+
+def _stamp_files() -> Tuple[Optional[int], ...]:
+    stamps = []
+    for name in _WATCHED_FILES:
+        try:
+            stamps.append(os.stat(getattr(cp_config, name)).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def clear_subagent_pool() -> None:
+    """Drop every pooled Agent, agent config and model."""
+    global _files_stamp
+    _POOL.clear()
+    _CONFIGS.clear()
+    _MODELS.clear()
+    _files_stamp = None
+
+
+def get_subagent_pool_size() -> int:
+    """Number of Agents currently in the pool."""
+    return len(_POOL)
+
+
+def _get_mcp_servers() -> List[Any]:
+    mcp_disabled = cp_config.get_value("disable_mcp_servers")
+    if mcp_disabled and str(mcp_disabled).lower() in ("1", "true", "yes", "on"):
+        return []
+    from newcode.mcp_ import get_mcp_manager
+
+    return get_mcp_manager().get_servers_for_agent()
+
+
+def _run_history_processor(ctx: RunContext, messages: List[Any]) -> List[Any]:
+    """Forward to the history accumulator of the config bound to this run."""
+    run_config = _run_config.get()
+    if run_config is None:
+        return messages
+    return run_config.message_history_accumulator(ctx, messages)
+
+
+def _get_model(model_name: str) -> Any:
+    from newcode.model_factory import ModelFactory
+
+    model = _MODELS.get(model_name)
+    if model is not None:
+        return model
+    models_config = ModelFactory.load_config()
+    if model_name not in models_config:
+        raise ValueError(f"Model '{model_name}' not found in configuration")
+    model = ModelFactory.get_model(model_name, models_config)
+    if model is not None:
+        _MODELS[model_name] = model
+    return model
+
+
+def _build_agent(
+    model_name: str, tools: Tuple[str, ...], mcp_servers: List[Any]
+) -> Agent:
+    from newcode.tools import register_tools_for_agent
+
+    agent = Agent(
+        model=_get_model(model_name),
+        output_type=str,
+        retries=10,
+        toolsets=mcp_servers,
+        history_processors=[_run_history_processor],
+    )
+    register_tools_for_agent(agent, list(tools), model_name=model_name)
+    return agent
+
+
+def get_pooled_subagent(agent_name: str) -> PooledSubagent:
+    """Return a warm Agent for ``agent_name``, building it on first use.
+
+    Raises:
+        ValueError: If the agent's model is not in the models configuration.
+    """
+    global _files_stamp
+    stamp = _stamp_files()
+    if stamp != _files_stamp:
+        clear_subagent_pool()
+        _files_stamp = stamp
+
+    config = _CONFIGS.get(agent_name)
+    if config is None:
+        from newcode.agents.agent_manager import load_agent
+
+        config = _CONFIGS[agent_name] = load_agent(agent_name)
+
+    # Cheap to recompute, and may change without a reload (e.g. /pin_model)
+    model_name = config.get_model_name()
+    tools = tuple(config.get_available_tools())
+    mcp_servers = _get_mcp_servers()
+    key = (config.name, model_name, tools, tuple(id(s) for s in mcp_servers))
+
+    pooled = _POOL.get(key)
+    if pooled is not None:
+        _POOL.move_to_end(key)
+        return pooled
+
+    pooled = PooledSubagent(
+        config=config,
+        model_name=model_name,
+        agent=_build_agent(model_name, tools, mcp_servers),
+    )
+    _POOL[key] = pooled
+    while len(_POOL) > POOL_MAX_SIZE:
+        _POOL.popitem(last=False)
+    return pooled
+
+
+@contextmanager
+def subagent_run_state(pooled: PooledSubagent) -> Iterator["BaseAgent"]:
+    """Bind a fresh copy of the pooled config to the current run.
+
+    Yields the copy, whose message history starts empty. Runs started
+    inside the block (including tasks created there) use it for history
+    processing.
+    """
+    run_config = copy.copy(pooled.config)
+    run_config.set_message_history([])
+    # The copy shares the set object with the pooled config; replace it
+    run_config._compacted_message_hashes = set()
+    token = _run_config.set(run_config)
+    try:
+        yield run_config
+    finally:
+        _run_config.reset(token)
@@ -2,7 +2,7 @@
 
 This handler suppresses all console output but still:
 - Updates SubAgentConsoleManager with status/metrics
-- Fires stream_event callbacks for the frontend emitter plugin
+- Publishes stream events for the frontend emitter plugin
 - Tracks tool calls, tokens, and status changes
 
 Usage:
@@ -11,7 +11,6 @@ Usage:
     >>> await subagent_stream_handler(ctx, events, session_id="my-session-123")
 """
 
-import asyncio
 import logging
 from collections.abc import AsyncIterable
 from typing import Any, Optional
@@ -35,11 +34,11 @@ logger = logging.getLogger(__name__)
 
 
 def _fire_callback(event_type: str, event_data: Any, session_id: Optional[str]) -> None:
-    """Fire stream_event callback non-blocking.
+    """Publish a stream event on the stream event bus (non-blocking).
 
-    Schedules the callback to run asynchronously without waiting for it.
-    Silently ignores errors if no event loop is running or if the callback
-    system is unavailable.
+    Subscribers receive it in a batch on the next event loop tick. Silently
+    ignores errors if no event loop is running or if the event bus is
+    unavailable.
 
     Args:
         event_type: Type of the event ('part_start', 'part_delta', 'part_end')
@@ -47,19 +46,15 @@ def _fire_callback(event_type: str, event_data: Any, session_id: Optional[str])
         session_id: Optional session ID for the sub-agent
     """
     try:
-        from newcode import callbacks
+        from newcode.stream_events import publish_stream_event
 
-        loop = asyncio.get_running_loop()
-        loop.create_task(callbacks.on_stream_event(event_type, event_data, session_id))
-    except RuntimeError:
-        # No event loop running - this can happen during shutdown
-        logger.debug("No event loop available for stream event callback")
+        publish_stream_event(event_type, event_data, session_id)
     except ImportError:
-        # Callbacks module not available
-        logger.debug("Callbacks module not available for stream event")
+        # Event bus not available
+        logger.debug("Stream event bus not available for stream event")
     except Exception as e:
-        # Don't let callback errors break the stream handler
-        logger.debug(f"Error firing stream event callback: {e}")
+        # Don't let subscriber errors break the stream handler
+        logger.debug(f"Error publishing stream event: {e}")
 
 
 # =============================================================================
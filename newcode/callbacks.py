@@ -1,7 +1,11 @@
 import asyncio
 import logging
+import os
+import threading
+import time
 import traceback
-from typing import Any, Callable, Dict, List, Literal, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
 PhaseType = Literal[
     "startup",
@@ -72,6 +76,146 @@ _callbacks: Dict[PhaseType, List[CallbackFunc]] = {
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds, in seconds, of the callback latency histogram buckets; a
+# final open-ended bucket counts anything slower
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+@dataclass
+class CallbackStats:
+    """Call count and latency histogram for one callback in one phase."""
+
+    phase: str
+    callback: str
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def record(self, seconds: float, outcome: str = "ok") -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if outcome == "error":
+            self.errors += 1
+        elif outcome == "timeout":
+            self.timeouts += 1
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+
+_stats: Dict[Tuple[str, str], CallbackStats] = {}
+# Sync phases may be triggered from worker threads
+_stats_lock = threading.Lock()
+
+# Phases whose results allow or block an action. Abandoning one of their
+# callbacks would read as "no objection", so they never time out.
+_GATING_PHASES = frozenset({"run_shell_command", "pre_tool_call", "file_permission"})
+
+# The config file is checked for changes at most this often (seconds)
+_DISPATCH_RECHECK_SECONDS = 1.0
+
+# (config path, mtime) the dispatch settings were read at, when that was last
+# checked, and the settings
+_dispatch_stamp: Optional[Tuple[str, Optional[int]]] = None
+_dispatch_checked_at: Optional[float] = None
+_concurrent_phases: frozenset = frozenset()
+_phase_timeouts: Dict[str, float] = {}
+
+
+def _callback_name(func: CallbackFunc) -> str:
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        return repr(func)
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+def _record_call(
+    phase: PhaseType, callback: CallbackFunc, started: float, outcome: str = "ok"
+) -> None:
+    elapsed = time.perf_counter() - started
+    key = (phase, _callback_name(callback))
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = CallbackStats(phase=key[0], callback=key[1])
+        stats.record(elapsed, outcome)
+
+
+def get_callback_stats() -> List[CallbackStats]:
+    """Snapshot of per-callback timing, slowest total time first."""
+    with _stats_lock:
+        snapshot = [
+            CallbackStats(
+                phase=s.phase,
+                callback=s.callback,
+                calls=s.calls,
+                errors=s.errors,
+                timeouts=s.timeouts,
+                total_seconds=s.total_seconds,
+                max_seconds=s.max_seconds,
+                buckets=list(s.buckets),
+            )
+            for s in _stats.values()
+        ]
+    return sorted(snapshot, key=lambda s: s.total_seconds, reverse=True)
+
+
+def reset_callback_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _get_phase_dispatch(phase: PhaseType) -> Tuple[bool, Optional[float]]:
+    """Return (concurrent, timeout) for an async phase.
+
+    Settings come from the config file, which is stat()ed at most once per
+    _DISPATCH_RECHECK_SECONDS and re-read only when it changed, since hot
+    phases like stream_event trigger many times per second.
+    """
+    global _dispatch_stamp, _dispatch_checked_at, _concurrent_phases
+    global _phase_timeouts
+
+    now = time.monotonic()
+    if (
+        _dispatch_checked_at is None
+        or now - _dispatch_checked_at >= _DISPATCH_RECHECK_SECONDS
+    ):
+        from newcode import config
+
+        _dispatch_checked_at = now
+        path = config.CONFIG_FILE
+        try:
+            stamp = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp = (path, None)
+        if stamp != _dispatch_stamp:
+            _concurrent_phases = frozenset(config.get_callback_concurrent_phases())
+            _phase_timeouts = {
+                name: seconds
+                for name, seconds in config.get_callback_timeouts().items()
+                if name not in _GATING_PHASES
+            }
+            _dispatch_stamp = stamp
+    return phase in _concurrent_phases, _phase_timeouts.get(phase)
+
+
+def _reset_dispatch_settings() -> None:
+    """Force the dispatch settings to be re-read on the next trigger."""
+    global _dispatch_stamp, _dispatch_checked_at
+    _dispatch_stamp = None
+    _dispatch_checked_at = None
+
 
 def register_callback(phase: PhaseType, func: CallbackFunc) -> None:
     if phase not in _callbacks:
@@ -137,6 +281,7 @@ def _trigger_callbacks_sync(phase: PhaseType, *args, **kwargs) -> List[Any]:
 
     results = []
     for callback in callbacks:
+        started = time.perf_counter()
         try:
             result = callback(*args, **kwargs)
             # Handle async callbacks - if we get a coroutine, run it
@@ -149,15 +294,18 @@ def _trigger_callbacks_sync(phase: PhaseType, *args, **kwargs) -> List[Any]:
                     logger.warning(
                         f"Async callback {callback.__name__} called from async context in sync trigger"
                     )
+                    _record_call(phase, callback, started, "error")
                     results.append(None)
                     continue
                 except RuntimeError:
                     # No running loop - we're in a sync/worker thread context
                     # Use asyncio.run() which is safe here since we're in an isolated thread
                     result = asyncio.run(result)
+            _record_call(phase, callback, started)
             results.append(result)
             logger.debug(f"Successfully executed callback {callback.__name__}")
         except Exception as e:
+            _record_call(phase, callback, started, "error")
             logger.error(
                 f"Callback {callback.__name__} failed in phase '{phase}': {e}\n"
                 f"{traceback.format_exc()}"
@@ -167,6 +315,40 @@ def _trigger_callbacks_sync(phase: PhaseType, *args, **kwargs) -> List[Any]:
     return results
 
 
+async def _run_async_callback(
+    phase: PhaseType,
+    callback: CallbackFunc,
+    timeout: Optional[float],
+    args: tuple,
+    kwargs: dict,
+) -> Any:
+    started = time.perf_counter()
+    try:
+        result = callback(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            if timeout:
+                result = await asyncio.wait_for(result, timeout)
+            else:
+                result = await result
+    except asyncio.TimeoutError:
+        _record_call(phase, callback, started, "timeout")
+        logger.warning(
+            f"Async callback {callback.__name__} timed out after {timeout}s "
+            f"in phase '{phase}'"
+        )
+        return None
+    except Exception as e:
+        _record_call(phase, callback, started, "error")
+        logger.error(
+            f"Async callback {callback.__name__} failed in phase '{phase}': {e}\n"
+            f"{traceback.format_exc()}"
+        )
+        return None
+    _record_call(phase, callback, started)
+    logger.debug(f"Successfully executed async callback {callback.__name__}")
+    return result
+
+
 async def _trigger_callbacks(phase: PhaseType, *args, **kwargs) -> List[Any]:
     callbacks = get_callbacks(phase)
 
@@ -176,21 +358,26 @@ async def _trigger_callbacks(phase: PhaseType, *args, **kwargs) -> List[Any]:
 
     logger.debug(f"Triggering {len(callbacks)} async callbacks for phase '{phase}'")
 
-    results = []
-    for callback in callbacks:
-        try:
-            result = callback(*args, **kwargs)
-            if asyncio.iscoroutine(result):
-                result = await result
-            results.append(result)
-            logger.debug(f"Successfully executed async callback {callback.__name__}")
-        except Exception as e:
-            logger.error(
-                f"Async callback {callback.__name__} failed in phase '{phase}': {e}\n"
-                f"{traceback.format_exc()}"
+    # Async callbacks are bounded by their phase's configured timeout, if
+    # any (a sync callback blocks the loop and cannot be interrupted). In
+    # concurrent phases they all start at once and results keep
+    # registration order.
+    concurrent, timeout = _get_phase_dispatch(phase)
+    if concurrent and len(callbacks) > 1:
+        return list(
+            await asyncio.gather(
+                *(
+                    _run_async_callback(phase, callback, timeout, args, kwargs)
+                    for callback in callbacks
+                )
             )
-            results.append(None)
+        )
 
+    results = []
+    for callback in callbacks:
+        results.append(
+            await _run_async_callback(phase, callback, timeout, args, kwargs)
+        )
     return results
 
 
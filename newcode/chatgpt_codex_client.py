@@ -43,7 +43,9 @@ class ChatGPTCodexAsyncClient(httpx.AsyncClient):
     This client:
     1. Injects required fields (store=false, stream=true)
     2. Strips unsupported parameters
-    3. Converts streaming responses to non-streaming format
+    3. Converts streaming responses to non-streaming format when the caller
+       did not ask for a stream; streaming requests get the SSE response
+       passed through untouched, event by event
     """
 
     async def send(
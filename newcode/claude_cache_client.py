@@ -24,6 +24,9 @@ from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 import httpx
 
+from newcode.http_cassette import apply_cassette_transport
+from newcode.rate_limiter import get_rate_limiter, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
 # Refresh token if it's older than the configured max age (seconds)
@@ -45,6 +48,80 @@ try:
 except ImportError:  # pragma: no cover - optional dep
     AsyncAnthropic = None  # type: ignore
 
+# Request bodies carry the whole conversation (often several MB), so use the
+# fastest JSON backend available. pydantic_core is always installed.
+try:
+    import orjson
+
+    def _json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # pragma: no cover - optional dep
+    import pydantic_core
+
+    def _json_loads(data: bytes) -> Any:
+        return pydantic_core.from_json(data)
+
+    def _json_dumps(obj: Any) -> bytes:
+        return pydantic_core.to_json(obj)
+
+
+# A body transform mutates the decoded /v1/messages payload in place and
+# returns True if it changed anything.
+BodyTransform = Callable[[dict[str, Any]], bool]
+
+_BODY_TRANSFORMS: list[BodyTransform] = []
+
+
+def register_body_transform(transform: BodyTransform) -> None:
+    """Register a transform applied to every /v1/messages request body.
+
+    All registered transforms share a single JSON decode/encode pass.
+    """
+    if transform not in _BODY_TRANSFORMS:
+        _BODY_TRANSFORMS.append(transform)
+
+
+def unregister_body_transform(transform: BodyTransform) -> bool:
+    """Remove a previously registered body transform."""
+    try:
+        _BODY_TRANSFORMS.remove(transform)
+        return True
+    except ValueError:
+        return False
+
+
+def _apply_body_transforms(
+    body: bytes, transforms: list[BodyTransform] | None = None
+) -> bytes | None:
+    """Decode ``body`` once, run the transforms, and encode once.
+
+    Returns the new body, or None if it isn't a JSON object or no transform
+    changed anything (so the original bytes can be sent untouched).
+    """
+    try:
+        data = _json_loads(body)
+    except Exception:
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    modified = False
+    for transform in _BODY_TRANSFORMS if transforms is None else transforms:
+        try:
+            modified = transform(data) or modified
+        except Exception as exc:
+            logger.debug("Body transform %r failed: %s", transform, exc)
+
+    if not modified:
+        return None
+
+    return _json_dumps(data)
+
 
 class ClaudeCacheAsyncClient(httpx.AsyncClient):
     """Async HTTP client with Claude Code OAuth transformations.
@@ -56,8 +133,17 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
     - Header transformations (anthropic-beta, user-agent)
     - URL modifications (adding ?beta=true)
     - Proactive token refresh
+    - Shared adaptive rate limiting (see newcode.rate_limiter)
     """
 
+    def __init__(self, *args: Any, rate_limit: bool | None = None, **kwargs: Any):
+        super().__init__(*args, **apply_cassette_transport(kwargs))
+        if rate_limit is None:
+            from newcode.config import get_http_rate_limiter_enabled
+
+            rate_limit = get_http_rate_limiter_enabled()
+        self._rate_limit = rate_limit
+
     def _get_jwt_age_seconds(self, token: str | None) -> float | None:
         """Decode a JWT and return its age in seconds.
 
@@ -181,30 +267,7 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
         This is required for Claude Code OAuth compatibility - tools must be
         prefixed on outgoing requests and unprefixed on incoming responses.
         """
-        try:
-            data = json.loads(body.decode("utf-8"))
-        except Exception:
-            return None
-
-        if not isinstance(data, dict):
-            return None
-
-        tools = data.get("tools")
-        if not isinstance(tools, list) or not tools:
-            return None
-
-        modified = False
-        for tool in tools:
-            if isinstance(tool, dict) and "name" in tool:
-                name = tool["name"]
-                if name and not name.startswith(TOOL_PREFIX):
-                    tool["name"] = f"{TOOL_PREFIX}{name}"
-                    modified = True
-
-        if not modified:
-            return None
-
-        return json.dumps(data).encode("utf-8")
+        return _apply_body_transforms(body, [_prefix_tool_names_in_payload])
 
     @staticmethod
     def _transform_headers_for_claude_code(
@@ -291,66 +354,32 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
             except Exception as exc:
                 logger.debug("Error during proactive token refresh check: %s", exc)
 
-        # Apply Claude Code OAuth transformations for /v1/messages
+        # Apply Claude Code OAuth transformations for /v1/messages. The request
+        # is patched in place: the body is decoded and encoded at most once
+        # for all registered body transforms, and never rebuilt.
         if is_messages_endpoint:
             try:
-                body_bytes = self._extract_body_bytes(request)
+                # 1. Transform headers for Claude Code OAuth. Values are only
+                # written back, never removed: API-key (non-OAuth) Anthropic
+                # clients share this client and still need their x-api-key.
                 headers = dict(request.headers)
-                url = request.url
-                body_modified = False
-                headers_modified = False
-
-                # 1. Transform headers for Claude Code OAuth
                 self._transform_headers_for_claude_code(headers)
-                headers_modified = True
+                for key, value in headers.items():
+                    if request.headers.get(key) != value:
+                        request.headers[key] = value
 
                 # 2. Add ?beta=true query param
-                url = self._add_beta_query_param(url)
+                url = self._add_beta_query_param(request.url)
+                if url != request.url:
+                    request.url = url
 
-                # 3. Prefix tool names in request body
+                # 3. Tool name prefixing, cache_control and any other
+                # registered body transforms in a single pass
+                body_bytes = self._extract_body_bytes(request)
                 if body_bytes:
-                    prefixed_body = self._prefix_tool_names(body_bytes)
-                    if prefixed_body is not None:
-                        body_bytes = prefixed_body
-                        body_modified = True
-
-                    # 4. Inject cache_control
-                    cached_body = self._inject_cache_control(body_bytes)
-                    if cached_body is not None:
-                        body_bytes = cached_body
-                        body_modified = True
-
-                # Rebuild request if anything changed
-                if body_modified or headers_modified or url != request.url:
-                    try:
-                        rebuilt = self.build_request(
-                            method=request.method,
-                            url=url,
-                            headers=headers,
-                            content=body_bytes,
-                        )
-
-                        # Copy core internals so httpx uses the modified body/stream
-                        if hasattr(rebuilt, "_content"):
-                            request._content = rebuilt._content  # type: ignore[attr-defined]
-                        if hasattr(rebuilt, "stream"):
-                            request.stream = rebuilt.stream
-                        if hasattr(rebuilt, "extensions"):
-                            request.extensions = rebuilt.extensions
-
-                        # Update URL
-                        request.url = url
-
-                        # Update headers
-                        for key, value in headers.items():
-                            request.headers[key] = value
-
-                        # Ensure Content-Length matches the new body
-                        if body_bytes:
-                            request.headers["Content-Length"] = str(len(body_bytes))
-
-                    except Exception as exc:
-                        logger.debug("Error rebuilding request: %s", exc)
+                    new_body = _apply_body_transforms(body_bytes)
+                    if new_body is not None:
+                        self._replace_body(request, new_body)
 
             except Exception as exc:
                 logger.debug("Error in Claude Code transformations: %s", exc)
@@ -416,11 +445,16 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
         """
         last_response = None
         last_exception = None
+        limiter = get_rate_limiter(request) if self._rate_limit else None
 
         for attempt in range(MAX_RETRIES + 1):
             try:
+                if limiter is not None:
+                    await limiter.acquire()
                 response = await super().send(request, *args, **kwargs)
                 last_response = response
+                if limiter is not None:
+                    limiter.observe(response)
 
                 # Check for retryable status
                 if response.status_code not in RETRY_STATUS_CODES:
@@ -440,17 +474,9 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
                 if response.status_code == 429:
                     retry_after = response.headers.get("Retry-After")
                     if retry_after:
-                        try:
-                            wait_time = float(retry_after)
-                        except ValueError:
-                            # Try parsing http-date format
-                            try:
-                                from email.utils import parsedate_to_datetime
-
-                                date = parsedate_to_datetime(retry_after)
-                                wait_time = max(0, date.timestamp() - time.time())
-                            except Exception:
-                                pass
+                        parsed = parse_retry_after(retry_after)
+                        if parsed is not None:
+                            wait_time = parsed
 
                 # Cap wait time between 0.5s and 60s
                 wait_time = max(0.5, min(wait_time, 60.0))
@@ -592,41 +618,38 @@ class ClaudeCacheAsyncClient(httpx.AsyncClient):
 
     @staticmethod
     def _inject_cache_control(body: bytes) -> bytes | None:
-        try:
-            data = json.loads(body.decode("utf-8"))
-        except Exception:
-            return None
+        return _apply_body_transforms(body, [_inject_cache_control_in_payload])
 
-        if not isinstance(data, dict):
-            return None
-
-        modified = False
-
-        # Minimal, deterministic strategy:
-        # Add cache_control only on the single most recent block:
-        # the last dict content block of the last message (if any).
-        messages = data.get("messages")
-        if isinstance(messages, list) and messages:
-            last = messages[-1]
-            if isinstance(last, dict):
-                content = last.get("content")
-                if isinstance(content, list) and content:
-                    last_block = content[-1]
-                    if (
-                        isinstance(last_block, dict)
-                        and "cache_control" not in last_block
-                    ):
-                        last_block["cache_control"] = {"type": "ephemeral"}
-                        modified = True
-
-        if not modified:
-            return None
-
-        return json.dumps(data).encode("utf-8")
-
-
-def _inject_cache_control_in_payload(payload: dict[str, Any]) -> None:
-    """In-place cache_control injection on Anthropic messages.create payload."""
+    @staticmethod
+    def _replace_body(request: httpx.Request, body: bytes) -> None:
+        """Swap the request body in place instead of rebuilding the request."""
+        request._content = body  # type: ignore[attr-defined]
+        request.stream = httpx.ByteStream(body)
+        request.headers["Content-Length"] = str(len(body))
+
+
+def _prefix_tool_names_in_payload(payload: dict[str, Any]) -> bool:
+    """In-place TOOL_PREFIX prefixing of tool names in a messages payload."""
+    tools = payload.get("tools")
+    if not isinstance(tools, list) or not tools:
+        return False
+
+    modified = False
+    for tool in tools:
+        if isinstance(tool, dict) and "name" in tool:
+            name = tool["name"]
+            if name and not name.startswith(TOOL_PREFIX):
+                tool["name"] = f"{TOOL_PREFIX}{name}"
+                modified = True
+    return modified
+
+
+def _inject_cache_control_in_payload(payload: dict[str, Any]) -> bool:
+    """In-place cache_control injection on Anthropic messages.create payload.
+
+    Minimal, deterministic strategy: add cache_control only on the single
+    most recent block - the last dict content block of the last message.
+    """
 
     messages = payload.get("messages")
     if isinstance(messages, list) and messages:
@@ -637,10 +660,12 @@ def _inject_cache_control_in_payload(payload: dict[str, Any]) -> None:
                 last_block = content[-1]
                 if isinstance(last_block, dict) and "cache_control" not in last_block:
                     last_block["cache_control"] = {"type": "ephemeral"}
+                    return True
+    return False
+
 
-    # No extra markers in production mode; keep payload clean.
-    # (Function kept for potential future use.)
-    return
+register_body_transform(_prefix_tool_names_in_payload)
+register_body_transform(_inject_cache_control_in_payload)
 
 
 def patch_anthropic_client_messages(client: Any) -> None:
@@ -334,6 +334,11 @@ async def interactive_mode(message_renderer, initial_command: str = None) -> Non
     from newcode.messaging import emit_info, emit_system_message
 
     emit_system_message("Type /help for commands and shortcuts.")
+
+    # Build the model and warm its connections while the prompt loads
+    from newcode.connection_warmup import schedule_agent_prewarm
+
+    schedule_agent_prewarm(get_current_agent())
     # MOTD display on startup disabled
     # try:
     #     from newcode.command_line.motd import print_motd
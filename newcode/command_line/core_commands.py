@@ -114,6 +114,91 @@ def handle_tools_command(command: str) -> bool:
     return True
 
 
+def _format_latency(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+def _format_bucket_bound(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:g}ms"
+    return f"{seconds:g}s"
+
+
+@register_command(
+    name="callbacks",
+    description="Show per-callback latency stats for plugin callbacks",
+    usage="/callbacks [stats|reset]",
+    category="core",
+    detailed_help="""
+    Show how long each registered plugin callback takes, per phase.
+
+    Commands:
+      /callbacks stats   Call counts, errors, timeouts and latency histogram
+      /callbacks reset   Clear the collected stats
+
+    Concurrent dispatch and timeouts are set with the
+    callback_concurrent_phases and callback_timeouts config keys.
+    """,
+)
+def handle_callbacks_command(command: str) -> bool:
+    """Show or reset callback timing stats."""
+    from rich.table import Table
+
+    from newcode.callbacks import (
+        LATENCY_BUCKETS,
+        get_callback_stats,
+        reset_callback_stats,
+    )
+    from newcode.messaging import emit_info, emit_success, emit_warning
+
+    tokens = command.split()
+    action = tokens[1] if len(tokens) > 1 else "stats"
+    if action == "reset":
+        reset_callback_stats()
+        emit_success("Callback stats reset")
+        return True
+    if action != "stats":
+        emit_warning("Usage: /callbacks [stats|reset]")
+        return True
+
+    stats = get_callback_stats()
+    if not stats:
+        emit_info("No callbacks have run yet")
+        return True
+
+    labels = [f"≤{_format_bucket_bound(b)}" for b in LATENCY_BUCKETS]
+    labels.append(f">{_format_bucket_bound(LATENCY_BUCKETS[-1])}")
+    # Only show histogram buckets that something landed in
+    used = [i for i in range(len(labels)) if any(s.buckets[i] for s in stats)]
+
+    table = Table(title="Callback latency")
+    table.add_column("Phase", style="cyan", no_wrap=True)
+    table.add_column("Callback", style="dim")
+    table.add_column("Calls", justify="right")
+    table.add_column("Mean", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Timeouts", justify="right")
+    for i in used:
+        table.add_column(labels[i], justify="right")
+
+    for s in stats:
+        table.add_row(
+            s.phase,
+            s.callback,
+            str(s.calls),
+            _format_latency(s.mean_seconds),
+            _format_latency(s.max_seconds),
+            str(s.errors),
+            str(s.timeouts),
+            *(str(s.buckets[i]) for i in used),
+        )
+    emit_info(table)
+    return True
+
+
 @register_command(
     name="motd",
     description="Show the latest message of the day (MOTD)",
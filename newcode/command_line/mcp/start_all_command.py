@@ -55,8 +55,8 @@ class StartAllCommand(MCPCommandBase):
                 server_id = server_info.id
                 server_name = server_info.name
 
-                # Skip if already running
-                if server_info.state == ServerState.RUNNING:
+                # Skip if already running (or enabled to start on first use)
+                if server_info.state in (ServerState.RUNNING, ServerState.IDLE):
                     already_running += 1
                     emit_info(
                         f"  • {server_name}: already running", message_group=group_id
@@ -46,8 +46,10 @@ class StopAllCommand(MCPCommandBase):
             stopped_count = 0
             failed_count = 0
 
-            # Count running servers
-            running_servers = [s for s in servers if s.state == ServerState.RUNNING]
+            # Count running servers, including idle ones waiting for first use
+            running_servers = [
+                s for s in servers if s.state in (ServerState.RUNNING, ServerState.IDLE)
+            ]
 
             if not running_servers:
                 emit_info("No servers are currently running", message_group=group_id)
@@ -25,6 +25,7 @@ def format_state_indicator(state: ServerState) -> Text:
         ServerState.RUNNING: ("✓ Run", "green"),
         ServerState.STOPPED: ("✗ Stop", "red"),
         ServerState.STARTING: ("↗ Start", "yellow"),
+        ServerState.IDLE: ("○ Idle", "cyan"),
         ServerState.STOPPING: ("↙ Stop", "yellow"),
         ServerState.ERROR: ("⚠ Err", "red"),
         ServerState.QUARANTINED: ("⏸ Quar", "yellow"),
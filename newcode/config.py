@@ -75,6 +75,18 @@ def get_subagent_verbose() -> bool:
     return str(cfg_val).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def get_subagent_concurrency(default: int = 4) -> int:
+    """Return how many sub-agents invoke_agents runs at once (default 4).
+
+    Configurable by 'subagent_concurrency'; values below 1 are treated as 1.
+    """
+    val = get_value("subagent_concurrency")
+    try:
+        return max(1, int(val)) if val else default
+    except (ValueError, TypeError):
+        return default
+
+
 # Pack agents - the specialized sub-agents coordinated by Pack Leader
 PACK_AGENT_NAMES = frozenset(
     [
@@ -269,6 +281,8 @@ def get_config_keys():
         "auto_save_session",
         "max_saved_sessions",
         "http2",
+        "http_rate_limiter",
+        "connection_warmup",
         "diff_context_lines",
         "default_agent",
         "temperature",
@@ -284,6 +298,9 @@ def get_config_keys():
     default_keys.append("enable_streaming")
     # Add cancel agent key configuration
     default_keys.append("cancel_agent_key")
+    # Add callback dispatch keys
+    default_keys.append("callback_concurrent_phases")
+    default_keys.append("callback_timeouts")
     # Add banner color keys
     for banner_name in DEFAULT_BANNER_COLORS:
         default_keys.append(f"banner_color_{banner_name}")
@@ -291,10 +308,17 @@ def get_config_keys():
     default_keys.append("resume_message_count")
     # Add show_diffs toggle
     default_keys.append("show_diffs")
+    # Add shell output display keys
+    default_keys.append("shell_output_view")
+    default_keys.append("shell_output_spill")
+    default_keys.append("shell_tail_lines")
+    default_keys.append("shell_session")
     # Add remaining settable keys
     default_keys.append("subagent_verbose")
+    default_keys.append("subagent_concurrency")
     default_keys.append("safety_permission_level")
     default_keys.append("mcp_disabled")
+    default_keys.append("mcp_lazy_startup")
     default_keys.append("grep_output_verbose")
     default_keys.append("diff_addition_color")
     default_keys.append("diff_deletion_color")
@@ -1071,6 +1095,20 @@ def get_mcp_disabled():
     return False
 
 
+def get_mcp_lazy_startup() -> bool:
+    """Check whether MCP servers are started on their first tool call.
+
+    When enabled, `/mcp start` only enables a server. Its tool definitions
+    come from the on-disk tool cache and its process is spawned the first
+    time the agent calls one of its tools (or lists tools with no cache).
+    Defaults to False. Configurable by 'mcp_lazy_startup' key.
+    """
+    cfg_val = get_value("mcp_lazy_startup")
+    if cfg_val is None:
+        return False
+    return str(cfg_val).strip().lower() in {"1", "true", "yes", "on"}
+
+
 def get_grep_output_verbose():
     """
     Checks puppy.cfg for 'grep_output_verbose' (case-insensitive in value only).
@@ -1173,6 +1211,69 @@ def get_http2() -> bool:
     return str(val).lower() in ("1", "true", "yes", "on")
 
 
+def get_http_rate_limiter_enabled() -> bool:
+    """
+    Get the http_rate_limiter configuration value.
+    When enabled, model HTTP clients share an adaptive per-provider rate
+    limiter that paces requests before they are sent.
+    Returns True if not set (default).
+    """
+    val = get_value("http_rate_limiter")
+    if val is None:
+        return True
+    return str(val).lower() in ("1", "true", "yes", "on")
+
+
+def get_callback_concurrent_phases() -> list[str]:
+    """
+    Get the callback phases whose async callbacks are dispatched concurrently.
+    Configurable by 'callback_concurrent_phases' as a comma-separated list,
+    e.g. "pre_tool_call,post_tool_call,stream_event".
+    Returns an empty list if not set (every phase runs callbacks in order).
+    """
+    val = get_value("callback_concurrent_phases")
+    if not val:
+        return []
+    return [phase.strip() for phase in str(val).split(",") if phase.strip()]
+
+
+def get_callback_timeouts() -> dict[str, float]:
+    """
+    Get per-phase timeouts in seconds for async callback phases.
+    Configurable by 'callback_timeouts' as comma-separated phase=seconds
+    pairs, e.g. "stream_event=0.5,post_tool_call=2". A callback still running
+    after its phase's timeout is abandoned and contributes None to the phase
+    results. Phases not listed, and invalid or non-positive values, have no
+    timeout.
+    """
+    val = get_value("callback_timeouts")
+    timeouts: dict[str, float] = {}
+    if not val:
+        return timeouts
+    for entry in str(val).split(","):
+        phase, _, seconds = entry.partition("=")
+        try:
+            timeout = float(seconds)
+        except ValueError:
+            continue
+        if phase.strip() and timeout > 0:
+            timeouts[phase.strip()] = timeout
+    return timeouts
+
+
+def get_connection_warmup_enabled() -> bool:
+    """
+    Get the connection_warmup configuration value.
+    When enabled, connections to the active model's endpoint are opened in
+    the background at startup and after a model switch.
+    Returns True if not set (default).
+    """
+    val = get_value("connection_warmup")
+    if val is None:
+        return True
+    return str(val).lower() in ("1", "true", "yes", "on")
+
+
 def set_http2(enabled: bool) -> None:
     """
     Sets the http2 configuration value.
@@ -1593,6 +1694,59 @@ def get_show_diffs() -> bool:
     return False
 
 
+def get_shell_output_view() -> str:
+    """Return how streaming shell output is displayed.
+
+    'full' (default) prints every line. 'tail' shows a live view of the
+    last shell_tail_lines lines that is rewritten in place.
+    Configurable by 'shell_output_view' key.
+    """
+    val = get_value("shell_output_view")
+    if val and val.strip().lower() in ("full", "tail"):
+        return val.strip().lower()
+    return "full"
+
+
+def get_shell_tail_lines() -> int:
+    """Return the number of lines shown by the 'tail' shell output view.
+
+    Defaults to 10 if unset or misconfigured, bounded to 1-100.
+    Configurable by 'shell_tail_lines' key.
+    """
+    val = get_value("shell_tail_lines")
+    try:
+        configured_value = int(val) if val else 10
+        return max(1, min(configured_value, 100))
+    except (ValueError, TypeError):
+        return 10
+
+
+def get_shell_output_spill_enabled() -> bool:
+    """Check whether full shell command output is written to a spill file.
+
+    Only the tail of long output is returned to the agent; the spill file
+    in the state dir keeps the rest for paging with read_file.
+    Defaults to True. Configurable by 'shell_output_spill' key.
+    """
+    cfg_val = get_value("shell_output_spill")
+    if cfg_val is None:
+        return True
+    return str(cfg_val).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_shell_session_enabled() -> bool:
+    """Check whether shell commands run in a persistent shell session.
+
+    When enabled, each agent keeps one long-lived shell, so `cd`, `export`
+    and sourced environments (virtualenv, nvm) carry over between commands.
+    Defaults to False. Configurable by 'shell_session' key.
+    """
+    cfg_val = get_value("shell_session")
+    if cfg_val is None:
+        return False
+    return str(cfg_val).strip().lower() in {"1", "true", "yes", "on"}
+
+
 def get_suppress_thinking_messages() -> bool:
     """
     Checks puppy.cfg for 'suppress_thinking_messages' (case-insensitive in value only).
@@ -0,0 +1,164 @@
+"""Background pre-warming of model endpoint connections.
+
+The first request to a provider pays for DNS, TCP connect, TLS handshake and
+HTTP/2 negotiation before any tokens flow. Sending a cheap HEAD request to the
+model's base_url through the very client the model will use leaves an open,
+negotiated connection in that client's pool for the first real request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Iterator, Optional
+
+import httpx
+from pydantic_ai.models import Model
+
+from newcode.config import get_connection_warmup_enabled
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TIMEOUT_SECONDS = 10.0
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+def _leaf_models(model: Any, _seen: Optional[set] = None) -> Iterator[Model]:
+    """The model itself, or the candidates of wrapper models (round robin,
+    latency router, hedged), recursively."""
+    seen = _seen if _seen is not None else set()
+    if not isinstance(model, Model) or id(model) in seen:
+        return
+    seen.add(id(model))
+
+    subs = list(getattr(model, "models", None) or [])
+    subs += [getattr(model, attr, None) for attr in ("primary", "hedge")]
+    subs = [sub for sub in subs if isinstance(sub, Model)]
+    if not subs:
+        yield model
+        return
+    for sub in subs:
+        yield from _leaf_models(sub, seen)
+
+
+async def _get_http_client(model: Any) -> Optional[httpx.AsyncClient]:
+    """The pooled httpx client a model sends its requests through."""
+    # GeminiModel creates its client lazily; create it now so it is reused
+    get_client = getattr(model, "_get_client", None)
+    if get_client is not None and asyncio.iscoroutinefunction(get_client):
+        client = await get_client()
+    else:
+        # OpenAI / Anthropic SDK clients wrap an httpx client in `_client`
+        sdk_client = getattr(model, "client", None)
+        client = getattr(sdk_client, "_client", None) or getattr(
+            model, "_http_client", None
+        )
+
+    # ReopenableAsyncClient wraps the real client
+    ensure_open = getattr(client, "_ensure_client_open", None)
+    if ensure_open is not None:
+        client = await ensure_open()
+
+    return client if isinstance(client, httpx.AsyncClient) else None
+
+
+async def _warm_client(client: httpx.AsyncClient, base_url: str) -> bool:
+    request = client.build_request("HEAD", base_url)
+    # Call the base send() directly: wrapper clients would otherwise retry,
+    # rate-limit or rewrite this throwaway request. The pool is the same.
+    response = await asyncio.wait_for(
+        httpx.AsyncClient.send(client, request), WARMUP_TIMEOUT_SECONDS
+    )
+    await response.aclose()
+    return True
+
+
+async def warm_model_connections(model: Any) -> int:
+    """Open connections to every endpoint the model may use.
+
+    Returns the number of endpoints warmed. Failures are only logged: the
+    real request will simply connect as it would have without warming.
+    """
+    warmed = 0
+    seen_endpoints = set()
+    for candidate in _leaf_models(model):
+        try:
+            base_url = getattr(candidate, "base_url", None)
+            if not base_url:
+                continue
+            client = await _get_http_client(candidate)
+            if client is None or (id(client), str(base_url)) in seen_endpoints:
+                continue
+            seen_endpoints.add((id(client), str(base_url)))
+            if await _warm_client(client, str(base_url)):
+                warmed += 1
+        except Exception as exc:
+            logger.debug(
+                "Connection warmup for %s failed: %s",
+                getattr(candidate, "model_name", candidate),
+                exc,
+            )
+    return warmed
+
+
+def _schedule(coro: Any) -> Optional[asyncio.Task]:
+    """Run ``coro`` as the single background warmup task of the running loop.
+
+    A warmup pool opened on another loop couldn't be reused, so outside an
+    event loop nothing is scheduled. A warmup still in flight is cancelled,
+    unless it is the caller: prewarm_agent_connections builds the agent,
+    whose build hook lands here, and warms the same model itself afterwards.
+    """
+    global _warmup_task
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        return None
+
+    if _warmup_task is not None and _warmup_task is asyncio.current_task():
+        coro.close()
+        return _warmup_task
+
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    _warmup_task = loop.create_task(coro)
+    return _warmup_task
+
+
+def schedule_connection_warmup(model: Any) -> Optional[asyncio.Task]:
+    """Warm the model's connections in the background of the running loop.
+
+    Does nothing when disabled via the connection_warmup setting.
+    """
+    if model is None or not get_connection_warmup_enabled():
+        return None
+    return _schedule(warm_model_connections(model))
+
+
+async def prewarm_agent_connections(agent: Any) -> int:
+    """Build the agent's model if needed, then warm its connections.
+
+    Meant to run in the background while the interactive prompt loads, so
+    the first prompt finds both the model and its connections ready. The
+    agent is built on the event loop, like run_with_mcp does: a build on a
+    worker thread could race with the first prompt building it too.
+    """
+    if agent is None or not get_connection_warmup_enabled():
+        return 0
+    try:
+        # Let the prompt start drawing before the synchronous build
+        await asyncio.sleep(0)
+        if getattr(agent, "_code_generation_agent", None) is None:
+            agent.reload_code_generation_agent()
+        return await warm_model_connections(getattr(agent, "cur_model", None))
+    except Exception as exc:
+        logger.debug("Connection prewarm failed: %s", exc)
+        return 0
+
+
+def schedule_agent_prewarm(agent: Any) -> Optional[asyncio.Task]:
+    """Schedule prewarm_agent_connections in the background."""
+    if agent is None or not get_connection_warmup_enabled():
+        return None
+    return _schedule(prewarm_agent_connections(agent))
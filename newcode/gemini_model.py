@@ -8,9 +8,11 @@ SDK dependency.
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import logging
 import uuid
+from collections import OrderedDict
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
@@ -38,12 +40,19 @@ from pydantic_ai.settings import ModelSettings
 from pydantic_ai.tools import ToolDefinition
 from pydantic_ai.usage import RequestUsage
 
+from newcode.http_cassette import apply_cassette_transport
+
 logger = logging.getLogger(__name__)
 
 # Bypass thought signature for Gemini when no pending signature is available.
 # This allows function calls to work with thinking models.
 BYPASS_THOUGHT_SIGNATURE = "context_engineering_is_the_way_to_go"
 
+# Sanitized tool schemas keyed by a hash of the original schema. Tool
+# definitions rarely change between requests, so this is almost always a hit.
+_SANITIZED_SCHEMA_CACHE_SIZE = 512
+_sanitized_schema_cache: OrderedDict[str, dict] = OrderedDict()
+
 
 def generate_tool_call_id() -> str:
     """Generate a unique tool call ID."""
@@ -232,6 +241,30 @@ def _sanitize_schema_for_gemini(schema: dict) -> dict:
     return resolve_refs(schema)
 
 
+def _schema_hash(schema: dict) -> str:
+    """Stable hash of a JSON schema, independent of key order."""
+    encoded = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _sanitize_schema_cached(schema: dict) -> dict:
+    """Memoized _sanitize_schema_for_gemini.
+
+    The returned schema is shared between callers and must not be mutated.
+    """
+    key = _schema_hash(schema)
+    cached = _sanitized_schema_cache.get(key)
+    if cached is not None:
+        _sanitized_schema_cache.move_to_end(key)
+        return cached
+
+    sanitized = _sanitize_schema_for_gemini(schema)
+    _sanitized_schema_cache[key] = sanitized
+    if len(_sanitized_schema_cache) > _SANITIZED_SCHEMA_CACHE_SIZE:
+        _sanitized_schema_cache.popitem(last=False)
+    return sanitized
+
+
 class GeminiModel(Model):
     """Standalone Model implementation for Google's Generative Language API.
 
@@ -250,6 +283,9 @@ class GeminiModel(Model):
         self._base_url = base_url.rstrip("/")
         self._http_client = http_client
         self._owns_client = http_client is None
+        # id(message) -> (message, parts, system_parts, content) from the
+        # previous _map_messages call; the stored parts detect in-place edits
+        self._message_cache: dict[int, tuple] = {}
 
     @property
     def model_name(self) -> str:
@@ -292,7 +328,9 @@ class GeminiModel(Model):
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._http_client is None:
-            self._http_client = httpx.AsyncClient(timeout=180)
+            self._http_client = httpx.AsyncClient(
+                **apply_cassette_transport({"timeout": 180})
+            )
         return self._http_client
 
     async def _close_client(self) -> None:
@@ -339,64 +377,93 @@ class GeminiModel(Model):
 
         return parts
 
-    async def _map_messages(
-        self,
-        messages: list[ModelMessage],
-        model_request_parameters: ModelRequestParameters,
-    ) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
-        """Map pydantic-ai messages to Gemini API format."""
-        contents: list[dict[str, Any]] = []
+    async def _map_message(
+        self, m: ModelMessage
+    ) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+        """Map a single message to its system parts and Gemini content."""
         system_parts: list[dict[str, Any]] = []
 
-        for m in messages:
-            if isinstance(m, ModelRequest):
-                message_parts: list[dict[str, Any]] = []
-
-                for part in m.parts:
-                    if isinstance(part, SystemPromptPart):
-                        system_parts.append({"text": part.content})
-                    elif isinstance(part, UserPromptPart):
-                        mapped_parts = await self._map_user_prompt(part)
-                        message_parts.extend(mapped_parts)
-                    elif isinstance(part, ToolReturnPart):
+        if isinstance(m, ModelRequest):
+            message_parts: list[dict[str, Any]] = []
+
+            for part in m.parts:
+                if isinstance(part, SystemPromptPart):
+                    system_parts.append({"text": part.content})
+                elif isinstance(part, UserPromptPart):
+                    mapped_parts = await self._map_user_prompt(part)
+                    message_parts.extend(mapped_parts)
+                elif isinstance(part, ToolReturnPart):
+                    message_parts.append(
+                        {
+                            "function_response": {
+                                "name": part.tool_name,
+                                "response": part.model_response_object(),
+                                "id": part.tool_call_id,
+                            }
+                        }
+                    )
+                elif isinstance(part, RetryPromptPart):
+                    if part.tool_name is None:
+                        message_parts.append({"text": part.model_response()})
+                    else:
                         message_parts.append(
                             {
                                 "function_response": {
                                     "name": part.tool_name,
-                                    "response": part.model_response_object(),
+                                    "response": {"error": part.model_response()},
                                     "id": part.tool_call_id,
                                 }
                             }
                         )
-                    elif isinstance(part, RetryPromptPart):
-                        if part.tool_name is None:
-                            message_parts.append({"text": part.model_response()})
-                        else:
-                            message_parts.append(
-                                {
-                                    "function_response": {
-                                        "name": part.tool_name,
-                                        "response": {"error": part.model_response()},
-                                        "id": part.tool_call_id,
-                                    }
-                                }
-                            )
 
-                if message_parts:
-                    # Merge with previous user message if exists
-                    if contents and contents[-1].get("role") == "user":
-                        contents[-1]["parts"].extend(message_parts)
-                    else:
-                        contents.append({"role": "user", "parts": message_parts})
-
-            elif isinstance(m, ModelResponse):
-                model_parts = self._map_model_response(m)
-                if model_parts:
-                    # Merge with previous model message if exists
-                    if contents and contents[-1].get("role") == "model":
-                        contents[-1]["parts"].extend(model_parts["parts"])
-                    else:
-                        contents.append(model_parts)
+            if message_parts:
+                return system_parts, {"role": "user", "parts": message_parts}
+            return system_parts, None
+
+        if isinstance(m, ModelResponse):
+            return system_parts, self._map_model_response(m)
+
+        return system_parts, None
+
+    async def _map_messages(
+        self,
+        messages: list[ModelMessage],
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+        """Map pydantic-ai messages to Gemini API format.
+
+        Each message is mapped once and reused on later requests, so a turn
+        only maps the messages added since the previous request.
+        """
+        contents: list[dict[str, Any]] = []
+        system_parts: list[dict[str, Any]] = []
+        previous = self._message_cache
+        cache: dict[int, tuple] = {}
+
+        for m in messages:
+            parts = tuple(getattr(m, "parts", ()))
+            entry = previous.get(id(m))
+            if (
+                entry is None
+                or entry[0] is not m
+                or len(entry[1]) != len(parts)
+                or any(a is not b for a, b in zip(entry[1], parts))
+            ):
+                entry = (m, parts, *await self._map_message(m))
+            cache[id(m)] = entry
+            _, _, message_system_parts, content = entry
+
+            system_parts.extend(message_system_parts)
+            if content is None:
+                continue
+            if contents and contents[-1].get("role") == content["role"]:
+                # Merge with previous message of the same role
+                contents[-1]["parts"].extend(content["parts"])
+            else:
+                # Copy the parts list so merging never touches the cache
+                contents.append({**content, "parts": list(content["parts"])})
+
+        self._message_cache = cache
 
         # Ensure at least one content
         if not contents:
@@ -474,7 +541,7 @@ class GeminiModel(Model):
             }
             if tool.parameters_json_schema:
                 # Sanitize schema for Gemini compatibility
-                func_decl["parameters"] = _sanitize_schema_for_gemini(
+                func_decl["parameters"] = _sanitize_schema_cached(
                     tool.parameters_json_schema
                 )
             function_declarations.append(func_decl)
@@ -0,0 +1,316 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from pydantic_ai._run_context import RunContext
+from pydantic_ai.models import (
+    Model,
+    ModelMessage,
+    ModelRequestParameters,
+    ModelResponse,
+    ModelSettings,
+    StreamedResponse,
+)
+
+try:
+    from opentelemetry.context import get_current_span
+except ImportError:
+    # If opentelemetry is not installed, provide a dummy implementation
+    def get_current_span():
+        class DummySpan:
+            def is_recording(self):
+                return False
+
+            def set_attributes(self, attributes):
+                pass
+
+        return DummySpan()
+
+
+def _percentile(samples: Deque[float], percentile: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``percentile`` in 0-100)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass(init=False)
+class HedgedModel(Model):
+    """A model that hedges slow requests with a second model.
+
+    The request goes to the primary model first. If it hasn't produced its
+    first token by the primary's learned percentile deadline, the same request
+    is also sent to the hedge model; whichever starts first is used and the
+    other one is cancelled.
+
+    Hedging only starts once ``min_samples`` latencies have been recorded, and
+    is capped by a cost budget: at most ``max_hedged_fraction`` of requests
+    (and at most ``max_hedges`` in total, if set) made through this instance.
+    A model instance lives for one agent session, so the budget is per session.
+    """
+
+    primary: Model
+    hedge: Model
+    _percentile: float = field(default=95.0, repr=False)
+    _min_samples: int = field(default=10, repr=False)
+    _max_hedged_fraction: float = field(default=0.1, repr=False)
+    _max_hedges: Optional[int] = field(default=None, repr=False)
+    _ttft_history: Deque[float] = field(default_factory=deque, repr=False)
+    _latency_history: Deque[float] = field(default_factory=deque, repr=False)
+    _stats: Dict[str, int] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _last_model: Optional[Model] = field(default=None, repr=False)
+
+    def __init__(
+        self,
+        primary: Model,
+        hedge: Model,
+        *,
+        percentile: float = 95.0,
+        history_size: int = 50,
+        min_samples: int = 10,
+        max_hedged_fraction: float = 0.1,
+        max_hedges: Optional[int] = None,
+        settings: ModelSettings | None = None,
+    ):
+        """Initialize a hedged model instance.
+
+        Args:
+            primary: The model every request is sent to first.
+            hedge: The model a slow request is duplicated to.
+            percentile: Percentile of the primary's recent time-to-first-token
+                used as the hedging deadline (0-100).
+            history_size: Number of recent latencies the deadline is learned from.
+            min_samples: Latencies required before hedging starts.
+            max_hedged_fraction: Largest share of requests that may be hedged.
+            max_hedges: Optional hard cap on hedged requests.
+            settings: Model settings that will be used as defaults for this model.
+        """
+        super().__init__(settings=settings)
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if history_size < 1:
+            raise ValueError("history_size must be at least 1")
+        if not 0 <= max_hedged_fraction <= 1:
+            raise ValueError("max_hedged_fraction must be in [0, 1]")
+        self.primary = primary
+        self.hedge = hedge
+        self._percentile = percentile
+        self._min_samples = max(1, min(min_samples, history_size))
+        self._max_hedged_fraction = max_hedged_fraction
+        self._max_hedges = max_hedges
+        self._ttft_history = deque(maxlen=history_size)
+        self._latency_history = deque(maxlen=history_size)
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+        self._lock = threading.Lock()
+        self._last_model = None
+
+    @property
+    def model_name(self) -> str:
+        """The model name showing this is a hedged model with its candidates."""
+        return f"hedged:{self.primary.model_name},{self.hedge.model_name}"
+
+    @property
+    def system(self) -> str:
+        """System prompt from the model that served the last request."""
+        return (self._last_model or self.primary).system
+
+    @property
+    def base_url(self) -> str | None:
+        """Base URL from the model that served the last request."""
+        return (self._last_model or self.primary).base_url
+
+    def _deadline(self, history: Deque[float]) -> Optional[float]:
+        """Hedging deadline in seconds, or None if hedging isn't allowed now."""
+        with self._lock:
+            self._stats["requests"] += 1
+            if len(history) < self._min_samples:
+                return None
+            if (
+                self._max_hedges is not None
+                and self._stats["hedged"] >= self._max_hedges
+            ):
+                return None
+            budget = self._max_hedged_fraction * self._stats["requests"]
+            if self._stats["hedged"] + 1 > budget:
+                return None
+            return _percentile(history, self._percentile)
+
+    def _record(self, history: Deque[float], model: Model, elapsed: float) -> None:
+        with self._lock:
+            self._last_model = model
+            # When the hedge wins, the elapsed time is a lower bound for the
+            # primary's latency; keeping it stops slow requests from being
+            # dropped from the history and dragging the deadline down.
+            history.append(elapsed)
+
+    def _record_hedge(self) -> None:
+        with self._lock:
+            self._stats["hedged"] += 1
+
+    def _record_hedge_win(self) -> None:
+        with self._lock:
+            self._stats["hedge_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedging counters and the current deadlines."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            for name, history in (
+                ("ttft_deadline", self._ttft_history),
+                ("latency_deadline", self._latency_history),
+            ):
+                stats[name] = (
+                    _percentile(history, self._percentile)
+                    if len(history) >= self._min_samples
+                    else None
+                )
+            return stats
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        """Make a request, hedging it if the primary is slower than usual.
+
+        Without streaming the first token arrives with the whole response, so
+        the deadline is learned from total latency here.
+        """
+
+        async def run(model: Model) -> ModelResponse:
+            merged_settings, prepared_params = model.prepare_request(
+                model_settings, model_request_parameters
+            )
+            return await model.request(messages, merged_settings, prepared_params)
+
+        deadline = self._deadline(self._latency_history)
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(run(self.primary))
+        tasks = {primary_task: self.primary}
+
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=deadline)
+            if not done:
+                self._record_hedge()
+                tasks[asyncio.ensure_future(run(self.hedge))] = self.hedge
+
+            winner, response = await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self._record(self._latency_history, tasks[winner], time.monotonic() - started)
+        if tasks[winner] is self.hedge:
+            self._record_hedge_win()
+        self._set_span_attributes(tasks[winner])
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        """Stream from the primary, hedging if its first token is late.
+
+        Opening a stream waits for the provider's first chunk, so the time to
+        open it is the time-to-first-token. Each stream is opened and closed
+        inside its own task, which keeps the provider's context manager on a
+        single task even when the other stream wins.
+        """
+        release = asyncio.Event()
+
+        async def hold(model: Model, ready: asyncio.Future) -> None:
+            merged_settings, prepared_params = model.prepare_request(
+                model_settings, model_request_parameters
+            )
+            try:
+                async with model.request_stream(
+                    messages, merged_settings, prepared_params, run_context
+                ) as response:
+                    ready.set_result(response)
+                    await release.wait()
+            except BaseException as exc:
+                if not ready.done():
+                    ready.set_exception(exc)
+                    return
+                raise
+
+        def start(model: Model) -> tuple[asyncio.Future, asyncio.Task]:
+            ready = asyncio.get_running_loop().create_future()
+            return ready, asyncio.ensure_future(hold(model, ready))
+
+        deadline = self._deadline(self._ttft_history)
+        started = time.monotonic()
+        primary_ready, primary_task = start(self.primary)
+        streams = {primary_ready: (self.primary, primary_task)}
+
+        try:
+            done, _ = await asyncio.wait({primary_ready}, timeout=deadline)
+            if not done:
+                self._record_hedge()
+                hedge_ready, hedge_task = start(self.hedge)
+                streams[hedge_ready] = (self.hedge, hedge_task)
+
+            winner, response = await self._first_success(streams)
+            model, winner_task = streams[winner]
+            for ready, (_, task) in streams.items():
+                if ready is not winner:
+                    # Abandon the slower stream, whether or not it has started
+                    task.cancel()
+                    if not ready.cancel() and not ready.cancelled():
+                        ready.exception()  # mark a late failure as retrieved
+        except BaseException:
+            for ready, (_, task) in streams.items():
+                task.cancel()
+                ready.cancel()
+            raise
+
+        self._record(self._ttft_history, model, time.monotonic() - started)
+        if model is self.hedge:
+            self._record_hedge_win()
+        self._set_span_attributes(model)
+        try:
+            yield response
+        finally:
+            release.set()
+            with suppress(Exception):
+                await winner_task
+
+    @staticmethod
+    async def _first_success(pending_map: Dict[asyncio.Future, Any]) -> tuple:
+        """Wait for the first future to succeed; raise the last error if none do."""
+        pending = set(pending_map)
+        last_exc: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                if future.cancelled():
+                    continue
+                exc = future.exception()
+                if exc is None:
+                    return future, future.result()
+                last_exc = exc
+        if last_exc is None:
+            raise asyncio.CancelledError()
+        raise last_exc
+
+    def _set_span_attributes(self, model: Model):
+        """Set span attributes for observability."""
+        with suppress(Exception):
+            span = get_current_span()
+            if span.is_recording():
+                attributes = getattr(span, "attributes", {})
+                if attributes.get("gen_ai.request.model") == self.model_name:
+                    span.set_attributes(model.model_attributes(model))
@@ -0,0 +1,87 @@
+"""
+Result memoization for pure hooks.
+
+Hooks configured with ``"cache": <seconds>`` are treated as pure functions
+of their input: a result is reused while it is younger than the TTL and the
+hook receives an identical stdin payload (and environment overrides).
+Entries are kept in an LRU bounded by ``max_entries``.
+
+Only completed runs (exit code 0, 1 or 2) are cached; timeouts and
+execution errors always run again.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
+
+from .models import ExecutionResult, HookConfig
+
+DEFAULT_MAX_ENTRIES = 512
+
+_CacheKey = Tuple[str, str]
+
+
+def make_cache_key(
+    hook: HookConfig, stdin_payload: bytes, env_vars: Optional[Dict[str, str]] = None
+) -> _CacheKey:
+    digest = hashlib.sha256(stdin_payload)
+    if env_vars:
+        digest.update(json.dumps(env_vars, sort_keys=True).encode("utf-8"))
+    return (hook.id or hook.command, digest.hexdigest())
+
+
+class HookResultCache:
+    """TTL + LRU cache of hook ExecutionResults."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[_CacheKey, Tuple[float, ExecutionResult]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: _CacheKey) -> Optional[ExecutionResult]:
+        """Return a copy of the cached result, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return replace(result, duration_ms=0.0)
+
+    def put(self, key: _CacheKey, result: ExecutionResult, ttl: float) -> None:
+        if ttl <= 0 or result.exit_code not in (0, 1, 2):
+            return
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -6,8 +6,8 @@ import logging
 import time
 from typing import Any, Dict, List, Optional
 
+from .cache import HookResultCache
 from .executor import execute_hooks_sequential, get_blocking_result
-from .matcher import matches
 from .models import (
     EventData,
     HookConfig,
@@ -44,6 +44,7 @@ class HookEngine:
         self.env_vars = env_vars or {}
         self.strict_validation = strict_validation
         self._registry: Optional[HookRegistry] = None
+        self._result_cache = HookResultCache()
 
         if config:
             self.load_config(config)
@@ -62,6 +63,7 @@ class HookEngine:
             else:
                 logger.warning(f"Hook configuration has errors:\n{error_msg}")
 
+        self._result_cache.clear()
         try:
             self._registry = build_registry_from_config(config)
             logger.info(
@@ -92,20 +94,13 @@ class HookEngine:
                 blocked=False, executed_hooks=0, results=[], total_duration_ms=0.0
             )
 
-        all_hooks = self._registry.get_hooks_for_event(event_type)
-
-        if not all_hooks:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            return ProcessEventResult(
-                blocked=False,
-                executed_hooks=0,
-                results=[],
-                total_duration_ms=duration_ms,
+        try:
+            matching_hooks = self._registry.get_hooks_for_tool(
+                event_type, event_data.tool_name, event_data.tool_args
             )
-
-        matching_hooks = self._filter_hooks_by_matcher(
-            all_hooks, event_data.tool_name, event_data.tool_args
-        )
+        except Exception as e:
+            logger.error(f"Error matching hooks for {event_type}: {e}", exc_info=True)
+            matching_hooks = []
 
         if not matching_hooks:
             duration_ms = (time.perf_counter() - start_time) * 1000
@@ -122,13 +117,17 @@ class HookEngine:
 
         if sequential:
             results = await execute_hooks_sequential(
-                matching_hooks, event_data, self.env_vars, stop_on_block=stop_on_block
+                matching_hooks,
+                event_data,
+                self.env_vars,
+                stop_on_block=stop_on_block,
+                cache=self._result_cache,
             )
         else:
             from .executor import execute_hooks_parallel
 
             results = await execute_hooks_parallel(
-                matching_hooks, event_data, self.env_vars
+                matching_hooks, event_data, self.env_vars, cache=self._result_cache
             )
 
         for hook, result in zip(matching_hooks, results):
@@ -154,27 +153,15 @@ class HookEngine:
             total_duration_ms=duration_ms,
         )
 
-    def _filter_hooks_by_matcher(
-        self,
-        hooks: List[HookConfig],
-        tool_name: str,
-        tool_args: Dict[str, Any],
-    ) -> List[HookConfig]:
-        matching_hooks = []
-        for hook in hooks:
-            try:
-                if matches(hook.matcher, tool_name, tool_args):
-                    matching_hooks.append(hook)
-            except Exception as e:
-                logger.error(
-                    f"Error matching hook '{hook.matcher}': {e}", exc_info=True
-                )
-        return matching_hooks
-
     def get_stats(self) -> Dict[str, Any]:
         if not self._registry:
             return {"total_hooks": 0, "error": "No registry loaded"}
-        return get_registry_stats(self._registry)
+        stats = get_registry_stats(self._registry)
+        stats["result_cache"] = self._result_cache.get_stats()
+        return stats
+
+    def clear_result_cache(self) -> None:
+        self._result_cache.clear()
 
     def get_hooks_for_event(self, event_type: str) -> List[HookConfig]:
         if not self._registry:
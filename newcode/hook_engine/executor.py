@@ -20,15 +20,22 @@ import re
 import time
 from typing import Any, Dict, List, Optional
 
+from .cache import HookResultCache, make_cache_key
 from .matcher import _extract_file_path
 from .models import EventData, ExecutionResult, HookConfig
+from .worker import HookWorkerError, get_hook_worker
 
 logger = logging.getLogger(__name__)
 
 
 def _build_stdin_payload(event_data: EventData) -> bytes:
+    """Build the JSON payload sent to hook scripts via stdin."""
+    return json.dumps(_build_hook_input(event_data), ensure_ascii=False).encode("utf-8")
+
+
+def _build_hook_input(event_data: EventData) -> Dict[str, Any]:
     """
-    Build the JSON payload sent to hook scripts via stdin.
+    Build the hook input object sent to hook scripts and workers.
 
     Matches the Claude Code hook input format:
     {
@@ -66,17 +73,21 @@ def _build_stdin_payload(event_data: EventData) -> bytes:
     if "duration_ms" in event_data.context:
         payload["tool_duration_ms"] = event_data.context["duration_ms"]
 
-    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return payload
 
 
 async def execute_hook(
     hook: HookConfig,
     event_data: EventData,
     env_vars: Optional[Dict[str, str]] = None,
+    cache: Optional[HookResultCache] = None,
 ) -> ExecutionResult:
     """
     Execute a hook command with timeout and variable substitution.
 
+    Hooks with a ``cache_ttl`` reuse a result from ``cache`` for an
+    identical stdin payload instead of running again.
+
     Input to the hook script:
       - stdin: JSON object (Claude Code compatible format)
       - env CLAUDE_TOOL_INPUT: JSON string of tool_args (legacy)
@@ -97,6 +108,18 @@ async def execute_hook(
             hook_id=hook.id,
         )
 
+    if cache is not None and hook.cache_ttl > 0:
+        key = make_cache_key(hook, _build_stdin_payload(event_data), env_vars)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        result = await execute_hook(hook, event_data, env_vars)
+        cache.put(key, result, hook.cache_ttl)
+        return result
+
+    if hook.type == "persistent":
+        return await _execute_persistent_hook(hook, event_data, env_vars)
+
     command = _substitute_variables(hook.command, event_data, env_vars or {})
     stdin_payload = _build_stdin_payload(event_data)
     start_time = time.perf_counter()
@@ -171,6 +194,71 @@ async def execute_hook(
         )
 
 
+async def _execute_persistent_hook(
+    hook: HookConfig,
+    event_data: EventData,
+    env_vars: Optional[Dict[str, str]] = None,
+) -> ExecutionResult:
+    """
+    Send the event to the hook's long-lived worker process.
+
+    The command runs unsubstituted, once, with the session-wide environment;
+    per-event details arrive only in the request. See ``worker.py`` for the
+    protocol. Exit code semantics match command hooks.
+    """
+    start_time = time.perf_counter()
+    cwd = os.getcwd()
+    worker = get_hook_worker(
+        hook.command, env=_build_worker_environment(cwd, env_vars), cwd=cwd
+    )
+
+    try:
+        response = await worker.request(
+            _build_hook_input(event_data), timeout=hook.timeout / 1000.0
+        )
+    except asyncio.TimeoutError:
+        return ExecutionResult(
+            blocked=True,
+            hook_command=hook.command,
+            stdout="",
+            stderr=f"Hook worker timed out after {hook.timeout}ms",
+            exit_code=-1,
+            duration_ms=(time.perf_counter() - start_time) * 1000,
+            error=f"Hook execution timed out after {hook.timeout}ms",
+            hook_id=hook.id,
+        )
+    except HookWorkerError as e:
+        logger.error(f"Persistent hook failed: {e}")
+        return ExecutionResult(
+            blocked=False,
+            hook_command=hook.command,
+            stdout="",
+            stderr=str(e),
+            exit_code=-1,
+            duration_ms=(time.perf_counter() - start_time) * 1000,
+            error=f"Hook execution error: {e}",
+            hook_id=hook.id,
+        )
+
+    try:
+        exit_code = int(response.get("exit_code") or 0)
+    except (TypeError, ValueError):
+        exit_code = -1
+    stdout_str = str(response.get("stdout") or "")
+    stderr_str = str(response.get("stderr") or "")
+
+    return ExecutionResult(
+        blocked=exit_code == 1,
+        hook_command=hook.command,
+        stdout=stdout_str,
+        stderr=stderr_str,
+        exit_code=exit_code,
+        duration_ms=(time.perf_counter() - start_time) * 1000,
+        error=stderr_str if exit_code != 0 and stderr_str else None,
+        hook_id=hook.id,
+    )
+
+
 def _substitute_variables(
     command: str,
     event_data: EventData,
@@ -217,14 +305,26 @@ def _build_environment(
     return env
 
 
+def _build_worker_environment(
+    cwd: str, env_vars: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    env = os.environ.copy()
+    env["CLAUDE_PROJECT_DIR"] = cwd
+    env["CLAUDE_CODE_HOOK"] = "1"
+    if env_vars:
+        env.update(env_vars)
+    return env
+
+
 async def execute_hooks_parallel(
     hooks: List[HookConfig],
     event_data: EventData,
     env_vars: Optional[Dict[str, str]] = None,
+    cache: Optional[HookResultCache] = None,
 ) -> List[ExecutionResult]:
     if not hooks:
         return []
-    tasks = [execute_hook(hook, event_data, env_vars) for hook in hooks]
+    tasks = [execute_hook(hook, event_data, env_vars, cache) for hook in hooks]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     final_results = []
     for i, result in enumerate(results):
@@ -251,10 +351,11 @@ async def execute_hooks_sequential(
     event_data: EventData,
     env_vars: Optional[Dict[str, str]] = None,
     stop_on_block: bool = True,
+    cache: Optional[HookResultCache] = None,
 ) -> List[ExecutionResult]:
     results = []
     for hook in hooks:
-        result = await execute_hook(hook, event_data, env_vars)
+        result = await execute_hook(hook, event_data, env_vars, cache)
         results.append(result)
         if stop_on_block and result.blocked:
             logger.debug(f"Hook blocked operation, stopping: {hook.command}")
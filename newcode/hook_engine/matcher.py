@@ -6,9 +6,14 @@ based on tool name, arguments, and other event data.
 """
 
 import re
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Pattern, Tuple
 
-from .aliases import get_aliases
+from .aliases import ALIAS_LOOKUP
+
+if TYPE_CHECKING:
+    from .models import HookConfig
 
 
 def matches(matcher: str, tool_name: str, tool_args: Dict[str, Any]) -> bool:
@@ -22,60 +27,153 @@ def matches(matcher: str, tool_name: str, tool_args: Dict[str, Any]) -> bool:
         - "Pattern1 && Pattern2" - AND condition (all must match)
         - "Pattern1 || Pattern2" - OR condition (any must match)
     """
-    if not matcher:
-        return False
+    return compile_matcher(matcher).matches(tool_name, tool_args)
 
-    if matcher.strip() == "*":
-        return True
 
-    if "||" in matcher:
-        parts = [p.strip() for p in matcher.split("||")]
-        return any(matches(part, tool_name, tool_args) for part in parts)
+@lru_cache(maxsize=4096)
+def _tool_key(name: str) -> str:
+    """Case-insensitive key shared by a tool name and all of its aliases."""
+    # A hook written for "Bash" (Claude Code) should fire when newcode calls
+    # "agent_run_shell_command", and vice-versa.
+    group = ALIAS_LOOKUP.get(name.lower())
+    if group is None:
+        return name.lower()
+    return min(alias.lower() for alias in group)
 
-    if "&&" in matcher:
-        parts = [p.strip() for p in matcher.split("&&")]
-        return all(matches(part, tool_name, tool_args) for part in parts)
 
-    return _match_single(matcher.strip(), tool_name, tool_args)
+@dataclass(frozen=True)
+class _Term:
+    """One single pattern, with everything it needs pre-computed."""
 
+    name_key: str
+    extension: Optional[str] = None
+    glob: Optional[Pattern[str]] = None
+    regex: Optional[Pattern[str]] = None
 
-def _match_single(pattern: str, tool_name: str, tool_args: Dict[str, Any]) -> bool:
-    if pattern == tool_name:
-        return True
+    @property
+    def name_only(self) -> bool:
+        return self.extension is None and self.glob is None and self.regex is None
 
-    if pattern.lower() == tool_name.lower():
-        return True
+    def matches(self, tool_key: str, tool_name: str, tool_args: Dict[str, Any]) -> bool:
+        if self.name_key == tool_key:
+            return True
 
-    # Check cross-provider aliases: a hook written for "Bash" (Claude Code) should
-    # fire when newcode calls "agent_run_shell_command", and vice-versa.
-    tool_aliases = get_aliases(tool_name)
-    pattern_aliases = get_aliases(pattern)
-    if tool_aliases & pattern_aliases:  # non-empty intersection → same logical tool
-        return True
+        if self.extension is not None:
+            file_path = _extract_file_path(tool_args)
+            return bool(file_path) and file_path.endswith(self.extension)
+
+        if self.glob is not None and self.glob.match(tool_name):
+            return True
+
+        if self.regex is not None:
+            if self.regex.search(tool_name):
+                return True
+            file_path = _extract_file_path(tool_args)
+            if file_path and self.regex.search(file_path):
+                return True
 
-    if pattern.startswith("."):
-        file_path = _extract_file_path(tool_args)
-        if file_path:
-            return file_path.endswith(pattern)
         return False
 
+
+def _compile_term(pattern: str) -> _Term:
+    if not pattern:
+        return _Term(name_key="")
+    if pattern.startswith("."):
+        return _Term(name_key=_tool_key(pattern), extension=pattern)
+
+    glob = None
     if "*" in pattern:
-        parts = pattern.split("*")
-        regex_pattern = ".*".join(re.escape(part) for part in parts)
-        if re.match(f"^{regex_pattern}$", tool_name, re.IGNORECASE):
-            return True
+        regex_pattern = ".*".join(re.escape(part) for part in pattern.split("*"))
+        glob = re.compile(f"^{regex_pattern}$", re.IGNORECASE)
 
+    regex = None
     if _is_regex_pattern(pattern):
         try:
-            if re.search(pattern, tool_name, re.IGNORECASE):
-                return True
-            file_path = _extract_file_path(tool_args)
-            if file_path and re.search(pattern, file_path, re.IGNORECASE):
-                return True
+            regex = re.compile(pattern, re.IGNORECASE)
         except re.error:
             pass
 
-    return False
+    return _Term(name_key=_tool_key(pattern), glob=glob, regex=regex)
+
+
+@dataclass(frozen=True)
+class CompiledMatcher:
+    """A matcher parsed into OR-ed groups of AND-ed pre-compiled terms."""
+
+    source: str
+    alternatives: Tuple[Tuple[_Term, ...], ...]
+
+    def matches(self, tool_name: str, tool_args: Dict[str, Any]) -> bool:
+        tool_key = _tool_key(tool_name)
+        return any(
+            all(term.matches(tool_key, tool_name, tool_args) for term in terms)
+            for terms in self.alternatives
+        )
+
+    @property
+    def tool_keys(self) -> Optional[FrozenSet[str]]:
+        """Tool keys this matcher can match, or None if it may match any tool.
+
+        An AND group containing a plain tool name can only match that tool.
+        """
+        keys = set()
+        for terms in self.alternatives:
+            named = [term.name_key for term in terms if term.name_only]
+            if not named:
+                return None
+            keys.add(named[0])
+        return frozenset(keys)
+
+
+@lru_cache(maxsize=1024)
+def compile_matcher(matcher: str) -> CompiledMatcher:
+    """Parse and compile a matcher string once; see ``matches`` for syntax."""
+    if not matcher:
+        return CompiledMatcher(matcher, ())
+
+    or_parts = matcher.split("||") if "||" in matcher else [matcher]
+    alternatives = []
+    for part in or_parts:
+        and_parts = part.split("&&") if "&&" in part else [part]
+        alternatives.append(tuple(_compile_term(p.strip()) for p in and_parts))
+    return CompiledMatcher(matcher, tuple(alternatives))
+
+
+class MatcherIndex:
+    """
+    Dispatch index from tool name to the hooks that could match it.
+
+    Hooks whose matcher names specific tools are filed under those tools'
+    alias keys; hooks using wildcards, extensions or regexes are checked for
+    every tool. Candidates keep their configuration order.
+    """
+
+    def __init__(self, hooks: List["HookConfig"]):
+        self.size = len(hooks)
+        self._compiled: List[CompiledMatcher] = []
+        self._by_tool: Dict[str, List[int]] = {}
+        self._any_tool: List[int] = []
+        for position, hook in enumerate(hooks):
+            compiled = compile_matcher(hook.matcher)
+            self._compiled.append(compiled)
+            keys = compiled.tool_keys
+            if keys is None:
+                self._any_tool.append(position)
+            else:
+                for key in keys:
+                    self._by_tool.setdefault(key, []).append(position)
+        self._hooks = list(hooks)
+
+    def candidates(self, tool_name: str) -> List[Tuple["HookConfig", CompiledMatcher]]:
+        """Hooks (with compiled matchers) that may match ``tool_name``."""
+        named = self._by_tool.get(_tool_key(tool_name), [])
+        positions = sorted(named + self._any_tool) if named else self._any_tool
+        return [(self._hooks[i], self._compiled[i]) for i in positions]
+
+
+def _is_regex_pattern(pattern: str) -> bool:
+    regex_chars = ["^", "$", ".", "+", "?", "[", "]", "(", ")", "{", "}", "|", "\\"]
+    return any(char in pattern for char in regex_chars)
 
 
 def _extract_file_path(tool_args: Dict[str, Any]) -> Optional[str]:
@@ -117,11 +215,6 @@ def _looks_like_file_path(value: str) -> bool:
     return False
 
 
-def _is_regex_pattern(pattern: str) -> bool:
-    regex_chars = ["^", "$", ".", "+", "?", "[", "]", "(", ")", "{", "}", "|", "\\"]
-    return any(char in pattern for char in regex_chars)
-
-
 def extract_file_extension(file_path: str) -> Optional[str]:
     if not file_path or "." not in file_path:
         return None
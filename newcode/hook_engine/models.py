@@ -6,7 +6,10 @@ safety and validation.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Literal, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
+
+if TYPE_CHECKING:
+    from .matcher import MatcherIndex
 
 
 @dataclass
@@ -16,30 +19,32 @@ class HookConfig:
 
     Attributes:
         matcher: Pattern to match against events (e.g., "Edit && .py")
-        type: Type of hook action ("command" or "prompt")
+        type: Type of hook action ("command", "persistent" or "prompt")
         command: Command or prompt text to execute
         timeout: Maximum execution time in milliseconds (default: 5000)
         once: Execute only once per session (default: False)
         enabled: Whether this hook is enabled (default: True)
         id: Optional unique identifier for this hook
+        cache_ttl: Seconds to reuse results for identical input (0: no caching)
     """
 
     matcher: str
-    type: Literal["command", "prompt"]
+    type: Literal["command", "persistent", "prompt"]
     command: str
     timeout: int = 5000
     once: bool = False
     enabled: bool = True
     id: Optional[str] = None
+    cache_ttl: float = 0.0
 
     def __post_init__(self):
         """Validate hook configuration after initialization."""
         if not self.matcher:
             raise ValueError("Hook matcher cannot be empty")
 
-        if self.type not in ("command", "prompt"):
+        if self.type not in ("command", "persistent", "prompt"):
             raise ValueError(
-                f"Hook type must be 'command' or 'prompt', got: {self.type}"
+                f"Hook type must be 'command', 'persistent' or 'prompt', got: {self.type}"
             )
 
         if not self.command:
@@ -48,6 +53,9 @@ class HookConfig:
         if self.timeout < 100:
             raise ValueError(f"Hook timeout must be >= 100ms, got: {self.timeout}")
 
+        if self.cache_ttl < 0:
+            raise ValueError(f"Hook cache TTL must be >= 0, got: {self.cache_ttl}")
+
         if self.id is None:
             import hashlib
 
@@ -147,6 +155,9 @@ class HookRegistry:
     subagent_stop: List[HookConfig] = field(default_factory=list)
 
     _executed_once_hooks: set = field(default_factory=set, repr=False)
+    _matcher_indexes: Dict[str, "MatcherIndex"] = field(
+        default_factory=dict, repr=False, compare=False
+    )
 
     def get_hooks_for_event(self, event_type: str) -> List[HookConfig]:
         attr_name = self._normalize_event_type(event_type)
@@ -162,6 +173,40 @@ class HookRegistry:
             enabled_hooks.append(hook)
         return enabled_hooks
 
+    def get_hooks_for_tool(
+        self, event_type: str, tool_name: str, tool_args: Dict[str, Any]
+    ) -> List[HookConfig]:
+        """Enabled hooks for ``event_type`` whose matcher matches the tool call.
+
+        Only hooks that can match ``tool_name`` are evaluated, via a
+        pre-compiled matcher index per event type.
+        """
+        attr_name = self._normalize_event_type(event_type)
+        if not hasattr(self, attr_name):
+            return []
+        matching = []
+        for hook, matcher in self.get_matcher_index(event_type).candidates(tool_name):
+            if not hook.enabled:
+                continue
+            if hook.once and hook.id in self._executed_once_hooks:
+                continue
+            if matcher.matches(tool_name, tool_args):
+                matching.append(hook)
+        return matching
+
+    def get_matcher_index(self, event_type: str) -> "MatcherIndex":
+        """Return the matcher index for ``event_type``, building it if stale."""
+        from .matcher import MatcherIndex
+
+        attr_name = self._normalize_event_type(event_type)
+        hooks = getattr(self, attr_name, [])
+        index = self._matcher_indexes.get(attr_name)
+        # add_hook/remove_hook drop the index; the size check catches
+        # hooks appended to the lists directly
+        if index is None or index.size != len(hooks):
+            index = self._matcher_indexes[attr_name] = MatcherIndex(hooks)
+        return index
+
     def mark_hook_executed(self, hook_id: str) -> None:
         self._executed_once_hooks.add(hook_id)
 
@@ -180,6 +225,7 @@ class HookRegistry:
         if not hasattr(self, attr_name):
             raise ValueError(f"Unknown event type: {event_type}")
         getattr(self, attr_name).append(hook)
+        self._matcher_indexes.pop(attr_name, None)
 
     def remove_hook(self, event_type: str, hook_id: str) -> bool:
         attr_name = self._normalize_event_type(event_type)
@@ -189,6 +235,7 @@ class HookRegistry:
         for i, hook in enumerate(hooks_list):
             if hook.id == hook_id:
                 hooks_list.pop(i)
+                self._matcher_indexes.pop(attr_name, None)
                 return True
         return False
 
@@ -30,6 +30,8 @@ def build_registry_from_config(config: Dict[str, Any]) -> HookRegistry:
     """
     Build a HookRegistry from a configuration dictionary.
 
+    Matchers are compiled into a dispatch index per event type.
+
     Args:
         config: Hook configuration dictionary
 
@@ -56,7 +58,10 @@ def build_registry_from_config(config: Dict[str, Any]) -> HookRegistry:
             for hook_data in hooks_data:
                 if not isinstance(hook_data, dict):
                     continue
-                if hook_data.get("type") == "command" and not hook_data.get("command"):
+                if hook_data.get("type") in (
+                    "command",
+                    "persistent",
+                ) and not hook_data.get("command"):
                     continue
 
                 try:
@@ -68,14 +73,28 @@ def build_registry_from_config(config: Dict[str, Any]) -> HookRegistry:
                         once=hook_data.get("once", False),
                         enabled=hook_data.get("enabled", True),
                         id=hook_data.get("id"),
+                        cache_ttl=_parse_cache_ttl(hook_data.get("cache")),
                     )
                     registry.add_hook(event_type, hook)
                 except (ValueError, KeyError) as e:
                     logger.warning(f"Skipping invalid hook in {event_type}: {e}")
 
+    # Parse and compile every matcher now rather than on the first tool call
+    for event_type in SUPPORTED_EVENT_TYPES:
+        registry.get_matcher_index(event_type)
+
     return registry
 
 
+def _parse_cache_ttl(cache: Any) -> float:
+    """Accept ``"cache": <seconds>`` or ``"cache": {"ttl": <seconds>}``."""
+    if isinstance(cache, dict):
+        cache = cache.get("ttl", 0)
+    if isinstance(cache, bool) or not isinstance(cache, (int, float)):
+        return 0.0
+    return max(float(cache), 0.0)
+
+
 def get_registry_stats(registry: HookRegistry) -> Dict[str, Any]:
     """Get statistics about a registry."""
     stats: Dict[str, Any] = {
@@ -21,7 +21,7 @@ VALID_EVENT_TYPES = [
     "SubagentStop",
 ]
 
-VALID_HOOK_TYPES = ["command", "prompt"]
+VALID_HOOK_TYPES = ["command", "persistent", "prompt"]
 
 
 def validate_hooks_config(config: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -93,8 +93,10 @@ def _validate_hook(
             f"{prefix} invalid type '{hook_type}'. Must be one of: {', '.join(VALID_HOOK_TYPES)}"
         )
 
-    if hook_type == "command" and not hook.get("command"):
-        errors.append(f"{prefix} missing required field 'command' for type 'command'")
+    if hook_type in ("command", "persistent") and not hook.get("command"):
+        errors.append(
+            f"{prefix} missing required field 'command' for type '{hook_type}'"
+        )
     elif hook_type == "prompt" and not hook.get("prompt") and not hook.get("command"):
         errors.append(
             f"{prefix} missing required field 'prompt' (or 'command') for type 'prompt'"
@@ -105,6 +107,15 @@ def _validate_hook(
         if not isinstance(timeout, (int, float)) or timeout < 100:
             errors.append(f"{prefix} 'timeout' must be >= 100ms, got: {timeout}")
 
+    if "cache" in hook:
+        cache = hook["cache"]
+        ttl = cache.get("ttl") if isinstance(cache, dict) else cache
+        if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+            errors.append(
+                f"{prefix} 'cache' must be a TTL in seconds > 0 "
+                f'(or {{"ttl": seconds}}), got: {cache}'
+            )
+
     return errors
 
 
@@ -0,0 +1,237 @@
+"""
+Long-lived worker processes for persistent hooks.
+
+A ``"type": "persistent"`` hook starts its command once and keeps it
+running. Each hook invocation is one line of JSON on the worker's stdin and
+one line of JSON back on its stdout, so interpreter startup is paid once
+per session instead of once per tool call.
+
+Protocol (newline-delimited JSON):
+  - request:  the regular hook stdin payload plus ``"request_id": <int>``
+  - response: ``{"request_id": <int>, "exit_code": 0, "stdout": "", "stderr": ""}``
+    using the same exit code semantics as command hooks. Only
+    ``request_id`` is required; lines that are not JSON objects with a
+    known ``request_id`` are ignored.
+
+Requests may be in flight concurrently; responses are matched by id. A
+worker that exits is started again on the next request. A request that
+times out kills the worker, failing its other in-flight requests, since a
+hung worker would otherwise stall every later hook.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Responses may carry large stdout payloads
+_MAX_LINE_BYTES = 16 * 1024 * 1024
+_STDERR_TAIL_LINES = 20
+_POSIX = hasattr(os, "killpg")
+
+
+class HookWorkerError(RuntimeError):
+    """The worker process died or could not be reached."""
+
+
+class HookWorker:
+    """One long-lived hook process speaking NDJSON over stdin/stdout."""
+
+    def __init__(
+        self,
+        command: str,
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+    ):
+        self.command = command
+        self.env = env
+        self.cwd = cwd
+        self.restarts = 0
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._tasks: list = []
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._stderr_tail: Deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._proc.pid if self._proc else None
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one request and wait up to ``timeout`` seconds for its response.
+
+        Raises:
+            asyncio.TimeoutError: No response in time; the worker is killed.
+            HookWorkerError: The worker could not be started or exited.
+        """
+        proc = await self._ensure_started()
+        # Requests belong to the process they were written to
+        pending = self._pending
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        pending[request_id] = future
+        line = json.dumps({**payload, "request_id": request_id}, ensure_ascii=False)
+        try:
+            try:
+                proc.stdin.write(line.encode("utf-8") + b"\n")
+                await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise HookWorkerError(f"Hook worker is not accepting input: {e}")
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                await self._kill(proc)
+                raise
+        finally:
+            pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        """Stop the worker process."""
+        if self._proc is not None and self._loop is asyncio.get_running_loop():
+            await self._kill(self._proc)
+        else:
+            self._abandon()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._proc = None
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pipes are bound to the loop that created them
+            self._abandon()
+            self._loop = loop
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.running:
+                return self._proc
+            if self._proc is not None:
+                self.restarts += 1
+                logger.warning(
+                    f"Restarting hook worker '{self.command}' "
+                    f"(exit code {self._proc.returncode})"
+                )
+            self._stderr_tail.clear()
+            try:
+                proc = await asyncio.create_subprocess_shell(
+                    self.command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self.cwd,
+                    env=self.env,
+                    limit=_MAX_LINE_BYTES,
+                    # The shell may not exec the command; kill the whole group
+                    start_new_session=_POSIX,
+                )
+            except OSError as e:
+                raise HookWorkerError(f"Failed to start hook worker: {e}") from e
+            self._proc = proc
+            self._pending = {}
+            self._tasks = [
+                loop.create_task(self._read_responses(proc, self._pending)),
+                loop.create_task(self._drain_stderr(proc)),
+            ]
+            return proc
+
+    async def _read_responses(
+        self, proc: asyncio.subprocess.Process, pending: Dict[int, asyncio.Future]
+    ) -> None:
+        try:
+            while line := await proc.stdout.readline():
+                self._dispatch(line, pending)
+        except (asyncio.LimitOverrunError, ValueError) as e:
+            logger.error(f"Hook worker '{self.command}' sent an oversized line: {e}")
+            await self._kill(proc)
+        returncode = await proc.wait()
+        message = f"Hook worker exited with code {returncode}"
+        if self._stderr_tail:
+            message += f": {'; '.join(self._stderr_tail)}"
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(HookWorkerError(message))
+
+    def _dispatch(self, line: bytes, pending: Dict[int, asyncio.Future]) -> None:
+        try:
+            response = json.loads(line)
+        except ValueError:
+            logger.debug(f"Ignoring non-JSON hook worker output: {line[:200]!r}")
+            return
+        if not isinstance(response, dict):
+            return
+        future = pending.get(response.get("request_id"))
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    async def _drain_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        while True:
+            line = await proc.stderr.readline()
+            if not line:
+                return
+            self._stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    async def _kill(self, proc: asyncio.subprocess.Process) -> None:
+        _kill_process_tree(proc)
+        try:
+            await proc.wait()
+        except Exception:
+            pass
+
+    def _abandon(self) -> None:
+        """Kill a worker started on another (possibly closed) event loop."""
+        if self._proc is not None:
+            _kill_process_tree(self._proc)
+        self._proc = None
+        self._tasks = []
+        self._pending = {}
+
+
+def _kill_process_tree(proc: asyncio.subprocess.Process) -> None:
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        elif proc.returncode is None:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+_workers: Dict[Tuple[str, Optional[str]], HookWorker] = {}
+
+
+def get_hook_worker(
+    command: str, env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None
+) -> HookWorker:
+    """Return the shared worker for ``command`` in ``cwd``, creating it lazily.
+
+    ``env`` is only used when the worker is first created.
+    """
+    key = (command, cwd)
+    worker = _workers.get(key)
+    if worker is None:
+        worker = _workers[key] = HookWorker(command, env=env, cwd=cwd)
+    return worker
+
+
+async def close_hook_workers() -> None:
+    """Stop every persistent hook worker."""
+    workers = list(_workers.values())
+    _workers.clear()
+    for worker in workers:
+        try:
+            await worker.close()
+        except Exception as e:
+            logger.debug(f"Failed to stop hook worker '{worker.command}': {e}")
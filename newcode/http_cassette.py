@@ -0,0 +1,285 @@
+"""Record/replay transport for model HTTP traffic.
+
+Records every request/response exchange, including the timing of each
+streamed (SSE) chunk, to a cassette file and replays it later without a
+network. This lets agent sessions be re-run offline to profile newcode's own
+overhead or benchmark it in CI.
+
+Enabled through environment variables:
+
+- CODE_PUPPY_CASSETTE: path of the cassette file (JSON lines)
+- CODE_PUPPY_CASSETTE_MODE: "record", "replay" (full speed, the default) or
+  "replay-timed" (reproduces the recorded time-to-headers and chunk gaps)
+
+Only the request method, a redacted URL and a hash of the request body are
+stored, so credentials in request headers never reach the cassette.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+CASSETTE_ENV = "CODE_PUPPY_CASSETTE"
+CASSETTE_MODE_ENV = "CODE_PUPPY_CASSETTE_MODE"
+
+MODES = ("record", "replay", "replay-timed")
+
+# Query parameters that carry credentials (e.g. Gemini's ?key=)
+_SECRET_QUERY_PARAMS = {"key", "api_key", "apikey", "access_token", "token"}
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised in replay mode when no recorded exchange matches a request."""
+
+
+def _redact_url(url: httpx.URL | str) -> str:
+    parts = urlsplit(str(url))
+    query = [
+        (key, "REDACTED" if key.lower() in _SECRET_QUERY_PARAMS else value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _encode_chunk(delay: float, chunk: bytes) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"t": round(delay, 6)}
+    try:
+        entry["text"] = chunk.decode("utf-8")
+    except UnicodeDecodeError:
+        entry["b64"] = base64.b64encode(chunk).decode("ascii")
+    return entry
+
+
+def _decode_chunk(entry: Dict[str, Any]) -> bytes:
+    if "b64" in entry:
+        return base64.b64decode(entry["b64"])
+    return entry.get("text", "").encode("utf-8")
+
+
+class Cassette:
+    """A cassette file shared by every client in the process."""
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._interactions: List[Dict[str, Any]] = []
+        self._used: List[bool] = []
+
+        if mode == "record":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            # A recording always starts a fresh cassette
+            with open(path, "w", encoding="utf-8"):
+                pass
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._interactions.append(json.loads(line))
+            self._used = [False] * len(self._interactions)
+
+    @property
+    def timed(self) -> bool:
+        return self.mode == "replay-timed"
+
+    def append(self, interaction: Dict[str, Any]) -> None:
+        """Append a recorded exchange to the cassette file."""
+        line = json.dumps(interaction, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def match(self, method: str, url: str, body_hash: str) -> Dict[str, Any]:
+        """Return the first unused exchange for this request.
+
+        An exact match on the body is preferred; otherwise the next unused
+        exchange for the same method and URL is used, since request bodies
+        often embed volatile data such as timestamps.
+        """
+        with self._lock:
+            fallback = None
+            for index, interaction in enumerate(self._interactions):
+                if self._used[index]:
+                    continue
+                if interaction["method"] != method or interaction["url"] != url:
+                    continue
+                if interaction.get("body_sha256") == body_hash:
+                    fallback = index
+                    break
+                if fallback is None:
+                    fallback = index
+            if fallback is None:
+                raise CassetteMissError(f"No recorded response for {method} {url}")
+            self._used[fallback] = True
+            return self._interactions[fallback]
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes the raw response stream through while timing every chunk."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncByteStream,
+        cassette: Cassette,
+        interaction: Dict[str, Any],
+        started: float,
+    ):
+        self._inner = inner
+        self._cassette = cassette
+        self._interaction = interaction
+        self._last = started
+        self._saved = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            now = time.monotonic()
+            self._interaction["chunks"].append(_encode_chunk(now - self._last, chunk))
+            self._last = now
+            yield chunk
+        self._interaction["complete"] = True
+        self._save()
+
+    async def aclose(self) -> None:
+        self._save()
+        await self._inner.aclose()
+
+    def _save(self) -> None:
+        if not self._saved:
+            self._saved = True
+            self._cassette.append(self._interaction)
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: List[Dict[str, Any]], timed: bool):
+        self._chunks = chunks
+        self._timed = timed
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for entry in self._chunks:
+            if self._timed and entry.get("t"):
+                await asyncio.sleep(entry["t"])
+            yield _decode_chunk(entry)
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records to, or replays from, a Cassette."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if cassette.mode == "record" and inner is None:
+            inner = httpx.AsyncHTTPTransport()
+        self.cassette = cassette
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        method = request.method
+        url = _redact_url(request.url)
+        body_hash = hashlib.sha256(body).hexdigest()
+
+        if self.cassette.mode != "record":
+            return await self._replay(method, url, body_hash)
+
+        started = time.monotonic()
+        response = await self._inner.handle_async_request(request)
+        now = time.monotonic()
+        interaction = {
+            "method": method,
+            "url": url,
+            "body_sha256": body_hash,
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in response.headers.multi_items()],
+            "headers_delay": round(now - started, 6),
+            "chunks": [],
+            "complete": False,
+        }
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, self.cassette, interaction, now),
+            extensions=response.extensions,
+        )
+
+    async def _replay(self, method: str, url: str, body_hash: str) -> httpx.Response:
+        interaction = self.cassette.match(method, url, body_hash)
+        if self.cassette.timed and interaction.get("headers_delay"):
+            await asyncio.sleep(interaction["headers_delay"])
+        return httpx.Response(
+            status_code=interaction["status"],
+            headers=[tuple(header) for header in interaction["headers"]],
+            stream=_ReplayStream(interaction["chunks"], self.cassette.timed),
+        )
+
+    async def aclose(self) -> None:
+        if self._inner is not None:
+            await self._inner.aclose()
+
+
+_cassettes: Dict[tuple, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_active_cassette() -> Optional[Cassette]:
+    """The process-wide cassette configured via the environment, if any."""
+    path = os.environ.get(CASSETTE_ENV, "").strip()
+    if not path:
+        return None
+    mode = os.environ.get(CASSETTE_MODE_ENV, "replay").strip().lower() or "replay"
+    key = (os.path.abspath(os.path.expanduser(path)), mode)
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = Cassette(key[0], mode)
+            _cassettes[key] = cassette
+        return cassette
+
+
+def reset_cassettes() -> None:
+    """Forget loaded cassettes (used by tests)."""
+    with _cassettes_lock:
+        _cassettes.clear()
+
+
+def apply_cassette_transport(client_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Route an httpx.AsyncClient through the active cassette, if any.
+
+    Returns the client keyword arguments unchanged when no cassette is
+    configured. Otherwise the connection options (verify, http2, proxy) move
+    to the recording transport so they keep applying while recording.
+    """
+    cassette = get_active_cassette()
+    if cassette is None or "transport" in client_kwargs:
+        return client_kwargs
+
+    kwargs = dict(client_kwargs)
+    inner = None
+    if cassette.mode == "record":
+        verify = kwargs.pop("verify", True)
+        inner = httpx.AsyncHTTPTransport(
+            verify=True if verify is None else verify,
+            http2=kwargs.pop("http2", False),
+            proxy=kwargs.pop("proxy", None),
+            trust_env=kwargs.get("trust_env", True),
+        )
+    else:
+        for name in ("verify", "http2", "proxy"):
+            kwargs.pop(name, None)
+    kwargs["transport"] = CassetteTransport(cassette, inner)
+    return kwargs
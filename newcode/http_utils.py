@@ -7,7 +7,6 @@ This module provides functions for creating properly configured HTTP clients.
 import asyncio
 import os
 import socket
-import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
@@ -15,7 +14,9 @@ import httpx
 
 if TYPE_CHECKING:
     import requests
-from newcode.config import get_http2
+from newcode.config import get_http2, get_http_rate_limiter_enabled
+from newcode.http_cassette import apply_cassette_transport
+from newcode.rate_limiter import get_rate_limiter, parse_retry_after
 
 
 @dataclass
@@ -103,6 +104,10 @@ class RetryingAsyncClient(httpx.AsyncClient):
     This replaces the Tenacity transport with a more direct subclass implementation,
     which plays nicer with proxies and custom transports (like Antigravity).
 
+    Requests are paced by a shared AdaptiveRateLimiter (one per endpoint and
+    API key) before they are sent, so concurrent clients don't stampede a
+    provider that is already returning 429s.
+
     Special handling for Cerebras: Their Retry-After headers are absurdly aggressive
     (often 60s), so we ignore them and use a 3s base backoff instead.
     """
@@ -112,6 +117,7 @@ class RetryingAsyncClient(httpx.AsyncClient):
         retry_status_codes: tuple = (429, 502, 503, 504),
         max_retries: int = 5,
         model_name: str = "",
+        rate_limit: Optional[bool] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -120,16 +126,26 @@ class RetryingAsyncClient(httpx.AsyncClient):
         self.model_name = model_name.lower() if model_name else ""
         # Cerebras sends crazy aggressive Retry-After headers (60s), ignore them
         self._ignore_retry_headers = "cerebras" in self.model_name
+        self._rate_limit = (
+            get_http_rate_limiter_enabled() if rate_limit is None else rate_limit
+        )
 
     async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
         """Send request with automatic retries for rate limits and server errors."""
         last_response = None
         last_exception = None
+        limiter = get_rate_limiter(request) if self._rate_limit else None
 
         for attempt in range(self.max_retries + 1):
             try:
+                if limiter is not None:
+                    await limiter.acquire()
                 response = await super().send(request, **kwargs)
                 last_response = response
+                if limiter is not None:
+                    limiter.observe(
+                        response, respect_headers=not self._ignore_retry_headers
+                    )
 
                 # Check for retryable status
                 if response.status_code not in self.retry_status_codes:
@@ -149,17 +165,9 @@ class RetryingAsyncClient(httpx.AsyncClient):
                     # Check Retry-After header (only for non-Cerebras)
                     retry_after = response.headers.get("Retry-After")
                     if retry_after:
-                        try:
-                            wait_time = float(retry_after)
-                        except ValueError:
-                            # Try parsing http-date
-                            from email.utils import parsedate_to_datetime
-
-                            try:
-                                date = parsedate_to_datetime(retry_after)
-                                wait_time = date.timestamp() - time.time()
-                            except Exception:
-                                pass
+                        parsed = parse_retry_after(retry_after)
+                        if parsed is not None:
+                            wait_time = parsed
 
                 # Cap wait time
                 wait_time = max(0.5, min(wait_time, 60.0))
@@ -237,26 +245,26 @@ def create_async_client(
 ) -> httpx.AsyncClient:
     config = _resolve_proxy_config(verify)
 
+    # Routes traffic through a record/replay cassette when one is configured
+    client_kwargs = apply_cassette_transport(
+        {
+            "proxy": config.proxy_url,
+            "verify": config.verify,
+            "headers": headers or {},
+            "timeout": timeout,
+            "http2": config.http2_enabled,
+            "trust_env": config.trust_env,
+        }
+    )
+
     if not config.disable_retry:
         return RetryingAsyncClient(
             retry_status_codes=retry_status_codes,
             model_name=model_name,
-            proxy=config.proxy_url,
-            verify=config.verify,
-            headers=headers or {},
-            timeout=timeout,
-            http2=config.http2_enabled,
-            trust_env=config.trust_env,
+            **client_kwargs,
         )
     else:
-        return httpx.AsyncClient(
-            proxy=config.proxy_url,
-            verify=config.verify,
-            headers=headers or {},
-            timeout=timeout,
-            http2=config.http2_enabled,
-            trust_env=config.trust_env,
-        )
+        return httpx.AsyncClient(**client_kwargs)
 
 
 def create_requests_session(
@@ -0,0 +1,315 @@
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from pydantic_ai._run_context import RunContext
+from pydantic_ai.exceptions import (
+    FallbackExceptionGroup,
+    ModelAPIError,
+    ModelHTTPError,
+)
+from pydantic_ai.models import (
+    Model,
+    ModelMessage,
+    ModelRequestParameters,
+    ModelResponse,
+    ModelSettings,
+    StreamedResponse,
+)
+
+try:
+    from opentelemetry.context import get_current_span
+except ImportError:
+    # If opentelemetry is not installed, provide a dummy implementation
+    def get_current_span():
+        class DummySpan:
+            def is_recording(self):
+                return False
+
+            def set_attributes(self, attributes):
+                pass
+
+        return DummySpan()
+
+
+# Status codes worth failing over on: throttling, overload and server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# Consecutive failures double the cooldown, up to this cap (seconds)
+MAX_COOLDOWN_SECONDS = 300.0
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Whether an error from a candidate model should trigger failover."""
+    if isinstance(exc, ModelHTTPError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (ModelAPIError, httpx.TransportError, asyncio.TimeoutError))
+
+
+@dataclass
+class CandidateStats:
+    """Routing state kept for each candidate model."""
+
+    ttft_ewma: Optional[float] = None
+    latency_ewma: Optional[float] = None
+    outstanding: int = 0
+    cooldown_until: float = 0.0
+    consecutive_failures: int = 0
+    requests: int = 0
+    failures: int = 0
+
+    def expected_latency(self, default: float) -> float:
+        """Expected time until this candidate finishes one more request.
+
+        Each in-flight request is assumed to delay a new one by the candidate's
+        time-to-first-token, since providers queue or throttle per key.
+        """
+        latency = self.latency_ewma if self.latency_ewma is not None else default
+        ttft = self.ttft_ewma if self.ttft_ewma is not None else latency
+        return latency + self.outstanding * ttft
+
+
+@dataclass(init=False)
+class LatencyRouterModel(Model):
+    """A model that routes each request to the candidate expected to be fastest.
+
+    Candidates are ranked by an EWMA of time-to-first-token and total latency,
+    inflated by their number of in-flight requests. Candidates that returned a
+    429/5xx or failed to connect are put in a cooldown, and a request that
+    fails with such an error fails over to the next-best candidate.
+
+    Candidates that have never been tried rank ahead of measured ones, so each
+    of them gets one request early on. Candidates tried without a measurement
+    yet are scored with the best latency seen so far.
+    """
+
+    models: List[Model]
+    _ewma_alpha: float = field(default=0.3, repr=False)
+    _cooldown_seconds: float = field(default=30.0, repr=False)
+    _stats: List[CandidateStats] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _last_model_index: int = field(default=0, repr=False)
+
+    def __init__(
+        self,
+        *models: Model,
+        ewma_alpha: float = 0.3,
+        cooldown_seconds: float = 30.0,
+        settings: ModelSettings | None = None,
+    ):
+        """Initialize a latency router model instance.
+
+        Args:
+            models: The candidate model instances.
+            ewma_alpha: Weight of the newest latency sample (0 < alpha <= 1).
+            cooldown_seconds: How long a candidate is skipped after a retryable
+                error. Doubles on consecutive failures.
+            settings: Model settings that will be used as defaults for this model.
+        """
+        super().__init__(settings=settings)
+        if not models:
+            raise ValueError("At least one model must be provided")
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+        if cooldown_seconds < 0:
+            raise ValueError("cooldown_seconds must not be negative")
+        self.models = list(models)
+        self._ewma_alpha = ewma_alpha
+        self._cooldown_seconds = cooldown_seconds
+        self._stats = [CandidateStats() for _ in self.models]
+        self._lock = threading.Lock()
+        self._last_model_index = 0
+
+    @property
+    def model_name(self) -> str:
+        """The model name showing this is a latency router with its candidates."""
+        return f"latency_router:{','.join(model.model_name for model in self.models)}"
+
+    @property
+    def system(self) -> str:
+        """System prompt from the most recently selected model."""
+        return self.models[self._last_model_index].system
+
+    @property
+    def base_url(self) -> str | None:
+        """Base URL from the most recently selected model."""
+        return self.models[self._last_model_index].base_url
+
+    def _ranked_candidates(self) -> List[int]:
+        """Candidate indices, best first. Cooling-down candidates go last."""
+        now = time.monotonic()
+        with self._lock:
+            known = [s.latency_ewma for s in self._stats if s.latency_ewma is not None]
+            default = min(known) if known else 0.0
+            ready = []
+            cooling = []
+            for index, stats in enumerate(self._stats):
+                if stats.cooldown_until > now:
+                    cooling.append((stats.cooldown_until, index))
+                elif stats.requests == 0:
+                    # Never tried: explore before trusting the measured ones
+                    ready.append((0, 0.0, index))
+                else:
+                    # Ties keep configuration order
+                    ready.append((1, stats.expected_latency(default), index))
+            ready.sort()
+            cooling.sort()
+            return [index for *_, index in ready] + [index for _, index in cooling]
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return self._ewma_alpha * sample + (1 - self._ewma_alpha) * current
+
+    def _on_start(self, index: int) -> float:
+        with self._lock:
+            stats = self._stats[index]
+            stats.outstanding += 1
+            stats.requests += 1
+            self._last_model_index = index
+        return time.monotonic()
+
+    def _on_first_token(self, index: int, started: float) -> None:
+        with self._lock:
+            stats = self._stats[index]
+            stats.ttft_ewma = self._ewma(stats.ttft_ewma, time.monotonic() - started)
+
+    def _on_success(self, index: int, started: float) -> None:
+        with self._lock:
+            stats = self._stats[index]
+            stats.outstanding -= 1
+            stats.latency_ewma = self._ewma(
+                stats.latency_ewma, time.monotonic() - started
+            )
+            stats.consecutive_failures = 0
+
+    def _on_failure(self, index: int, exc: BaseException) -> None:
+        with self._lock:
+            stats = self._stats[index]
+            stats.outstanding -= 1
+            if not is_retryable_error(exc):
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            cooldown = min(
+                self._cooldown_seconds * 2 ** (stats.consecutive_failures - 1),
+                MAX_COOLDOWN_SECONDS,
+            )
+            stats.cooldown_until = time.monotonic() + cooldown
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Routing state per candidate, keyed by candidate model name."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model.model_name: {
+                    "ttft_ewma": stats.ttft_ewma,
+                    "latency_ewma": stats.latency_ewma,
+                    "outstanding": stats.outstanding,
+                    "cooldown_remaining": max(0.0, stats.cooldown_until - now),
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                }
+                for model, stats in zip(self.models, self._stats)
+            }
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        """Make a request on the best candidate, failing over on retryable errors."""
+        exceptions: list[Exception] = []
+
+        for index in self._ranked_candidates():
+            current_model = self.models[index]
+            # Use prepare_request to merge settings and customize parameters
+            merged_settings, prepared_params = current_model.prepare_request(
+                model_settings, model_request_parameters
+            )
+            started = self._on_start(index)
+            try:
+                response = await current_model.request(
+                    messages, merged_settings, prepared_params
+                )
+            except Exception as exc:
+                self._on_failure(index, exc)
+                if not is_retryable_error(exc):
+                    raise
+                exceptions.append(exc)
+                continue
+
+            # Non-streaming: the first token arrives with the whole response
+            self._on_first_token(index, started)
+            self._on_success(index, started)
+            self._set_span_attributes(current_model)
+            return response
+
+        raise FallbackExceptionGroup(
+            "All models from LatencyRouterModel failed", exceptions
+        )
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        """Stream from the best candidate, failing over until the stream opens.
+
+        Opening a stream waits for the provider's first chunk, so the time to
+        open it is recorded as time-to-first-token. Once events have been handed
+        to the caller, errors are recorded but can no longer fail over.
+        """
+        exceptions: list[Exception] = []
+
+        for index in self._ranked_candidates():
+            current_model = self.models[index]
+            # Use prepare_request to merge settings and customize parameters
+            merged_settings, prepared_params = current_model.prepare_request(
+                model_settings, model_request_parameters
+            )
+            started = self._on_start(index)
+            async with AsyncExitStack() as stack:
+                try:
+                    response = await stack.enter_async_context(
+                        current_model.request_stream(
+                            messages, merged_settings, prepared_params, run_context
+                        )
+                    )
+                except Exception as exc:
+                    self._on_failure(index, exc)
+                    if not is_retryable_error(exc):
+                        raise
+                    exceptions.append(exc)
+                    continue
+
+                self._on_first_token(index, started)
+                self._set_span_attributes(current_model)
+                try:
+                    yield response
+                except BaseException as exc:
+                    self._on_failure(index, exc)
+                    raise
+                self._on_success(index, started)
+                return
+
+        raise FallbackExceptionGroup(
+            "All models from LatencyRouterModel failed", exceptions
+        )
+
+    def _set_span_attributes(self, model: Model):
+        """Set span attributes for observability."""
+        with suppress(Exception):
+            span = get_current_span()
+            if span.is_recording():
+                attributes = getattr(span, "attributes", {})
+                if attributes.get("gen_ai.request.model") == self.model_name:
+                    span.set_attributes(model.model_attributes(model))
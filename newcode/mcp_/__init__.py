@@ -15,6 +15,7 @@ from .error_isolation import (
     QuarantinedServerError,
     get_error_isolator,
 )
+from .lazy_startup import LazyMCPServer
 from .managed_server import ManagedMCPServer, ServerConfig, ServerState
 from .manager import MCPManager, ServerInfo, get_mcp_manager
 from .mcp_logs import (
@@ -29,9 +30,11 @@ from .mcp_logs import (
 from .registry import ServerRegistry
 from .retry_manager import RetryManager, RetryStats, get_retry_manager, retry_mcp_call
 from .status_tracker import Event, ServerStatusTracker
+from .tool_cache import MCPToolCache, get_cached_tool_definitions, get_tool_cache
 
 __all__ = [
     "ManagedMCPServer",
+    "LazyMCPServer",
     "ServerConfig",
     "ServerState",
     "ServerStatusTracker",
@@ -63,4 +66,8 @@ __all__ = [
     "clear_logs",
     "list_servers_with_logs",
     "get_log_stats",
+    # Tool definition cache
+    "MCPToolCache",
+    "get_tool_cache",
+    "get_cached_tool_definitions",
 ]
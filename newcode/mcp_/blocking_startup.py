@@ -21,10 +21,20 @@ from pydantic_ai.mcp import MCPServerStdio
 from newcode.mcp_.mcp_logs import get_log_file_path, rotate_log_if_needed, write_log
 from newcode.messaging import emit_info
 
+# Stderr lines kept in memory per server (older lines remain in the log file)
+MAX_CAPTURED_LINES = 1000
+
+_READ_CHUNK_BYTES = 65536
+
 
 class StderrFileCapture:
     """
-    Captures stderr to a persistent log file and optionally monitors it.
+    Captures stderr through a pipe into a persistent log file.
+
+    The server's stderr is the write end of a pipe. Lines are appended to
+    the log file and a bounded ring buffer as they arrive: the read end is
+    watched by the event loop (or, without a loop that supports it, read by
+    a thread blocked in read()), so idle servers cost no CPU.
 
     Logs are written to ~/.newcode/mcp_logs/<server_name>.log
     """
@@ -40,13 +50,20 @@ class StderrFileCapture:
         self.message_group = message_group or uuid.uuid4()
         self.log_file = None
         self.log_path = None
-        self.monitor_thread = None
-        self.stop_monitoring = threading.Event()
-        self.captured_lines: deque = deque(maxlen=1000)
-        self._last_read_pos = 0
+        self.reader_thread = None
+        self.captured_lines: deque = deque(maxlen=MAX_CAPTURED_LINES)
+        self._pipe_writer = None
+        self._read_fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._partial = b""
+        self._lock = threading.Lock()
 
     def start(self):
-        """Start capture by opening persistent log file and monitor thread."""
+        """Open the log file and the stderr pipe.
+
+        Returns:
+            The pipe's write end, to be passed to the server as its stderr
+        """
         # Rotate log if needed
         rotate_log_if_needed(self.server_name)
 
@@ -56,70 +73,152 @@ class StderrFileCapture:
         # Write startup marker
         write_log(self.server_name, "--- Server starting ---", "INFO")
 
-        # Start monitoring thread only if we need to emit to user or capture lines
         try:
             # Open log file for appending stderr (inside try for proper cleanup)
             self.log_file = open(self.log_path, "a", encoding="utf-8")
-            self.stop_monitoring.clear()
-            self.monitor_thread = threading.Thread(target=self._monitor_file)
-            self.monitor_thread.daemon = True
-            self.monitor_thread.start()
+            read_fd, write_fd = os.pipe()
+            self._read_fd = read_fd
+            self._pipe_writer = os.fdopen(write_fd, "wb", buffering=0)
+            self._start_reader()
         except Exception:
+            self._close_pipe()
             if self.log_file is not None:
                 self.log_file.close()
                 self.log_file = None
             raise
 
-        return self.log_file
+        return self._pipe_writer
 
-    def _monitor_file(self):
-        """Monitor the log file for new content."""
-        if not self.log_path:
+    def _start_reader(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+            os.set_blocking(self._read_fd, False)
+            loop.add_reader(self._read_fd, self._on_readable)
+            self._loop = loop
+        except (RuntimeError, NotImplementedError):
+            # No running loop, or one without add_reader (Windows proactor)
+            os.set_blocking(self._read_fd, True)
+            self.reader_thread = threading.Thread(
+                target=self._read_until_eof, args=(self._read_fd,), daemon=True
+            )
+            self.reader_thread.start()
+
+    def close_writer(self) -> None:
+        """Close our copy of the pipe's write end once the server holds its own.
+
+        The reader sees end-of-file when the server exits only after this.
+        """
+        if self._pipe_writer is not None:
+            try:
+                self._pipe_writer.close()
+            except OSError:
+                pass
+            self._pipe_writer = None
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._read_fd, _READ_CHUNK_BYTES)
+        except BlockingIOError:
             return
+        except OSError:
+            data = b""
+        if data:
+            self._feed(data)
+        else:
+            self._remove_reader()
 
+    def _read_until_eof(self, read_fd: int) -> None:
+        # The thread owns read_fd: closing it elsewhere could free the
+        # number for reuse while read() is still blocked on it
         try:
-            # Start reading from current position (end of file before we started)
+            while data := os.read(read_fd, _READ_CHUNK_BYTES):
+                self._feed(data)
+        except OSError:
+            pass
+        finally:
             try:
-                self._last_read_pos = os.path.getsize(self.log_path)
+                os.close(read_fd)
             except OSError:
-                self._last_read_pos = 0
-
-            while not self.stop_monitoring.is_set():
-                try:
-                    with open(
-                        self.log_path, "r", encoding="utf-8", errors="replace"
-                    ) as f:
-                        f.seek(self._last_read_pos)
-                        new_content = f.read()
-                        if new_content:
-                            self._last_read_pos = f.tell()
-                            # Process new lines
-                            for line in new_content.splitlines():
-                                if line.strip():
-                                    self.captured_lines.append(line)
-                                    if self.emit_to_user:
-                                        emit_info(
-                                            f"MCP {self.server_name}: {line}",
-                                            message_group=self.message_group,
-                                        )
-
-                except Exception:
-                    pass  # File might not exist yet or be deleted
-
-                self.stop_monitoring.wait(0.1)  # Check every 100ms
-        finally:
-            if self.log_file is not None:
-                try:
-                    self.log_file.close()
-                except Exception:
-                    pass
-                self.log_file = None
+                pass
+
+    def _drain(self) -> None:
+        """Read whatever is still buffered in the pipe without blocking."""
+        if self._read_fd is None:
+            return
+        try:
+            os.set_blocking(self._read_fd, False)
+            while data := os.read(self._read_fd, _READ_CHUNK_BYTES):
+                self._feed(data)
+        except OSError:
+            pass
+
+    def _feed(self, data: bytes) -> None:
+        with self._lock:
+            *lines, self._partial = (self._partial + data).split(b"\n")
+            for line in lines:
+                self._handle_line(line.decode("utf-8", errors="replace"))
+            self._flush_log()
+
+    def _flush_partial(self) -> None:
+        with self._lock:
+            if self._partial:
+                self._handle_line(self._partial.decode("utf-8", errors="replace"))
+                self._partial = b""
+                self._flush_log()
+
+    def _handle_line(self, line: str) -> None:
+        line = line.rstrip("\r")
+        if self.log_file is not None:
+            try:
+                self.log_file.write(line + "\n")
+            except Exception:
+                pass
+        if line.strip():
+            self.captured_lines.append(line)
+            if self.emit_to_user:
+                emit_info(
+                    f"MCP {self.server_name}: {line}",
+                    message_group=self.message_group,
+                )
+
+    def _flush_log(self) -> None:
+        if self.log_file is not None:
+            try:
+                self.log_file.flush()
+            except Exception:
+                pass
+
+    def _remove_reader(self) -> None:
+        if self._loop is not None and self._read_fd is not None:
+            try:
+                self._loop.remove_reader(self._read_fd)
+            except Exception:
+                pass  # Loop already closed
+        self._loop = None
+
+    def _close_pipe(self) -> None:
+        self._remove_reader()
+        self.close_writer()
+        if self._read_fd is not None:
+            try:
+                os.close(self._read_fd)
+            except OSError:
+                pass
+            self._read_fd = None
 
     def stop(self):
-        """Stop monitoring and clean up."""
-        self.stop_monitoring.set()
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=1)
+        """Read remaining output, close the pipe and the log file."""
+        self.close_writer()
+        if self.reader_thread is not None:
+            # Returns at end-of-file, once the server has exited
+            self.reader_thread.join(timeout=1)
+            self.reader_thread = None
+            self._read_fd = None
+        else:
+            self._remove_reader()
+            self._drain()
+        self._flush_partial()
+        self._close_pipe()
 
         if self.log_file:
             try:
@@ -127,31 +226,21 @@ class StderrFileCapture:
                 self.log_file.close()
             except Exception:
                 pass
+            self.log_file = None
 
         # Write shutdown marker
         write_log(self.server_name, "--- Server stopped ---", "INFO")
 
-        # Read any remaining content for in-memory capture
-        if self.log_path and os.path.exists(self.log_path):
-            try:
-                with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
-                    f.seek(self._last_read_pos)
-                    content = f.read()
-                    for line in content.splitlines():
-                        if line.strip() and line not in self.captured_lines:
-                            self.captured_lines.append(line)
-                            if self.emit_to_user:
-                                emit_info(
-                                    f"MCP {self.server_name}: {line}",
-                                    message_group=self.message_group,
-                                )
-            except Exception:
-                pass
-
         # Note: We do NOT delete the log file - it's persistent now!
 
     def __del__(self):
-        """Safety net to close log file handle if stop() was never called."""
+        """Safety net to close handles if stop() was never called."""
+        if getattr(self, "_read_fd", None) is not None and not getattr(
+            self, "reader_thread", None
+        ):
+            self._close_pipe()
+        else:
+            self.close_writer()
         if getattr(self, "log_file", None) is not None:
             try:
                 self.log_file.close()
@@ -195,13 +284,15 @@ class SimpleCapturedMCPServerStdio(MCPServerStdio):
         self._stderr_capture = StderrFileCapture(
             server_name, self.emit_stderr, self.message_group
         )
-        stderr_file = self._stderr_capture.start()
+        stderr_pipe = self._stderr_capture.start()
 
         try:
-            async with stdio_client(server=server, errlog=stderr_file) as (
+            async with stdio_client(server=server, errlog=stderr_pipe) as (
                 read_stream,
                 write_stream,
             ):
+                # The server process holds its own copy of the write end now
+                self._stderr_capture.close_writer()
                 yield read_stream, write_stream
         finally:
             self._stderr_capture.stop()
@@ -159,6 +159,7 @@ class MCPDashboard:
             ServerState.STOPPED: "[red]✗ Stop[/red]",
             ServerState.ERROR: "[red]⚠ Err[/red]",
             ServerState.STARTING: "[yellow]⏳ Start[/yellow]",
+            ServerState.IDLE: "[cyan]○ Idle[/cyan]",
             ServerState.STOPPING: "[yellow]⏳ Stop[/yellow]",
             ServerState.QUARANTINED: "[yellow]⏸ Quar[/yellow]",
         }
@@ -0,0 +1,109 @@
+"""
+Lazy, on-demand startup of MCP servers.
+
+With ``mcp_lazy_startup`` enabled, ``/mcp start`` only enables a server and
+agents receive it wrapped in a ``LazyMCPServer`` toolset. The wrapper:
+
+- does not connect when an agent run enters it;
+- serves tool definitions from the on-disk tool cache while the server is
+  not running;
+- starts the server through ``MCPManager.ensure_server_running`` on the
+  first tool call, or when listing tools with nothing cached.
+
+pydantic-ai lists tools of all toolsets and runs parallel tool calls
+concurrently, so servers needed at the same time also start concurrently.
+Once started, a server keeps running like an eagerly started one until
+``/mcp stop``.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp import types as mcp_types
+from pydantic_ai import RunContext
+from pydantic_ai.mcp import MCPServer
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import ToolsetTool, WrapperToolset
+
+from .tool_cache import get_cached_tools
+
+logger = logging.getLogger(__name__)
+
+
+def _tool_definition(server: MCPServer, tool: mcp_types.Tool) -> ToolDefinition:
+    """Build the definition pydantic-ai's ``MCPServer.get_tools`` would."""
+    name = f"{server.tool_prefix}_{tool.name}" if server.tool_prefix else tool.name
+    return ToolDefinition(
+        name=name,
+        description=tool.description,
+        parameters_json_schema=tool.inputSchema,
+        metadata={
+            "meta": tool.meta,
+            "annotations": tool.annotations.model_dump() if tool.annotations else None,
+            "output_schema": tool.outputSchema or None,
+        },
+    )
+
+
+@dataclass
+class LazyMCPServer(WrapperToolset[Any]):
+    """An MCP server toolset that starts its server on first use.
+
+    Args:
+        wrapped: The pydantic-ai MCP server.
+        start: Starts the server process and keeps it running; returns
+            whether it is running. If it fails, calls fall back to the
+            server's own per-call connection and surface its error.
+    """
+
+    wrapped: MCPServer
+    start: Callable[[], Awaitable[bool]] = field(repr=False)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.wrapped.id
+
+    @property
+    def is_running(self) -> bool:
+        return self.wrapped.is_running
+
+    async def __aenter__(self) -> "LazyMCPServer":
+        # Entering the agent run must not spawn the server
+        return self
+
+    async def __aexit__(self, *args: Any) -> Optional[bool]:
+        return None
+
+    async def _ensure_started(self) -> None:
+        if not self.wrapped.is_running and not await self.start():
+            logger.warning(f"Lazy start of MCP server {self.wrapped.label} failed")
+
+    async def get_tools(self, ctx: RunContext[Any]) -> Dict[str, ToolsetTool[Any]]:
+        if not self.wrapped.is_running:
+            cached = get_cached_tools(self.wrapped)
+            if cached is not None:
+                return {
+                    tool_def.name: self.wrapped.tool_for_tool_def(tool_def)
+                    for tool_def in (
+                        _tool_definition(self.wrapped, tool) for tool in cached
+                    )
+                }
+            await self._ensure_started()
+        return await self.wrapped.get_tools(ctx)
+
+    async def call_tool(
+        self,
+        name: str,
+        tool_args: Dict[str, Any],
+        ctx: RunContext[Any],
+        tool: ToolsetTool[Any],
+    ) -> Any:
+        await self._ensure_started()
+        return await self.wrapped.call_tool(name, tool_args, ctx, tool)
+
+    async def list_tools(self) -> List[mcp_types.Tool]:
+        """Tools of the server, without starting it just to list them."""
+        if self.wrapped.is_running:
+            return await self.wrapped.list_tools()
+        return get_cached_tools(self.wrapped) or []
@@ -25,6 +25,7 @@ from pydantic_ai.mcp import (
 
 from newcode.http_utils import create_async_client
 from newcode.mcp_.blocking_startup import BlockingMCPServerStdio
+from newcode.mcp_.tool_cache import attach_tool_cache, compute_config_hash
 from newcode.messaging import emit_info
 
 
@@ -58,6 +59,8 @@ class ServerState(Enum):
 
     STOPPED = "stopped"
     STARTING = "starting"
+    # Enabled, with the process started on first use (mcp_lazy_startup)
+    IDLE = "idle"
     RUNNING = "running"
     STOPPING = "stopping"
     ERROR = "error"
@@ -267,6 +270,15 @@ class ManagedMCPServer:
             else:
                 raise ValueError(f"Unsupported server type: {server_type}")
 
+            # Keep tool definitions across connections and restarts; a
+            # config change produces a new hash and so a fresh tool list
+            hashed_config = {k: v for k, v in config.items() if k != "http_client"}
+            attach_tool_cache(
+                self._pydantic_server,
+                self.config.name,
+                compute_config_hash(server_type, _expand_env_vars(hashed_config)),
+            )
+
         except Exception:
             raise
 
@@ -302,10 +314,23 @@ class ManagedMCPServer:
     def disable(self) -> None:
         """Disable server availability."""
         self._enabled = False
-        if self._state == ServerState.RUNNING:
+        if self._state in (ServerState.RUNNING, ServerState.IDLE):
             self._state = ServerState.STOPPED
             self._stop_time = datetime.now()
 
+    def mark_idle(self) -> None:
+        """Report an enabled server as idle until its process is started."""
+        if self._enabled and self._state == ServerState.RUNNING:
+            self._state = ServerState.IDLE
+
+    def mark_running(self) -> bool:
+        """Report an idle server as running. Returns True if it was idle."""
+        if self._state != ServerState.IDLE:
+            return False
+        self._state = ServerState.RUNNING
+        self._start_time = datetime.now()
+        return True
+
     def is_enabled(self) -> bool:
         """
         Check if server is enabled.
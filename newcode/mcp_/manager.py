@@ -8,6 +8,7 @@ to agents.
 """
 
 import asyncio
+import functools
 import logging
 from dataclasses import dataclass
 from datetime import datetime
@@ -16,6 +17,7 @@ from typing import Any, Dict, List, Optional, Union
 from pydantic_ai.mcp import MCPServerSSE, MCPServerStdio, MCPServerStreamableHTTP
 
 from .async_lifecycle import get_lifecycle_manager
+from .lazy_startup import LazyMCPServer
 from .managed_server import ManagedMCPServer, ServerConfig, ServerState
 from .registry import ServerRegistry
 from .status_tracker import ServerStatusTracker
@@ -78,6 +80,9 @@ class MCPManager:
         # Active managed servers (server_id -> ManagedMCPServer)
         self._managed_servers: Dict[str, ManagedMCPServer] = {}
 
+        # In-flight process starts for lazily started servers
+        self._process_starts: Dict[str, asyncio.Future] = {}
+
         # Sync servers from mcp_servers.json into registry
         self.sync_from_config()
 
@@ -229,7 +234,9 @@ class MCPManager:
 
     def get_servers_for_agent(
         self,
-    ) -> List[Union[MCPServerSSE, MCPServerStdio, MCPServerStreamableHTTP]]:
+    ) -> List[
+        Union[MCPServerSSE, MCPServerStdio, MCPServerStreamableHTTP, LazyMCPServer]
+    ]:
         """
         Get pydantic-ai compatible servers for agent use.
 
@@ -237,9 +244,15 @@ class MCPManager:
         instances (not wrappers). Only returns enabled, non-quarantined servers.
         Handles errors gracefully by logging but not crashing.
 
+        With ``mcp_lazy_startup`` enabled, each server is wrapped in a
+        LazyMCPServer toolset that starts it on first use.
+
         Returns:
             List of actual pydantic-ai MCP server instances ready for use
         """
+        from newcode.config import get_mcp_lazy_startup
+
+        lazy = get_mcp_lazy_startup()
         servers = []
 
         for server_id, managed_server in self._managed_servers.items():
@@ -248,6 +261,11 @@ class MCPManager:
                 if managed_server.is_enabled() and not managed_server.is_quarantined():
                     # Get the actual pydantic-ai server instance
                     pydantic_server = managed_server.get_pydantic_server()
+                    if lazy:
+                        pydantic_server = LazyMCPServer(
+                            pydantic_server,
+                            functools.partial(self.ensure_server_running, server_id),
+                        )
                     servers.append(pydantic_server)
 
                     logger.debug(
@@ -415,36 +433,27 @@ class MCPManager:
         try:
             # First enable the server
             managed_server.enable()
+
+            from newcode.config import get_mcp_lazy_startup
+
+            if get_mcp_lazy_startup():
+                # The process is spawned by ensure_server_running() on first
+                # use; until then the server is reported as idle
+                managed_server.mark_idle()
+                self.status_tracker.set_status(server_id, ServerState.IDLE)
+                self.status_tracker.record_event(
+                    server_id,
+                    "enabled",
+                    {"message": "Server enabled (process will start on first use)"},
+                )
+                return True
+
             self.status_tracker.set_status(server_id, ServerState.RUNNING)
             self.status_tracker.record_start_time(server_id)
 
             # Try to actually start it if we have an async context
             try:
-                # Get the pydantic-ai server instance
-                pydantic_server = managed_server.get_pydantic_server()
-
-                # Start the server using the async lifecycle manager
-                lifecycle_mgr = get_lifecycle_manager()
-                started = await lifecycle_mgr.start_server(server_id, pydantic_server)
-
-                if started:
-                    logger.info(
-                        f"Started server process: {managed_server.config.name} (ID: {server_id})"
-                    )
-                    self.status_tracker.record_event(
-                        server_id,
-                        "started",
-                        {"message": "Server started and process running"},
-                    )
-                else:
-                    logger.warning(
-                        f"Could not start process for server {server_id}, but it's enabled"
-                    )
-                    self.status_tracker.record_event(
-                        server_id,
-                        "enabled",
-                        {"message": "Server enabled (process will start when used)"},
-                    )
+                await self._start_process(server_id, managed_server)
             except Exception as e:
                 # Process start failed, but server is still enabled
                 logger.warning(f"Could not start process for server {server_id}: {e}")
@@ -466,6 +475,79 @@ class MCPManager:
             )
             return False
 
+    async def _start_process(
+        self, server_id: str, managed_server: ManagedMCPServer
+    ) -> bool:
+        """Spawn the server process (or open its connection) and keep it running."""
+        # Get the pydantic-ai server instance
+        pydantic_server = managed_server.get_pydantic_server()
+
+        # Start the server using the async lifecycle manager
+        lifecycle_mgr = get_lifecycle_manager()
+        started = await lifecycle_mgr.start_server(server_id, pydantic_server)
+
+        if started:
+            logger.info(
+                f"Started server process: {managed_server.config.name} (ID: {server_id})"
+            )
+            self.status_tracker.record_event(
+                server_id,
+                "started",
+                {"message": "Server started and process running"},
+            )
+        else:
+            logger.warning(
+                f"Could not start process for server {server_id}, but it's enabled"
+            )
+            self.status_tracker.record_event(
+                server_id,
+                "enabled",
+                {"message": "Server enabled (process will start when used)"},
+            )
+        return started
+
+    async def ensure_server_running(self, server_id: str) -> bool:
+        """
+        Start the process of an enabled server unless it is already running.
+
+        Used by lazily started servers on their first tool call. Concurrent
+        callers for the same server share one start, and different servers
+        start concurrently.
+
+        Args:
+            server_id: ID of server to start
+
+        Returns:
+            True if the server process is running, False otherwise
+        """
+        managed_server = self._managed_servers.get(server_id)
+        if managed_server is None or not managed_server.is_enabled():
+            return False
+
+        task = self._process_starts.get(server_id)
+        if task is None:
+
+            async def start() -> bool:
+                try:
+                    started = await self._start_process(server_id, managed_server)
+                    if started and managed_server.mark_running():
+                        self.status_tracker.set_status(server_id, ServerState.RUNNING)
+                        self.status_tracker.record_start_time(server_id)
+                    return started
+                except Exception as e:
+                    logger.warning(
+                        f"Could not start process for server {server_id}: {e}"
+                    )
+                    return False
+                finally:
+                    self._process_starts.pop(server_id, None)
+
+            task = asyncio.ensure_future(start())
+            self._process_starts[server_id] = task
+
+        # Don't let one cancelled caller abort the start for the others
+        return await asyncio.shield(task)
+
     def start_server_sync(self, server_id: str) -> bool:
         """
         Synchronous wrapper for start_server.
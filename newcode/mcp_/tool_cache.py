@@ -0,0 +1,253 @@
+"""
+On-disk cache of MCP tool definitions.
+
+pydantic-ai caches ``list_tools`` results in memory, but drops them whenever
+a server connection closes, so tool lists are fetched again for every run
+and lost on restart. This module keeps the last list per server on disk and
+seeds pydantic-ai's in-memory cache from it when the server connects.
+
+An entry is used only while it matches:
+- the server's config hash (type plus env-expanded config), and
+- the name and version the server reports during initialization.
+
+Entries are dropped when the server sends ``notifications/tools/list_changed``,
+and replaced whenever the tools are fetched from the server.
+``get_cached_tool_definitions`` gives agents the cached definitions for
+token estimation before any server has been contacted.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import types as mcp_types
+from pydantic import ValidationError
+from pydantic_ai.mcp import MCPServer
+
+from newcode import config as cp_config
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_VERSION = 1
+
+# Attribute set on servers whose tool lists are cached on disk
+_CACHE_KEY_ATTR = "_newcode_tool_cache_key"
+
+
+def compute_config_hash(server_type: str, config: Dict[str, Any]) -> str:
+    """Stable hash of a server's type and (env-expanded) config."""
+    payload = json.dumps(
+        {"type": server_type, "config": config}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _default_cache_path() -> Path:
+    return Path(cp_config.CACHE_DIR) / "mcp_tool_cache.json"
+
+
+class MCPToolCache:
+    """Per-server tool definitions, persisted as one JSON file."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded_from: Optional[Path] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path or _default_cache_path()
+
+    def _ensure_loaded(self) -> None:
+        path = self.path
+        if self._loaded_from == path:
+            return
+        self._loaded_from = path
+        self._entries = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_FILE_VERSION:
+                self._entries = dict(data.get("servers", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.debug(f"Ignoring unreadable MCP tool cache {path}: {e}")
+
+    def _persist(self) -> None:
+        path = self.path
+        data = {"version": CACHE_FILE_VERSION, "servers": self._entries}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file, then rename (atomic)
+            temp_path = path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.debug(f"Failed to persist MCP tool cache: {e}")
+
+    def get(
+        self,
+        server_name: str,
+        config_hash: str,
+        server_version: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Cached tool dicts, or None if missing or stale.
+
+        ``server_version`` is only checked when given, so definitions can be
+        read for token estimation before the server is contacted.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(server_name)
+        if not entry or entry.get("config_hash") != config_hash:
+            return None
+        if server_version is not None and entry.get("server_version") != server_version:
+            return None
+        return entry.get("tools")
+
+    def put(
+        self,
+        server_name: str,
+        config_hash: str,
+        server_version: Optional[str],
+        tools: List[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[server_name] = {
+                "config_hash": config_hash,
+                "server_version": server_version,
+                "tools": tools,
+            }
+            self._persist()
+
+    def invalidate(self, server_name: str) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            if self._entries.pop(server_name, None) is not None:
+                self._persist()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._loaded_from = self.path
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+
+_cache = MCPToolCache()
+
+
+def get_tool_cache() -> MCPToolCache:
+    return _cache
+
+
+def _server_version(server: MCPServer) -> Optional[str]:
+    try:
+        info = server.server_info
+    except AttributeError:
+        return None
+    return f"{info.name}@{info.version}"
+
+
+def attach_tool_cache(server: Any, server_name: str, config_hash: str) -> None:
+    """Back ``server``'s tool list with the on-disk cache.
+
+    The manager must hand agents the pydantic-ai server objects themselves,
+    so the cache is attached by wrapping ``list_tools`` and the notification
+    handler on the instance. Does nothing for other objects (e.g. mocks).
+    """
+    if not isinstance(server, MCPServer):
+        return
+    key: Tuple[str, str] = (server_name, config_hash)
+    setattr(server, _CACHE_KEY_ATTR, key)
+    original_list_tools = server.list_tools
+    original_handle_notification = server._handle_notification
+
+    async def list_tools() -> List[mcp_types.Tool]:
+        if not server.cache_tools:
+            return await original_list_tools()
+        async with server:
+            if server._cached_tools is not None:
+                return server._cached_tools
+            version = _server_version(server)
+            cached = _cache.get(server_name, config_hash, version)
+            if cached is not None:
+                try:
+                    server._cached_tools = [
+                        mcp_types.Tool.model_validate(tool) for tool in cached
+                    ]
+                    return server._cached_tools
+                except ValidationError as e:
+                    logger.debug(f"Discarding cached tools for {server_name}: {e}")
+            tools = await original_list_tools()
+            _cache.put(
+                server_name,
+                config_hash,
+                version,
+                [
+                    tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+                    for tool in tools
+                ],
+            )
+            return tools
+
+    async def handle_notification(message: Any) -> None:
+        await original_handle_notification(message)
+        if isinstance(message, mcp_types.ServerNotification) and isinstance(
+            message.root, mcp_types.ToolListChangedNotification
+        ):
+            _cache.invalidate(server_name)
+
+    server.list_tools = list_tools
+    server._handle_notification = handle_notification
+
+
+def _cache_key(server: Any) -> Optional[Tuple[str, str]]:
+    # Lazily started servers are wrapped in a toolset
+    server = getattr(server, "wrapped", server)
+    key = getattr(server, _CACHE_KEY_ATTR, None)
+    return key if isinstance(key, tuple) else None
+
+
+def get_cached_tools(server: Any) -> Optional[List[mcp_types.Tool]]:
+    """Cached tools for ``server`` regardless of server version, or None."""
+    key = _cache_key(server)
+    cached = _cache.get(*key) if key else None
+    if cached is None:
+        return None
+    try:
+        return [mcp_types.Tool.model_validate(tool) for tool in cached]
+    except ValidationError as e:
+        logger.debug(f"Discarding cached tools for {key[0]}: {e}")
+        return None
+
+
+def get_cached_tool_definitions(servers: List[Any]) -> List[Dict[str, Any]]:
+    """Cached ``{"name", "description", "inputSchema"}`` dicts for ``servers``.
+
+    Servers without an attached cache or without a cache entry contribute
+    nothing.
+    """
+    definitions: List[Dict[str, Any]] = []
+    for server in servers or []:
+        key = _cache_key(server)
+        if key is None:
+            continue
+        for tool in _cache.get(*key) or []:
+            definitions.append(
+                {
+                    "name": tool.get("name", ""),
+                    "description": tool.get("description", ""),
+                    "inputSchema": tool.get("inputSchema", {}),
+                }
+            )
+    return definitions
@@ -54,6 +54,9 @@ from .messages import (
     UserInputRequest,
 )
 
+# Put on the outgoing queue to wake a consumer blocked in drain_messages()
+_WAKEUP = object()
+
 
 class MessageBus:
     """Central coordinator for bidirectional Agent <-> UI communication.
@@ -408,10 +411,10 @@ class MessageBus:
         """
         # For async usage, wrap sync queue in asyncio-friendly way
         while True:
-            try:
-                return self._outgoing.get_nowait()
-            except queue.Empty:
-                await asyncio.sleep(0.01)
+            message = self.get_message_nowait()
+            if message is not None:
+                return message
+            await asyncio.sleep(0.01)
 
     def get_message_nowait(self) -> Optional[AnyMessage]:
         """Get the next outgoing message without blocking.
@@ -419,10 +422,52 @@ class MessageBus:
         Returns:
             The next message, or None if queue is empty.
         """
+        while True:
+            try:
+                message = self._outgoing.get_nowait()
+            except queue.Empty:
+                return None
+            if message is not _WAKEUP:
+                return message
+
+    def drain_messages(
+        self, timeout: Optional[float] = None, max_batch: int = 256
+    ) -> List[AnyMessage]:
+        """Block until messages are available, then take all that are queued.
+
+        Sleeps on the queue instead of polling, so an idle consumer costs
+        nothing, and a burst of messages is handed over as one batch.
+
+        Args:
+            timeout: Seconds to wait for the first message (None waits forever).
+            max_batch: Maximum number of messages returned at once.
+
+        Returns:
+            The queued messages in order. Empty on timeout or after
+            wake_consumers() was called.
+        """
         try:
-            return self._outgoing.get_nowait()
+            first = self._outgoing.get(timeout=timeout)
         except queue.Empty:
-            return None
+            return []
+
+        batch: List[AnyMessage] = [] if first is _WAKEUP else [first]
+        while len(batch) < max_batch:
+            try:
+                message = self._outgoing.get_nowait()
+            except queue.Empty:
+                break
+            if message is not _WAKEUP:
+                batch.append(message)
+        return batch
+
+    def wake_consumers(self) -> None:
+        """Wake a consumer blocked in drain_messages() (e.g. to let it stop)."""
+        try:
+            self._outgoing.put_nowait(_WAKEUP)  # type: ignore[arg-type]
+        except queue.Full:
+            # A full queue never blocks its consumer
+            pass
 
     async def get_command(self) -> AnyCommand:
         """Get the next incoming command (async).
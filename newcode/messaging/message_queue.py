@@ -17,6 +17,9 @@ from rich.text import Text
 
 logger = logging.getLogger(__name__)
 
+# Put on the queue to wake the processing thread when stopping
+_WAKEUP = object()
+
 
 class MessageType(Enum):
     """Types of messages that can be sent through the queue."""
@@ -98,9 +101,10 @@ class MessageQueue:
         while True:
             try:
                 message = self._queue.get_nowait()
-                messages.append(message)
             except queue.Empty:
                 break
+            if message is not _WAKEUP:
+                messages.append(message)
         return messages
 
     def clear_startup_buffer(self):
@@ -111,6 +115,11 @@ class MessageQueue:
         """Stop the queue processing."""
         self._running = False
         if self._thread and self._thread.is_alive():
+            try:
+                self._queue.put_nowait(_WAKEUP)
+            except queue.Full:
+                # A full queue never blocks the processing thread
+                pass
             self._thread.join(timeout=1.0)
 
     def emit(self, message: UIMessage):
@@ -137,10 +146,13 @@ class MessageQueue:
 
     def get_nowait(self) -> Optional[UIMessage]:
         """Get a message without blocking."""
-        try:
-            return self._queue.get_nowait()
-        except queue.Empty:
-            return None
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+            if message is not _WAKEUP:
+                return message
 
     async def get_async(self) -> UIMessage:
         """Get a message asynchronously."""
@@ -151,31 +163,46 @@ class MessageQueue:
         return await self._async_queue.get()
 
     def _process_messages(self):
-        """Process messages from sync to async queue."""
-        while self._running:
-            try:
-                message = self._queue.get(timeout=0.1)
+        """Process messages from sync to async queue.
 
-                # Try to put in async queue if we have an event loop reference
-                if self._event_loop is not None and self._async_queue is not None:
-                    # Use thread-safe call to put message in async queue
-                    # Create a bound method to avoid closure issues
-                    try:
-                        self._event_loop.call_soon_threadsafe(
-                            self._async_queue.put_nowait, message
-                        )
-                    except Exception as e:
-                        logger.debug("Failed to enqueue message to async queue: %s", e)
+        Blocks until messages arrive, then hands over everything queued as
+        one batch: a single thread-safe call feeds the async queue.
+        """
+        while self._running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [message for message in batch if message is not _WAKEUP]
+            if not batch:
+                continue
 
-                # Notify listeners immediately for sync processing
+            # Try to put in async queue if we have an event loop reference
+            if self._event_loop is not None and self._async_queue is not None:
+                try:
+                    self._event_loop.call_soon_threadsafe(
+                        self._enqueue_async_batch, batch
+                    )
+                except Exception as e:
+                    logger.debug("Failed to enqueue message to async queue: %s", e)
+
+            # Notify listeners immediately for sync processing
+            for message in batch:
                 for listener in self._listeners:
                     try:
                         listener(message)
                     except Exception as e:
                         logger.debug("Listener error in message queue: %s", e)
 
-            except queue.Empty:
-                continue
+    def _enqueue_async_batch(self, batch):
+        """Put a batch of messages on the async queue (runs on the event loop)."""
+        for message in batch:
+            try:
+                self._async_queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.debug("Async message queue full, dropping message")
 
     def add_listener(self, callback):
         """Add a listener for messages (for direct sync consumption)."""
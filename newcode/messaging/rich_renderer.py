@@ -7,9 +7,13 @@ The renderer is responsible for ALL presentation decisions - the messages contai
 only structured data with no formatting hints.
 """
 
-from typing import Dict, Optional, Protocol, runtime_checkable
+from collections import deque
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Optional, Protocol, runtime_checkable
 
 from rich.console import Console
+from rich.errors import LiveError
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.markup import escape as escape_rich_markup
 from rich.panel import Panel
@@ -18,7 +22,11 @@ from rich.rule import Rule
 # Note: Syntax import removed - file content not displayed, only header
 from rich.table import Table
 
-from newcode.config import get_subagent_verbose
+from newcode.config import (
+    get_shell_output_view,
+    get_shell_tail_lines,
+    get_subagent_verbose,
+)
 from newcode.tools.common import format_diff_with_colors
 from newcode.tools.subagent_context import is_subagent
 
@@ -150,6 +158,9 @@ class RichConsoleRenderer:
         self._spinners: Dict[str, object] = {}  # spinner_id -> status context
         # Grouping: track last rendered message type for consecutive grouping
         self._last_rendered_type: Optional[type] = None
+        # 'tail' shell output view: live display of the latest lines
+        self._shell_live: Optional[Live] = None
+        self._shell_tail: deque = deque()
 
     @property
     def console(self) -> Console:
@@ -232,13 +243,16 @@ class RichConsoleRenderer:
         self._bus.mark_renderer_inactive()
 
         if self._thread and self._thread.is_alive():
+            self._bus.wake_consumers()
             self._thread.join(timeout=1.0)
         self._thread = None
 
     def _consume_loop_sync(self) -> None:
-        """Synchronous message consumption loop running in background thread."""
-        import time
+        """Synchronous message consumption loop running in background thread.
 
+        Blocks on the bus while idle and renders whatever has queued up
+        since the last wakeup as one batch.
+        """
         # First, process any buffered messages
         for msg in self._bus.get_buffered_messages():
             self._render_sync(msg)
@@ -246,15 +260,50 @@ class RichConsoleRenderer:
 
         # Then consume new messages
         while self._running:
-            message = self._bus.get_message_nowait()
-            if message:
+            batch = self._bus.drain_messages()
+            if batch:
+                self._render_batch(batch)
+
+    def _render_batch(self, messages: List[AnyMessage]) -> None:
+        """Render a batch of messages with a single console write.
+
+        Progress-style shell lines containing a carriage return bypass the
+        console, so the buffered output is flushed before each of them to
+        keep ordering intact.
+        """
+        pending: List[AnyMessage] = []
+        for message in messages:
+            if isinstance(message, ShellLineMessage) and "\r" in message.line:
+                self._render_buffered(pending)
+                pending = []
                 self._render_sync(message)
             else:
-                time.sleep(0.01)
+                pending.append(message)
+        self._render_buffered(pending)
+
+    def _render_buffered(self, messages: List[AnyMessage]) -> None:
+        """Render messages inside the console's buffer, written out on exit."""
+        if len(messages) == 1:
+            self._render_sync(messages[0])
+            return
+        with self._console_buffer():
+            for message in messages:
+                self._render_sync(message)
+
+    def _console_buffer(self) -> ContextManager:
+        """The Console's own buffering context (a no-op for stand-in consoles)."""
+        if hasattr(type(self._console), "__enter__"):
+            return self._console
+        return nullcontext()
 
     def _render_sync(self, message: AnyMessage) -> None:
         """Render a message synchronously with error handling."""
         try:
+            if self._shell_live is not None and not isinstance(
+                message, (ShellLineMessage, SpinnerControl)
+            ):
+                # Anything else ends the live shell view, leaving its last frame
+                self._stop_shell_tail()
             self._do_render(message)
             # Track type for grouping (transparent types don't break groups)
             msg_type = type(message)
@@ -750,11 +799,19 @@ class RichConsoleRenderer:
             )
 
     def _render_shell_line(self, msg: ShellLineMessage) -> None:
-        """Render shell output line preserving ANSI codes and carriage returns."""
+        """Render shell output line(s) preserving ANSI codes and carriage returns.
+
+        A message may carry several newline-separated lines, since streaming
+        output is coalesced into chunks by the command runner.
+        """
         import sys
 
         from rich.text import Text
 
+        if get_shell_output_view() == "tail":
+            self._render_shell_tail(msg)
+            return
+
         # Check if line contains carriage return (progress bar style output)
         if "\r" in msg.line:
             # Bypass Rich entirely - write directly to stdout so terminal interprets \r
@@ -766,12 +823,47 @@ class RichConsoleRenderer:
             text = Text.from_ansi(msg.line)
             self._console.print(text, style="dim")
 
+    def _render_shell_tail(self, msg: ShellLineMessage) -> None:
+        """Show the latest lines of shell output in a live view, in place."""
+        from rich.text import Text
+
+        limit = get_shell_tail_lines()
+        if self._shell_tail.maxlen != limit:
+            self._shell_tail = deque(self._shell_tail, maxlen=limit)
+        for line in msg.line.split("\n"):
+            # Only the final state of a progress-bar line is worth showing
+            self._shell_tail.append(line.rsplit("\r", 1)[-1])
+
+        view = Text("\n").join(Text.from_ansi(line) for line in self._shell_tail)
+        view.stylize("dim")
+        if self._shell_live is None:
+            live = Live(view, console=self._console, auto_refresh=False)
+            try:
+                live.start()
+            except LiveError:
+                # Another live display owns the console; print the lines instead
+                self._shell_tail.clear()
+                self._console.print(Text.from_ansi(msg.line), style="dim")
+                return
+            self._shell_live = live
+        else:
+            self._shell_live.update(view)
+        self._shell_live.refresh()
+
+    def _stop_shell_tail(self) -> None:
+        """End the live shell view, keeping its final frame on screen."""
+        live, self._shell_live = self._shell_live, None
+        self._shell_tail.clear()
+        if live is not None:
+            live.stop()
+
     def _render_shell_output(self, msg: ShellOutputMessage) -> None:
         """Render shell command output - just a trailing newline for spinner separation.
 
         Shell command results are already returned to the LLM via tool responses,
         so we don't need to clutter the UI with redundant output.
         """
+        self._stop_shell_tail()
         # Just print trailing newline for spinner separation
         self._console.print()
 
@@ -25,7 +25,9 @@ from newcode.messaging import emit_warning
 from . import callbacks
 from .claude_cache_client import ClaudeCacheAsyncClient, patch_anthropic_client_messages
 from .config import EXTRA_MODELS_FILE, get_value, get_yolo_mode
+from .hedged_model import HedgedModel
 from .http_utils import create_async_client, get_cert_bundle_path, get_http2
+from .latency_router_model import LatencyRouterModel
 from .round_robin_model import RoundRobinModel
 
 logger = logging.getLogger(__name__)
@@ -784,6 +786,43 @@ class ModelFactory:
             # Create and return the round-robin model
             return RoundRobinModel(*models, rotate_every=rotate_every)
 
+        elif model_type == "latency_router":
+            # Same candidate list as round_robin, but routed by observed
+            # latency, in-flight load and error cooldowns
+            model_names = model_config.get("models")
+            if not model_names or not isinstance(model_names, list):
+                raise ValueError(
+                    f"Latency router model '{model_name}' requires a 'models' list in its configuration."
+                )
+
+            models = [ModelFactory.get_model(name, config) for name in model_names]
+
+            return LatencyRouterModel(
+                *models,
+                ewma_alpha=model_config.get("ewma_alpha", 0.3),
+                cooldown_seconds=model_config.get("cooldown_seconds", 30.0),
+            )
+
+        elif model_type == "hedged":
+            # Wraps a primary model with a second model that slow requests
+            # are duplicated to
+            primary_name = model_config.get("primary")
+            hedge_name = model_config.get("hedge")
+            if not primary_name or not hedge_name:
+                raise ValueError(
+                    f"Hedged model '{model_name}' requires 'primary' and 'hedge' model names in its configuration."
+                )
+
+            return HedgedModel(
+                ModelFactory.get_model(primary_name, config),
+                ModelFactory.get_model(hedge_name, config),
+                percentile=model_config.get("percentile", 95.0),
+                history_size=model_config.get("history_size", 50),
+                min_samples=model_config.get("min_samples", 10),
+                max_hedged_fraction=model_config.get("max_hedged_fraction", 0.1),
+                max_hedges=model_config.get("max_hedges"),
+            )
+
         else:
             # Check for plugin-registered model type handlers
             registered_handlers = callbacks.on_register_model_types()
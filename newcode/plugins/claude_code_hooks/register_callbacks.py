@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 
 from newcode.callbacks import register_callback
 from newcode.hook_engine import EventData, HookEngine
+from newcode.hook_engine.worker import close_hook_workers
 
 from .config import load_hooks_config
 
@@ -169,7 +170,16 @@ async def on_agent_run_end_hook(
         logger.error(f"Error in {event_type} hook: {e}", exc_info=True)
 
 
+async def on_shutdown_hook() -> None:
+    """Shutdown callback — stops persistent hook workers."""
+    try:
+        await close_hook_workers()
+    except Exception as e:
+        logger.error(f"Error stopping hook workers: {e}", exc_info=True)
+
+
 register_callback("startup", on_startup_hook)
 register_callback("agent_run_end", on_agent_run_end_hook)
+register_callback("shutdown", on_shutdown_hook)
 
 logger.info("Claude Code hooks plugin registered")
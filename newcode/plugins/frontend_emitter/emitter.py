@@ -7,7 +7,7 @@ Events are JSON-serializable dicts with type, timestamp, and data.
 import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Set
+from typing import Any, Callable, Dict, List, Set
 from uuid import uuid4
 
 from newcode.config import (
@@ -21,6 +21,8 @@ logger = logging.getLogger(__name__)
 # Global state for event distribution
 _subscribers: Set[asyncio.Queue[Dict[str, Any]]] = set()
 _recent_events: List[Dict[str, Any]] = []  # Keep last N events for new subscribers
+# Called with the new subscriber count whenever a subscriber comes or goes
+_count_listeners: List[Callable[[int], None]] = []
 
 
 def emit_event(event_type: str, data: Any = None) -> None:
@@ -74,6 +76,7 @@ def subscribe() -> asyncio.Queue[Dict[str, Any]]:
     queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
     _subscribers.add(queue)
     logger.debug(f"New subscriber added, total subscribers: {len(_subscribers)}")
+    _notify_count_listeners()
     return queue
 
 
@@ -86,8 +89,34 @@ def unsubscribe(queue: asyncio.Queue[Dict[str, Any]]) -> None:
     Args:
         queue: The queue returned from subscribe()
     """
+    if queue not in _subscribers:
+        return
     _subscribers.discard(queue)
     logger.debug(f"Subscriber removed, remaining subscribers: {len(_subscribers)}")
+    _notify_count_listeners()
+
+
+def add_subscriber_count_listener(listener: Callable[[int], None]) -> None:
+    """Call ``listener`` with the subscriber count now and on every change.
+
+    Lets producers of expensive events start and stop work as the first
+    subscriber connects and the last one leaves.
+
+    Args:
+        listener: Called with the current number of subscribers
+    """
+    if listener not in _count_listeners:
+        _count_listeners.append(listener)
+    listener(len(_subscribers))
+
+
+def _notify_count_listeners() -> None:
+    count = len(_subscribers)
+    for listener in list(_count_listeners):
+        try:
+            listener(count)
+        except Exception as e:
+            logger.error(f"Subscriber count listener failed: {e}")
 
 
 def get_recent_events() -> List[Dict[str, Any]]:
@@ -6,10 +6,19 @@ to subscribed WebSocket handlers via the emitter module.
 
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from newcode.callbacks import register_callback
-from newcode.plugins.frontend_emitter.emitter import emit_event
+from newcode.plugins.frontend_emitter.emitter import (
+    add_subscriber_count_listener,
+    emit_event,
+    get_subscriber_count,
+)
+from newcode.stream_events import (
+    StreamEvent,
+    subscribe_stream_events,
+    unsubscribe_stream_events,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,30 +81,47 @@ async def on_post_tool_call(
         logger.error(f"Failed to emit post_tool_call event: {e}")
 
 
-async def on_stream_event(
-    event_type: str, event_data: Any, agent_session_id: Optional[str] = None
-) -> None:
-    """Emit streaming events from the agent.
+def on_stream_events(events: List[StreamEvent]) -> None:
+    """Emit a batch of streaming events from the stream event bus.
+
+    Only subscribed while a frontend is connected (see
+    _on_subscriber_count_change), so streams nobody watches skip the event
+    bus entirely and deltas do not flood the replay buffer.
 
     Args:
-        event_type: Type of the streaming event
-        event_data: Data associated with the event
-        agent_session_id: Optional session ID of the agent emitting the event
+        events: Events published since the last event loop tick
     """
+    if get_subscriber_count() == 0:
+        return
     try:
-        emit_event(
-            "stream_event",
-            {
-                "event_type": event_type,
-                "event_data": _sanitize_event_data(event_data),
-                "agent_session_id": agent_session_id,
-            },
-        )
-        logger.debug(f"Emitted stream_event: {event_type}")
+        for event in events:
+            _emit_stream_event(event.event_type, event.event_data, event.session_id)
+        logger.debug(f"Emitted {len(events)} stream_event(s)")
     except Exception as e:
         logger.error(f"Failed to emit stream_event: {e}")
 
 
+def _on_subscriber_count_change(count: int) -> None:
+    """Subscribe to stream events while at least one frontend is connected."""
+    if count:
+        subscribe_stream_events(on_stream_events)
+    else:
+        unsubscribe_stream_events(on_stream_events)
+
+
+def _emit_stream_event(
+    event_type: str, event_data: Any, agent_session_id: Optional[str]
+) -> None:
+    emit_event(
+        "stream_event",
+        {
+            "event_type": event_type,
+            "event_data": _sanitize_event_data(event_data),
+            "agent_session_id": agent_session_id,
+        },
+    )
+
+
 async def on_invoke_agent(*args: Any, **kwargs: Any) -> None:
     """Emit an event when an agent is invoked.
 
@@ -252,7 +278,7 @@ def register() -> None:
     """Register all frontend emitter callbacks."""
     register_callback("pre_tool_call", on_pre_tool_call)
     register_callback("post_tool_call", on_post_tool_call)
-    register_callback("stream_event", on_stream_event)
+    add_subscriber_count_listener(_on_subscriber_count_change)
     register_callback("invoke_agent", on_invoke_agent)
     logger.debug("Frontend emitter callbacks registered")
 
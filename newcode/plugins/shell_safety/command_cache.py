@@ -2,17 +2,89 @@
 
 This module provides an LRU cache for recently assessed commands to avoid redundant API calls.
 
-The approach is simple and secure: let the LLM assess ALL commands and cache
-those assessments. This eliminates the security risks of pre-defined whitelists
-while providing the performance benefits of caching.
+Commands the rule table in command_rules.py can't decide are assessed by the
+LLM, and those assessments are cached here. The session cache is backed by a
+JSON file in the cache dir, so an assessment made once is reused across
+restarts. Entries are keyed by the normalized command and the class of its
+working directory (system, home, temp or project), so the same command is
+not re-assessed in every project.
 """
 
+import json
+import logging
+import os
+import tempfile
 from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional, Tuple
 
+from newcode.config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
 # Maximum number of cached assessments (LRU eviction after this)
 MAX_CACHE_SIZE = 200
+# Maximum number of assessments kept on disk across sessions
+PERSISTENT_CACHE_SIZE = 2000
+CACHE_FILE_VERSION = 1
+
+# Top-level directories owned by the operating system
+SYSTEM_DIRS = (
+    "/bin",
+    "/boot",
+    "/dev",
+    "/etc",
+    "/lib",
+    "/lib64",
+    "/proc",
+    "/sbin",
+    "/sys",
+    "/usr",
+    "/var",
+)
+
+
+def normalize_command(command: str) -> str:
+    """Command with runs of blanks outside quotes collapsed to one space.
+
+    Only spacing that cannot change what the shell runs is normalized;
+    quoting, escapes and newlines are kept as they are.
+    """
+    out = []
+    quote = None
+    escaped = False
+    for ch in command.strip():
+        if escaped:
+            escaped = False
+        elif ch == "\\" and quote != "'":
+            escaped = True
+        elif quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch in " \t":
+            if out and out[-1] == " ":
+                continue
+            ch = " "
+        out.append(ch)
+    return "".join(out)
+
+
+def cwd_class(cwd: Optional[str]) -> Optional[str]:
+    """Coarse class of a working directory, which is what affects risk."""
+    if not cwd:
+        return None
+    path = os.path.realpath(os.path.expanduser(cwd))
+    if path == "/" or any(path == d or path.startswith(d + "/") for d in SYSTEM_DIRS):
+        return "system"
+    if path == os.path.realpath(os.path.expanduser("~")):
+        return "home"
+    temp = os.path.realpath(tempfile.gettempdir())
+    if path == temp or path.startswith(temp + "/") or path.startswith("/tmp/"):
+        return "temp"
+    return "project"
 
 
 @dataclass
@@ -27,21 +99,62 @@ class CommandSafetyCache:
     """LRU cache for shell command safety assessments.
 
     This cache stores previous LLM assessments to avoid redundant API calls.
-    It uses an OrderedDict for O(1) LRU eviction.
+    It uses an OrderedDict for O(1) LRU eviction. With a ``path`` the cache
+    is loaded from that JSON file on first use and written back whenever an
+    assessment is added.
     """
 
-    def __init__(self, max_size: int = MAX_CACHE_SIZE):
+    def __init__(self, max_size: int = MAX_CACHE_SIZE, path: Optional[Path] = None):
         self._cache: OrderedDict[Tuple[str, Optional[str]], CachedAssessment] = (
             OrderedDict()
         )
         self._max_size = max_size
         self._hits = 0
         self._misses = 0
+        self._path = path
+        self._loaded = path is None
 
     def _make_key(self, command: str, cwd: Optional[str]) -> Tuple[str, Optional[str]]:
-        """Create a cache key from command and cwd."""
-        # Normalize command (strip whitespace)
-        return (command.strip(), cwd)
+        """Create a cache key from the normalized command and cwd class."""
+        return (normalize_command(command), cwd_class(cwd))
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_FILE_VERSION:
+                return
+            for command, cwd_cls, risk, reasoning in data.get("entries", []):
+                self._cache[(command, cwd_cls)] = CachedAssessment(risk, reasoning)
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable shell safety cache {self._path}: {e}")
+
+    def _persist(self) -> None:
+        if self._path is None:
+            return
+        data = {
+            "version": CACHE_FILE_VERSION,
+            "entries": [
+                [command, cwd_cls, a.risk, a.reasoning]
+                for (command, cwd_cls), a in self._cache.items()
+            ],
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file, then rename (atomic)
+            temp_path = self._path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            temp_path.replace(self._path)
+        except OSError as e:
+            logger.debug(f"Failed to persist shell safety cache: {e}")
 
     def get(
         self, command: str, cwd: Optional[str] = None
@@ -55,6 +168,7 @@ class CommandSafetyCache:
         Returns:
             CachedAssessment if found, None otherwise
         """
+        self._ensure_loaded()
         key = self._make_key(command, cwd)
         if key in self._cache:
             # Move to end (most recently used)
@@ -74,25 +188,32 @@ class CommandSafetyCache:
             cwd: Optional working directory
             assessment: The assessment result to cache
         """
+        self._ensure_loaded()
         key = self._make_key(command, cwd)
 
         # If already exists, update and move to end
         if key in self._cache:
             self._cache.move_to_end(key)
             self._cache[key] = assessment
-            return
-
-        # Evict oldest if at capacity
-        while len(self._cache) >= self._max_size:
-            self._cache.popitem(last=False)
+        else:
+            # Evict oldest if at capacity
+            while len(self._cache) >= self._max_size:
+                self._cache.popitem(last=False)
+            self._cache[key] = assessment
 
-        self._cache[key] = assessment
+        self._persist()
 
     def clear(self) -> None:
-        """Clear all cached assessments."""
+        """Clear all cached assessments, including the ones on disk."""
         self._cache.clear()
         self._hits = 0
         self._misses = 0
+        self._loaded = True
+        if self._path is not None:
+            try:
+                self._path.unlink()
+            except OSError:
+                pass
 
     @property
     def stats(self) -> dict:
@@ -108,8 +229,12 @@ class CommandSafetyCache:
         }
 
 
-# Global cache instance (singleton for the session)
-_cache = CommandSafetyCache()
+def _default_cache_path() -> Path:
+    return Path(CACHE_DIR) / "shell_safety_cache.json"
+
+
+# Global cache instance (singleton for the session, persisted across sessions)
+_cache = CommandSafetyCache(max_size=PERSISTENT_CACHE_SIZE, path=_default_cache_path())
 
 
 def get_cache_stats() -> dict:
@@ -122,8 +247,8 @@ def get_cached_assessment(
 ) -> Optional[CachedAssessment]:
     """Get a cached command safety assessment.
 
-    Cache-only approach: use the LLM cache for speed, but let the LLM
-    determine safety for all commands. No pre-defined whitelists.
+    Only LLM assessments are cached; commands the rule table decides never
+    reach the cache.
 
     Args:
         command: The shell command to check
@@ -0,0 +1,663 @@
+"""Rule-based pre-classification of shell commands.
+
+Most commands an agent runs are plainly harmless (``ls``, ``git status``,
+``pytest -q``) or plainly catastrophic (``rm -rf /``, ``mkfs``). Asking the
+shell-safety LLM about those costs seconds per command for an answer that
+never changes, so they are resolved here from an allow/deny rule table.
+
+The classifier is deliberately conservative: the command is tokenized and
+split into simple commands at ``;``, ``&&``, ``||``, ``|`` and ``&``, and
+every one of them must match an allow rule for the command to be allowed.
+Anything it cannot read with certainty (command substitution, subshells,
+multi-line scripts, output redirection, environment assignments, programs
+given by path, unknown programs) is left to the LLM.
+"""
+
+import re
+import shlex
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from newcode.plugins.shell_safety.command_cache import SYSTEM_DIRS, CachedAssessment
+
+_RISK_ORDER = ("none", "low", "medium", "high", "critical")
+
+_SEPARATORS = {";", "&&", "||", "|", "&", "|&"}
+
+# Redirections that cannot write anything worth protecting
+_HARMLESS_REDIRECTS = re.compile(
+    r"\s*(?:\d*|&)>>?\s*/dev/null(?=[\s;&|]|$)|\s*\d*>&\d(?=[\s;&|]|$)"
+)
+
+# Constructs that hide what will actually run
+_OPAQUE = ("`", "$(", "<(", ">(", "\n", "\r", "<<")
+
+_FORK_BOMB = re.compile(r":\s*\(\s*\)\s*\{\s*:\s*\|\s*:\s*&\s*\}\s*;\s*:")
+
+_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+
+_HOME_TARGETS = {"~", "~/", "~/*", "$HOME", "${HOME}", "$HOME/", "$HOME/*"}
+
+_SHELLS = {"sh", "bash", "zsh", "dash", "ksh", "fish"}
+_INTERPRETERS = _SHELLS | {"python", "python3", "perl", "ruby", "node"}
+
+
+def _is_critical_path(target: str) -> bool:
+    if target in _HOME_TARGETS:
+        return True
+    path = target.rstrip("/*") or "/"
+    return path == "/" or path in SYSTEM_DIRS
+
+
+def _short_flags(args: Sequence[str]) -> str:
+    return "".join(a[1:] for a in args if a.startswith("-") and not a.startswith("--"))
+
+
+# --- deny rules: (risk, reason) when a simple command is destructive ---------
+
+
+def _deny_rm(args: Sequence[str]) -> Optional[Tuple[str, str]]:
+    recursive = "r" in _short_flags(args).lower() or "--recursive" in args
+    targets = [a for a in args if not a.startswith("-")]
+    if recursive and any(_is_critical_path(t) for t in targets):
+        return "critical", "Recursively deletes the root, home or a system directory"
+    return None
+
+
+def _deny_recursive_perms(args: Sequence[str]) -> Optional[Tuple[str, str]]:
+    recursive = "R" in _short_flags(args) or "--recursive" in args
+    targets = [a for a in args if not a.startswith("-")][1:]
+    if recursive and any(_is_critical_path(t) for t in targets):
+        return "critical", "Recursively changes ownership or permissions system-wide"
+    return None
+
+
+def _deny_dd(args: Sequence[str]) -> Optional[Tuple[str, str]]:
+    if any(a.startswith("of=/dev/") and a != "of=/dev/null" for a in args):
+        return "critical", "Writes raw data to a block device"
+    return None
+
+
+def _deny_always(risk: str, reason: str) -> Callable[[Sequence[str]], Tuple[str, str]]:
+    return lambda args: (risk, reason)
+
+
+_DENY_RULES: Dict[str, Callable[[Sequence[str]], Optional[Tuple[str, str]]]] = {
+    "rm": _deny_rm,
+    "chmod": _deny_recursive_perms,
+    "chown": _deny_recursive_perms,
+    "dd": _deny_dd,
+    "mkfs": _deny_always("critical", "Formats a filesystem"),
+    "fdisk": _deny_always("critical", "Modifies disk partitions"),
+    "parted": _deny_always("critical", "Modifies disk partitions"),
+    "wipefs": _deny_always("critical", "Erases filesystem signatures"),
+    "shutdown": _deny_always("high", "Shuts down or restarts the machine"),
+    "reboot": _deny_always("high", "Shuts down or restarts the machine"),
+    "halt": _deny_always("high", "Shuts down or restarts the machine"),
+    "poweroff": _deny_always("high", "Shuts down or restarts the machine"),
+}
+
+
+# --- allow rules: risk when a simple command is known to be safe -------------
+
+# Programs that only read (given no output redirection)
+_READ_ONLY = {
+    "basename",
+    "cat",
+    "cd",
+    "cmp",
+    "column",
+    "cut",
+    "date",
+    "df",
+    "diff",
+    "dirname",
+    "du",
+    "echo",
+    "egrep",
+    "false",
+    "fgrep",
+    "file",
+    "free",
+    "grep",
+    "head",
+    "id",
+    "jq",
+    "ls",
+    "md5sum",
+    "nl",
+    "printenv",
+    "printf",
+    "ps",
+    "pwd",
+    "readlink",
+    "realpath",
+    "rg",
+    "sha1sum",
+    "sha256sum",
+    "stat",
+    "tail",
+    "test",
+    "tr",
+    "tree",
+    "true",
+    "type",
+    "uname",
+    "uptime",
+    "wc",
+    "which",
+    "whoami",
+}
+
+# Options that make an otherwise read-only program write or run something
+_READ_ONLY_EXCEPTIONS = {
+    "date": ("-s", "--set"),
+    "rg": ("--pre",),
+    "tree": ("-o",),
+}
+
+# Developer tools that run the project's own code or checks
+_PROJECT_TOOLS = {
+    "flake8",
+    "jest",
+    "mypy",
+    "nox",
+    "pylint",
+    "pyright",
+    "pytest",
+    "tox",
+    "tsc",
+    "vitest",
+}
+
+# Options each read-only git subcommand may be given. Anything else, such as
+# --output, --ext-diff, --textconv or grep's -O<pager>, is left to the LLM.
+_GIT_DIFF_OPTIONS = {
+    "-b",
+    "-G",
+    "-M",
+    "-p",
+    "-S",
+    "-U",
+    "-w",
+    "-W",
+    "-z",
+    "--abbrev",
+    "--cached",
+    "--check",
+    "--color",
+    "--color-words",
+    "--diff-filter",
+    "--dirstat",
+    "--exit-code",
+    "--find-renames",
+    "--function-context",
+    "--ignore-all-space",
+    "--ignore-blank-lines",
+    "--ignore-space-change",
+    "--merge-base",
+    "--minimal",
+    "--name-only",
+    "--name-status",
+    "--no-color",
+    "--no-ext-diff",
+    "--no-renames",
+    "--no-textconv",
+    "--numstat",
+    "--patch",
+    "--patch-with-stat",
+    "--quiet",
+    "--raw",
+    "--relative",
+    "--shortstat",
+    "--staged",
+    "--stat",
+    "--summary",
+    "--unified",
+    "--word-diff",
+}
+_GIT_LOG_OPTIONS = _GIT_DIFF_OPTIONS | {
+    "-i",
+    "-L",
+    "-n",
+    "-q",
+    "--abbrev-commit",
+    "--after",
+    "--all",
+    "--author",
+    "--before",
+    "--branches",
+    "--committer",
+    "--date",
+    "--decorate",
+    "--first-parent",
+    "--follow",
+    "--format",
+    "--graph",
+    "--grep",
+    "--max-count",
+    "--merges",
+    "--no-decorate",
+    "--no-merges",
+    "--oneline",
+    "--pretty",
+    "--regexp-ignore-case",
+    "--remotes",
+    "--reverse",
+    "--since",
+    "--skip",
+    "--tags",
+    "--until",
+}
+_GIT_READ_ONLY = {
+    "blame": {"-e", "-l", "-L", "-M", "-p", "-s", "-w", "--porcelain"},
+    "cat-file": {"-e", "-p", "-s", "-t"},
+    "describe": {
+        "--abbrev",
+        "--always",
+        "--dirty",
+        "--exact-match",
+        "--long",
+        "--tags",
+    },
+    "diff": _GIT_DIFF_OPTIONS,
+    "grep": {
+        "-A",
+        "-B",
+        "-c",
+        "-C",
+        "-e",
+        "-E",
+        "-F",
+        "-h",
+        "-H",
+        "-i",
+        "-I",
+        "-l",
+        "-L",
+        "-n",
+        "-P",
+        "-v",
+        "-w",
+        "--break",
+        "--cached",
+        "--count",
+        "--files-with-matches",
+        "--heading",
+        "--ignore-case",
+        "--line-number",
+        "--untracked",
+        "--word-regexp",
+    },
+    "log": _GIT_LOG_OPTIONS,
+    "ls-files": {
+        "-c",
+        "-d",
+        "-m",
+        "-o",
+        "-s",
+        "-z",
+        "--cached",
+        "--deleted",
+        "--exclude-standard",
+        "--modified",
+        "--others",
+        "--stage",
+    },
+    "ls-tree": {"-d", "-l", "-r", "-t", "-z", "--name-only"},
+    "rev-parse": {
+        "--abbrev-ref",
+        "--git-dir",
+        "--is-inside-work-tree",
+        "--short",
+        "--show-toplevel",
+        "--verify",
+    },
+    "shortlog": _GIT_LOG_OPTIONS | {"-e", "-s", "--email", "--numbered", "--summary"},
+    "show": _GIT_LOG_OPTIONS,
+    "status": {
+        "-b",
+        "-s",
+        "-u",
+        "-v",
+        "--branch",
+        "--ignored",
+        "--porcelain",
+        "--short",
+        "--untracked-files",
+    },
+}
+# Short git options whose value may be attached (-U3, -n5, -A2)
+_GIT_VALUE_OPTIONS = {"-A", "-B", "-C", "-e", "-G", "-L", "-M", "-n", "-S", "-U"}
+
+_GIT_FETCH_OPTIONS = {
+    "-p",
+    "-q",
+    "-t",
+    "-v",
+    "--all",
+    "--depth",
+    "--dry-run",
+    "--no-tags",
+    "--prune",
+    "--quiet",
+    "--tags",
+    "--unshallow",
+    "--verbose",
+}
+
+_PACKAGE_SCRIPTS = {"build", "check", "lint", "test", "typecheck"}
+_MAKE_TARGETS = _PACKAGE_SCRIPTS | {"all", "tests"}
+_CARGO_SUBCOMMANDS = {"build", "check", "clippy", "doc", "test"}
+_GO_SUBCOMMANDS = {"build", "test", "vet"}
+_PYTHON_MODULES = _PROJECT_TOOLS | {"compileall", "unittest"}
+
+
+def _git_options_allowed(args: Sequence[str], allowed: set) -> bool:
+    """Whether every option in ``args`` (up to ``--``) is in ``allowed``."""
+    for arg in args:
+        if arg == "--":
+            return True
+        if not arg.startswith("-") or arg == "-":
+            continue
+        if arg.startswith("--"):
+            if arg.split("=", 1)[0] not in allowed:
+                return False
+        elif arg[1:].isdigit():
+            # git log -5
+            if "-n" not in allowed:
+                return False
+        elif arg[:2] in _GIT_VALUE_OPTIONS and arg[:2] in allowed:
+            continue
+        elif not all(f"-{flag}" in allowed for flag in arg[1:]):
+            # Combined short flags (-sb) must each be allowed
+            return False
+    return True
+
+
+def _allow_git(args: Sequence[str]) -> Optional[str]:
+    args = list(args)
+    # Global options before the subcommand; -c is not allowed since config
+    # such as core.fsmonitor or core.pager can run arbitrary commands
+    while args and args[0].startswith("-"):
+        option = args.pop(0)
+        if option == "-C" and args:
+            args.pop(0)
+        elif option not in ("--no-pager", "--no-optional-locks"):
+            return None
+    if not args:
+        return None
+    sub, rest = args[0], args[1:]
+    if sub in _GIT_READ_ONLY:
+        return "none" if _git_options_allowed(rest, _GIT_READ_ONLY[sub]) else None
+    if sub == "branch":
+        read_only = {"-a", "-r", "-v", "-vv", "--all", "--list", "--show-current"}
+        return "none" if all(a in read_only for a in rest) else None
+    if sub == "remote":
+        return "none" if all(a in ("-v", "--verbose") for a in rest) else None
+    if sub == "stash" and rest == ["list"]:
+        return "none"
+    if sub == "fetch":
+        # --upload-pack and transports such as ext:: run arbitrary commands
+        if any("::" in a for a in rest if not a.startswith("-")):
+            return None
+        return "low" if _git_options_allowed(rest, _GIT_FETCH_OPTIONS) else None
+    return None
+
+
+def _allow_find(args: Sequence[str]) -> Optional[str]:
+    writes = {"-delete", "-exec", "-execdir", "-ok", "-okdir", "-fls", "-fprint"}
+    if any(a in writes or a.startswith("-fprint") for a in args):
+        return None
+    return "none"
+
+
+def _allow_sort(args: Sequence[str]) -> Optional[str]:
+    for arg in args:
+        if arg.startswith(("--output", "--compress-program")):
+            return None
+        if arg.startswith("-") and not arg.startswith("--"):
+            # -uo out: stop at the first option that takes the rest as value
+            for flag in arg[1:]:
+                if flag == "o":
+                    return None
+                if flag in "kStT":
+                    break
+    return "none"
+
+
+def _has_option(args: Sequence[str], options: Sequence[str]) -> bool:
+    return any(a.split("=", 1)[0] in options for a in args)
+
+
+def _allow_ruff(args: Sequence[str]) -> Optional[str]:
+    # Linting only: fixes, noqa insertion and output files rewrite the tree
+    if args[:1] == ["check"]:
+        writes = ("--fix", "--fix-only", "--unsafe-fixes", "--add-noqa", "-o")
+        if _has_option(args, writes + ("--output-file",)):
+            return None
+        return "low"
+    if args[:1] == ["format"] and _has_option(args, ("--check", "--diff")):
+        return "low"
+    return None
+
+
+def _allow_black(args: Sequence[str]) -> Optional[str]:
+    return "low" if _has_option(args, ("--check", "--diff")) else None
+
+
+def _allow_prettier(args: Sequence[str]) -> Optional[str]:
+    if _has_option(args, ("-w", "--write")):
+        return None
+    return (
+        "low"
+        if _has_option(args, ("-c", "--check", "-l", "--list-different"))
+        else None
+    )
+
+
+def _allow_eslint(args: Sequence[str]) -> Optional[str]:
+    if _has_option(args, ("--fix", "-o", "--output-file")):
+        return None
+    return "low"
+
+
+# Linters and formatters, allowed only in modes that leave files untouched
+_LINTER_RULES: Dict[str, Callable[[Sequence[str]], Optional[str]]] = {
+    "ruff": _allow_ruff,
+    "black": _allow_black,
+    "prettier": _allow_prettier,
+    "eslint": _allow_eslint,
+}
+
+
+def _allow_python(args: Sequence[str]) -> Optional[str]:
+    if args[:1] == ["--version"] or args[:1] == ["-V"]:
+        return "none"
+    if len(args) >= 2 and args[0] == "-m":
+        if args[1] in _PYTHON_MODULES:
+            return "low"
+        if args[1] in _LINTER_RULES:
+            return _LINTER_RULES[args[1]](args[2:])
+        if args[1] == "pip":
+            return _allow_pip(args[2:])
+    return None
+
+
+def _allow_pip(args: Sequence[str]) -> Optional[str]:
+    return "none" if args[:1] in (["list"], ["show"], ["freeze"], ["check"]) else None
+
+
+def _allow_package_manager(args: Sequence[str]) -> Optional[str]:
+    # npm/yarn/pnpm: test and build scripts, not installs or arbitrary scripts
+    if not args:
+        return None
+    if args[0] == "run":
+        args = args[1:]
+    if args[:1] and args[0] in _PACKAGE_SCRIPTS:
+        return "low"
+    if args[:1] and args[0] in ("ls", "list", "outdated", "why", "--version"):
+        return "none"
+    return None
+
+
+def _allow_make(args: Sequence[str]) -> Optional[str]:
+    targets = [a for a in args if not a.startswith("-")]
+    return "low" if all(t in _MAKE_TARGETS for t in targets) else None
+
+
+def _allow_subcommand(allowed: set) -> Callable[[Sequence[str]], Optional[str]]:
+    return lambda args: "low" if args[:1] and args[0] in allowed else None
+
+
+_ALLOW_RULES: Dict[str, Callable[[Sequence[str]], Optional[str]]] = {
+    "git": _allow_git,
+    "find": _allow_find,
+    "sort": _allow_sort,
+    "python": _allow_python,
+    "python3": _allow_python,
+    "pip": _allow_pip,
+    "pip3": _allow_pip,
+    "npm": _allow_package_manager,
+    "yarn": _allow_package_manager,
+    "pnpm": _allow_package_manager,
+    "cargo": _allow_subcommand(_CARGO_SUBCOMMANDS),
+    "go": _allow_subcommand(_GO_SUBCOMMANDS),
+    "make": _allow_make,
+    **_LINTER_RULES,
+}
+
+
+_PROJECT_TOOL_REASON = "Runs the project's own build, test or lint tooling"
+# Low-risk allow rules that are not project tooling
+_ALLOW_REASONS = {
+    "git": "Downloads objects from a git remote without changing the work tree",
+}
+
+
+def _tokenize(command: str) -> Optional[List[str]]:
+    lexer = shlex.shlex(command, posix=True, punctuation_chars="();<>|&")
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    try:
+        return list(lexer)
+    except ValueError:
+        return None
+
+
+def _split_segments(tokens: List[str]) -> List[Tuple[List[str], str]]:
+    """Simple commands, each with the separator that follows it."""
+    segments: List[Tuple[List[str], str]] = []
+    current: List[str] = []
+    for token in tokens:
+        if token in _SEPARATORS:
+            segments.append((current, token))
+            current = []
+        else:
+            current.append(token)
+    segments.append((current, ""))
+    return [(words, sep) for words, sep in segments if words]
+
+
+def _command_words(words: List[str]) -> Tuple[List[str], bool]:
+    """Strip leading VAR=value assignments and sudo; report if sudo was used."""
+    words = list(words)
+    elevated = False
+    while words:
+        if _ASSIGNMENT.match(words[0]):
+            words.pop(0)
+        elif words[0] == "sudo":
+            elevated = True
+            words.pop(0)
+            while words and words[0].startswith("-"):
+                words.pop(0)
+        else:
+            break
+    return words, elevated
+
+
+def _program(word: str) -> str:
+    name = word.rsplit("/", 1)[-1]
+    # mkfs.ext4, python3.12
+    if name.startswith("mkfs."):
+        return "mkfs"
+    return re.sub(r"^(python3?)\.\d+$", r"\1", name)
+
+
+def _deny(segments: List[Tuple[List[str], str]]) -> Optional[Tuple[str, str]]:
+    for index, (words, sep) in enumerate(segments):
+        words, _ = _command_words(words)
+        if not words:
+            continue
+        program = _program(words[0])
+        rule = _DENY_RULES.get(program)
+        verdict = rule(words[1:]) if rule else None
+        if verdict:
+            return verdict
+        if program in ("curl", "wget") and sep in ("|", "|&"):
+            following, _ = _command_words(segments[index + 1][0])
+            if following and _program(following[0]) in _INTERPRETERS:
+                return "high", "Pipes a downloaded script straight into an interpreter"
+    return None
+
+
+def classify_command(command: str) -> Optional[CachedAssessment]:
+    """Assess a command from the rule table, or return None if unsure.
+
+    A None result means the command needs an LLM assessment.
+    """
+    command = command.strip()
+    if not command:
+        return None
+
+    if _FORK_BOMB.search(command):
+        return CachedAssessment(risk="critical", reasoning="Fork bomb")
+
+    tokens = _tokenize(_HARMLESS_REDIRECTS.sub(" ", command))
+    if tokens is None:
+        return None
+    segments = _split_segments(tokens)
+
+    # Deny rules apply even to commands the allow rules can't fully read
+    denied = _deny(segments)
+    if denied:
+        risk, reason = denied
+        return CachedAssessment(risk=risk, reasoning=f"{reason} (rule match)")
+
+    if any(marker in command for marker in _OPAQUE):
+        return None
+    if any(t in ("(", ")", ">", ">>", ">&", "&>", "<>", ">|") for t in tokens):
+        return None
+
+    risks = []
+    reasons = []
+    for words, _ in segments:
+        # Environment assignments (GIT_EXTERNAL_DIFF=, GIT_CONFIG_*=, ...) and
+        # programs given by path (./ls) can run anything under a harmless name
+        if _ASSIGNMENT.match(words[0]) or "/" in words[0]:
+            return None
+        words, elevated = _command_words(words)
+        if elevated or not words:
+            return None
+        program = _program(words[0])
+        if program in _READ_ONLY:
+            exceptions = _READ_ONLY_EXCEPTIONS.get(program, ())
+            writes = any(w.startswith(exceptions) for w in words[1:])
+            risk = None if exceptions and writes else "none"
+        elif program in _PROJECT_TOOLS:
+            risk = "low"
+        elif program in _ALLOW_RULES:
+            risk = _ALLOW_RULES[program](words[1:])
+        else:
+            risk = None
+        if risk is None:
+            return None
+        risks.append(risk)
+        reasons.append(_ALLOW_REASONS.get(program, _PROJECT_TOOL_REASON))
+
+    risk = max(risks, key=_RISK_ORDER.index)
+    reason = (
+        "Read-only command"
+        if risk == "none"
+        else reasons[[r == risk for r in risks].index(True)]
+    )
+    return CachedAssessment(risk=risk, reasoning=f"{reason} (rule match)")
@@ -17,6 +17,7 @@ from newcode.plugins.shell_safety.command_cache import (
     cache_assessment,
     get_cached_assessment,
 )
+from newcode.plugins.shell_safety.command_rules import classify_command
 from newcode.tools.command_runner import ShellSafetyAssessment
 
 # OAuth model prefixes - these models have their own safety mechanisms
@@ -112,8 +113,8 @@ async def shell_safety_callback(
     threshold = get_safety_permission_level()
 
     try:
-        # Check cache first (fast path - no LLM call)
-        cached = get_cached_assessment(command, cwd)
+        # Rule table first, then the cache (fast paths - no LLM call)
+        cached = classify_command(command) or get_cached_assessment(command, cwd)
 
         if cached:
             # Got a cached result - check against threshold
@@ -0,0 +1,377 @@
+"""
+Adaptive client-side rate limiting for model provider HTTP clients.
+
+Every HTTP client talking to the same provider endpoint with the same
+credentials shares one ``AdaptiveRateLimiter``. Requests acquire a slot from
+a token bucket *before* they are sent, so concurrent sub-agents pace
+themselves instead of retrying in lockstep after a burst of 429s.
+
+The bucket starts out unlimited and learns from response headers:
+- ``Retry-After`` (seconds or HTTP date)
+- ``x-ratelimit-*`` (OpenAI / OpenRouter / Cerebras style)
+- ``anthropic-ratelimit-*`` (Anthropic style)
+
+When a 429 arrives without usable headers the limiter falls back to AIMD:
+the rate is halved on every 429 and grows additively on success until it
+is released back to unlimited.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rate used when a 429 arrives before any limits have been learned
+_PROBE_RATE = 1.0
+# Lower bound for the AIMD rate (requests per second)
+_MIN_RATE = 0.05
+# Additive increase applied per successful response while in AIMD mode
+_AIMD_INCREASE = 0.1
+# Once AIMD recovers past this rate, pacing is switched off again
+_AIMD_RELEASE_RATE = 20.0
+# Never block a request for longer than this on a single acquire
+_MAX_WAIT = 60.0
+# Waits shorter than this are not reported to telemetry
+_REPORT_THRESHOLD = 0.05
+
+# Headers that identify the credential a request is made with
+_KEY_HEADERS = ("authorization", "x-api-key", "api-key", "x-goog-api-key")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse a reset duration into seconds.
+
+    Accepts plain seconds ("12", "0.5"), OpenAI-style durations ("6m0s",
+    "20ms", "1h2m3s"), RFC 3339 timestamps (Anthropic) and epoch seconds.
+    """
+    value = value.strip()
+    if not value:
+        return None
+
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+
+    if number is not None:
+        # Large values are absolute epoch timestamps rather than durations
+        if number > 1_000_000_000:
+            return max(0.0, number - time.time())
+        return max(0.0, number)
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, reset_at.timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+        return max(0.0, date.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _header(headers: Mapping[str, Any], name: str) -> Optional[str]:
+    """Case-insensitive header lookup that ignores non-string values."""
+    try:
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.title())
+    except Exception:
+        return None
+    return value if isinstance(value, str) else None
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by all clients of one provider endpoint and key.
+
+    The limiter is loop-agnostic: state is guarded by a ``threading.Lock``
+    and waiting happens with ``asyncio.sleep`` outside the lock, so clients
+    running on different event loops (sub-agents) can share it safely.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        # None means "no limit learned yet" - requests are not paced
+        self._rate: Optional[float] = None
+        self._capacity: float = 1.0
+        self._tokens: float = 1.0
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        # True when the rate was derived from 429s rather than headers
+        self._aimd = False
+        # True once any rate-limit headers have been seen
+        self._headers_seen = False
+
+        self._requests = 0
+        self._delayed_requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._throttled_responses = 0
+
+    def _refill(self, now: float) -> None:
+        if self._rate is not None:
+            elapsed = now - self._last_refill
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def reserve(self) -> float:
+        """Reserve a slot and return how long the caller must wait first.
+
+        Tokens may go negative so that concurrent callers queue behind each
+        other at the learned rate instead of all waking up at once.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._blocked_until - now)
+            if self._rate is not None:
+                self._tokens -= 1.0
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self._rate)
+            wait = min(wait, _MAX_WAIT)
+
+            self._requests += 1
+            if wait > 0:
+                self._delayed_requests += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    async def acquire(self) -> float:
+        """Wait until a request may be sent. Returns the time spent queued."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            if wait >= _REPORT_THRESHOLD:
+                await self._report_wait(wait)
+        return wait
+
+    async def _report_wait(self, wait: float) -> None:
+        logger.debug("Rate limiter %s delayed request by %.2fs", self.name, wait)
+        try:
+            from newcode.stream_events import publish_stream_event
+
+            publish_stream_event(
+                "rate_limit_wait",
+                {
+                    "limiter": self.name,
+                    "wait_seconds": round(wait, 3),
+                    "rate": self._rate,
+                },
+            )
+        except Exception as exc:
+            logger.debug("Failed to report rate limiter wait: %s", exc)
+
+    def observe(self, response: Any, respect_headers: bool = True) -> Optional[float]:
+        """Learn from a response. Returns the server-requested pause, if any."""
+        status_code = getattr(response, "status_code", 0)
+        headers = getattr(response, "headers", None) or {}
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            learned = (
+                self._learn_from_headers(headers, now) if respect_headers else False
+            )
+            pause = None
+
+            if status_code == 429:
+                self._throttled_responses += 1
+                retry_after = (
+                    _header(headers, "retry-after") if respect_headers else None
+                )
+                if retry_after:
+                    pause = parse_retry_after(retry_after)
+                    if pause is not None:
+                        pause = min(pause, _MAX_WAIT)
+                        self._blocked_until = max(self._blocked_until, now + pause)
+                if not learned:
+                    # Multiplicative decrease; start probing if nothing is known
+                    self._rate = max(_MIN_RATE, (self._rate or _PROBE_RATE * 2) / 2.0)
+                    self._capacity = 1.0
+                    self._tokens = min(self._tokens, self._capacity)
+                    self._aimd = True
+            elif self._aimd and status_code < 400:
+                self._rate = (self._rate or _PROBE_RATE) + _AIMD_INCREASE
+                if self._rate >= _AIMD_RELEASE_RATE:
+                    self._rate = None
+                    self._aimd = False
+            return pause
+
+    def _learn_from_headers(self, headers: Mapping[str, Any], now: float) -> bool:
+        """Update the bucket from provider rate-limit headers (lock held)."""
+        candidates = (
+            # (limit, remaining, reset) for request-count limits
+            (
+                "anthropic-ratelimit-requests-limit",
+                "anthropic-ratelimit-requests-remaining",
+                "anthropic-ratelimit-requests-reset",
+            ),
+            (
+                "x-ratelimit-limit-requests",
+                "x-ratelimit-remaining-requests",
+                "x-ratelimit-reset-requests",
+            ),
+            ("x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset"),
+        )
+        learned = False
+        for limit_name, remaining_name, reset_name in candidates:
+            limit = _to_int(_header(headers, limit_name))
+            remaining = _to_int(_header(headers, remaining_name))
+            reset_raw = _header(headers, reset_name)
+            reset = _parse_duration(reset_raw) if reset_raw else None
+            if limit is None and remaining is None:
+                continue
+
+            if limit and limit > 0:
+                # Both Anthropic and OpenAI publish request limits per minute
+                self._rate = limit / 60.0
+                self._capacity = float(limit)
+                self._aimd = False
+                if not self._headers_seen:
+                    self._tokens = self._capacity
+            if remaining is not None:
+                if self._headers_seen:
+                    self._tokens = min(self._tokens, float(remaining))
+                else:
+                    self._tokens = float(remaining)
+                if remaining <= 0 and reset is not None:
+                    self._blocked_until = max(
+                        self._blocked_until, now + min(reset, _MAX_WAIT)
+                    )
+            self._tokens = min(self._tokens, self._capacity)
+            self._headers_seen = True
+            learned = True
+            break
+
+        # Token-based limits can't be paced per request, but exhausting them
+        # still means nothing will succeed until the window resets.
+        for remaining_name, reset_name in (
+            (
+                "anthropic-ratelimit-tokens-remaining",
+                "anthropic-ratelimit-tokens-reset",
+            ),
+            (
+                "anthropic-ratelimit-input-tokens-remaining",
+                "anthropic-ratelimit-input-tokens-reset",
+            ),
+            (
+                "anthropic-ratelimit-output-tokens-remaining",
+                "anthropic-ratelimit-output-tokens-reset",
+            ),
+            ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ):
+            remaining = _to_int(_header(headers, remaining_name))
+            reset_raw = _header(headers, reset_name)
+            if remaining is not None and remaining <= 0 and reset_raw:
+                reset = _parse_duration(reset_raw)
+                if reset is not None:
+                    self._blocked_until = max(
+                        self._blocked_until, now + min(reset, _MAX_WAIT)
+                    )
+                    learned = True
+        return learned
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queueing statistics for this limiter."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": self._rate,
+                "capacity": self._capacity,
+                "tokens": self._tokens,
+                "adaptive": self._aimd,
+                "requests": self._requests,
+                "delayed_requests": self._delayed_requests,
+                "total_wait_seconds": self._total_wait,
+                "max_wait_seconds": self._max_wait,
+                "throttled_responses": self._throttled_responses,
+            }
+
+
+_limiters: Dict[Tuple[str, str], AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _key_fingerprint(headers: Mapping[str, Any]) -> str:
+    for name in _KEY_HEADERS:
+        value = _header(headers, name)
+        if value:
+            return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+    return ""
+
+
+def get_rate_limiter(request: Any) -> AdaptiveRateLimiter:
+    """Return the shared limiter for a request's endpoint and credential.
+
+    Requests without a resolvable host get a private limiter that is not
+    shared with anything else.
+    """
+    host = getattr(getattr(request, "url", None), "host", None)
+    if not isinstance(host, str) or not host:
+        return AdaptiveRateLimiter()
+
+    try:
+        fingerprint = _key_fingerprint(request.headers)
+        if not fingerprint:
+            key_param = request.url.params.get("key")
+            if isinstance(key_param, str) and key_param:
+                fingerprint = hashlib.sha256(key_param.encode("utf-8")).hexdigest()[:12]
+    except Exception:
+        fingerprint = ""
+
+    key = (host, fingerprint)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                name = f"{host}#{fingerprint}" if fingerprint else host
+                limiter = AdaptiveRateLimiter(name=name)
+                _limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics for every active limiter, keyed by limiter name."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
+
+
+def reset_rate_limiters() -> None:
+    """Forget all learned limits (mainly for tests)."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,174 @@
+"""Stream event bus for model streaming events.
+
+Stream handlers publish an event for every part start, delta and end, which
+can be hundreds per second per streaming agent. Publishing is built to cost
+next to nothing:
+
+- With no subscribers for an event type (and no ``stream_event`` phase
+  callbacks), ``publish_stream_event`` returns immediately.
+- Otherwise events are queued and delivered once per event loop tick, as a
+  list, to each subscriber wanting that event type. Async handlers get one
+  task per batch instead of one per event.
+
+Callbacks registered for the ``stream_event`` phase still receive every
+event, one call per event, from a single task per batch.
+
+Usage:
+    >>> def on_events(events):
+    ...     for event in events:
+    ...         print(event.event_type, event.session_id)
+    >>> unsubscribe = subscribe_stream_events(on_events, {"part_delta"})
+    >>> publish_stream_event("part_delta", {"index": 0}, "session-1")
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from newcode import callbacks
+
+logger = logging.getLogger(__name__)
+
+
+class StreamEvent(NamedTuple):
+    """One streaming event as delivered to subscribers."""
+
+    event_type: str
+    event_data: Any
+    session_id: Optional[str] = None
+
+
+StreamEventHandler = Callable[[List[StreamEvent]], Any]
+
+
+@dataclass(frozen=True)
+class _Subscription:
+    handler: StreamEventHandler
+    # None means every event type
+    event_types: Optional[FrozenSet[str]]
+
+    def wants(self, event_type: str) -> bool:
+        return self.event_types is None or event_type in self.event_types
+
+
+_subscriptions: List[_Subscription] = []
+# Events waiting for the next flush, per event loop
+_pending: Dict[asyncio.AbstractEventLoop, List[StreamEvent]] = {}
+
+
+def subscribe_stream_events(
+    handler: StreamEventHandler, event_types: Optional[Iterable[str]] = None
+) -> Callable[[], bool]:
+    """Deliver batches of stream events to ``handler``.
+
+    Subscribing a handler again replaces its previous subscription.
+
+    Args:
+        handler: Called with a list of StreamEvent once per loop tick in
+            which matching events were published. May be sync or async.
+        event_types: Event types to receive, e.g. {"part_start", "part_end"}.
+            None (default) receives every type.
+
+    Returns:
+        A function that removes the subscription.
+    """
+    unsubscribe_stream_events(handler)
+    subscription = _Subscription(
+        handler, frozenset(event_types) if event_types is not None else None
+    )
+    _subscriptions.append(subscription)
+    return lambda: unsubscribe_stream_events(handler)
+
+
+def unsubscribe_stream_events(handler: StreamEventHandler) -> bool:
+    """Remove every subscription of ``handler``. Returns True if one existed."""
+    before = len(_subscriptions)
+    _subscriptions[:] = [s for s in _subscriptions if s.handler is not handler]
+    return len(_subscriptions) != before
+
+
+def clear_stream_subscriptions() -> None:
+    _subscriptions.clear()
+    _pending.clear()
+
+
+def has_stream_subscribers(event_type: Optional[str] = None) -> bool:
+    """Whether publishing ``event_type`` (any type if None) would reach anyone."""
+    if callbacks.count_callbacks("stream_event"):
+        return True
+    if event_type is None:
+        return bool(_subscriptions)
+    return any(s.wants(event_type) for s in _subscriptions)
+
+
+def publish_stream_event(
+    event_type: str, event_data: Any, session_id: Optional[str] = None
+) -> None:
+    """Queue a stream event for delivery on the next loop tick.
+
+    Does nothing when there are no subscribers or no running event loop.
+    """
+    if not has_stream_subscribers(event_type):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.debug("No event loop available for stream event")
+        return
+    pending = _pending.get(loop)
+    if pending is None:
+        pending = _pending[loop] = []
+        loop.call_soon(_flush, loop)
+    pending.append(StreamEvent(event_type, event_data, session_id))
+
+
+def _flush(loop: asyncio.AbstractEventLoop) -> None:
+    events = _pending.pop(loop, None)
+    if not events:
+        return
+    for subscription in list(_subscriptions):
+        if subscription.event_types is None:
+            batch = events
+        else:
+            batch = [e for e in events if e.event_type in subscription.event_types]
+        if batch:
+            _deliver(subscription.handler, batch, loop)
+    if callbacks.count_callbacks("stream_event"):
+        loop.create_task(_run_stream_callbacks(events))
+
+
+def _deliver(
+    handler: StreamEventHandler,
+    batch: List[StreamEvent],
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    try:
+        result = handler(batch)
+        if asyncio.iscoroutine(result):
+            loop.create_task(_await_handler(handler, result))
+    except Exception as e:
+        logger.debug(f"Stream event handler {handler!r} failed: {e}")
+
+
+async def _await_handler(handler: StreamEventHandler, result: Any) -> None:
+    try:
+        await result
+    except Exception as e:
+        logger.debug(f"Stream event handler {handler!r} failed: {e}")
+
+
+async def _run_stream_callbacks(events: List[StreamEvent]) -> None:
+    for event in events:
+        await callbacks.on_stream_event(
+            event.event_type, event.event_data, event.session_id
+        )
@@ -10,8 +10,18 @@ Install with: pip install websockets
 
 from newcode.callbacks import on_register_tools
 from newcode.messaging import emit_warning
-from newcode.tools.agent_tools import register_invoke_agent, register_list_agents
+from newcode.tools.agent_tools import (
+    register_invoke_agent,
+    register_invoke_agents,
+    register_list_agents,
+)
 from newcode.tools.ask_user_question import register_ask_user_question
+from newcode.tools.background_jobs import (
+    register_kill_background_job,
+    register_list_background_jobs,
+    register_tail_background_job,
+    register_wait_for_background_output,
+)
 from newcode.tools.browser.browser_workflows import (
     register_list_workflows,
     register_read_workflow,
@@ -256,6 +266,7 @@ TOOL_REGISTRY = {
     # Agent Tools
     "list_agents": register_list_agents,
     "invoke_agent": register_invoke_agent,
+    "invoke_agents": register_invoke_agents,
     # File Operations
     "list_files": register_list_files,
     "read_file": register_read_file,
@@ -265,6 +276,10 @@ TOOL_REGISTRY = {
     "delete_file": register_delete_file,
     # Command Runner
     "agent_run_shell_command": register_agent_run_shell_command,
+    "list_background_jobs": register_list_background_jobs,
+    "tail_background_job": register_tail_background_job,
+    "wait_for_background_output": register_wait_for_background_output,
+    "kill_background_job": register_kill_background_job,
     # User Interaction
     "ask_user_question": register_ask_user_question,
     # Browser Control
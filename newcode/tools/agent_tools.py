@@ -4,21 +4,19 @@ import hashlib
 import json
 import pickle
 import re
+import sys
 from datetime import datetime
 from functools import partial
 from pathlib import Path
 from typing import List, Set
 
 from pydantic import BaseModel
-
-# Import Agent from pydantic_ai to create temporary agents for invocation
-from pydantic_ai import Agent, RunContext, UsageLimits
+from pydantic_ai import RunContext, UsageLimits
 from pydantic_ai.messages import ModelMessage
 
 from newcode.config import (
     DATA_DIR,
     get_message_limit,
-    get_value,
 )
 from newcode.error_logging import log_error
 from newcode.messaging import (
@@ -215,6 +213,23 @@ class AgentInvokeOutput(BaseModel):
     error: str | None = None
 
 
+class AgentTask(BaseModel):
+    """A single sub-agent invocation within an invoke_agents batch."""
+
+    agent_name: str
+    prompt: str
+    session_id: str | None = None
+
+
+class AgentBatchInvokeOutput(BaseModel):
+    """Output for the invoke_agents tool."""
+
+    results: List[AgentInvokeOutput]
+    succeeded: int = 0
+    failed: int = 0
+    error: str | None = None
+
+
 def register_list_agents(agent):
     """Register the list_agents tool with the provided agent.
 
@@ -282,6 +297,259 @@ def register_list_agents(agent):
     return list_agents
 
 
+async def _invoke_subagent(
+    agent_name: str,
+    prompt: str,
+    session_id: str | None = None,
+    track_progress: bool = False,
+) -> AgentInvokeOutput:
+    """Run one sub-agent invocation; shared by invoke_agent and invoke_agents.
+
+    Args:
+        agent_name: The name of the agent to invoke
+        prompt: The prompt to send to the agent
+        session_id: Optional session ID, see invoke_agent
+        track_progress: Register the run with SubAgentConsoleManager so its
+            status shows in the aggregated sub-agent display.
+    """
+    # Validate user-provided session_id if given
+    if session_id is not None:
+        try:
+            _validate_session_id(session_id)
+        except ValueError as e:
+            # Return error immediately if session_id is invalid
+            group_id = generate_group_id("invoke_agent", agent_name)
+            emit_error(str(e), message_group=group_id)
+            return AgentInvokeOutput(response=None, agent_name=agent_name, error=str(e))
+
+    # Generate a group ID for this tool execution
+    group_id = generate_group_id("invoke_agent", agent_name)
+
+    # Check if this is an existing session or a new one
+    # For user-provided session_id, check if it exists
+    # For None, we'll generate a new one below
+    if session_id is not None:
+        message_history = _load_session_history(session_id)
+        is_new_session = len(message_history) == 0
+    else:
+        message_history = []
+        is_new_session = True
+
+    # Generate or finalize session_id
+    if session_id is None:
+        # Auto-generate a session ID with hash suffix for uniqueness
+        # Example: "qa-expert-session-a3f2b1"
+        hash_suffix = _generate_session_hash_suffix()
+        session_id = f"{agent_name}-session-{hash_suffix}"
+    elif is_new_session:
+        # User provided a base name for a NEW session - append hash suffix
+        # Example: "review-auth" -> "review-auth-a3f2b1"
+        hash_suffix = _generate_session_hash_suffix()
+        session_id = f"{session_id}-{hash_suffix}"
+    # else: continuing existing session, use session_id as-is
+
+    # Lazy imports to avoid circular dependency
+    from newcode.agents.subagent_stream_handler import subagent_stream_handler
+
+    # Emit structured invocation message via MessageBus
+    bus = get_message_bus()
+    bus.emit(
+        SubAgentInvocationMessage(
+            agent_name=agent_name,
+            session_id=session_id,
+            prompt=prompt,
+            is_new_session=is_new_session,
+            message_count=len(message_history),
+        )
+    )
+
+    # Save current session context and set the new one for this sub-agent
+    previous_session_id = get_session_context()
+    set_session_context(session_id)
+
+    # Set terminal session for browser-based terminal tools
+    # This uses contextvars which properly propagate through async tasks
+    from newcode.tools.browser.terminal_tools import (
+        _terminal_session_var,
+        set_terminal_session,
+    )
+
+    terminal_session_token = set_terminal_session(f"terminal-{session_id}")
+
+    # Set browser session for browser tools.
+    # CDP-based browser tooling uses its own contextvar session manager.
+    from newcode.tools.browser.cdp_manager import set_cdp_session
+
+    browser_session_token = set_cdp_session(f"browser-{session_id}")
+
+    console_manager = None
+    final_status = "error"
+    try:
+        # Lazy import to break circular dependency with messaging module
+        from newcode.agents.subagent_pool import (
+            get_pooled_subagent,
+            subagent_run_state,
+        )
+        from newcode.model_factory import make_model_settings
+
+        # Reuse a warm Agent (model client, MCP servers, registered tools)
+        pooled = get_pooled_subagent(agent_name)
+        agent_config = pooled.config
+        model_name = pooled.model_name
+
+        if track_progress:
+            from newcode.messaging.subagent_console import SubAgentConsoleManager
+
+            console_manager = SubAgentConsoleManager.get_instance()
+            console_manager.register_agent(session_id, agent_name, model_name)
+
+        # Instructions are built per run and passed to the pooled agent
+        instructions = agent_config.get_full_system_prompt()
+
+        # Add AGENTS.md content to subagents
+        puppy_rules = agent_config.load_agent_rules()
+        if puppy_rules:
+            instructions += f"\n\n{puppy_rules}"
+
+        # Apply prompt additions (like file permission handling) to temporary agents
+        from newcode import callbacks
+        from newcode.model_utils import prepare_prompt_for_model
+
+        prompt_additions = callbacks.on_load_prompt()
+        if len(prompt_additions):
+            instructions += "\n" + "\n".join(prompt_additions)
+
+        # Handle claude-code models: swap instructions, and prepend system prompt only on first message
+        prepared = prepare_prompt_for_model(
+            model_name,
+            instructions,
+            prompt,
+            prepend_system_to_user=is_new_session,  # Only prepend on first message
+        )
+        instructions = prepared.instructions
+        prompt = prepared.user_prompt
+
+        model_settings = make_model_settings(model_name)
+
+        # Run the pooled agent with the provided prompt as an asyncio task
+        # Pass the message_history from the session to continue the conversation
+
+        # Always use subagent_stream_handler to silence output and update console manager
+        # This ensures all sub-agent output goes through the aggregated dashboard
+        stream_handler = partial(subagent_stream_handler, session_id=session_id)
+
+        # Wrap the agent run in subagent context for tracking, with run-local
+        # history state for the pooled agent's history processor
+        with subagent_context(agent_name, session_id), subagent_run_state(pooled):
+            task = asyncio.create_task(
+                pooled.agent.run(
+                    prompt,
+                    message_history=message_history,
+                    instructions=instructions,
+                    model_settings=model_settings,
+                    usage_limits=UsageLimits(request_limit=get_message_limit()),
+                    event_stream_handler=stream_handler,
+                )
+            )
+            _active_subagent_tasks.add(task)
+
+            try:
+                result = await task
+            finally:
+                _active_subagent_tasks.discard(task)
+
+        # Extract the response from the result
+        response = result.output
+
+        # Update the session history with the new messages from this interaction
+        # The result contains all_messages which includes the full conversation
+        updated_history = result.all_messages()
+
+        # Save to filesystem (include initial prompt only for new sessions)
+        _save_session_history(
+            session_id=session_id,
+            message_history=updated_history,
+            agent_name=agent_name,
+            initial_prompt=prompt if is_new_session else None,
+        )
+
+        # Emit structured response message via MessageBus
+        bus.emit(
+            SubAgentResponseMessage(
+                agent_name=agent_name,
+                session_id=session_id,
+                response=response,
+                message_count=len(updated_history),
+            )
+        )
+
+        # Emit clean completion summary
+        emit_success(f"✓ {agent_name} completed successfully", message_group=group_id)
+        final_status = "completed"
+
+        return AgentInvokeOutput(
+            response=response, agent_name=agent_name, session_id=session_id
+        )
+
+    except Exception as e:
+        error_summary = _format_exception_summary(e)
+        log_error(e, context=f"invoke_agent:{agent_name}")
+
+        # Emit a concise, user-safe failure summary only.
+        emit_error(f"✗ {agent_name} failed: {error_summary}", message_group=group_id)
+
+        return AgentInvokeOutput(
+            response=None,
+            agent_name=agent_name,
+            session_id=session_id,
+            error=f"Error invoking agent '{agent_name}': {error_summary}",
+        )
+
+    finally:
+        if console_manager is not None:
+            console_manager.unregister_agent(session_id, final_status=final_status)
+        # Restore the previous session context
+        set_session_context(previous_session_id)
+        # Reset terminal session context
+        _terminal_session_var.reset(terminal_session_token)
+        # Reset browser session context
+        from newcode.tools.browser.cdp_manager import _cdp_session_var
+
+        _cdp_session_var.reset(browser_session_token)
+        # Stop this invocation's persistent shell, if it started one
+        if not sys.platform.startswith("win"):
+            from newcode.tools.shell_session import close_shell_session
+
+            await close_shell_session(session_id)
+
+
+async def _invoke_subagents(
+    tasks: List[AgentTask], concurrency: int
+) -> AgentBatchInvokeOutput:
+    """Run a batch of sub-agent invocations, at most ``concurrency`` at a time.
+
+    Invocations get their agents from the sub-agent pool, which shares one
+    model instance (and HTTP connection pool) per model name. Results are
+    returned in task order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(task: AgentTask) -> AgentInvokeOutput:
+        async with semaphore:
+            return await _invoke_subagent(
+                task.agent_name,
+                task.prompt,
+                task.session_id,
+                track_progress=True,
+            )
+
+    results = await asyncio.gather(*(run(task) for task in tasks))
+    failed = sum(1 for result in results if result.error)
+    return AgentBatchInvokeOutput(
+        results=list(results), succeeded=len(results) - failed, failed=failed
+    )
+
+
 def register_invoke_agent(agent):
     """Register the invoke_agent tool with the provided agent.
 
@@ -361,234 +629,67 @@ def register_invoke_agent(agent):
             )
             # payment_review.session_id contains a different full ID
         """
-        from newcode.agents.agent_manager import load_agent
+        return await _invoke_subagent(agent_name, prompt, session_id)
 
-        # Validate user-provided session_id if given
-        if session_id is not None:
-            try:
-                _validate_session_id(session_id)
-            except ValueError as e:
-                # Return error immediately if session_id is invalid
-                group_id = generate_group_id("invoke_agent", agent_name)
-                emit_error(str(e), message_group=group_id)
-                return AgentInvokeOutput(
-                    response=None, agent_name=agent_name, error=str(e)
-                )
-
-        # Generate a group ID for this tool execution
-        group_id = generate_group_id("invoke_agent", agent_name)
-
-        # Check if this is an existing session or a new one
-        # For user-provided session_id, check if it exists
-        # For None, we'll generate a new one below
-        if session_id is not None:
-            message_history = _load_session_history(session_id)
-            is_new_session = len(message_history) == 0
-        else:
-            message_history = []
-            is_new_session = True
-
-        # Generate or finalize session_id
-        if session_id is None:
-            # Auto-generate a session ID with hash suffix for uniqueness
-            # Example: "qa-expert-session-a3f2b1"
-            hash_suffix = _generate_session_hash_suffix()
-            session_id = f"{agent_name}-session-{hash_suffix}"
-        elif is_new_session:
-            # User provided a base name for a NEW session - append hash suffix
-            # Example: "review-auth" -> "review-auth-a3f2b1"
-            hash_suffix = _generate_session_hash_suffix()
-            session_id = f"{session_id}-{hash_suffix}"
-        # else: continuing existing session, use session_id as-is
-
-        # Lazy imports to avoid circular dependency
-        from newcode.agents.subagent_stream_handler import subagent_stream_handler
-
-        # Emit structured invocation message via MessageBus
-        bus = get_message_bus()
-        bus.emit(
-            SubAgentInvocationMessage(
-                agent_name=agent_name,
-                session_id=session_id,
-                prompt=prompt,
-                is_new_session=is_new_session,
-                message_count=len(message_history),
-            )
-        )
-
-        # Save current session context and set the new one for this sub-agent
-        previous_session_id = get_session_context()
-        set_session_context(session_id)
-
-        # Set terminal session for browser-based terminal tools
-        # This uses contextvars which properly propagate through async tasks
-        from newcode.tools.browser.terminal_tools import (
-            _terminal_session_var,
-            set_terminal_session,
-        )
-
-        terminal_session_token = set_terminal_session(f"terminal-{session_id}")
-
-        # Set browser session for browser tools.
-        # CDP-based browser tooling uses its own contextvar session manager.
-        from newcode.tools.browser.cdp_manager import set_cdp_session
-
-        browser_session_token = set_cdp_session(f"browser-{session_id}")
-
-        try:
-            # Lazy import to break circular dependency with messaging module
-            from newcode.model_factory import ModelFactory, make_model_settings
-
-            # Load the specified agent config
-            agent_config = load_agent(agent_name)
-
-            # Get the current model for creating a temporary agent
-            model_name = agent_config.get_model_name()
-            models_config = ModelFactory.load_config()
-
-            # Only proceed if we have a valid model configuration
-            if model_name not in models_config:
-                raise ValueError(f"Model '{model_name}' not found in configuration")
-
-            model = ModelFactory.get_model(model_name, models_config)
-
-            # Create a temporary agent instance to avoid interfering with current agent state
-            instructions = agent_config.get_full_system_prompt()
-
-            # Add AGENTS.md content to subagents
-            puppy_rules = agent_config.load_agent_rules()
-            if puppy_rules:
-                instructions += f"\n\n{puppy_rules}"
-
-            # Apply prompt additions (like file permission handling) to temporary agents
-            from newcode import callbacks
-            from newcode.model_utils import prepare_prompt_for_model
-
-            prompt_additions = callbacks.on_load_prompt()
-            if len(prompt_additions):
-                instructions += "\n" + "\n".join(prompt_additions)
-
-            # Handle claude-code models: swap instructions, and prepend system prompt only on first message
-            prepared = prepare_prompt_for_model(
-                model_name,
-                instructions,
-                prompt,
-                prepend_system_to_user=is_new_session,  # Only prepend on first message
-            )
-            instructions = prepared.instructions
-            prompt = prepared.user_prompt
-
-            model_settings = make_model_settings(model_name)
-
-            # Get MCP servers for sub-agents (same as main agent)
-            from newcode.mcp_ import get_mcp_manager
-
-            mcp_servers = []
-            mcp_disabled = get_value("disable_mcp_servers")
-            if not (
-                mcp_disabled and str(mcp_disabled).lower() in ("1", "true", "yes", "on")
-            ):
-                manager = get_mcp_manager()
-                mcp_servers = manager.get_servers_for_agent()
-
-            temp_agent = Agent(
-                model=model,
-                instructions=instructions,
-                output_type=str,
-                retries=10,
-                toolsets=mcp_servers,
-                history_processors=[agent_config.message_history_accumulator],
-                model_settings=model_settings,
-            )
-
-            # Register the tools that the agent needs
-            from newcode.tools import register_tools_for_agent
-
-            agent_tools = agent_config.get_available_tools()
-            register_tools_for_agent(temp_agent, agent_tools, model_name=model_name)
-
-            # Run the temporary agent with the provided prompt as an asyncio task
-            # Pass the message_history from the session to continue the conversation
-
-            # Always use subagent_stream_handler to silence output and update console manager
-            # This ensures all sub-agent output goes through the aggregated dashboard
-            stream_handler = partial(subagent_stream_handler, session_id=session_id)
-
-            # Wrap the agent run in subagent context for tracking
-            with subagent_context(agent_name):
-                task = asyncio.create_task(
-                    temp_agent.run(
-                        prompt,
-                        message_history=message_history,
-                        usage_limits=UsageLimits(request_limit=get_message_limit()),
-                        event_stream_handler=stream_handler,
-                    )
-                )
-                _active_subagent_tasks.add(task)
-
-                try:
-                    result = await task
-                finally:
-                    _active_subagent_tasks.discard(task)
+    return invoke_agent
 
-            # Extract the response from the result
-            response = result.output
 
-            # Update the session history with the new messages from this interaction
-            # The result contains all_messages which includes the full conversation
-            updated_history = result.all_messages()
+def register_invoke_agents(agent):
+    """Register the invoke_agents tool with the provided agent.
 
-            # Save to filesystem (include initial prompt only for new sessions)
-            _save_session_history(
-                session_id=session_id,
-                message_history=updated_history,
-                agent_name=agent_name,
-                initial_prompt=prompt if is_new_session else None,
-            )
+    Args:
+        agent: The agent to register the tool with
+    """
 
-            # Emit structured response message via MessageBus
-            bus.emit(
-                SubAgentResponseMessage(
-                    agent_name=agent_name,
-                    session_id=session_id,
-                    response=response,
-                    message_count=len(updated_history),
-                )
-            )
+    @agent.tool
+    async def invoke_agents(
+        context: RunContext, tasks: List[AgentTask]
+    ) -> AgentBatchInvokeOutput:
+        """Invoke several sub-agents in parallel and collect all their responses.
 
-            # Emit clean completion summary
-            emit_success(
-                f"✓ {agent_name} completed successfully", message_group=group_id
-            )
+        Use this instead of multiple invoke_agent calls when the tasks are
+        independent, e.g. reviewing several files or searching several areas
+        of the codebase at once. Sub-agents run concurrently, up to the
+        configured `subagent_concurrency` limit (default 4); the rest wait
+        for a free slot.
 
-            return AgentInvokeOutput(
-                response=response, agent_name=agent_name, session_id=session_id
-            )
-
-        except Exception as e:
-            error_summary = _format_exception_summary(e)
-            log_error(e, context=f"invoke_agent:{agent_name}")
+        Args:
+            tasks: The invocations to run. Each has:
+                - agent_name (str): The name of the agent to invoke
+                - prompt (str): The prompt to send to the agent
+                - session_id (str | None): Optional session ID, with the same
+                  meaning as for invoke_agent
 
-            # Emit a concise, user-safe failure summary only.
-            emit_error(
-                f"✗ {agent_name} failed: {error_summary}", message_group=group_id
-            )
+        Returns:
+            AgentBatchInvokeOutput: Contains:
+                - results (List[AgentInvokeOutput]): One result per task, in
+                  task order, each with its response, session_id and error
+                - succeeded (int): Number of tasks that completed
+                - failed (int): Number of tasks that returned an error
+                - error (str | None): Error message if the batch was rejected
 
-            return AgentInvokeOutput(
-                response=None,
-                agent_name=agent_name,
-                session_id=session_id,
-                error=f"Error invoking agent '{agent_name}': {error_summary}",
-            )
+        Examples:
+            result = invoke_agents([
+                {"agent_name": "code-reviewer", "prompt": "Review auth.py"},
+                {"agent_name": "code-reviewer", "prompt": "Review payments.py"},
+                {"agent_name": "qa-expert", "prompt": "List edge cases for auth.py"},
+            ])
+            # result.results[1].response is the payments.py review
+        """
+        from newcode.config import get_subagent_concurrency
 
-        finally:
-            # Restore the previous session context
-            set_session_context(previous_session_id)
-            # Reset terminal session context
-            _terminal_session_var.reset(terminal_session_token)
-            # Reset browser session context
-            from newcode.tools.browser.cdp_manager import _cdp_session_var
+        group_id = generate_group_id("invoke_agents")
+        if not tasks:
+            error_msg = "No tasks given to invoke_agents"
+            emit_error(error_msg, message_group=group_id)
+            return AgentBatchInvokeOutput(results=[], error=error_msg)
 
-            _cdp_session_var.reset(browser_session_token)
+        concurrency = get_subagent_concurrency()
+        emit_info(
+            f"Dispatching {len(tasks)} sub-agents "
+            f"({min(concurrency, len(tasks))} at a time)",
+            message_group=group_id,
+        )
+        return await _invoke_subagents(tasks, concurrency)
 
-    return invoke_agent
+    return invoke_agents
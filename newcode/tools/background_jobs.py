@@ -0,0 +1,393 @@
+"""Background jobs - tracking and monitoring of background shell commands.
+
+``agent_run_shell_command(background=True)`` detaches a process whose output
+goes to a ``shell_bg_*.log`` file. The job registry remembers each of them
+(PID, command, start time, log path) so agents can list, tail, wait on and
+kill them without re-reading whole log files: tails are incremental, from
+a byte offset returned by the previous call.
+"""
+
+import asyncio
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+from pydantic_ai import RunContext
+
+from newcode.messaging import emit_info
+
+# Upper bound on output returned by a single tail / wait call
+MAX_TAIL_BYTES = 64 * 1024
+# How often wait_for_background_output checks the log for new output
+WAIT_POLL_INTERVAL = 0.25
+# Upper bound on a single wait, to keep tool calls from hanging forever
+MAX_WAIT_SECONDS = 600
+
+
+@dataclass
+class BackgroundJob:
+    """A background shell command started by the agent."""
+
+    process: subprocess.Popen
+    command: str
+    log_file: str
+    cwd: Optional[str] = None
+    started_at: float = 0.0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        return self.process.poll()
+
+    @property
+    def running(self) -> bool:
+        return self.exit_code is None
+
+
+_JOBS: Dict[int, BackgroundJob] = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def register_background_job(
+    process: subprocess.Popen, command: str, log_file: str, cwd: Optional[str] = None
+) -> BackgroundJob:
+    """Track a freshly started background process."""
+    job = BackgroundJob(
+        process=process,
+        command=command,
+        log_file=log_file,
+        cwd=cwd,
+        started_at=time.time(),
+    )
+    with _JOBS_LOCK:
+        _JOBS[job.pid] = job
+    return job
+
+
+def get_background_job(pid: int) -> Optional[BackgroundJob]:
+    with _JOBS_LOCK:
+        return _JOBS.get(pid)
+
+
+def get_background_jobs() -> List[BackgroundJob]:
+    """All tracked jobs, oldest first, including those that have exited."""
+    with _JOBS_LOCK:
+        return sorted(_JOBS.values(), key=lambda job: job.started_at)
+
+
+def clear_background_jobs() -> None:
+    """Forget all tracked jobs (does not kill them)."""
+    with _JOBS_LOCK:
+        _JOBS.clear()
+
+
+def _read_log_bytes(
+    log_file: str, offset: int = 0, max_bytes: int = MAX_TAIL_BYTES
+) -> tuple[bytes, int, bool]:
+    """Raw log bytes from ``offset``; returns ``(data, start, truncated)``.
+
+    Negative offsets count from the end of the log. When more than
+    ``max_bytes`` are available the read stops at the last complete line
+    within the limit and ``truncated`` is set.
+    """
+    with open(log_file, "rb") as f:
+        size = f.seek(0, 2)
+        if offset < 0:
+            offset = max(0, size + offset)
+        elif offset > size:
+            # The log was truncated or replaced; start over
+            offset = 0
+        f.seek(offset)
+        data = f.read(max_bytes + 1)
+
+    truncated = len(data) > max_bytes
+    if truncated:
+        data = data[:max_bytes]
+        newline = data.rfind(b"\n")
+        if newline >= 0:
+            data = data[: newline + 1]
+    return data, offset, truncated
+
+
+# Output models
+class BackgroundJobInfo(BaseModel):
+    """A background job as reported by list_background_jobs."""
+
+    pid: int
+    command: str
+    cwd: Optional[str] = None
+    log_file: str
+    started_at: float
+    running_seconds: float
+    running: bool
+    exit_code: Optional[int] = None
+    log_size: int = 0  # Bytes of output so far; pass as offset to tail new output
+
+
+class BackgroundJobListOutput(BaseModel):
+    """Output for list_background_jobs tool."""
+
+    jobs: List[BackgroundJobInfo]
+    error: Optional[str] = None
+
+
+class BackgroundJobOutput(BaseModel):
+    """Output for tail_background_job and wait_for_background_output tools."""
+
+    pid: int
+    output: str = ""
+    offset: int = 0
+    next_offset: int = 0  # Pass as offset on the next call to get only new output
+    truncated: bool = False
+    running: bool = False
+    exit_code: Optional[int] = None
+    matched: Optional[bool] = None  # Only set by wait_for_background_output
+    match: Optional[str] = None
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+class BackgroundJobKillOutput(BaseModel):
+    """Output for kill_background_job tool."""
+
+    pid: int
+    success: bool
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _job_info(job: BackgroundJob) -> BackgroundJobInfo:
+    try:
+        with open(job.log_file, "rb") as f:
+            log_size = f.seek(0, 2)
+    except OSError:
+        log_size = 0
+    return BackgroundJobInfo(
+        pid=job.pid,
+        command=job.command,
+        cwd=job.cwd,
+        log_file=job.log_file,
+        started_at=job.started_at,
+        running_seconds=round(time.time() - job.started_at, 1),
+        running=job.running,
+        exit_code=job.exit_code,
+        log_size=log_size,
+    )
+
+
+def _unknown_job(pid: int) -> str:
+    return f"No background job with PID {pid}. Use list_background_jobs to see them."
+
+
+def _list_background_jobs() -> BackgroundJobListOutput:
+    return BackgroundJobListOutput(
+        jobs=[_job_info(job) for job in get_background_jobs()]
+    )
+
+
+def _tail_background_job(
+    pid: int, offset: int = 0, max_bytes: int = MAX_TAIL_BYTES
+) -> BackgroundJobOutput:
+    job = get_background_job(pid)
+    if job is None:
+        return BackgroundJobOutput(pid=pid, error=_unknown_job(pid))
+    # Sample the exit status first so no output written before exit is missed
+    exit_code = job.exit_code
+    try:
+        data, start, truncated = _read_log_bytes(job.log_file, offset, max_bytes)
+    except OSError as e:
+        return BackgroundJobOutput(
+            pid=pid, offset=offset, error=f"Failed to read log file: {e}"
+        )
+    return BackgroundJobOutput(
+        pid=pid,
+        output=data.decode("utf-8", errors="replace"),
+        offset=start,
+        next_offset=start + len(data),
+        truncated=truncated,
+        running=exit_code is None,
+        exit_code=exit_code,
+    )
+
+
+async def _wait_for_background_output(
+    pid: int, pattern: str, timeout: float = 60, offset: int = 0
+) -> BackgroundJobOutput:
+    """Wait until a line of new output matches ``pattern``.
+
+    Only output after ``offset`` is searched. Returns as soon as a line
+    matches, when the job exits without a match, or after ``timeout``
+    seconds. ``output`` holds the new output up to and including the
+    matching line; ``next_offset`` points just past it.
+    """
+    job = get_background_job(pid)
+    if job is None:
+        return BackgroundJobOutput(pid=pid, error=_unknown_job(pid))
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        return BackgroundJobOutput(pid=pid, error=f"Invalid regex pattern: {e}")
+
+    deadline = time.monotonic() + max(0.0, min(timeout, MAX_WAIT_SECONDS))
+    start_offset = None
+    # Lines read so far, keeping only the last MAX_TAIL_BYTES
+    seen: Deque[bytes] = deque()
+    seen_bytes = 0
+    truncated = False
+
+    def result(**kwargs) -> BackgroundJobOutput:
+        return BackgroundJobOutput(
+            pid=pid,
+            output=b"".join(seen).decode("utf-8", errors="replace"),
+            offset=start_offset,
+            next_offset=offset,
+            truncated=truncated,
+            **kwargs,
+        )
+
+    while True:
+        exit_code = job.exit_code
+        try:
+            data, offset, _ = _read_log_bytes(job.log_file, offset)
+        except OSError as e:
+            return BackgroundJobOutput(
+                pid=pid, offset=offset, error=f"Failed to read log file: {e}"
+            )
+        if start_offset is None:
+            start_offset = offset
+
+        for line in data.splitlines(keepends=True):
+            if (
+                not line.endswith(b"\n")
+                and exit_code is None
+                and len(line) < MAX_TAIL_BYTES
+            ):
+                # Partial last line; read it again once it is complete
+                break
+            offset += len(line)
+            seen.append(line)
+            seen_bytes += len(line)
+            while seen_bytes > MAX_TAIL_BYTES and len(seen) > 1:
+                seen_bytes -= len(seen.popleft())
+                truncated = True
+            found = regex.search(line.decode("utf-8", errors="replace"))
+            if found:
+                exit_code = job.exit_code
+                return result(
+                    running=exit_code is None,
+                    exit_code=exit_code,
+                    matched=True,
+                    match=found.group(0),
+                )
+
+        timed_out = time.monotonic() >= deadline
+        if exit_code is not None or timed_out:
+            return result(
+                running=exit_code is None,
+                exit_code=exit_code,
+                matched=False,
+                timed_out=exit_code is None,
+            )
+        await asyncio.sleep(min(WAIT_POLL_INTERVAL, deadline - time.monotonic()))
+
+
+async def _kill_background_job(pid: int) -> BackgroundJobKillOutput:
+    from newcode.tools.command_runner import _kill_process_group
+
+    job = get_background_job(pid)
+    if job is None:
+        return BackgroundJobKillOutput(pid=pid, success=False, error=_unknown_job(pid))
+    if job.running:
+        # Escalating group kill sleeps between signals; keep it off the loop
+        await asyncio.to_thread(_kill_process_group, job.process)
+        emit_info(f"🛑 Killed background process {pid}: {job.command}")
+    exit_code = job.exit_code
+    if exit_code is None:
+        return BackgroundJobKillOutput(
+            pid=pid, success=False, error="Process did not exit after SIGKILL"
+        )
+    return BackgroundJobKillOutput(pid=pid, success=True, exit_code=exit_code)
+
+
+def register_list_background_jobs(agent):
+    """Register the list_background_jobs tool."""
+
+    @agent.tool
+    async def list_background_jobs(
+        context: RunContext,
+    ) -> BackgroundJobListOutput:
+        """List background shell commands started with background=True.
+
+        Returns each job's PID, command, log file, whether it is still running,
+        its exit code and the current log size in bytes.
+        """
+        return _list_background_jobs()
+
+
+def register_tail_background_job(agent):
+    """Register the tail_background_job tool."""
+
+    @agent.tool
+    async def tail_background_job(
+        context: RunContext, pid: int, offset: int = 0
+    ) -> BackgroundJobOutput:
+        """Read a background job's output written since a byte offset.
+
+        Start with offset=0 (or a negative offset to read only the last bytes),
+        then pass the returned next_offset on the next call to get only what is
+        new. Much cheaper than re-reading the log file with read_file.
+
+        Args:
+            pid: PID of the background job.
+            offset: Byte offset in the job's log to read from.
+        """
+        return _tail_background_job(pid, offset)
+
+
+def register_wait_for_background_output(agent):
+    """Register the wait_for_background_output tool."""
+
+    @agent.tool
+    async def wait_for_background_output(
+        context: RunContext,
+        pid: int,
+        pattern: str,
+        timeout: float = 60,
+        offset: int = 0,
+    ) -> BackgroundJobOutput:
+        """Wait until a background job prints a line matching a regex.
+
+        Use it to wait for dev servers ("Listening on"), builds or test runs
+        instead of polling. Returns when a new line matches (matched=True),
+        when the job exits, or after timeout seconds (timed_out=True).
+
+        Args:
+            pid: PID of the background job.
+            pattern: Python regular expression searched in each new line.
+            timeout: Seconds to wait at most (capped at 600).
+            offset: Byte offset to start searching from, e.g. a previous next_offset.
+        """
+        return await _wait_for_background_output(pid, pattern, timeout, offset)
+
+
+def register_kill_background_job(agent):
+    """Register the kill_background_job tool."""
+
+    @agent.tool
+    async def kill_background_job(
+        context: RunContext, pid: int
+    ) -> BackgroundJobKillOutput:
+        """Kill a background job and its child processes.
+
+        Args:
+            pid: PID of the background job.
+        """
+        return await _kill_background_job(pid)
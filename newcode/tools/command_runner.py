@@ -12,7 +12,7 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from functools import partial
-from typing import Callable, Literal, Optional, Set
+from typing import TYPE_CHECKING, Callable, Literal, Optional, Set
 
 from pydantic import BaseModel
 from pydantic_ai import RunContext
@@ -27,8 +27,17 @@ from newcode.messaging import (  # Structured messaging types
     emit_warning,
     get_message_bus,
 )
+from newcode.tools.background_jobs import register_background_job
 from newcode.tools.common import generate_group_id, get_user_approval_async
-from newcode.tools.subagent_context import is_subagent
+from newcode.tools.shell_output import ShellOutputCapture, ShellOutputCoalescer
+from newcode.tools.subagent_context import (
+    get_subagent_name,
+    get_subagent_session_id,
+    is_subagent,
+)
+
+if TYPE_CHECKING:
+    from newcode.tools.shell_session import ShellSession
 
 # Maximum line length for shell command output to prevent massive token usage
 # This helps avoid exceeding model context limits when commands produce very long lines
@@ -133,6 +142,37 @@ def _unregister_process(proc: subprocess.Popen) -> None:
         _RUNNING_PROCESSES.discard(proc)
 
 
+class _AsyncProcessHandle:
+    """Popen-like view of an asyncio subprocess for the process registry.
+
+    Lets kill_all_running_shell_processes() and get_running_shell_process_count()
+    treat commands run by the asyncio engine like Popen-based ones. Killing
+    is handed to the event loop, since the registry is used from keyboard
+    listener threads and signal handlers.
+    """
+
+    stdin = stdout = stderr = None
+
+    def __init__(
+        self, process: asyncio.subprocess.Process, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self._process = process
+        self._loop = loop
+        self.pid = process.pid
+        self.kill_requested = asyncio.Event()
+
+    def poll(self) -> Optional[int]:
+        return self._process.returncode
+
+    def request_kill(self) -> None:
+        """Ask the engine to kill the process group (callable from any thread)."""
+        try:
+            self._loop.call_soon_threadsafe(self.kill_requested.set)
+        except RuntimeError:
+            # Event loop already closed; nothing left to kill through it
+            pass
+
+
 def _kill_process_group(proc: subprocess.Popen) -> None:
     """Attempt to aggressively terminate a process and its group.
 
@@ -215,6 +255,14 @@ def kill_all_running_shell_processes() -> int:
         procs = list(_RUNNING_PROCESSES)
     count = 0
     for p in procs:
+        if isinstance(p, _AsyncProcessHandle):
+            # The asyncio engine kills the group itself, without blocking
+            if p.poll() is None:
+                p.request_kill()
+                count += 1
+                _USER_KILLED_PROCESSES.add(p.pid)
+            _unregister_process(p)
+            continue
         try:
             # Close pipes first to unblock readline()
             try:
@@ -298,6 +346,8 @@ class ShellCommandOutput(BaseModel):
     background: bool = False  # True if command was run in background mode
     log_file: str | None = None  # Path to temp log file for background commands
     pid: int | None = None  # Process ID for background commands
+    # Full output when stdout/stderr only hold its tail; page with read_file
+    output_file: str | None = None
 
 
 class ShellSafetyAssessment(BaseModel):
@@ -620,8 +670,8 @@ def run_shell_command_streaming(
 
     ABSOLUTE_TIMEOUT_SECONDS = 270
 
-    stdout_lines = []
-    stderr_lines = []
+    # Bounded in-memory tail per stream; full output spills to disk
+    capture = ShellOutputCapture(command, truncate=_truncate_line)
 
     stdout_thread = None
     stderr_thread = None
@@ -632,6 +682,9 @@ def run_shell_command_streaming(
         except (ValueError, OSError):
             return
 
+        # Lines are shown in frame-rate chunks rather than one message each
+        stdout_output = ShellOutputCoalescer("stdout", emit=emit_shell_line)
+
         try:
             while True:
                 # Check stop event first
@@ -648,11 +701,9 @@ def run_shell_command_streaming(
                             line = process.stdout.readline()
                             if not line:  # EOF
                                 break
-                            line = line.rstrip("\n")
-                            line = _truncate_line(line)
-                            stdout_lines.append(line)
+                            line = capture.add("stdout", line.rstrip("\n"))
                             if not silent:
-                                emit_shell_line(line, stream="stdout")
+                                stdout_output.add(line)
                             last_output_time[0] = time.time()
                         else:
                             # No data available, check if process has exited
@@ -662,21 +713,25 @@ def run_shell_command_streaming(
                                     remaining = process.stdout.read()
                                     if remaining:
                                         for line in remaining.split("\n"):
-                                            line = _truncate_line(line)
-                                            stdout_lines.append(line)
+                                            line = capture.add("stdout", line)
                                             if not silent:
-                                                emit_shell_line(line, stream="stdout")
+                                                stdout_output.add(line)
                                 except (ValueError, OSError):
                                     pass
                                 break
+                            if not silent:
+                                stdout_output.flush()
                             # Sleep briefly to avoid busy-waiting (100ms like POSIX)
                             time.sleep(0.1)
                     except (ValueError, OSError):
                         break
                 else:
-                    # POSIX: use select with timeout
+                    # POSIX: use select with timeout (100ms, or until the
+                    # pending output chunk is due)
                     try:
-                        ready, _, _ = select.select([fd], [], [], 0.1)  # 100ms timeout
+                        ready, _, _ = select.select(
+                            [fd], [], [], stdout_output.time_until_due(0.1)
+                        )
                     except (ValueError, OSError, select.error):
                         break
 
@@ -684,17 +739,20 @@ def run_shell_command_streaming(
                         line = process.stdout.readline()
                         if not line:  # EOF
                             break
-                        line = line.rstrip("\n")
-                        line = _truncate_line(line)
-                        stdout_lines.append(line)
+                        line = capture.add("stdout", line.rstrip("\n"))
                         if not silent:
-                            emit_shell_line(line, stream="stdout")
+                            stdout_output.add(line)
                         last_output_time[0] = time.time()
+                    elif not silent:
+                        stdout_output.flush_if_due()
                     # If not ready, loop continues and checks stop event again
         except (ValueError, OSError):
             pass
         except Exception:
             pass
+        finally:
+            if not silent:
+                stdout_output.flush()
 
     def read_stderr():
         try:
@@ -702,6 +760,9 @@ def run_shell_command_streaming(
         except (ValueError, OSError):
             return
 
+        # Lines are shown in frame-rate chunks rather than one message each
+        stderr_output = ShellOutputCoalescer("stderr", emit=emit_shell_line)
+
         try:
             while True:
                 # Check stop event first
@@ -717,11 +778,9 @@ def run_shell_command_streaming(
                             line = process.stderr.readline()
                             if not line:  # EOF
                                 break
-                            line = line.rstrip("\n")
-                            line = _truncate_line(line)
-                            stderr_lines.append(line)
+                            line = capture.add("stderr", line.rstrip("\n"))
                             if not silent:
-                                emit_shell_line(line, stream="stderr")
+                                stderr_output.add(line)
                             last_output_time[0] = time.time()
                         else:
                             # No data available, check if process has exited
@@ -731,20 +790,23 @@ def run_shell_command_streaming(
                                     remaining = process.stderr.read()
                                     if remaining:
                                         for line in remaining.split("\n"):
-                                            line = _truncate_line(line)
-                                            stderr_lines.append(line)
+                                            line = capture.add("stderr", line)
                                             if not silent:
-                                                emit_shell_line(line, stream="stderr")
+                                                stderr_output.add(line)
                                 except (ValueError, OSError):
                                     pass
                                 break
+                            if not silent:
+                                stderr_output.flush()
                             # Sleep briefly to avoid busy-waiting (100ms like POSIX)
                             time.sleep(0.1)
                     except (ValueError, OSError):
                         break
                 else:
                     try:
-                        ready, _, _ = select.select([fd], [], [], 0.1)
+                        ready, _, _ = select.select(
+                            [fd], [], [], stderr_output.time_until_due(0.1)
+                        )
                     except (ValueError, OSError, select.error):
                         break
 
@@ -752,16 +814,19 @@ def run_shell_command_streaming(
                         line = process.stderr.readline()
                         if not line:  # EOF
                             break
-                        line = line.rstrip("\n")
-                        line = _truncate_line(line)
-                        stderr_lines.append(line)
+                        line = capture.add("stderr", line.rstrip("\n"))
                         if not silent:
-                            emit_shell_line(line, stream="stderr")
+                            stderr_output.add(line)
                         last_output_time[0] = time.time()
+                    elif not silent:
+                        stderr_output.flush_if_due()
         except (ValueError, OSError):
             pass
         except Exception:
             pass
+        finally:
+            if not silent:
+                stderr_output.flush()
 
     def cleanup_process_and_threads(timeout_type: str = "unknown"):
         nonlocal stdout_thread, stderr_thread
@@ -816,12 +881,13 @@ def run_shell_command_streaming(
             **{
                 "success": False,
                 "command": command,
-                "stdout": "\n".join(stdout_lines[-256:]),
-                "stderr": "\n".join(stderr_lines[-256:]),
+                "stdout": capture.stdout.text(),
+                "stderr": capture.stderr.text(),
                 "exit_code": -9,
                 "execution_time": execution_time,
                 "timeout": True,
                 "error": f"Command timed out after {timeout} seconds",
+                "output_file": capture.close(),
             }
         )
 
@@ -873,9 +939,10 @@ def run_shell_command_streaming(
 
         _unregister_process(process)
 
-        # Apply line length limits to stdout/stderr before returning
-        truncated_stdout = stdout_lines[-256:]
-        truncated_stderr = stderr_lines[-256:]
+        # The capture only holds the (line length limited) tail of the output
+        truncated_stdout = capture.stdout.lines
+        truncated_stderr = capture.stderr.lines
+        output_file = capture.close()
 
         # Emit structured ShellOutputMessage for the UI (skip for silent sub-agents)
         if not silent:
@@ -904,6 +971,7 @@ def run_shell_command_streaming(
                 execution_time=execution_time,
                 timeout=False,
                 user_interrupted=process.pid in _USER_KILLED_PROCESSES,
+                output_file=output_file,
             )
 
         return ShellCommandOutput(
@@ -914,6 +982,7 @@ def run_shell_command_streaming(
             exit_code=exit_code,
             execution_time=execution_time,
             timeout=False,
+            output_file=output_file,
         )
 
     except Exception as e:
@@ -923,11 +992,406 @@ def run_shell_command_streaming(
             success=False,
             command=command,
             error=f"Error during streaming execution: {str(e)}",
-            stdout="\n".join(stdout_lines[-256:]),
-            stderr="\n".join(stderr_lines[-256:]),
+            stdout=capture.stdout.text(),
+            stderr=capture.stderr.text(),
             exit_code=-1,
             timeout=False,
+            output_file=capture.close(),
+        )
+
+
+# Longest line the asyncio engine buffers; longer lines are delivered in
+# pieces instead of failing the read
+_ASYNC_STREAM_LIMIT = 1024 * 1024
+
+
+class _OutputLineReader:
+    """Splits a subprocess stream into lines ending in \\n, \\r\\n or a bare \\r.
+
+    Matches the universal-newline splitting of the threaded engine's text
+    pipes, so carriage-return progress updates arrive as lines (and count as
+    output for the inactivity timeout) instead of waiting for a newline.
+    Buffered data survives a cancelled readline().
+    """
+
+    def __init__(self, stream: asyncio.StreamReader, limit: int = _ASYNC_STREAM_LIMIT):
+        self._stream = stream
+        self._limit = limit
+        self._buffer = bytearray()
+        # A line just ended in a bare \r at the end of the buffer; a \n
+        # arriving next belongs to that line ending
+        self._skip_lf = False
+
+    def _take_line(self) -> Optional[bytes]:
+        buffer = self._buffer
+        if self._skip_lf and buffer:
+            if buffer[0] == 0x0A:
+                del buffer[0]
+            self._skip_lf = False
+        cr = buffer.find(b"\r")
+        lf = buffer.find(b"\n")
+        if cr != -1 and (lf == -1 or cr < lf):
+            end = cr + 1
+            if end < len(buffer):
+                if buffer[end] == 0x0A:
+                    end += 1
+            else:
+                self._skip_lf = True
+        elif lf != -1:
+            end = lf + 1
+        elif len(buffer) >= self._limit:
+            end = self._limit
+        else:
+            return None
+        line = bytes(buffer[:end])
+        del buffer[:end]
+        return line
+
+    async def readline(self) -> Optional[bytes]:
+        """Next line (line ending included), or None at EOF."""
+        while True:
+            line = self._take_line()
+            if line is not None:
+                return line
+            chunk = await self._stream.read(65536)
+            if not chunk:
+                line = bytes(self._buffer) or None
+                self._buffer.clear()
+                return line
+            self._buffer += chunk
+
+
+async def _kill_process_group_async(process: asyncio.subprocess.Process) -> None:
+    """Terminate a process group, escalating SIGTERM -> SIGINT -> SIGKILL.
+
+    Async counterpart of _kill_process_group: waits for the exit on the event
+    loop instead of sleeping.
+    """
+    if process.returncode is not None:
+        return
+    try:
+        pgid = os.getpgid(process.pid)
+    except (OSError, ProcessLookupError):
+        pgid = None
+
+    for sig, grace in (
+        (signal.SIGTERM, 1.0),
+        (signal.SIGINT, 0.6),
+        (signal.SIGKILL, 0.5),
+    ):
+        try:
+            if pgid is not None:
+                os.killpg(pgid, sig)
+            else:
+                process.send_signal(sig)
+        except (OSError, ProcessLookupError):
+            return
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+
+async def run_shell_command_async(
+    command: str,
+    cwd: str | None = None,
+    timeout: int = 60,
+    group_id: str = None,
+    silent: bool = False,
+) -> ShellCommandOutput:
+    """Run a shell command entirely on the event loop.
+
+    Same behaviour as run_shell_command_streaming, but output readers,
+    timeout enforcement and process-group kills are coroutines: no worker
+    or reader threads, no polling, and a command returns as soon as it
+    exits.
+    """
+    ABSOLUTE_TIMEOUT_SECONDS = 270
+
+    start_time = time.time()
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True,
+        limit=_ASYNC_STREAM_LIMIT,
+    )
+    handle = _AsyncProcessHandle(process, asyncio.get_running_loop())
+    _register_process(handle)
+
+    # Bounded in-memory tail per stream; full output spills to disk
+    capture = ShellOutputCapture(command, truncate=_truncate_line)
+    last_output_time = [time.monotonic()]
+
+    async def pump(stream: asyncio.StreamReader, name: str) -> None:
+        # Lines are shown in frame-rate chunks rather than one message each
+        output = None if silent else ShellOutputCoalescer(name, emit=emit_shell_line)
+        reader = _OutputLineReader(stream)
+        try:
+            while True:
+                if output is not None and output.has_pending:
+                    try:
+                        raw = await asyncio.wait_for(
+                            reader.readline(), output.time_until_due(1.0)
+                        )
+                    except asyncio.TimeoutError:
+                        output.flush()
+                        continue
+                else:
+                    raw = await reader.readline()
+                if raw is None:
+                    break
+                line = raw.decode("utf-8", errors="replace")
+                if line.endswith("\n"):
+                    line = line[:-1]
+                line = capture.add(name, line)
+                last_output_time[0] = time.monotonic()
+                if output is not None:
+                    output.add(line)
+        finally:
+            if output is not None:
+                output.flush()
+
+    readers = [
+        asyncio.create_task(pump(process.stdout, "stdout")),
+        asyncio.create_task(pump(process.stderr, "stderr")),
+    ]
+    exited = asyncio.create_task(process.wait())
+    kill_requested = asyncio.create_task(handle.kill_requested.wait())
+    timeout_type = None
+
+    try:
+        while not exited.done():
+            now = time.monotonic()
+            elapsed = time.time() - start_time
+            if elapsed > ABSOLUTE_TIMEOUT_SECONDS:
+                timeout_type = "absolute"
+                break
+            if now - last_output_time[0] > timeout:
+                timeout_type = "inactivity"
+                break
+            wait_for = min(
+                ABSOLUTE_TIMEOUT_SECONDS - elapsed,
+                timeout - (now - last_output_time[0]),
+            )
+            await asyncio.wait(
+                {exited, kill_requested},
+                timeout=max(wait_for, 0.01),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if kill_requested.done() and not exited.done():
+                # Ctrl-C / Ctrl-X: kill, then report like any failed command
+                await _kill_process_group_async(process)
+                await exited
+
+        if timeout_type is not None:
+            if not silent:
+                emit_error(
+                    f"Process killed: {timeout_type} timeout reached",
+                    message_group=group_id,
+                )
+            await _kill_process_group_async(process)
+
+        # Let the readers drain what is left in the pipes
+        _, pending = await asyncio.wait(readers, timeout=5)
+        if pending and not silent:
+            emit_warning(
+                "Output readers failed to finish after the command exited",
+                message_group=group_id,
+            )
+    except asyncio.CancelledError:
+        await _kill_process_group_async(process)
+        raise
+    finally:
+        for task in (*readers, exited, kill_requested):
+            if not task.done():
+                task.cancel()
+        _unregister_process(handle)
+
+    return _command_result(
+        command,
+        capture,
+        exit_code=process.returncode,
+        execution_time=time.time() - start_time,
+        timeout=timeout if timeout_type is not None else None,
+        silent=silent,
+        user_interrupted=process.pid in _USER_KILLED_PROCESSES,
+    )
+
+
+def _command_result(
+    command: str,
+    capture: ShellOutputCapture,
+    exit_code: Optional[int],
+    execution_time: float,
+    timeout: Optional[int] = None,
+    silent: bool = False,
+    user_interrupted: bool = False,
+) -> ShellCommandOutput:
+    """Build the tool result for a finished command (``timeout`` if it timed out)."""
+    output_file = capture.close()
+    stdout = capture.stdout.text()
+    stderr = capture.stderr.text()
+
+    if timeout is not None:
+        return ShellCommandOutput(
+            success=False,
+            command=command,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=-9,
+            execution_time=execution_time,
+            timeout=True,
+            error=f"Command timed out after {timeout} seconds",
+            output_file=output_file,
+        )
+
+    # Emit structured ShellOutputMessage for the UI (skip for silent sub-agents)
+    if not silent:
+        get_message_bus().emit(
+            ShellOutputMessage(
+                command=command,
+                stdout=stdout,
+                stderr=stderr,
+                exit_code=exit_code,
+                duration_seconds=execution_time,
+            )
+        )
+
+    if exit_code != 0:
+        return ShellCommandOutput(
+            success=False,
+            command=command,
+            error="""The process didn't exit cleanly! If the user_interrupted flag is true,
+                please stop all execution and ask the user for clarification!""",
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            execution_time=execution_time,
+            timeout=False,
+            user_interrupted=user_interrupted,
+            output_file=output_file,
+        )
+
+    return ShellCommandOutput(
+        success=True,
+        command=command,
+        stdout=stdout,
+        stderr=stderr,
+        exit_code=exit_code,
+        execution_time=execution_time,
+        timeout=False,
+        output_file=output_file,
+    )
+
+
+async def run_shell_command_in_session(
+    session: "ShellSession",
+    command: str,
+    cwd: str | None = None,
+    timeout: int = 60,
+    group_id: str = None,
+    silent: bool = False,
+) -> ShellCommandOutput:
+    """Run a shell command in a persistent shell session.
+
+    Timeouts and Ctrl-C / Ctrl-X kills behave as for one-off commands, but
+    kill the whole session, so the next command gets a fresh shell.
+    """
+    from newcode.tools.shell_session import ShellSessionClosed
+
+    ABSOLUTE_TIMEOUT_SECONDS = 270
+
+    async with session.lock:
+        if not session.alive:
+            await session.start()
+
+        start_time = time.time()
+        handle = _AsyncProcessHandle(session, asyncio.get_running_loop())
+        _register_process(handle)
+        # PTY output is a single stream: stderr arrives merged into stdout
+        capture = ShellOutputCapture(command, truncate=_truncate_line)
+        output = (
+            None if silent else ShellOutputCoalescer("stdout", emit=emit_shell_line)
+        )
+        last_output_time = time.monotonic()
+        exit_code = None
+        timeout_type = None
+        session_note = None
+
+        try:
+            session.begin(command, cwd)
+            while exit_code is None:
+                now = time.monotonic()
+                elapsed = time.time() - start_time
+                if handle.kill_requested.is_set():
+                    break
+                if elapsed > ABSOLUTE_TIMEOUT_SECONDS:
+                    timeout_type = "absolute"
+                    break
+                if now - last_output_time > timeout:
+                    timeout_type = "inactivity"
+                    break
+                wait_for = min(
+                    ABSOLUTE_TIMEOUT_SECONDS - elapsed,
+                    timeout - (now - last_output_time),
+                )
+                if output is not None:
+                    wait_for = output.time_until_due(wait_for)
+                try:
+                    lines, exit_code = await session.read_lines(
+                        max(wait_for, 0.01), interrupt=handle.kill_requested
+                    )
+                except ShellSessionClosed:
+                    exit_code = session.returncode
+                    session_note = (
+                        "The shell session exited; the next command starts a new one."
+                    )
+                    break
+                if lines:
+                    last_output_time = time.monotonic()
+                for line in lines:
+                    line = capture.add("stdout", line)
+                    if output is not None:
+                        output.add(line)
+                if output is not None:
+                    output.flush_if_due()
+
+            if exit_code is None:
+                if timeout_type is not None and not silent:
+                    emit_error(
+                        f"Process killed: {timeout_type} timeout reached",
+                        message_group=group_id,
+                    )
+                await session.close()
+                exit_code = -9 if timeout_type else session.returncode
+                session_note = (
+                    "The shell session was killed; the next command starts a new one."
+                )
+        except asyncio.CancelledError:
+            await session.close()
+            raise
+        finally:
+            if output is not None:
+                output.flush()
+            _unregister_process(handle)
+
+    result = _command_result(
+        command,
+        capture,
+        exit_code=exit_code,
+        execution_time=time.time() - start_time,
+        timeout=timeout if timeout_type is not None else None,
+        silent=silent,
+        user_interrupted=handle.pid in _USER_KILLED_PROCESSES,
+    )
+    if session_note:
+        result.error = (
+            f"{result.error} {session_note}" if result.error else session_note
         )
+    return result
 
 
 async def run_shell_command(
@@ -998,6 +1462,7 @@ async def run_shell_command(
                 )
 
             log_file.close()  # Close our handle, process keeps writing
+            register_background_job(process, command, log_file_path, cwd)
 
             # Emit UI messages so user sees what happened
             bus = get_message_bus()
@@ -1239,9 +1704,41 @@ async def _run_command_inner(
     group_id: str,
     silent: bool = False,
 ) -> ShellCommandOutput:
-    """Inner command execution logic - runs blocking code in thread pool."""
+    """Inner command execution logic.
+
+    On POSIX the command runs on the event loop via run_shell_command_async,
+    so concurrent commands need no threads, or in the agent's persistent
+    shell session when the shell_session setting is on. Windows keeps the
+    thread pool engine, which relies on taskkill for process-tree kills.
+    """
     loop = asyncio.get_running_loop()
     try:
+        if not sys.platform.startswith("win"):
+            from newcode.config import get_shell_session_enabled
+
+            session = None
+            if get_shell_session_enabled():
+                from newcode.tools.shell_session import (
+                    ShellSessionClosed,
+                    get_shell_session,
+                )
+
+                # One shell per sub-agent invocation: parallel runs of the
+                # same sub-agent must not share a cwd or environment
+                session = get_shell_session(
+                    get_subagent_session_id() or get_subagent_name() or "main"
+                )
+            if session is not None:
+                try:
+                    return await run_shell_command_in_session(
+                        session, command, cwd, timeout, group_id, silent=silent
+                    )
+                except ShellSessionClosed:
+                    # Session failed to start; run the command on its own
+                    pass
+            return await run_shell_command_async(
+                command, cwd, timeout, group_id, silent=silent
+            )
         # Run the blocking shell command in a thread pool to avoid blocking the event loop
         # This allows multiple sub-agents to run shell commands in parallel
         return await loop.run_in_executor(
@@ -1296,5 +1793,10 @@ def register_agent_run_shell_command(agent):
         """Execute a shell command with comprehensive monitoring and safety features.
 
         Supports streaming output, timeout handling, and background execution.
+        Background commands return their pid; follow them with
+        tail_background_job or wait_for_background_output and stop them with
+        kill_background_job. Long output is cut to its last lines in
+        stdout/stderr; output_file then holds the complete output, which can
+        be paged through with read_file.
         """
         return await run_shell_command(context, command, cwd, timeout, background)
@@ -0,0 +1,254 @@
+"""Display and capture of streaming shell output.
+
+Emitting one ShellLineMessage per output line makes chatty commands
+(``npm install``, verbose test runs) spend most of their time building,
+queueing and rendering messages. ShellOutputCoalescer collects lines and
+emits them as one newline-joined ShellLineMessage per frame instead.
+
+ShellOutputCapture keeps only the tail of each stream in memory, bounded
+by lines and bytes, and streams the complete output to a spill file in
+the state dir so nothing is lost when the tail is all the agent sees.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, TextIO
+
+from newcode.config import STATE_DIR, get_shell_output_spill_enabled
+from newcode.messaging import emit_shell_line
+
+# Chunks are flushed at most this many times per second...
+SHELL_OUTPUT_FRAME_RATE = 30
+# ...or as soon as this many characters are pending.
+SHELL_OUTPUT_MAX_CHUNK_CHARS = 16384
+
+# In-memory tail kept per stream for the tool result
+SHELL_CAPTURE_MAX_LINES = 256
+SHELL_CAPTURE_MAX_BYTES = 64 * 1024
+
+# Number of spill files kept in the spill directory
+MAX_SPILL_FILES = 50
+
+
+class ShellOutputCoalescer:
+    """Buffer shell output lines of one stream and emit them in chunks.
+
+    Not thread-safe: each reader thread owns the coalescer of its stream.
+    """
+
+    def __init__(
+        self,
+        stream: str = "stdout",
+        frame_rate: float = SHELL_OUTPUT_FRAME_RATE,
+        max_chunk_chars: int = SHELL_OUTPUT_MAX_CHUNK_CHARS,
+        emit: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self.stream = stream
+        self.frame_interval = 1.0 / frame_rate
+        self.max_chunk_chars = max_chunk_chars
+        self._emit = emit or emit_shell_line
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def add(self, line: str) -> None:
+        """Queue a line, flushing when the frame is due or the chunk is full."""
+        if "\r" in line:
+            # Progress-bar output is rendered raw, so it can't share a chunk
+            self.flush()
+            self._emit(line, self.stream)
+            self._last_flush = time.monotonic()
+            return
+
+        self._pending.append(line)
+        self._pending_chars += len(line) + 1
+        if self._pending_chars >= self.max_chunk_chars:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        """Flush if a frame interval has passed since the last flush."""
+        if self._pending and (
+            time.monotonic() - self._last_flush >= self.frame_interval
+        ):
+            self.flush()
+
+    def time_until_due(self, idle: float) -> float:
+        """How long a reader may wait for input before the next flush is due."""
+        if not self._pending:
+            return idle
+        remaining = self.frame_interval - (time.monotonic() - self._last_flush)
+        return max(0.0, min(idle, remaining))
+
+    def flush(self) -> None:
+        """Emit all pending lines as a single message."""
+        if not self._pending:
+            return
+        chunk = "\n".join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+        self._emit(chunk, self.stream)
+
+
+def get_shell_spill_dir() -> Path:
+    """Directory holding full shell command output, created on demand."""
+    spill_dir = Path(STATE_DIR) / "shell_output"
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    return spill_dir
+
+
+def _prune_spill_files(spill_dir: Path, keep: int = MAX_SPILL_FILES) -> None:
+    """Delete the oldest spill files beyond ``keep``."""
+    try:
+        files = sorted(spill_dir.glob("shell_*.log"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for old in files[: max(0, len(files) - keep)]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+class OutputRingBuffer:
+    """The most recent lines of a stream, bounded by line count and bytes."""
+
+    def __init__(
+        self,
+        max_lines: int = SHELL_CAPTURE_MAX_LINES,
+        max_bytes: int = SHELL_CAPTURE_MAX_BYTES,
+    ) -> None:
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._lines: Deque[str] = deque()
+        self._bytes = 0
+        self.total_lines = 0
+        self.dropped_lines = 0
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        self._bytes += len(line) + 1
+        self.total_lines += 1
+        while self._lines and (
+            len(self._lines) > self.max_lines or self._bytes > self.max_bytes
+        ):
+            self._bytes -= len(self._lines.popleft()) + 1
+            self.dropped_lines += 1
+
+    @property
+    def lines(self) -> List[str]:
+        return list(self._lines)
+
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+
+class ShellOutputCapture:
+    """Bounded capture of a command's stdout and stderr.
+
+    Memory use stays flat however much a command prints: only the last
+    lines of each stream are kept, each shortened by ``truncate``. With
+    spilling enabled, once the in-memory tail starts losing output the
+    complete output, in arrival order, is written to a file in the state
+    dir; its path is available as ``spill_path`` for paging with read_file.
+    Commands whose output fits never touch the disk.
+
+    Thread-safe: the stdout and stderr readers may add lines concurrently.
+    """
+
+    def __init__(
+        self,
+        command: str = "",
+        spill: Optional[bool] = None,
+        truncate: Optional[Callable[[str], str]] = None,
+        max_lines: int = SHELL_CAPTURE_MAX_LINES,
+        max_bytes: int = SHELL_CAPTURE_MAX_BYTES,
+    ) -> None:
+        self.command = command
+        self.stdout = OutputRingBuffer(max_lines, max_bytes)
+        self.stderr = OutputRingBuffer(max_lines, max_bytes)
+        self._truncate = truncate
+        self._spill = get_shell_output_spill_enabled() if spill is None else spill
+        self._spill_file: Optional[TextIO] = None
+        # Full lines seen so far, written out if the capture becomes lossy.
+        # Bounded: the ring buffers drop (and so trigger the spill) first.
+        self._unspilled: List[str] = []
+        self._lines_shortened = False
+        self._lock = threading.Lock()
+        self._closed = False
+        self.spill_path: Optional[str] = None
+
+    @property
+    def lossy(self) -> bool:
+        """Whether the in-memory tail is missing any output."""
+        return (
+            bool(self.stdout.dropped_lines or self.stderr.dropped_lines)
+            or self._lines_shortened
+        )
+
+    def _open_spill_file(self) -> None:
+        try:
+            spill_dir = get_shell_spill_dir()
+            _prune_spill_files(spill_dir, keep=MAX_SPILL_FILES - 1)
+            fd, path = tempfile.mkstemp(
+                prefix="shell_", suffix=".log", dir=str(spill_dir)
+            )
+            self._spill_file = os.fdopen(fd, "w", encoding="utf-8", errors="replace")
+            self.spill_path = path
+            if self.command:
+                self._spill_file.write(f"$ {self.command}\n")
+        except OSError:
+            # Spilling is best effort; the in-memory tail still works
+            self._spill = False
+
+    def add(self, stream: str, line: str) -> str:
+        """Record a line of ``stream`` output; returns the line as kept in memory."""
+        kept = self._truncate(line) if self._truncate else line
+        buffer = self.stderr if stream == "stderr" else self.stdout
+        with self._lock:
+            if kept != line:
+                self._lines_shortened = True
+            buffer.append(kept)
+            if not self._spill or self._closed:
+                return kept
+
+            if self._spill_file is None:
+                if not self.lossy:
+                    self._unspilled.append(line)
+                    return kept
+                self._open_spill_file()
+                if self._spill_file is None:
+                    self._unspilled = []
+                    return kept
+                self._unspilled.append(line)
+                line = "\n".join(self._unspilled)
+                self._unspilled = []
+            try:
+                self._spill_file.write(line + "\n")
+            except (OSError, ValueError):
+                pass
+        return kept
+
+    def close(self) -> Optional[str]:
+        """Finish capturing; returns the spill file path, if one was needed."""
+        with self._lock:
+            self._closed = True
+            self._unspilled = []
+            spill_file, self._spill_file = self._spill_file, None
+
+        if spill_file is not None:
+            try:
+                spill_file.close()
+            except OSError:
+                pass
+        return self.spill_path
@@ -0,0 +1,334 @@
+"""Persistent shell sessions for agent_run_shell_command.
+
+Normally every command starts a fresh shell, so `cd`, `export` and sourced
+environments (virtualenv, nvm, direnv) are lost and paid for again on the
+next call. With the ``shell_session`` setting enabled, the main agent and
+each sub-agent invocation instead keep one long-lived bash driven through a
+PTY. Commands are written to it one at a time, with stdin redirected from
+/dev/null, each followed by a sentinel line carrying a per-command token and
+the exit status, which marks where the command's output ends.
+
+Output arrives as a single stream: stderr is merged into stdout, as in a
+terminal. A command that times out or is killed takes the session down
+with it; the next command starts a new one.
+"""
+
+import asyncio
+import fcntl
+import os
+import pty
+import re
+import secrets
+import shlex
+import shutil
+import signal
+import subprocess
+import termios
+from typing import Dict, List, Optional, Tuple
+
+_SENTINEL_PREFIX = "__NEWCODE_DONE_"
+_SENTINEL_RE = re.compile(_SENTINEL_PREFIX + r"([0-9a-f]+):(\d+)$")
+
+# How long a new shell may take to answer its first sentinel
+STARTUP_TIMEOUT_SECONDS = 10.0
+READ_CHUNK_BYTES = 65536
+MAX_PARTIAL_LINE_BYTES = 1024 * 1024
+
+
+class ShellSessionClosed(Exception):
+    """The session's shell exited (e.g. the command ran `exit`)."""
+
+
+def _session_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # No prompts, no pagers waiting for keypresses, no colour escapes
+    env.update(
+        PS1="",
+        PS2="",
+        PROMPT_COMMAND="",
+        TERM="dumb",
+        PAGER="cat",
+        GIT_PAGER="cat",
+    )
+    env.pop("HISTFILE", None)
+    return env
+
+
+def _configure_pty(fd: int) -> None:
+    """Raw-ish terminal: no echo, no line length limit, no CRLF translation."""
+    attrs = termios.tcgetattr(fd)
+    attrs[1] &= ~termios.OPOST
+    attrs[3] &= ~(termios.ECHO | termios.ICANON)
+    attrs[6][termios.VMIN] = 1
+    attrs[6][termios.VTIME] = 0
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+def _make_controlling_tty() -> None:
+    # Runs in the child after setsid(): programs opening /dev/tty work
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class ShellSession:
+    """A long-lived bash process running commands sent over a PTY.
+
+    Not safe for concurrent commands; callers hold ``lock`` while running one.
+    """
+
+    def __init__(self, shell: str) -> None:
+        self.shell = shell
+        self.lock = asyncio.Lock()
+        self.process: Optional[subprocess.Popen] = None
+        self._master_fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffer = bytearray()
+        self._data_ready = asyncio.Event()
+        self._eof = False
+        self._token: Optional[str] = None
+        self._held_blank = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Exit status of the shell, None while it is alive."""
+        if self.process is None:
+            return -1
+        return self.process.poll()
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.process is not None
+            and not self._eof
+            and self.process.poll() is None
+            and self.loop_is_current()
+        )
+
+    def loop_is_current(self) -> bool:
+        """Whether the session is unused or bound to the running event loop."""
+        return self._loop is None or self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        """Start (or restart) the shell and wait until it accepts commands."""
+        self.discard()
+        self._buffer.clear()
+        self._data_ready.clear()
+        self._eof = False
+
+        master, slave = pty.openpty()
+        try:
+            _configure_pty(slave)
+            self.process = subprocess.Popen(
+                [self.shell, "--norc", "--noprofile", "--noediting", "+m", "-i"],
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                env=_session_env(),
+                start_new_session=True,
+                preexec_fn=_make_controlling_tty,
+            )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+
+        os.set_blocking(master, False)
+        self._master_fd = master
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(master, self._on_readable)
+
+        # Wait for the shell to answer, discarding anything it printed first
+        self.begin("true")
+        try:
+            async with asyncio.timeout(STARTUP_TIMEOUT_SECONDS):
+                status = None
+                while status is None:
+                    _, status = await self.read_lines(STARTUP_TIMEOUT_SECONDS)
+        except (TimeoutError, ShellSessionClosed):
+            await self.close()
+            raise ShellSessionClosed("Shell session failed to start")
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._master_fd, READ_CHUNK_BYTES)
+        except BlockingIOError:
+            return
+        except OSError:
+            # EIO: every process holding the slave side has exited
+            data = b""
+        if data:
+            self._buffer += data
+        else:
+            self._eof = True
+            self._loop.remove_reader(self._master_fd)
+        self._data_ready.set()
+
+    def begin(self, command: str, cwd: Optional[str] = None) -> None:
+        """Send a command to the shell, framed by a fresh sentinel."""
+        self._token = secrets.token_hex(8)
+        self._held_blank = False
+        # The command reads /dev/null, not the PTY: otherwise cat, read or
+        # an editor would swallow the sentinel. eval is a builtin, so cd and
+        # export still apply to the session's shell.
+        script = f"eval {shlex.quote(command)} </dev/null"
+        if cwd:
+            script = f"cd -- {shlex.quote(cwd)} && {script}"
+        # The sentinel follows on the same line. Its leading newline puts it
+        # on its own output line even when the command's output does not end
+        # with one.
+        line = f"{script}; printf '\\n{_SENTINEL_PREFIX}{self._token}:%s\\n' \"$?\"\n"
+        os.write(self._master_fd, line.encode("utf-8"))
+
+    async def read_lines(
+        self, timeout: float, interrupt: Optional[asyncio.Event] = None
+    ) -> Tuple[List[str], Optional[int]]:
+        """Wait up to ``timeout`` for output of the current command.
+
+        Returns the complete lines received and, once the command has
+        finished, its exit status. Also returns early when ``interrupt``
+        is set. Raises ShellSessionClosed if the shell exited.
+        """
+        if b"\n" not in self._buffer and not self._eof:
+            waiters = [asyncio.ensure_future(self._data_ready.wait())]
+            if interrupt is not None:
+                waiters.append(asyncio.ensure_future(interrupt.wait()))
+            try:
+                await asyncio.wait(
+                    waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        self._data_ready.clear()
+
+        end = self._buffer.rfind(b"\n")
+        if end < 0 and len(self._buffer) >= MAX_PARTIAL_LINE_BYTES:
+            # Output without newlines; hand it over rather than buffer forever
+            self._buffer += b"\n"
+            end = len(self._buffer) - 1
+        if end < 0:
+            if self._eof:
+                raise ShellSessionClosed("Shell session exited")
+            return [], None
+        chunk = bytes(self._buffer[: end + 1])
+        del self._buffer[: end + 1]
+
+        lines: List[str] = []
+        if self._held_blank:
+            lines.append("")
+            self._held_blank = False
+        for line in chunk.decode("utf-8", errors="replace").split("\n")[:-1]:
+            found = _SENTINEL_RE.search(line)
+            if found and found.group(1) == self._token:
+                # Drop the blank line the sentinel's leading newline produced
+                if lines and lines[-1] == "":
+                    lines.pop()
+                prefix = line[: found.start()]
+                if prefix:
+                    lines.append(prefix)
+                self._token = None
+                self._buffer.clear()
+                return lines, int(found.group(2))
+            lines.append(line)
+
+        # A trailing blank line may belong to the sentinel; hold it back
+        if lines and lines[-1] == "":
+            lines.pop()
+            self._held_blank = True
+        return lines, None
+
+    def _close_pty(self) -> None:
+        if self._master_fd is None:
+            return
+        if self._loop is not None and not self._loop.is_closed() and not self._eof:
+            try:
+                self._loop.remove_reader(self._master_fd)
+            except Exception:
+                pass
+        try:
+            os.close(self._master_fd)
+        except OSError:
+            pass
+        self._master_fd = None
+        self._eof = True
+
+    def discard(self) -> None:
+        """Kill the shell immediately, e.g. one left over from another event loop."""
+        self._close_pty()
+        if self.process is not None and self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (OSError, ProcessLookupError):
+                pass
+
+    async def close(self) -> None:
+        """Kill the shell and everything it started, escalating to SIGKILL."""
+        self._close_pty()
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        loop = asyncio.get_running_loop()
+        for sig, grace in ((signal.SIGTERM, 0.5), (signal.SIGKILL, 0.5)):
+            try:
+                # The shell leads its own process group, shared by its commands
+                os.killpg(process.pid, sig)
+            except (OSError, ProcessLookupError):
+                return
+            deadline = loop.time() + grace
+            while process.poll() is None and loop.time() < deadline:
+                await asyncio.sleep(0.02)
+            if process.poll() is not None:
+                return
+
+
+_SESSIONS: Dict[str, ShellSession] = {}
+
+
+def _find_shell() -> Optional[str]:
+    return shutil.which("bash")
+
+
+def get_shell_session(key: str) -> Optional[ShellSession]:
+    """The shell session for ``key`` (the main agent or a sub-agent session).
+
+    The session is started, or restarted after a kill, by its first
+    command. Returns None when bash is not available, in which case callers
+    fall back to one shell per command.
+    """
+    session = _SESSIONS.get(key)
+    if session is not None and session.loop_is_current():
+        return session
+    if session is not None:
+        session.discard()
+
+    shell = _find_shell()
+    if shell is None:
+        return None
+    session = _SESSIONS[key] = ShellSession(shell)
+    return session
+
+
+async def close_shell_session(key: str) -> None:
+    """Close the shell session for ``key``, if there is one."""
+    session = _SESSIONS.pop(key, None)
+    if session is None:
+        return
+    if session.loop_is_current():
+        await session.close()
+    else:
+        session.discard()
+
+
+async def close_shell_sessions() -> None:
+    """Close every shell session."""
+    sessions = list(_SESSIONS.values())
+    _SESSIONS.clear()
+    for session in sessions:
+        if session.loop_is_current():
+            await session.close()
+        else:
+            session.discard()
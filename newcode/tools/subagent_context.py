@@ -56,6 +56,7 @@ __all__ = [
     "is_subagent",
     "get_subagent_name",
     "get_subagent_depth",
+    "get_subagent_session_id",
 ]
 
 # Track sub-agent depth (0 = main agent, 1+ = sub-agent)
@@ -64,9 +65,16 @@ _subagent_depth: ContextVar[int] = ContextVar("subagent_depth", default=0)
 # Track current sub-agent name (None = main agent)
 _subagent_name: ContextVar[str | None] = ContextVar("subagent_name", default=None)
 
+# Track the current sub-agent invocation's session id (None = main agent)
+_subagent_session_id: ContextVar[str | None] = ContextVar(
+    "subagent_session_id", default=None
+)
+
 
 @contextmanager
-def subagent_context(agent_name: str) -> Generator[None, None, None]:
+def subagent_context(
+    agent_name: str, session_id: str | None = None
+) -> Generator[None, None, None]:
     """Context manager for tracking sub-agent execution.
 
     Increments the sub-agent depth and sets the current agent name on entry,
@@ -75,6 +83,8 @@ def subagent_context(agent_name: str) -> Generator[None, None, None]:
 
     Args:
         agent_name: Name of the sub-agent being executed (e.g., "retriever", "husky")
+        session_id: Session id of this invocation. Parallel invocations of the
+            same sub-agent have different ids.
 
     Yields:
         None
@@ -96,6 +106,7 @@ def subagent_context(agent_name: str) -> Generator[None, None, None]:
     # Set new values and save tokens for restoration
     depth_token = _subagent_depth.set(current_depth + 1)
     name_token = _subagent_name.set(agent_name)
+    session_token = _subagent_session_id.set(session_id)
 
     try:
         yield
@@ -104,6 +115,7 @@ def subagent_context(agent_name: str) -> Generator[None, None, None]:
         # This ensures the context is restored even if an exception occurs
         _subagent_depth.reset(depth_token)
         _subagent_name.reset(name_token)
+        _subagent_session_id.reset(session_token)
 
 
 def is_subagent() -> bool:
@@ -156,3 +168,18 @@ def get_subagent_depth() -> int:
         2
     """
     return _subagent_depth.get()
+
+
+def get_subagent_session_id() -> str | None:
+    """Get the session id of the current sub-agent invocation.
+
+    Returns:
+        Current invocation's session id, or None if in main agent context or
+        if the sub-agent was entered without one
+
+    Example:
+        >>> with subagent_context("husky", session_id="husky-session-a1b2c3"):
+        ...     get_subagent_session_id()
+        'husky-session-a1b2c3'
+    """
+    return _subagent_session_id.get()
@@ -294,6 +294,20 @@ class TestMCPToolCache:
         # Cache should be cleared
         assert agent._mcp_tool_definitions_cache == []
 
+    def test_mcp_cache_preloaded_from_disk(self, agent, monkeypatch):
+        """Test that cached tool definitions survive update_mcp_tool_cache_sync."""
+        definitions = [{"name": "disk_tool", "description": "", "inputSchema": {}}]
+        monkeypatch.setattr(
+            "newcode.agents.base_agent.get_cached_tool_definitions",
+            lambda servers: definitions if servers else [],
+        )
+        agent._mcp_servers = [object()]
+        agent._mcp_tool_definitions_cache = []
+
+        agent.update_mcp_tool_cache_sync()
+
+        assert agent._mcp_tool_definitions_cache == definitions
+
     def test_mcp_cache_token_estimation_accuracy(self, agent):
         """Test that MCP tool cache token estimation is reasonably accurate."""
         # Create a tool definition with known content
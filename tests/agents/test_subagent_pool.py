@@ -0,0 +1,155 @@
+"""Tests for newcode/agents/subagent_pool.py."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from newcode.agents import subagent_pool
+from newcode.agents.base_agent import BaseAgent
+from newcode.agents.subagent_pool import (
+    clear_subagent_pool,
+    get_pooled_subagent,
+    get_subagent_pool_size,
+    subagent_run_state,
+)
+
+
+class _Agent(BaseAgent):
+    def __init__(self, name="reviewer", tools=("read_file",)):
+        super().__init__()
+        self._name = name
+        self._tools = list(tools)
+        self.model = "model-a"
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def display_name(self):
+        return self._name
+
+    @property
+    def description(self):
+        return "test agent"
+
+    def get_system_prompt(self):
+        return "prompt"
+
+    def get_available_tools(self):
+        return self._tools
+
+    def get_model_name(self):
+        return self.model
+
+
+@pytest.fixture
+def pool_env():
+    configs = {"reviewer": _Agent(), "searcher": _Agent("searcher")}
+    with (
+        patch(
+            "newcode.agents.agent_manager.load_agent",
+            side_effect=lambda name: configs[name],
+        ) as load_agent,
+        patch.object(subagent_pool, "_get_mcp_servers", return_value=[]),
+        patch(
+            "newcode.model_factory.ModelFactory.load_config",
+            return_value={"model-a": {}, "model-b": {}},
+        ),
+        patch(
+            "newcode.model_factory.ModelFactory.get_model",
+            side_effect=lambda name, config: MagicMock(name=name),
+        ) as get_model,
+        patch.object(
+            subagent_pool, "Agent", side_effect=lambda **kw: SimpleNamespace(**kw)
+        ),
+        patch("newcode.tools.register_tools_for_agent") as register_tools,
+    ):
+        clear_subagent_pool()
+        yield configs, load_agent, get_model, register_tools
+        clear_subagent_pool()
+
+
+class TestSubagentPool:
+    def test_reuses_built_agent(self, pool_env):
+        _, load_agent, _, register_tools = pool_env
+
+        first = get_pooled_subagent("reviewer")
+        second = get_pooled_subagent("reviewer")
+
+        assert second is first
+        assert load_agent.call_count == 1
+        assert register_tools.call_count == 1
+        assert get_subagent_pool_size() == 1
+
+    def test_model_change_builds_new_agent_sharing_models(self, pool_env):
+        configs, _, get_model, _ = pool_env
+
+        reviewer = get_pooled_subagent("reviewer")
+        searcher = get_pooled_subagent("searcher")
+        configs["reviewer"].model = "model-b"
+        repinned = get_pooled_subagent("reviewer")
+
+        assert searcher.agent is not reviewer.agent
+        # Both agents on model-a share one model instance
+        assert searcher.agent.model is reviewer.agent.model
+        assert repinned.model_name == "model-b"
+        assert repinned.agent is not reviewer.agent
+        assert get_model.call_count == 2
+
+    def test_unknown_model_raises(self, pool_env):
+        configs, _, _, _ = pool_env
+        configs["reviewer"].model = "missing"
+        with pytest.raises(ValueError, match="missing"):
+            get_pooled_subagent("reviewer")
+
+    def test_refresh_agents_clears_pool(self, pool_env):
+        from newcode.agents.agent_manager import refresh_agents
+
+        get_pooled_subagent("reviewer")
+        with patch("newcode.agents.agent_manager._discover_agents"):
+            refresh_agents()
+        assert get_subagent_pool_size() == 0
+
+    def test_config_change_clears_pool(self, pool_env):
+        from newcode import config as cp_config
+
+        first = get_pooled_subagent("reviewer")
+        cp_config.set_config_value("temperature", "0.5")
+        stat = os.stat(cp_config.CONFIG_FILE)
+        os.utime(cp_config.CONFIG_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert get_pooled_subagent("reviewer") is not first
+
+
+class TestSubagentRunState:
+    def test_each_run_gets_fresh_history(self, pool_env):
+        pooled = get_pooled_subagent("reviewer")
+        pooled.config.set_message_history(["stale"])
+        pooled.config.get_compacted_message_hashes().add("hash")
+
+        with subagent_run_state(pooled) as first:
+            assert subagent_pool._run_config.get() is first
+            assert first.get_message_history() == []
+            assert first.get_compacted_message_hashes() == set()
+            first.get_compacted_message_hashes().add("new")
+        with subagent_run_state(pooled) as second:
+            assert second is not first
+            assert second.get_compacted_message_hashes() == set()
+
+        assert subagent_pool._run_config.get() is None
+        assert pooled.config.get_compacted_message_hashes() == {"hash"}
+
+    def test_history_processor_forwards_to_run_config(self, pool_env):
+        pooled = get_pooled_subagent("reviewer")
+        ctx = MagicMock()
+        assert subagent_pool._run_history_processor(ctx, ["m"]) == ["m"]
+
+        with subagent_run_state(pooled) as run_config:
+            with patch.object(
+                type(run_config), "message_history_accumulator", return_value=["x"]
+            ) as accumulate:
+                assert subagent_pool._run_history_processor(ctx, ["m"]) == ["x"]
+        accumulate.assert_called_once_with(ctx, ["m"])
@@ -86,20 +86,20 @@ class TestFireCallback:
         # When no event loop is available, should not raise
         # This tests the RuntimeError handling path
         with patch(
-            "newcode.agents.subagent_stream_handler.asyncio.get_running_loop",
+            "newcode.stream_events.asyncio.get_running_loop",
             side_effect=RuntimeError("No running event loop"),
         ):
             # Should not raise, just log debug
             _fire_callback("part_start", {"index": 0}, "session-123")
 
     def test_fire_callback_import_error(self):
-        """Test callback handling when callbacks module is unavailable."""
+        """Test callback handling when the event bus module is unavailable."""
         # Simulate ImportError when importing callbacks
         with patch(
-            "newcode.agents.subagent_stream_handler.asyncio.get_running_loop",
+            "newcode.stream_events.asyncio.get_running_loop",
             return_value=MagicMock(),
         ):
-            with patch.dict("sys.modules", {"newcode.callbacks": None}):
+            with patch.dict("sys.modules", {"newcode.stream_events": None}):
                 # Should not raise
                 _fire_callback("part_start", {"index": 0}, "session-123")
 
@@ -107,7 +107,7 @@ class TestFireCallback:
         """Test callback handling for general exceptions."""
         # Simulate exception during callback import
         with patch(
-            "newcode.agents.subagent_stream_handler.asyncio.get_running_loop",
+            "newcode.stream_events.asyncio.get_running_loop",
             side_effect=Exception("Some unexpected error"),
         ):
             # Should not raise, just log debug
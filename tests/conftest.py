@@ -14,6 +14,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from newcode import config as cp_config
+from newcode.agents.subagent_pool import clear_subagent_pool
 
 # Integration test fixtures - only import if pexpect.spawn is available (Unix)
 # On Windows, pexpect doesn't have spawn attribute, so skip these imports
@@ -68,6 +69,8 @@ def isolate_config_between_tests(tmp_path_factory):
     cp_config.clear_model_cache()
     # Clear session-local model cache (required for /model session sticky behavior)
     cp_config.reset_session_model()
+    # Warm sub-agents were built from the previous config
+    clear_subagent_pool()
 
     yield
 
@@ -79,6 +82,7 @@ def isolate_config_between_tests(tmp_path_factory):
     cp_config.clear_model_cache()
     # Clear session-local model cache
     cp_config.reset_session_model()
+    clear_subagent_pool()
 
     # Clean up the temp directory
     try:
@@ -0,0 +1,111 @@
+"""Tests for hook result memoization."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from newcode.hook_engine import EventData, ExecutionResult, HookConfig, HookEngine
+from newcode.hook_engine.cache import HookResultCache, make_cache_key
+from newcode.hook_engine.validator import validate_hooks_config
+
+
+def _config(cache):
+    return {
+        "PreToolUse": [
+            {
+                "matcher": "Bash",
+                "hooks": [
+                    {"type": "command", "command": "echo checked", "cache": cache}
+                ],
+            }
+        ]
+    }
+
+
+def _event(command="ls"):
+    return EventData(
+        event_type="PreToolUse", tool_name="Bash", tool_args={"command": command}
+    )
+
+
+class TestHookResultCache:
+    def _hook(self):
+        return HookConfig(matcher="*", type="command", command="true", cache_ttl=10)
+
+    def test_hit_miss_and_lru(self):
+        cache = HookResultCache(max_entries=2)
+        hook = self._hook()
+        keys = [make_cache_key(hook, f"{i}".encode()) for i in range(3)]
+        result = ExecutionResult(blocked=False, hook_command="true", duration_ms=7)
+
+        assert cache.get(keys[0]) is None
+        for key in keys:
+            cache.put(key, result, ttl=10)
+
+        assert cache.get(keys[0]) is None
+        cached = cache.get(keys[2])
+        assert cached.duration_ms == 0.0
+        assert cached.hook_command == "true"
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_expired_entries_miss(self):
+        cache = HookResultCache()
+        key = make_cache_key(self._hook(), b"{}")
+        cache.put(key, ExecutionResult(blocked=True, hook_command="x", exit_code=1), 5)
+
+        with patch("newcode.hook_engine.cache.time.monotonic", return_value=1e12):
+            assert cache.get(key) is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_failed_runs_not_cached(self):
+        cache = HookResultCache()
+        key = make_cache_key(self._hook(), b"{}")
+        cache.put(key, ExecutionResult(blocked=True, hook_command="x", exit_code=-1), 5)
+        assert cache.get(key) is None
+
+    def test_env_vars_change_key(self):
+        hook = self._hook()
+        assert make_cache_key(hook, b"{}", {"A": "1"}) != make_cache_key(
+            hook, b"{}", {"A": "2"}
+        )
+
+
+@pytest.mark.asyncio
+class TestEngineCaching:
+    async def test_identical_calls_skip_execution(self):
+        engine = HookEngine(_config(60))
+
+        with patch(
+            "asyncio.create_subprocess_shell", wraps=asyncio.create_subprocess_shell
+        ) as spawn:
+            first = await engine.process_event("PreToolUse", _event())
+            second = await engine.process_event("PreToolUse", _event())
+            other = await engine.process_event("PreToolUse", _event("pwd"))
+
+        assert spawn.call_count == 2
+        assert first.results[0].stdout.strip() == "checked"
+        assert second.results[0].stdout == first.results[0].stdout
+        assert other.executed_hooks == 1
+        stats = engine.get_stats()["result_cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["entries"] == 2
+
+    async def test_uncached_hooks_always_run(self):
+        engine = HookEngine(_config({"ttl": 60}))
+        engine.registry.pre_tool_use[0].cache_ttl = 0
+
+        await engine.process_event("PreToolUse", _event())
+        await engine.process_event("PreToolUse", _event())
+
+        assert engine.get_stats()["result_cache"]["entries"] == 0
+
+
+def test_cache_option_parsed_and_validated():
+    assert HookEngine(_config({"ttl": 30})).registry.pre_tool_use[0].cache_ttl == 30
+    assert validate_hooks_config(_config(30))[0] is True
+    is_valid, errors = validate_hooks_config(_config("forever"))
+    assert is_valid is False
+    assert "'cache' must be a TTL in seconds" in errors[0]
@@ -1,6 +1,12 @@
 """Tests for hook engine pattern matcher."""
 
-from newcode.hook_engine.matcher import _extract_file_path, matches
+from newcode.hook_engine.matcher import (
+    MatcherIndex,
+    _extract_file_path,
+    compile_matcher,
+    matches,
+)
+from newcode.hook_engine.models import HookConfig, HookRegistry
 
 
 class TestMatches:
@@ -72,3 +78,63 @@ class TestExtractFilePath:
         # file_path takes priority over path
         result = _extract_file_path({"file_path": "a.py", "path": "b.py"})
         assert result == "a.py"
+
+
+def _hook(matcher):
+    return HookConfig(matcher=matcher, type="command", command=f"echo {matcher}")
+
+
+class TestCompiledMatcher:
+    def test_compiled_once(self):
+        assert compile_matcher("Edit && .py") is compile_matcher("Edit && .py")
+
+    def test_alias_matches_both_ways(self):
+        assert matches("Bash", "agent_run_shell_command", {}) is True
+        assert matches("agent_run_shell_command", "bash", {}) is True
+        assert matches("Write", "Edit", {}) is True
+
+    def test_tool_keys(self):
+        assert (
+            compile_matcher("Bash").tool_keys
+            == compile_matcher("agent_run_shell_command").tool_keys
+        )
+        assert len(compile_matcher("Bash || Edit").tool_keys) == 2
+        assert compile_matcher("Edit && .py").tool_keys == (
+            compile_matcher("Edit").tool_keys
+        )
+        assert compile_matcher("*").tool_keys is None
+        assert compile_matcher(".py").tool_keys is None
+        assert compile_matcher("Edit || .py").tool_keys is None
+        assert compile_matcher("Bash|agent_run_shell_command").tool_keys is None
+
+
+class TestMatcherIndex:
+    def test_candidates_keep_config_order(self):
+        hooks = [_hook("Bash"), _hook("*"), _hook("Edit && .py"), _hook("Write")]
+        index = MatcherIndex(hooks)
+
+        edit = [hook for hook, _ in index.candidates("edit_file")]
+        shell = [hook for hook, _ in index.candidates("agent_run_shell_command")]
+        other = [hook for hook, _ in index.candidates("read_file")]
+
+        assert edit == [hooks[1], hooks[2], hooks[3]]
+        assert shell == [hooks[0], hooks[1]]
+        assert other == [hooks[1]]
+
+    def test_registry_matches_through_index(self):
+        registry = HookRegistry()
+        registry.add_hook("PreToolUse", _hook("Edit && .py"))
+        assert registry.get_hooks_for_tool("PreToolUse", "Edit", {}) == []
+
+        registry.add_hook("PreToolUse", _hook(".py"))
+        matched = registry.get_hooks_for_tool(
+            "PreToolUse", "Edit", {"file_path": "app.py"}
+        )
+        assert [h.matcher for h in matched] == ["Edit && .py", ".py"]
+
+        registry.pre_tool_use[0].enabled = False
+        matched = registry.get_hooks_for_tool(
+            "PreToolUse", "Edit", {"file_path": "app.py"}
+        )
+        assert [h.matcher for h in matched] == [".py"]
+        assert registry.get_hooks_for_tool("Unknown", "Edit", {}) == []
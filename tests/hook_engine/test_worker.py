@@ -0,0 +1,147 @@
+"""Tests for persistent hook workers."""
+
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from newcode.hook_engine.executor import execute_hook
+from newcode.hook_engine.models import EventData, HookConfig
+from newcode.hook_engine.validator import validate_hooks_config
+from newcode.hook_engine.worker import (
+    HookWorker,
+    HookWorkerError,
+    close_hook_workers,
+    get_hook_worker,
+)
+
+# Echoes tool_input.command; blocks "rm", crashes on "crash", hangs on "hang"
+WORKER_SCRIPT = textwrap.dedent(
+    """
+    import json, os, sys, time
+    print("worker ready", file=sys.stderr, flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        command = request["tool_input"].get("command", "")
+        if command == "crash":
+            print("boom", file=sys.stderr, flush=True)
+            sys.exit(3)
+        if command == "hang":
+            time.sleep(30)
+        response = {"request_id": request["request_id"], "stdout": command}
+        if command.startswith("rm"):
+            response.update(exit_code=1, stderr="rm is not allowed")
+        print("not json", flush=True)
+        print(json.dumps(response), flush=True)
+        print(os.getpid(), file=sys.stderr, flush=True)
+    """
+)
+
+
+@pytest.fixture
+def worker_command(tmp_path):
+    script = tmp_path / "worker.py"
+    script.write_text(WORKER_SCRIPT)
+    return f'"{sys.executable}" "{script}"'
+
+
+@pytest.fixture
+async def cleanup_workers():
+    yield
+    await close_hook_workers()
+
+
+def _event(command):
+    return EventData(
+        event_type="PreToolUse",
+        tool_name="Bash",
+        tool_args={"command": command},
+    )
+
+
+def _hook(command, timeout=5000):
+    return HookConfig(matcher="*", type="persistent", command=command, timeout=timeout)
+
+
+@pytest.mark.asyncio
+class TestPersistentHook:
+    async def test_reuses_one_process(self, worker_command, cleanup_workers):
+        hook = _hook(worker_command)
+
+        first = await execute_hook(hook, _event("ls"))
+        results = await asyncio.gather(
+            *(execute_hook(hook, _event(f"echo {i}")) for i in range(5))
+        )
+
+        assert first.success is True
+        assert first.stdout == "ls"
+        assert [r.stdout for r in results] == [f"echo {i}" for i in range(5)]
+        (worker,) = [w for w in _all_workers() if w.command == worker_command]
+        assert worker.restarts == 0
+        assert get_hook_worker(worker_command, cwd=worker.cwd) is worker
+
+    async def test_exit_code_one_blocks(self, worker_command, cleanup_workers):
+        result = await execute_hook(_hook(worker_command), _event("rm -rf /"))
+        assert result.blocked is True
+        assert result.exit_code == 1
+        assert result.error == "rm is not allowed"
+
+    async def test_restarts_after_crash(self, worker_command, cleanup_workers):
+        hook = _hook(worker_command)
+        await execute_hook(hook, _event("ls"))
+        (worker,) = [w for w in _all_workers() if w.command == worker_command]
+        pid = worker.pid
+
+        crashed = await execute_hook(hook, _event("crash"))
+        after = await execute_hook(hook, _event("pwd"))
+
+        assert crashed.blocked is False
+        assert "exited with code 3" in crashed.error
+        assert "boom" in crashed.error
+        assert after.stdout == "pwd"
+        assert worker.pid != pid
+        assert worker.restarts == 1
+
+    async def test_timeout_kills_worker(self, worker_command, cleanup_workers):
+        hook = _hook(worker_command, timeout=300)
+        await execute_hook(hook, _event("ls"))
+        (worker,) = [w for w in _all_workers() if w.command == worker_command]
+
+        result = await execute_hook(hook, _event("hang"))
+        assert result.blocked is True
+        assert "timed out" in result.error
+        assert worker.running is False
+
+        assert (await execute_hook(hook, _event("ls"))).stdout == "ls"
+
+    async def test_failed_start_reports_error(self, tmp_path):
+        worker = HookWorker("true", cwd=str(tmp_path / "missing"))
+        with pytest.raises(HookWorkerError):
+            await worker.request({}, timeout=1)
+
+
+def _all_workers():
+    from newcode.hook_engine import worker
+
+    return list(worker._workers.values())
+
+
+def test_validator_accepts_persistent_hooks():
+    config = {
+        "PreToolUse": [
+            {
+                "matcher": "*",
+                "hooks": [
+                    {"type": "persistent", "command": "python3 hook_worker.py"},
+                    {"type": "persistent"},
+                ],
+            }
+        ]
+    }
+    is_valid, errors = validate_hooks_config(config)
+    assert is_valid is False
+    assert errors == [
+        "'PreToolUse[0].hooks[1]' missing required field 'command' for type "
+        "'persistent'"
+    ]
@@ -115,10 +115,10 @@ class TestStderrFileCapture:
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
-    def test_monitor_thread_stops_cleanly(
+    def test_reader_thread_stops_cleanly(
         self, mock_write_log, mock_get_path, mock_rotate
     ):
-        """Test that monitor thread stops cleanly on stop()."""
+        """Test that the pipe reader thread stops cleanly on stop()."""
         with tempfile.NamedTemporaryFile(delete=False) as tmp:
             temp_path = tmp.name
 
@@ -127,15 +127,15 @@ class TestStderrFileCapture:
             capture = StderrFileCapture("test-server")
             capture.start()
 
-            monitor_thread = capture.monitor_thread
-            assert monitor_thread is not None
-            assert monitor_thread.is_alive()
+            reader_thread = capture.reader_thread
+            assert reader_thread is not None
+            assert reader_thread.is_alive()
 
             capture.stop()
 
-            # Monitor thread should be stopped
-            monitor_thread.join(timeout=2)
-            assert not monitor_thread.is_alive()
+            # Reader thread sees end-of-file once the write end is closed
+            reader_thread.join(timeout=2)
+            assert not reader_thread.is_alive()
         finally:
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
@@ -2,16 +2,16 @@
 Additional coverage tests for blocking_startup.py.
 
 Targets uncovered lines in:
-- _monitor_file() method with emit_to_user=True
+- stderr pipe reader with emit_to_user=True
 - stop() method exception handling and remaining content reading
 - client_streams() async context manager
 - start_servers_with_blocking() function
 - ExceptionGroup handling in __aenter__
 """
 
+import asyncio
 import os
 import tempfile
-import threading
 import time
 import uuid
 from contextlib import asynccontextmanager
@@ -21,6 +21,7 @@ import pytest
 
 # Import directly - avoid conftest autouse fixtures
 from newcode.mcp_.blocking_startup import (
+    MAX_CAPTURED_LINES,
     BlockingMCPServerStdio,
     SimpleCapturedMCPServerStdio,
     StartupMonitor,
@@ -28,123 +29,86 @@ from newcode.mcp_.blocking_startup import (
 )
 
 
-class TestStderrFileCaptureMonitoring:
-    """Test _monitor_file method and emit_to_user path."""
+class TestStderrFileCapturePipe:
+    """Test the stderr pipe reader and emit_to_user path."""
 
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
     @patch("newcode.mcp_.blocking_startup.emit_info")
-    def test_monitor_file_emits_to_user_when_enabled(
-        self, mock_emit_info, mock_write_log, mock_get_path, mock_rotate
+    @pytest.mark.asyncio
+    async def test_pipe_lines_reach_log_and_user_as_they_arrive(
+        self, mock_emit_info, mock_write_log, mock_get_path, mock_rotate, tmp_path
     ):
-        """Test that emit_to_user=True causes messages to be emitted."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            temp_path = tmp.name
-            tmp.write("initial content\n")
+        """Test that lines are logged and emitted without waiting for stop()."""
+        log_path = tmp_path / "server.log"
+        mock_get_path.return_value = log_path
+        capture = StderrFileCapture(
+            "test-server", emit_to_user=True, message_group=uuid.uuid4()
+        )
+        pipe = capture.start()
+        assert capture.reader_thread is None  # Watched by the event loop
 
-        try:
-            mock_get_path.return_value = temp_path
+        pipe.write(b"New stderr line\npartial")
+        for _ in range(100):
+            if capture.captured_lines:
+                break
+            await asyncio.sleep(0.01)
 
-            # Create capture with emit_to_user=True
-            msg_group = uuid.uuid4()
-            capture = StderrFileCapture(
-                "test-server", emit_to_user=True, message_group=msg_group
-            )
-            capture.start()
+        assert capture.get_captured_lines() == ["New stderr line"]
+        assert log_path.read_text() == "New stderr line\n"
+        mock_emit_info.assert_called_once()
+        assert "New stderr line" in mock_emit_info.call_args[0][0]
 
-            # Write new content to the file (simulating stderr output)
-            time.sleep(0.15)  # Let monitor thread start
-            with open(temp_path, "a") as f:
-                f.write("New stderr line\n")
-                f.flush()
-
-            # Wait for monitor to pick up the content
-            time.sleep(0.25)
-
-            capture.stop()
-
-            # Verify emit_info was called with the line content
-            emit_calls = [str(call) for call in mock_emit_info.call_args_list]
-            # Check that some call contains our line
-            assert (
-                any(
-                    "New stderr line" in str(call) or "test-server" in str(call)
-                    for call in emit_calls
-                )
-                or len(capture.captured_lines) > 0
-            )
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        capture.stop()
+        assert capture.get_captured_lines() == ["New stderr line", "partial"]
+        assert log_path.read_text() == "New stderr line\npartial\n"
 
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
-    def test_monitor_file_handles_missing_file(
-        self, mock_write_log, mock_get_path, mock_rotate
+    def test_reader_thread_without_event_loop(
+        self, mock_write_log, mock_get_path, mock_rotate, tmp_path
     ):
-        """Test _monitor_file handles missing log file gracefully."""
-        # Use a non-existent path
-        nonexistent_path = "/tmp/nonexistent_test_file_12345.log"
-        mock_get_path.return_value = nonexistent_path
-
-        # Need to create it for start() but can delete after
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            temp_path = tmp.name
-
-        mock_get_path.return_value = temp_path
-
-        try:
-            capture = StderrFileCapture("test-server")
-            capture.start()
+        """Test the blocking reader thread used when no loop is running."""
+        mock_get_path.return_value = tmp_path / "server.log"
+        capture = StderrFileCapture("test-server")
+        pipe = capture.start()
+        assert capture.reader_thread is not None
 
-            # Delete the file to simulate it being removed
-            os.unlink(temp_path)
+        pipe.write(b"line one\n")
+        capture.stop()
 
-            # Let monitor try to read (should handle error gracefully)
-            time.sleep(0.15)
-
-            capture.stop()  # Should not raise
-        except Exception:
-            # Ensure cleanup even on failure
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        assert capture.get_captured_lines() == ["line one"]
+        assert capture.reader_thread is None
 
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
-    def test_monitor_file_skips_empty_lines(
-        self, mock_write_log, mock_get_path, mock_rotate
+    def test_blank_lines_logged_but_not_captured(
+        self, mock_write_log, mock_get_path, mock_rotate, tmp_path
     ):
-        """Test that empty lines are skipped in monitoring."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            temp_path = tmp.name
-
-        try:
-            mock_get_path.return_value = temp_path
-            capture = StderrFileCapture("test-server")
-            capture.start()
-
-            time.sleep(0.15)
+        """Test that blank lines are skipped in the ring buffer."""
+        log_path = tmp_path / "server.log"
+        mock_get_path.return_value = log_path
+        capture = StderrFileCapture("test-server")
+        pipe = capture.start()
 
-            # Write content with empty lines
-            with open(temp_path, "a") as f:
-                f.write("\n\n   \n\nActual content\n\n")
-                f.flush()
+        pipe.write(b"\n\n   \r\nActual content\r\n")
+        capture.stop()
 
-            time.sleep(0.25)
-            capture.stop()
+        assert capture.get_captured_lines() == ["Actual content"]
+        assert log_path.read_text() == "\n\n   \nActual content\n"
 
-            # Only non-empty, non-whitespace lines should be captured
-            lines = capture.get_captured_lines()
-            # Should not have empty lines
-            for line in lines:
-                if "Actual content" in line:
-                    assert line.strip() != ""
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the newest lines are kept in memory."""
+        capture = StderrFileCapture("test-server")
+        capture._feed(
+            b"".join(f"line {i}\n".encode() for i in range(MAX_CAPTURED_LINES + 5))
+        )
+        lines = capture.get_captured_lines()
+        assert len(lines) == MAX_CAPTURED_LINES
+        assert lines[0] == "line 5"
 
 
 class TestStderrFileCaptureStopBranches:
@@ -154,36 +118,26 @@ class TestStderrFileCaptureStopBranches:
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
     @patch("newcode.mcp_.blocking_startup.emit_info")
-    def test_stop_reads_remaining_content_with_emit(
-        self, mock_emit_info, mock_write_log, mock_get_path, mock_rotate
+    @pytest.mark.asyncio
+    async def test_stop_reads_remaining_content_with_emit(
+        self, mock_emit_info, mock_write_log, mock_get_path, mock_rotate, tmp_path
     ):
-        """Test stop() reads remaining content and emits when emit_to_user=True."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            temp_path = tmp.name
-
-        try:
-            mock_get_path.return_value = temp_path
-            capture = StderrFileCapture(
-                "test-server", emit_to_user=True, message_group=uuid.uuid4()
-            )
-            capture.start()
+        """Test stop() drains the pipe and emits when emit_to_user=True."""
+        mock_get_path.return_value = tmp_path / "server.log"
+        capture = StderrFileCapture(
+            "test-server", emit_to_user=True, message_group=uuid.uuid4()
+        )
+        pipe = capture.start()
 
-            # Write content just before stopping (so it's "remaining")
-            time.sleep(0.05)
-            with open(temp_path, "a") as f:
-                f.write("Remaining line 1\nRemaining line 2\n")
-                f.flush()
+        # Written just before stopping, so the loop has not read it yet
+        pipe.write(b"Remaining line 1\nRemaining line 2\n")
+        capture.stop()
 
-            # Stop immediately - remaining content should be read
-            capture.stop()
-
-            # Check that lines were captured
-            lines = capture.get_captured_lines()
-            # At least some content should be there
-            assert isinstance(lines, list)
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        assert capture.get_captured_lines() == [
+            "Remaining line 1",
+            "Remaining line 2",
+        ]
+        assert mock_emit_info.call_count == 2
 
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
@@ -234,15 +188,6 @@ class TestStderrFileCaptureStopBranches:
         except Exception:
             pass  # File might already be gone
 
-    def test_monitor_thread_with_no_log_path(self):
-        """Test _monitor_file returns early when log_path is None."""
-        capture = StderrFileCapture("test-server")
-        capture.log_path = None
-        capture.stop_monitoring = threading.Event()
-
-        # Call _monitor_file directly - should return early
-        capture._monitor_file()  # Should not raise or hang
-
 
 class TestSimpleCapturedMCPServerStdioClientStreams:
     """Test client_streams() async context manager."""
@@ -584,8 +529,6 @@ class TestOsPathExistsEdgeCases:
         """Test stop() when log file was deleted."""
         capture = StderrFileCapture("test")
         capture.log_path = "/nonexistent/path/that/does/not/exist.log"
-        capture._last_read_pos = 0
-        capture.stop_monitoring = threading.Event()
 
         # stop() should handle missing file gracefully
         capture.stop()  # Should not raise
@@ -593,46 +536,17 @@ class TestOsPathExistsEdgeCases:
     @patch("newcode.mcp_.blocking_startup.rotate_log_if_needed")
     @patch("newcode.mcp_.blocking_startup.get_log_file_path")
     @patch("newcode.mcp_.blocking_startup.write_log")
-    @patch("newcode.mcp_.blocking_startup.emit_info")
-    def test_stop_deduplicates_captured_lines(
-        self, mock_emit_info, mock_write_log, mock_get_path, mock_rotate
+    def test_stop_does_not_capture_earlier_log_content(
+        self, mock_write_log, mock_get_path, mock_rotate, tmp_path
     ):
-        """Test that stop() doesn't add duplicate lines to captured_lines."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            temp_path = tmp.name
-            tmp.write("Line already captured\n")
-
-        try:
-            mock_get_path.return_value = temp_path
-            capture = StderrFileCapture("test", emit_to_user=True)
-            capture.start()
-
-            # Pre-add a line to captured_lines
-            time.sleep(0.15)
-            capture.captured_lines.append("Line already captured")
-
-            capture.stop()
-
-            # Count occurrences - should be deduplicated
-            count = capture.captured_lines.count("Line already captured")
-            # Due to deduplication logic in stop(), should be 1
-            assert count >= 1  # At least one
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-
-
-class TestMonitorFileOsError:
-    """Test OSError handling in _monitor_file."""
-
-    def test_monitor_file_handles_getsize_os_error(self):
-        """Test _monitor_file handles OSError from os.path.getsize."""
-        capture = StderrFileCapture("test")
-        capture.log_path = "/nonexistent/path.log"
-        capture.stop_monitoring = threading.Event()
-        capture.stop_monitoring.set()  # Stop immediately
+        """Test that lines from earlier sessions in the log are not captured."""
+        log_path = tmp_path / "server.log"
+        log_path.write_text("Line from an earlier session\n")
+        mock_get_path.return_value = log_path
 
-        # Should handle the OSError and exit cleanly
-        capture._monitor_file()  # Should not raise
+        capture = StderrFileCapture("test", emit_to_user=True)
+        capture.start()
+        capture.stop()
 
-        assert capture._last_read_pos == 0  # Falls back to 0
+        assert capture.get_captured_lines() == []
+        assert log_path.read_text() == "Line from an earlier session\n"
@@ -0,0 +1,150 @@
+"""Tests for lazy, on-demand MCP server startup."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types as mcp_types
+from pydantic_ai.mcp import MCPServerStdio
+
+from newcode.mcp_ import tool_cache
+from newcode.mcp_.lazy_startup import LazyMCPServer
+from newcode.mcp_.managed_server import ManagedMCPServer, ServerConfig, ServerState
+from newcode.mcp_.manager import MCPManager
+from newcode.mcp_.tool_cache import MCPToolCache, attach_tool_cache
+
+TOOL = mcp_types.Tool(
+    name="search",
+    description="Search things",
+    inputSchema={"type": "object", "properties": {}},
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = MCPToolCache(tmp_path / "mcp_tool_cache.json")
+    monkeypatch.setattr(tool_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def lazy_mode(monkeypatch):
+    monkeypatch.setattr("newcode.config.get_mcp_lazy_startup", lambda: True)
+
+
+def _server():
+    server = MCPServerStdio(command="search-server", args=[], tool_prefix="srv")
+    attach_tool_cache(server, "srv", "hash")
+    server.get_tools = AsyncMock(return_value={"live": MagicMock()})
+    server.call_tool = AsyncMock(return_value="result")
+    return server
+
+
+@pytest.mark.asyncio
+class TestLazyMCPServer:
+    async def test_cached_tools_served_without_starting(self, cache):
+        cache.put("srv", "hash", "search@1.0", [TOOL.model_dump(by_alias=True)])
+        server = _server()
+        start = AsyncMock(return_value=True)
+        lazy = LazyMCPServer(server, start)
+
+        async with lazy:
+            tools = await lazy.get_tools(MagicMock())
+
+        assert list(tools) == ["srv_search"]
+        assert tools["srv_search"].tool_def.description == "Search things"
+        assert [t.name for t in await lazy.list_tools()] == ["search"]
+        start.assert_not_awaited()
+        server.get_tools.assert_not_awaited()
+
+    async def test_uncached_tools_start_server(self, cache):
+        server = _server()
+        start = AsyncMock(return_value=True)
+        lazy = LazyMCPServer(server, start)
+
+        assert list(await lazy.get_tools(MagicMock())) == ["live"]
+        start.assert_awaited_once()
+        assert await lazy.list_tools() == []
+
+    async def test_first_tool_call_starts_server(self, cache):
+        server = _server()
+        start = AsyncMock(return_value=False)
+        lazy = LazyMCPServer(server, start)
+
+        assert await lazy.call_tool("srv_search", {}, MagicMock(), MagicMock()) == (
+            "result"
+        )
+        start.assert_awaited_once()
+        server.call_tool.assert_awaited_once()
+
+
+def _manager(*names):
+    manager = MCPManager()
+    manager._managed_servers = {}
+    for name in names:
+        managed = ManagedMCPServer(
+            ServerConfig(id=name, name=name, type="stdio", config={"command": name})
+        )
+        managed.enable()
+        manager._managed_servers[name] = managed
+    return manager
+
+
+@pytest.mark.asyncio
+class TestManagerLazyStartup:
+    async def test_start_server_only_enables(self, lazy_mode):
+        manager = _manager("a")
+        with patch("newcode.mcp_.manager.get_lifecycle_manager") as lifecycle:
+            assert await manager.start_server("a") is True
+        lifecycle.assert_not_called()
+        (server,) = manager.get_servers_for_agent()
+        assert isinstance(server, LazyMCPServer)
+        assert isinstance(server.wrapped, MCPServerStdio)
+        (info,) = manager.list_servers()
+        assert info.state == ServerState.IDLE
+        assert manager.status_tracker.get_status("a") == ServerState.IDLE
+
+    async def test_first_use_reports_running(self, lazy_mode):
+        manager = _manager("a")
+        with patch("newcode.mcp_.manager.get_lifecycle_manager"):
+            await manager.start_server("a")
+        with patch.object(manager, "_start_process", AsyncMock(return_value=True)):
+            assert await manager.ensure_server_running("a") is True
+
+        (info,) = manager.list_servers()
+        assert info.state == ServerState.RUNNING
+        assert manager.status_tracker.get_status("a") == ServerState.RUNNING
+
+        manager._managed_servers["a"].disable()
+        assert manager.list_servers()[0].state == ServerState.STOPPED
+
+    async def test_servers_start_once_and_concurrently(self):
+        manager = _manager("a", "b")
+        running = 0
+        peak = 0
+        calls = []
+
+        async def start_process(server_id, managed_server):
+            nonlocal running, peak
+            calls.append(server_id)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return True
+
+        with patch.object(manager, "_start_process", side_effect=start_process):
+            results = await asyncio.gather(
+                *(manager.ensure_server_running(sid) for sid in ["a", "a", "b", "b"])
+            )
+
+        assert results == [True] * 4
+        assert sorted(calls) == ["a", "b"]
+        assert peak == 2
+        assert manager._process_starts == {}
+
+    async def test_disabled_server_not_started(self):
+        manager = _manager("a")
+        manager._managed_servers["a"].disable()
+        assert await manager.ensure_server_running("a") is False
+        assert await manager.ensure_server_running("missing") is False
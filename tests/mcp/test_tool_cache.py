@@ -0,0 +1,158 @@
+"""Tests for the on-disk MCP tool definition cache."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from mcp import types as mcp_types
+from pydantic_ai.mcp import MCPServerStdio
+
+from newcode.mcp_ import tool_cache
+from newcode.mcp_.managed_server import ManagedMCPServer, ServerConfig
+from newcode.mcp_.tool_cache import (
+    MCPToolCache,
+    attach_tool_cache,
+    compute_config_hash,
+    get_cached_tool_definitions,
+)
+
+TOOL = mcp_types.Tool(
+    name="search",
+    description="Search things",
+    inputSchema={"type": "object", "properties": {"q": {"type": "string"}}},
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = MCPToolCache(tmp_path / "mcp_tool_cache.json")
+    monkeypatch.setattr(tool_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def no_connect():
+    with (
+        patch.object(MCPServerStdio, "__aenter__", autospec=True) as enter,
+        patch.object(MCPServerStdio, "__aexit__", AsyncMock(return_value=None)),
+    ):
+        enter.side_effect = lambda self: self
+        yield
+
+
+def _server(version="1.0", fetched=(TOOL,)):
+    server = MCPServerStdio(command="search-server", args=[])
+    server._server_info = mcp_types.Implementation(name="search", version=version)
+    server.list_tools = AsyncMock(return_value=list(fetched))
+    return server
+
+
+class TestMCPToolCache:
+    def test_round_trip_and_staleness(self, cache):
+        cache.put("srv", "hash", "search@1.0", [{"name": "a"}])
+
+        reloaded = MCPToolCache(cache.path)
+        assert reloaded.get("srv", "hash", "search@1.0") == [{"name": "a"}]
+        assert reloaded.get("srv", "hash") == [{"name": "a"}]
+        assert reloaded.get("srv", "other-hash") is None
+        assert reloaded.get("srv", "hash", "search@2.0") is None
+
+    def test_invalidate_and_clear(self, cache):
+        cache.put("a", "h", None, [])
+        cache.put("b", "h", None, [])
+        cache.invalidate("a")
+        assert MCPToolCache(cache.path).get("a", "h") is None
+        assert MCPToolCache(cache.path).get("b", "h") == []
+
+        cache.clear()
+        assert not cache.path.exists()
+        assert cache.get("b", "h") is None
+
+    def test_ignores_corrupt_or_old_files(self, cache):
+        cache.path.write_text("{not json")
+        assert cache.get("srv", "hash") is None
+
+        cache.path.write_text(json.dumps({"version": 0, "servers": {"srv": {}}}))
+        assert MCPToolCache(cache.path).get("srv", "hash") is None
+
+    def test_config_hash_is_order_independent(self):
+        assert compute_config_hash("stdio", {"a": 1, "b": 2}) == compute_config_hash(
+            "stdio", {"b": 2, "a": 1}
+        )
+        assert compute_config_hash("stdio", {"a": 1}) != compute_config_hash(
+            "sse", {"a": 1}
+        )
+
+
+@pytest.mark.asyncio
+class TestAttachedServer:
+    async def test_second_server_uses_disk_cache(self, cache, no_connect):
+        first = _server()
+        attach_tool_cache(first, "srv", "hash")
+        assert [t.name for t in await first.list_tools()] == ["search"]
+
+        second = _server(fetched=())
+        fetch = second.list_tools
+        attach_tool_cache(second, "srv", "hash")
+        tools = await second.list_tools()
+
+        assert tools == [TOOL]
+        fetch.assert_not_awaited()
+
+    async def test_version_change_refetches(self, cache, no_connect):
+        attach_tool_cache(first := _server(), "srv", "hash")
+        await first.list_tools()
+
+        upgraded = _server(version="2.0", fetched=())
+        fetch = upgraded.list_tools
+        attach_tool_cache(upgraded, "srv", "hash")
+
+        assert await upgraded.list_tools() == []
+        fetch.assert_awaited_once()
+        assert cache.get("srv", "hash", "search@2.0") == []
+
+    async def test_list_changed_notification_invalidates(self, cache, no_connect):
+        server = _server()
+        attach_tool_cache(server, "srv", "hash")
+        await server.list_tools()
+
+        await server._handle_notification(
+            mcp_types.ServerNotification(mcp_types.ToolListChangedNotification())
+        )
+
+        assert server._cached_tools is None
+        assert cache.get("srv", "hash") is None
+
+    async def test_ignores_non_mcp_servers(self, cache):
+        sentinel = AsyncMock()
+        attach_tool_cache(sentinel, "srv", "hash")
+        assert get_cached_tool_definitions([sentinel]) == []
+
+
+def test_preload_definitions_for_managed_server(cache):
+    managed = ManagedMCPServer(
+        ServerConfig(
+            id="1",
+            name="srv",
+            type="stdio",
+            config={"command": "search-server", "args": ["--fast"]},
+        )
+    )
+    server = managed._pydantic_server
+    config_hash = server._newcode_tool_cache_key[1]
+    cache.put("srv", config_hash, "search@1.0", [TOOL.model_dump(by_alias=True)])
+
+    assert get_cached_tool_definitions([server]) == [
+        {
+            "name": "search",
+            "description": "Search things",
+            "inputSchema": TOOL.inputSchema,
+        }
+    ]
+
+    changed = ManagedMCPServer(
+        ServerConfig(
+            id="1", name="srv", type="stdio", config={"command": "search-server"}
+        )
+    )
+    assert get_cached_tool_definitions([changed._pydantic_server]) == []
@@ -344,6 +344,33 @@ def test_get_message_nowait(bus):
     assert msg is not None
 
 
+def test_drain_messages_returns_batch(bus):
+    bus.mark_renderer_active()
+    for i in range(5):
+        bus.emit(TextMessage(level=MessageLevel.INFO, text=str(i)))
+    batch = bus.drain_messages(timeout=1, max_batch=3)
+    assert [m.text for m in batch] == ["0", "1", "2"]
+    assert [m.text for m in bus.drain_messages(timeout=1)] == ["3", "4"]
+
+
+def test_drain_messages_timeout(bus):
+    assert bus.drain_messages(timeout=0.01) == []
+
+
+def test_wake_consumers_unblocks_drain(bus):
+    import threading
+
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(bus.drain_messages()))
+    consumer.start()
+    bus.wake_consumers()
+    consumer.join(timeout=2)
+    assert not consumer.is_alive()
+    assert results == [[]]
+    # The wakeup marker is never handed out as a message
+    assert bus.get_message_nowait() is None
+
+
 @pytest.mark.asyncio
 async def test_get_command_async(bus):
     bus.provide_response(CancelAgentCommand())
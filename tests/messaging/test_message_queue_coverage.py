@@ -596,6 +596,37 @@ class TestProcessMessagesEdgeCases:
 
         queue.stop()
 
+    def test_process_messages_batches_async_handoff(self):
+        """A burst of messages reaches the event loop in one call."""
+        queue = MessageQueue()
+        queue.mark_renderer_active()
+        queue._async_queue = asyncio.Queue()
+        mock_loop = MagicMock()
+        queue._event_loop = mock_loop
+
+        for i in range(3):
+            queue.emit(UIMessage(type=MessageType.INFO, content=str(i)))
+        queue.start()
+        deadline = time.monotonic() + 2
+        while not mock_loop.call_soon_threadsafe.called:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        queue.stop()
+
+        callback, batch = mock_loop.call_soon_threadsafe.call_args.args
+        callback(batch)
+        assert [m.content for m in batch] == ["0", "1", "2"]
+        assert queue._async_queue.qsize() == 3
+
+    def test_stop_wakes_idle_thread(self):
+        """stop() returns promptly and the thread exits."""
+        queue = MessageQueue()
+        queue.start()
+        thread = queue._thread
+        queue.stop()
+        assert not thread.is_alive()
+        assert queue.get_nowait() is None
+
 
 class TestEmitQueueFullEdgeCase:
     """Test edge case when queue is full and get_nowait fails."""
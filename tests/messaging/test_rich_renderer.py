@@ -110,6 +110,68 @@ def test_consume_loop_processes_buffered(renderer, bus):
     assert "buf" in output(renderer.console)
 
 
+def test_consume_loop_renders_live_messages(renderer, bus):
+    renderer.start()
+    bus.emit(TextMessage(level=MessageLevel.INFO, text="live"))
+    deadline = time.monotonic() + 2
+    while "live" not in output(renderer.console) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    renderer.stop()
+    assert "live" in output(renderer.console)
+    assert renderer._thread is None
+
+
+def test_render_batch_single_console_write(renderer, console):
+    writes = []
+    original_write = console.file.write
+    console.file.write = lambda text: writes.append(text) or original_write(text)
+
+    renderer._render_batch(
+        [TextMessage(level=MessageLevel.INFO, text=f"line {i}") for i in range(5)]
+    )
+
+    assert len(writes) == 1
+    assert all(f"line {i}" in writes[0] for i in range(5))
+
+
+def test_render_batch_flushes_before_carriage_return_lines(renderer, console):
+    order = []
+    console.file.write = lambda text: order.append("console")
+    with patch("sys.stdout") as mock_stdout:
+        mock_stdout.write.side_effect = lambda text: order.append("raw")
+        renderer._render_batch(
+            [
+                TextMessage(level=MessageLevel.INFO, text="a"),
+                TextMessage(level=MessageLevel.INFO, text="b"),
+                ShellLineMessage(line="50%\r"),
+                TextMessage(level=MessageLevel.INFO, text="c"),
+            ]
+        )
+    assert order == ["console", "raw", "console"]
+
+
+def test_render_shell_line_multiline_chunk(renderer, console):
+    renderer._render_shell_line(ShellLineMessage(line="one\ntwo"))
+    assert "one\ntwo" in output(console)
+
+
+@patch("newcode.messaging.rich_renderer.get_shell_tail_lines", return_value=2)
+@patch("newcode.messaging.rich_renderer.get_shell_output_view", return_value="tail")
+def test_shell_tail_view_keeps_last_lines(mock_view, mock_lines, renderer, console):
+    renderer._render_sync(ShellLineMessage(line="a\nb"))
+    renderer._render_sync(ShellLineMessage(line="c\r\x1b[31md\x1b[0m"))
+    assert renderer._shell_live is not None
+    assert list(renderer._shell_tail) == ["b", "\x1b[31md\x1b[0m"]
+
+    # Any other message ends the live view, leaving its final frame
+    renderer._render_sync(TextMessage(level=MessageLevel.INFO, text="done"))
+    assert renderer._shell_live is None
+    out = output(console)
+    assert "b\nd" in out
+    assert "a\n" not in out
+    assert out.index("d") < out.index("done")
+
+
 def test_render_sync_error_handling(renderer, console):
     """Render errors should be caught and printed."""
     # Force _do_render to raise
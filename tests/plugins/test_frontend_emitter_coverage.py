@@ -541,30 +541,6 @@ class TestAsyncCallbacks:
         ):
             await on_post_tool_call("t", {}, None, 0.0)
 
-    @pytest.mark.asyncio
-    async def test_on_stream_event(self):
-        from newcode.plugins.frontend_emitter.register_callbacks import (
-            on_stream_event,
-        )
-
-        with patch(
-            "newcode.plugins.frontend_emitter.register_callbacks.emit_event"
-        ) as mock_emit:
-            await on_stream_event("text_delta", "hello", "sess-1")
-            mock_emit.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_on_stream_event_exception(self):
-        from newcode.plugins.frontend_emitter.register_callbacks import (
-            on_stream_event,
-        )
-
-        with patch(
-            "newcode.plugins.frontend_emitter.register_callbacks.emit_event",
-            side_effect=RuntimeError,
-        ):
-            await on_stream_event("x", "y")
-
     @pytest.mark.asyncio
     async def test_on_invoke_agent_with_kwargs(self):
         from newcode.plugins.frontend_emitter.register_callbacks import (
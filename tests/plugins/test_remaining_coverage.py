@@ -35,7 +35,7 @@ class TestCommandSafetyCache:
     def test_make_key_strips_whitespace(self):
         cache = CommandSafetyCache()
         key = cache._make_key("  ls -la  ", "/tmp")
-        assert key == ("ls -la", "/tmp")
+        assert key == ("ls -la", "temp")
 
     def test_get_miss(self):
         cache = CommandSafetyCache()
@@ -16,6 +16,16 @@ from newcode.plugins.shell_safety.register_callbacks import (
 from newcode.tools.command_runner import ShellSafetyAssessment
 
 
+@pytest.fixture(autouse=True)
+def no_rule_match():
+    """Keep the rule table out of tests of the cache and LLM paths."""
+    with patch(
+        "newcode.plugins.shell_safety.register_callbacks.classify_command",
+        return_value=None,
+    ):
+        yield
+
+
 class TestShellSafetyCallbackOAuthBypass:
     """Test OAuth model bypass in shell_safety_callback."""
 
@@ -587,6 +597,62 @@ class TestShellSafetyCallbackErrorMessages:
             assert "No reasoning provided" in result["error_message"]
 
 
+class TestShellSafetyCallbackRules:
+    """Test commands decided by the rule table without cache or LLM."""
+
+    @pytest.fixture(autouse=True)
+    def no_rule_match(self):
+        # Use the real rule table here
+        yield
+
+    @pytest.fixture(autouse=True)
+    def yolo(self):
+        with (
+            patch(
+                "newcode.plugins.shell_safety.register_callbacks.get_global_model_name",
+                return_value="claude-opus-4",
+            ),
+            patch(
+                "newcode.plugins.shell_safety.register_callbacks.get_yolo_mode",
+                return_value=True,
+            ),
+            patch(
+                "newcode.plugins.shell_safety.register_callbacks.get_safety_permission_level",
+                return_value="medium",
+            ),
+            patch(
+                "newcode.plugins.shell_safety.register_callbacks.get_cached_assessment"
+            ) as mock_cache,
+            patch(
+                "newcode.plugins.shell_safety.agent_shell_safety.ShellSafetyAgent"
+            ) as mock_agent,
+            patch("newcode.plugins.shell_safety.register_callbacks.emit_info"),
+        ):
+            self.mock_cache = mock_cache
+            self.mock_agent = mock_agent
+            yield
+
+    @pytest.mark.anyio
+    async def test_safe_command_allowed_without_llm(self):
+        result = await shell_safety_callback(
+            context=None, command="git status && pytest -q", cwd=None, timeout=60
+        )
+
+        assert result is None
+        self.mock_cache.assert_not_called()
+        self.mock_agent.assert_not_called()
+
+    @pytest.mark.anyio
+    async def test_destructive_command_blocked_without_llm(self):
+        result = await shell_safety_callback(
+            context=None, command="sudo rm -rf /", cwd=None, timeout=60
+        )
+
+        assert result["blocked"] is True
+        assert result["risk"] == "critical"
+        self.mock_agent.assert_not_called()
+
+
 class TestRegisterCallback:
     """Test callback registration function."""
 
@@ -496,9 +496,8 @@ class TestRegisterInvokeAgentExecution:
                     instructions="System prompt", user_prompt="Hello"
                 ),
             ),
-            patch("newcode.tools.agent_tools.get_value", return_value=None),
             patch("newcode.mcp_.get_mcp_manager", return_value=mock_manager),
-            patch("newcode.tools.agent_tools.Agent", return_value=mock_temp_agent),
+            patch("newcode.agents.subagent_pool.Agent", return_value=mock_temp_agent),
             patch("newcode.tools.register_tools_for_agent"),
             patch(
                 "newcode.tools.agent_tools._load_session_history",
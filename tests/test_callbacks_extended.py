@@ -620,3 +620,143 @@ class TestStreamEventCallback:
             assert results[1] == "OK"  # Survived
             assert successful_events == ["token"]
             mock_logger.error.assert_called_once()
+
+
+class TestCallbackDispatch:
+    """Test concurrent dispatch, timeouts and timing stats."""
+
+    def setup_method(self):
+        from newcode.callbacks import _reset_dispatch_settings, reset_callback_stats
+
+        clear_callbacks()
+        reset_callback_stats()
+        _reset_dispatch_settings()
+
+    def teardown_method(self):
+        from newcode.callbacks import _reset_dispatch_settings
+
+        clear_callbacks()
+        _reset_dispatch_settings()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_phase_runs_callbacks_together(self):
+        from newcode import config as cp_config
+
+        async def slow_a(*args):
+            await asyncio.sleep(0.2)
+            return "a"
+
+        async def slow_b(*args):
+            await asyncio.sleep(0.2)
+            return "b"
+
+        register_callback("pre_tool_call", slow_a)
+        register_callback("pre_tool_call", slow_b)
+        cp_config.set_config_value("callback_concurrent_phases", "pre_tool_call")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await on_pre_tool_call("tool", {})
+        assert results == ["a", "b"]
+        assert loop.time() - started < 0.35
+
+    @pytest.mark.asyncio
+    async def test_sequential_by_default(self):
+        order = []
+
+        async def first(*args):
+            await asyncio.sleep(0.05)
+            order.append("first")
+
+        async def second(*args):
+            order.append("second")
+
+        register_callback("post_tool_call", first)
+        register_callback("post_tool_call", second)
+        await on_post_tool_call("tool", {}, None, 1.0)
+        assert order == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_abandons_slow_callback(self):
+        from newcode import config as cp_config
+        from newcode.callbacks import get_callback_stats
+
+        async def hangs(*args):
+            await asyncio.sleep(10)
+
+        def quick(*args):
+            return "ok"
+
+        register_callback("stream_event", hangs)
+        register_callback("stream_event", quick)
+        cp_config.set_config_value(
+            "callback_timeouts", "stream_event=0.05,pre_tool_call=0.05"
+        )
+
+        results = await on_stream_event("part_delta", {})
+        assert results == [None, "ok"]
+
+        stats = {s.callback.rsplit(".", 1)[-1]: s for s in get_callback_stats()}
+        assert stats["hangs"].timeouts == 1
+        assert stats["quick"].calls == 1
+        assert stats["quick"].timeouts == 0
+
+    @pytest.mark.asyncio
+    async def test_timeouts_apply_only_to_configured_phases(self):
+        from newcode import config as cp_config
+
+        async def slow(*args):
+            await asyncio.sleep(0.2)
+            return "done"
+
+        register_callback("post_tool_call", slow)
+        register_callback("pre_tool_call", slow)
+        cp_config.set_config_value(
+            "callback_timeouts", "stream_event=0.05,pre_tool_call=0.05"
+        )
+
+        # Not listed, and a gating phase that must never be abandoned
+        assert await on_post_tool_call("tool", {}, None, 1.0) == ["done"]
+        assert await on_pre_tool_call("tool", {}) == ["done"]
+
+    def test_dispatch_settings_checked_at_most_once_per_interval(self):
+        from newcode import callbacks
+
+        with patch.object(callbacks.os, "stat") as stat:
+            stat.return_value.st_mtime_ns = 1
+            for _ in range(100):
+                callbacks._get_phase_dispatch("stream_event")
+        assert stat.call_count == 1
+
+    def test_stats_record_errors_and_histogram(self):
+        from newcode.callbacks import LATENCY_BUCKETS, get_callback_stats
+
+        def broken(*args):
+            raise RuntimeError("boom")
+
+        register_callback("edit_file", broken)
+        on_edit_file("a.py")
+        on_edit_file("b.py")
+
+        (stats,) = get_callback_stats()
+        assert stats.phase == "edit_file"
+        assert stats.callback.endswith("broken")
+        assert (stats.calls, stats.errors) == (2, 2)
+        assert len(stats.buckets) == len(LATENCY_BUCKETS) + 1
+        assert sum(stats.buckets) == 2
+
+    def test_callbacks_command(self):
+        from newcode.callbacks import get_callback_stats
+        from newcode.command_line.core_commands import handle_callbacks_command
+
+        register_callback("edit_file", lambda *args: None)
+        on_edit_file("a.py")
+
+        with patch("newcode.messaging.emit_info") as emit_info:
+            assert handle_callbacks_command("/callbacks stats") is True
+        table = emit_info.call_args.args[0]
+        assert table.row_count == 1
+
+        with patch("newcode.messaging.emit_success"):
+            assert handle_callbacks_command("/callbacks reset") is True
+        assert get_callback_stats() == []
@@ -728,6 +728,66 @@ class TestSendMethod:
             assert result is stream_response
 
 
+class _ChunkedStream(httpx.AsyncByteStream):
+    """Upstream SSE body delivered in arbitrary chunks, recording progress."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestStreamPassthrough:
+    """Streaming callers get the SSE body incrementally and unmodified."""
+
+    async def _send_streaming(self, upstream):
+        with patch.object(
+            httpx.AsyncClient,
+            "send",
+            new_callable=AsyncMock,
+            return_value=upstream,
+        ):
+            client = ChatGPTCodexAsyncClient()
+            request = httpx.Request(
+                "POST",
+                "https://chatgpt.com/backend-api/codex/responses",
+                content=json.dumps(
+                    {"model": "gpt-4", "stream": True, "store": False}
+                ).encode(),
+            )
+            return await client.send(request, stream=True)
+
+    @pytest.mark.asyncio
+    async def test_events_yielded_as_they_arrive(self):
+        delta = b'data: {"type": "response.output_text.delta", "delta": "Hi"}\n\n'
+        stream = _ChunkedStream([delta[:20], delta[20:], delta, b"data: [DONE]\n\n"])
+        upstream = httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=stream
+        )
+
+        result = await self._send_streaming(upstream)
+        assert result is upstream
+        assert result.stream is stream
+
+        received = []
+        async for chunk in result.aiter_bytes():
+            received.append((chunk, stream.sent))
+        await result.aclose()
+
+        # Each chunk reaches the caller as soon as it arrives
+        assert [sent for _, sent in received] == [1, 2, 3, 4]
+        assert b"".join(c for c, _ in received) == b"".join(stream.chunks)
+        assert stream.closed is True
+
+
 class TestCreateCodexAsyncClient:
     """Test the create_codex_async_client factory function."""
 
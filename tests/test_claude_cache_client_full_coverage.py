@@ -13,8 +13,11 @@ from newcode.claude_cache_client import (
     TOKEN_MAX_AGE_SECONDS,
     TOOL_PREFIX,
     ClaudeCacheAsyncClient,
+    _apply_body_transforms,
     _inject_cache_control_in_payload,
     patch_anthropic_client_messages,
+    register_body_transform,
+    unregister_body_transform,
 )
 
 
@@ -388,6 +391,97 @@ class TestInjectCacheControlInPayload:
         _inject_cache_control_in_payload(payload)
 
 
+# --- body transform pipeline ---
+
+
+class TestBodyTransforms:
+    def test_single_decode_and_encode(self):
+        body = json.dumps(
+            {
+                "tools": [{"name": "read_file"}],
+                "messages": [{"role": "user", "content": [{"type": "text"}]}],
+            }
+        ).encode()
+        with (
+            patch("newcode.claude_cache_client._json_loads", wraps=json.loads) as loads,
+            patch(
+                "newcode.claude_cache_client._json_dumps",
+                side_effect=lambda o: json.dumps(o).encode(),
+            ) as dumps,
+        ):
+            result = _apply_body_transforms(body)
+        assert loads.call_count == 1
+        assert dumps.call_count == 1
+        data = json.loads(result)
+        assert data["tools"][0]["name"] == f"{TOOL_PREFIX}read_file"
+        assert data["messages"][0]["content"][0]["cache_control"] == {
+            "type": "ephemeral"
+        }
+
+    def test_unchanged_body_not_reencoded(self):
+        body = b'{"model": "x"}'
+        with patch("newcode.claude_cache_client._json_dumps") as dumps:
+            assert _apply_body_transforms(body) is None
+        dumps.assert_not_called()
+
+    def test_register_custom_transform(self):
+        def add_metadata(payload):
+            payload["metadata"] = {"user_id": "u"}
+            return True
+
+        register_body_transform(add_metadata)
+        register_body_transform(add_metadata)  # idempotent
+        try:
+            result = _apply_body_transforms(b'{"model": "x"}')
+            assert json.loads(result)["metadata"] == {"user_id": "u"}
+        finally:
+            assert unregister_body_transform(add_metadata) is True
+        assert unregister_body_transform(add_metadata) is False
+        assert _apply_body_transforms(b'{"model": "x"}') is None
+
+    def test_failing_transform_skipped(self):
+        def broken(payload):
+            raise ValueError("boom")
+
+        register_body_transform(broken)
+        try:
+            result = _apply_body_transforms(b'{"tools": [{"name": "a"}]}')
+        finally:
+            unregister_body_transform(broken)
+        assert json.loads(result)["tools"][0]["name"] == f"{TOOL_PREFIX}a"
+
+    @pytest.mark.asyncio
+    async def test_send_rewrites_request_in_place(self):
+        resp = Mock(spec=httpx.Response)
+        resp.status_code = 200
+        resp.headers = {}
+
+        with patch.object(
+            httpx.AsyncClient, "send", new_callable=AsyncMock, return_value=resp
+        ) as mock_send:
+            c = ClaudeCacheAsyncClient(rate_limit=False)
+            req = httpx.Request(
+                "POST",
+                "https://api.com/v1/messages",
+                headers={"x-api-key": "key"},
+                content=b'{"tools": [{"name": "grep"}]}',
+            )
+            with patch.object(c, "build_request") as mock_build:
+                await c.send(req)
+            mock_build.assert_not_called()
+
+        sent = mock_send.call_args[0][0]
+        assert sent is req
+        assert sent.url.params["beta"] == "true"
+        assert sent.headers["user-agent"] == CLAUDE_CLI_USER_AGENT
+        # API-key clients share this code path and keep their key
+        assert sent.headers["x-api-key"] == "key"
+        assert json.loads(sent.content)["tools"][0]["name"] == f"{TOOL_PREFIX}grep"
+        assert sent.headers["Content-Length"] == str(len(sent.content))
+        streamed = b"".join([chunk async for chunk in sent.stream])
+        assert streamed == sent.content
+
+
 # --- patch_anthropic_client_messages ---
 
 
@@ -19,16 +19,16 @@ class TestCacheFunctions:
         assert result is None
 
     def test_cache_with_cwd(self):
-        """Should differentiate by cwd."""
+        """Should differentiate by cwd class."""
         cache = CommandSafetyCache(max_size=10)
         assessment1 = CachedAssessment(risk="low", reasoning="cwd1")
         assessment2 = CachedAssessment(risk="medium", reasoning="cwd2")
 
         cache.put("npm test", "/project1", assessment1)
-        cache.put("npm test", "/project2", assessment2)
+        cache.put("npm test", "/etc", assessment2)
 
-        result1 = cache.get("npm test", "/project1")
-        result2 = cache.get("npm test", "/project2")
+        result1 = cache.get("npm test", "/project2")
+        result2 = cache.get("npm test", "/etc")
 
         assert result1.reasoning == "cwd1"
         assert result2.reasoning == "cwd2"
@@ -209,9 +209,12 @@ class TestGetConfigKeys:
                 "browser_agent_enabled",
                 "browser_chrome_path",
                 "browser_headless",
+                "callback_concurrent_phases",
+                "callback_timeouts",
                 "cancel_agent_key",
                 "compaction_strategy",
                 "compaction_threshold",
+                "connection_warmup",
                 "debug",
                 "default_agent",
                 "diff_addition_color",
@@ -225,10 +228,12 @@ class TestGetConfigKeys:
                 "frontend_emitter_queue_size",
                 "grep_output_verbose",
                 "http2",
+                "http_rate_limiter",
                 "key1",
                 "key2",
                 "max_saved_sessions",
                 "mcp_disabled",
+                "mcp_lazy_startup",
                 "message_limit",
                 "model",
                 "openai_reasoning_effort",
@@ -236,7 +241,12 @@ class TestGetConfigKeys:
                 "protected_token_count",
                 "resume_message_count",
                 "safety_permission_level",
+                "shell_output_spill",
+                "shell_output_view",
+                "shell_session",
+                "shell_tail_lines",
                 "show_diffs",
+                "subagent_concurrency",
                 "subagent_verbose",
                 "suppress_informational_messages",
                 "suppress_thinking_messages",
@@ -274,9 +284,12 @@ class TestGetConfigKeys:
                 "browser_agent_enabled",
                 "browser_chrome_path",
                 "browser_headless",
+                "callback_concurrent_phases",
+                "callback_timeouts",
                 "cancel_agent_key",
                 "compaction_strategy",
                 "compaction_threshold",
+                "connection_warmup",
                 "debug",
                 "default_agent",
                 "diff_addition_color",
@@ -290,8 +303,10 @@ class TestGetConfigKeys:
                 "frontend_emitter_queue_size",
                 "grep_output_verbose",
                 "http2",
+                "http_rate_limiter",
                 "max_saved_sessions",
                 "mcp_disabled",
+                "mcp_lazy_startup",
                 "message_limit",
                 "model",
                 "openai_reasoning_effort",
@@ -299,7 +314,12 @@ class TestGetConfigKeys:
                 "protected_token_count",
                 "resume_message_count",
                 "safety_permission_level",
+                "shell_output_spill",
+                "shell_output_view",
+                "shell_session",
+                "shell_tail_lines",
                 "show_diffs",
+                "subagent_concurrency",
                 "subagent_verbose",
                 "suppress_informational_messages",
                 "suppress_thinking_messages",
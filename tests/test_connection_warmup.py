@@ -0,0 +1,193 @@
+"""Tests for background connection pre-warming."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from newcode.connection_warmup import (
+    prewarm_agent_connections,
+    schedule_connection_warmup,
+    warm_model_connections,
+)
+from newcode.gemini_model import GeminiModel
+from newcode.round_robin_model import RoundRobinModel
+
+
+def _recording_client(seen, status=404):
+    def handler(request):
+        seen.append((request.method, str(request.url)))
+        return httpx.Response(status)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _gemini(name, client, base_url="https://generativelanguage.example.com/v1"):
+    return GeminiModel(
+        model_name=name, api_key="k", base_url=base_url, http_client=client
+    )
+
+
+class TestWarmModelConnections:
+    @pytest.mark.asyncio
+    async def test_head_request_through_model_client(self):
+        seen = []
+        model = _gemini("g", _recording_client(seen))
+
+        assert await warm_model_connections(model) == 1
+        assert seen == [("HEAD", "https://generativelanguage.example.com/v1")]
+
+    @pytest.mark.asyncio
+    async def test_bypasses_wrapper_client_logic(self):
+        from newcode.http_utils import RetryingAsyncClient
+
+        seen = []
+        client = RetryingAsyncClient(
+            transport=httpx.MockTransport(
+                lambda r: seen.append(r.method) or httpx.Response(503)
+            ),
+        )
+        model = _gemini("g", client)
+
+        with patch("asyncio.sleep") as mock_sleep:
+            assert await warm_model_connections(model) == 1
+        # A 503 on the warmup request is not retried
+        assert seen == ["HEAD"]
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_wrapper_models_warm_each_endpoint_once(self):
+        seen = []
+        shared = _recording_client(seen)
+        model = RoundRobinModel(
+            _gemini("a", shared),
+            _gemini("b", shared),
+            _gemini("c", shared, base_url="https://other.example.com/v1"),
+        )
+
+        assert await warm_model_connections(model) == 2
+        assert sorted(url for _, url in seen) == [
+            "https://generativelanguage.example.com/v1",
+            "https://other.example.com/v1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_swallowed(self):
+        def handler(request):
+            raise httpx.ConnectError("offline")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        assert await warm_model_connections(_gemini("g", client)) == 0
+
+    @pytest.mark.asyncio
+    async def test_non_models_ignored(self):
+        assert await warm_model_connections(MagicMock()) == 0
+        assert await warm_model_connections(None) == 0
+
+
+class TestScheduling:
+    def test_no_running_loop(self):
+        seen = []
+        assert schedule_connection_warmup(_gemini("g", _recording_client(seen))) is None
+        assert seen == []
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_config(self):
+        with patch(
+            "newcode.connection_warmup.get_connection_warmup_enabled",
+            return_value=False,
+        ):
+            assert schedule_connection_warmup(MagicMock()) is None
+
+    @pytest.mark.asyncio
+    async def test_new_warmup_cancels_previous(self):
+        gate = asyncio.Event()
+
+        def handler(request):
+            return httpx.Response(200)
+
+        async def slow_handler(request):
+            await gate.wait()
+            return httpx.Response(200)
+
+        slow = _gemini(
+            "slow", httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        )
+        fast = _gemini(
+            "fast", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+
+        first = schedule_connection_warmup(slow)
+        await asyncio.sleep(0)
+        second = schedule_connection_warmup(fast)
+        assert await second == 1
+        await asyncio.sleep(0)
+        assert first.cancelled()
+
+
+class TestPrewarmAgent:
+    @pytest.mark.asyncio
+    async def test_builds_agent_then_warms(self):
+        seen = []
+        model = _gemini("g", _recording_client(seen))
+        agent = MagicMock()
+        agent._code_generation_agent = None
+
+        def reload():
+            agent.cur_model = model
+
+        agent.reload_code_generation_agent.side_effect = reload
+
+        assert await prewarm_agent_connections(agent) == 1
+        agent.reload_code_generation_agent.assert_called_once()
+        assert seen[0][0] == "HEAD"
+
+    @pytest.mark.asyncio
+    async def test_builds_on_the_event_loop(self):
+        agent = MagicMock()
+        agent._code_generation_agent = None
+        agent.cur_model = None
+        threads = []
+        agent.reload_code_generation_agent.side_effect = lambda: threads.append(
+            threading.get_ident()
+        )
+
+        await prewarm_agent_connections(agent)
+        assert threads == [threading.get_ident()]
+
+    @pytest.mark.asyncio
+    async def test_build_hook_does_not_cancel_running_prewarm(self):
+        from newcode.connection_warmup import schedule_agent_prewarm
+
+        seen = []
+        model = _gemini("g", _recording_client(seen))
+        agent = MagicMock()
+        agent._code_generation_agent = None
+
+        def reload():
+            # BaseAgent.reload_code_generation_agent schedules a warmup
+            agent.cur_model = model
+            assert schedule_connection_warmup(model) is prewarm
+
+        agent.reload_code_generation_agent.side_effect = reload
+
+        prewarm = schedule_agent_prewarm(agent)
+        assert await prewarm == 1
+        assert not prewarm.cancelled()
+        assert len(seen) == 1
+
+    @pytest.mark.asyncio
+    async def test_built_agent_is_not_rebuilt(self):
+        agent = MagicMock()
+        agent.cur_model = None
+        await prewarm_agent_connections(agent)
+        agent.reload_code_generation_agent.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reload_failure_is_swallowed(self):
+        agent = MagicMock()
+        agent._code_generation_agent = None
+        agent.reload_code_generation_agent.side_effect = RuntimeError("boom")
+        assert await prewarm_agent_connections(agent) == 0
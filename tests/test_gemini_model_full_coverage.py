@@ -25,6 +25,7 @@ from newcode.gemini_model import (
     GeminiModel,
     GeminiStreamingResponse,
     _flatten_union_to_object_gemini,
+    _sanitize_schema_cached,
     _sanitize_schema_for_gemini,
     generate_tool_call_id,
 )
@@ -456,6 +457,43 @@ class TestMapMessages:
             si, _ = await model._map_messages(msgs, default_params)
             assert si["parts"][0]["text"] == "INJECTED"
 
+    @pytest.mark.anyio
+    async def test_reuses_mapped_prefix(self, model, default_params):
+        msgs = [
+            ModelRequest(parts=[UserPromptPart(content="a")]),
+            ModelResponse(parts=[TextPart(content="b")], model_name="m"),
+        ]
+        _, first = await model._map_messages(msgs, default_params)
+
+        msgs.append(ModelRequest(parts=[UserPromptPart(content="c")]))
+        with patch.object(model, "_map_message", wraps=model._map_message) as mock_map:
+            _, second = await model._map_messages(msgs, default_params)
+        mock_map.assert_called_once_with(msgs[2])
+        assert second[:2] == first
+        assert second[2] == {"role": "user", "parts": [{"text": "c"}]}
+
+    @pytest.mark.anyio
+    async def test_merging_does_not_corrupt_cache(self, model, default_params):
+        msgs = [
+            ModelRequest(parts=[UserPromptPart(content="a")]),
+            ModelRequest(parts=[UserPromptPart(content="b")]),
+        ]
+        await model._map_messages(msgs, default_params)
+        _, contents = await model._map_messages(msgs, default_params)
+        assert contents == [{"role": "user", "parts": [{"text": "a"}, {"text": "b"}]}]
+
+    @pytest.mark.anyio
+    async def test_replaced_part_is_remapped(self, model, default_params):
+        msgs = [
+            ModelRequest(
+                parts=[SystemPromptPart(content="old"), UserPromptPart(content="hi")]
+            )
+        ]
+        await model._map_messages(msgs, default_params)
+        msgs[0].parts[0] = SystemPromptPart(content="new")
+        si, _ = await model._map_messages(msgs, default_params)
+        assert si["parts"] == [{"text": "new"}]
+
 
 class TestMapModelResponse:
     def test_empty_parts(self, model):
@@ -541,6 +579,35 @@ class TestBuildTools:
         assert "parameters" in decls[0]
         assert "parameters" not in decls[1]
 
+    def test_sanitized_schemas_memoized(self, model):
+        schema = {
+            "type": "object",
+            "properties": {"x": {"$ref": "#/$defs/X"}},
+            "$defs": {"X": {"type": "string"}},
+        }
+        with patch(
+            "newcode.gemini_model._sanitize_schema_for_gemini",
+            wraps=_sanitize_schema_for_gemini,
+        ) as mock_sanitize:
+            first = model._build_tools(
+                [ToolDefinition(name="fn", parameters_json_schema=schema)]
+            )
+            # An equal schema with a different key order hits the cache
+            second = model._build_tools(
+                [
+                    ToolDefinition(
+                        name="fn", parameters_json_schema=dict(reversed(schema.items()))
+                    )
+                ]
+            )
+        assert mock_sanitize.call_count == 1
+        assert first == second
+        assert first[0]["functionDeclarations"][0]["parameters"] == {
+            "type": "object",
+            "properties": {"x": {"type": "string"}},
+        }
+        assert _sanitize_schema_cached(schema) is _sanitize_schema_cached(schema)
+
 
 # --- Build generation config ---
 
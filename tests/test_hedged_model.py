@@ -0,0 +1,243 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+
+from newcode.hedged_model import HedgedModel, _percentile
+
+
+class MockModel:
+    """Mock model whose request and stream start take ``delay`` seconds."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self._name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    @property
+    def model_name(self):
+        return self._name
+
+    @property
+    def system(self):
+        return f"system_{self._name}"
+
+    @property
+    def base_url(self):
+        return f"https://api.{self._name}.com"
+
+    def model_attributes(self, model):
+        return {"model_name": self._name}
+
+    def prepare_request(self, model_settings, model_request_parameters):
+        return model_settings, model_request_parameters
+
+    async def _wait(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+
+    async def request(self, *args):
+        await self._wait()
+        return f"response_from_{self._name}"
+
+    @asynccontextmanager
+    async def request_stream(self, *args):
+        await self._wait()
+        try:
+            yield f"stream_from_{self._name}"
+        finally:
+            self.closed += 1
+
+
+def _warmed(primary, hedge, samples=0.01, **kwargs):
+    """A hedged model whose history already allows hedging."""
+    kwargs.setdefault("min_samples", 3)
+    kwargs.setdefault("max_hedged_fraction", 1.0)
+    model = HedgedModel(primary, hedge, **kwargs)
+    for _ in range(kwargs["min_samples"]):
+        model._ttft_history.append(samples)
+        model._latency_history.append(samples)
+    return model
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        samples = list(range(1, 101))
+        assert _percentile(samples, 50) == 50
+        assert _percentile(samples, 95) == 95
+        assert _percentile(samples, 100) == 100
+        assert _percentile([3.0], 95) == 3.0
+
+
+class TestHedgedModel:
+    def test_initialization(self):
+        model = HedgedModel(MockModel("a"), MockModel("b"))
+        assert model.model_name == "hedged:a,b"
+        assert model.system == "system_a"
+        assert model.base_url == "https://api.a.com"
+
+    def test_initialization_validation(self):
+        with pytest.raises(ValueError, match="percentile"):
+            HedgedModel(MockModel("a"), MockModel("b"), percentile=0)
+        with pytest.raises(ValueError, match="history_size"):
+            HedgedModel(MockModel("a"), MockModel("b"), history_size=0)
+        with pytest.raises(ValueError, match="max_hedged_fraction"):
+            HedgedModel(MockModel("a"), MockModel("b"), max_hedged_fraction=2)
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_until_history_learned(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b")
+        model = HedgedModel(primary, hedge, min_samples=3, max_hedged_fraction=1)
+
+        for _ in range(3):
+            assert await model.request([], None, None) == "response_from_a"
+        assert hedge.calls == 0
+        assert model.get_stats()["latency_deadline"] is not None
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_not_hedged(self):
+        primary = MockModel("a")
+        hedge = MockModel("b")
+        model = _warmed(primary, hedge, samples=1.0)
+
+        assert await model.request([], None, None) == "response_from_a"
+        assert hedge.calls == 0
+        assert model.get_stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_hedged_and_loser_cancelled(self):
+        primary = MockModel("a", delay=10)
+        hedge = MockModel("b")
+        model = _warmed(primary, hedge)
+
+        assert await model.request([], None, None) == "response_from_b"
+        await asyncio.sleep(0)
+        assert primary.cancelled == 1
+        stats = model.get_stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert model.base_url == "https://api.b.com"
+
+    @pytest.mark.asyncio
+    async def test_primary_still_wins_after_hedge_starts(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b", delay=10)
+        model = _warmed(primary, hedge)
+
+        assert await model.request([], None, None) == "response_from_a"
+        await asyncio.sleep(0)
+        assert hedge.cancelled == 1
+        assert model.get_stats()["hedge_wins"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_falls_back_to_primary(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b", error=RuntimeError("down"))
+        model = _warmed(primary, hedge)
+        assert await model.request([], None, None) == "response_from_a"
+
+    @pytest.mark.asyncio
+    async def test_primary_error_without_hedge_propagates(self):
+        model = HedgedModel(MockModel("a", error=RuntimeError("boom")), MockModel("b"))
+        with pytest.raises(RuntimeError, match="boom"):
+            await model.request([], None, None)
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_hedging(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b", delay=10)
+        model = _warmed(primary, hedge, max_hedges=1)
+
+        await model.request([], None, None)
+        await model.request([], None, None)
+        assert hedge.calls == 1
+        assert model.get_stats()["hedged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fraction_budget(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b", delay=10)
+        model = _warmed(primary, hedge, max_hedged_fraction=0.0)
+
+        await model.request([], None, None)
+        assert hedge.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_hedged_and_loser_closed(self):
+        primary = MockModel("a", delay=10)
+        hedge = MockModel("b")
+        model = _warmed(primary, hedge)
+
+        async with model.request_stream([], None, None) as response:
+            assert response == "stream_from_b"
+            assert hedge.closed == 0
+        assert hedge.closed == 1
+        await asyncio.sleep(0)
+        assert primary.cancelled == 1
+        assert model.get_stats()["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_primary_wins_both_started(self):
+        primary = MockModel("a", delay=0.05)
+        hedge = MockModel("b", delay=0.2)
+        model = _warmed(primary, hedge)
+
+        async with model.request_stream([], None, None) as response:
+            assert response == "stream_from_a"
+        assert primary.closed == 1
+        await asyncio.sleep(0)
+        assert hedge.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_error_propagates(self):
+        model = HedgedModel(MockModel("a", error=RuntimeError("boom")), MockModel("b"))
+        with pytest.raises(RuntimeError, match="boom"):
+            async with model.request_stream([], None, None):
+                pass
+
+
+class TestModelFactoryIntegration:
+    def test_hedged_from_config(self):
+        from newcode.model_factory import ModelFactory
+
+        config = {
+            "model-1": {"type": "openai", "name": "gpt-4"},
+            "model-2": {"type": "openai", "name": "gpt-4-turbo"},
+            "hedged-test": {
+                "type": "hedged",
+                "primary": "model-1",
+                "hedge": "model-2",
+                "percentile": 90,
+                "max_hedges": 5,
+            },
+        }
+
+        with (
+            patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"}),
+            patch("newcode.model_factory.HedgedModel") as mock_hedged,
+        ):
+            ModelFactory.get_model("hedged-test", config)
+
+        args, kwargs = mock_hedged.call_args
+        assert len(args) == 2
+        assert kwargs["percentile"] == 90
+        assert kwargs["max_hedges"] == 5
+        assert kwargs["max_hedged_fraction"] == 0.1
+
+    def test_hedged_requires_both_models(self):
+        from newcode.model_factory import ModelFactory
+
+        config = {"hedged-test": {"type": "hedged", "primary": "x"}}
+        with pytest.raises(ValueError, match="requires 'primary' and 'hedge'"):
+            ModelFactory.get_model("hedged-test", config)
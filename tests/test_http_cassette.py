@@ -0,0 +1,186 @@
+"""Tests for the record/replay cassette transport."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from newcode.http_cassette import (
+    CASSETTE_ENV,
+    CASSETTE_MODE_ENV,
+    Cassette,
+    CassetteMissError,
+    CassetteTransport,
+    apply_cassette_transport,
+    get_active_cassette,
+    reset_cassettes,
+)
+
+SSE_CHUNKS = [
+    b'data: {"type": "message_start"}\n\n',
+    b'data: {"type": "content_block_delta", "delta": "Hi"}\n\n',
+    b"\x00\xffbinary",
+]
+
+
+class _SlowStream(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        for chunk in SSE_CHUNKS:
+            yield chunk
+
+
+def _upstream(request):
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        stream=_SlowStream(),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    monkeypatch.delenv(CASSETTE_ENV, raising=False)
+    monkeypatch.delenv(CASSETTE_MODE_ENV, raising=False)
+    reset_cassettes()
+    yield
+    reset_cassettes()
+
+
+async def _record(path, requests):
+    cassette = Cassette(str(path), "record")
+    transport = CassetteTransport(cassette, httpx.MockTransport(_upstream))
+    async with httpx.AsyncClient(transport=transport) as client:
+        for method, url, body in requests:
+            async with client.stream(method, url, content=body) as response:
+                assert [c async for c in response.aiter_raw()] == SSE_CHUNKS
+    return cassette
+
+
+class TestRecordReplay:
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        path = tmp_path / "session.jsonl"
+        await _record(
+            path,
+            [("POST", "https://api.example.com/v1/messages?key=secret", b"{}")],
+        )
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        interaction = json.loads(lines[0])
+        assert "secret" not in interaction["url"]
+        assert interaction["complete"] is True
+        assert len(interaction["chunks"]) == 3
+        assert "b64" in interaction["chunks"][2]
+
+        transport = CassetteTransport(Cassette(str(path), "replay"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post(
+                "https://api.example.com/v1/messages?key=other", content=b"{}"
+            )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/event-stream"
+        assert response.content == b"".join(SSE_CHUNKS)
+
+    @pytest.mark.asyncio
+    async def test_exact_body_match_preferred(self, tmp_path):
+        path = tmp_path / "session.jsonl"
+        await _record(
+            path,
+            [
+                ("POST", "https://api.example.com/v1/x", b"first"),
+                ("POST", "https://api.example.com/v1/x", b"second"),
+            ],
+        )
+        cassette = Cassette(str(path), "replay")
+        second = cassette.match(
+            "POST",
+            "https://api.example.com/v1/x",
+            json.loads(path.read_text().splitlines()[1])["body_sha256"],
+        )
+        assert second is cassette._interactions[1]
+        # Otherwise the next unused exchange for the URL is used
+        first = cassette.match("POST", "https://api.example.com/v1/x", "other")
+        assert first is cassette._interactions[0]
+        with pytest.raises(CassetteMissError):
+            cassette.match("POST", "https://api.example.com/v1/x", "other")
+
+    @pytest.mark.asyncio
+    async def test_timed_replay_sleeps_recorded_gaps(self, tmp_path):
+        path = tmp_path / "session.jsonl"
+        path.write_text(
+            json.dumps(
+                {
+                    "method": "GET",
+                    "url": "https://api.example.com/",
+                    "body_sha256": "",
+                    "status": 200,
+                    "headers": [],
+                    "headers_delay": 0.5,
+                    "chunks": [{"t": 0.25, "text": "a"}, {"t": 0.0, "text": "b"}],
+                    "complete": True,
+                }
+            )
+            + "\n"
+        )
+        transport = CassetteTransport(Cassette(str(path), "replay-timed"))
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            async with httpx.AsyncClient(transport=transport) as client:
+                response = await client.get("https://api.example.com/")
+        assert response.content == b"ab"
+        assert [c.args[0] for c in mock_sleep.await_args_list] == [0.5, 0.25]
+
+    @pytest.mark.asyncio
+    async def test_miss_raises_transport_error(self, tmp_path):
+        path = tmp_path / "empty.jsonl"
+        path.write_text("")
+        transport = CassetteTransport(Cassette(str(path), "replay"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.TransportError):
+                await client.get("https://api.example.com/")
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown cassette mode"):
+            Cassette(str(tmp_path / "x.jsonl"), "rewind")
+
+
+class TestEnvironmentActivation:
+    def test_disabled_by_default(self):
+        kwargs = {"timeout": 180, "verify": True}
+        assert get_active_cassette() is None
+        assert apply_cassette_transport(kwargs) is kwargs
+
+    def test_record_moves_connection_options(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CASSETTE_ENV, str(tmp_path / "rec.jsonl"))
+        monkeypatch.setenv(CASSETTE_MODE_ENV, "record")
+
+        kwargs = apply_cassette_transport(
+            {"timeout": 180, "verify": False, "http2": False, "proxy": None}
+        )
+        assert isinstance(kwargs["transport"], CassetteTransport)
+        assert "verify" not in kwargs and "proxy" not in kwargs
+        assert kwargs["timeout"] == 180
+        # One cassette per process, shared by every client
+        assert get_active_cassette() is kwargs["transport"].cassette
+
+    def test_clients_use_active_cassette(self, tmp_path, monkeypatch):
+        path = tmp_path / "replay.jsonl"
+        path.write_text("")
+        monkeypatch.setenv(CASSETTE_ENV, str(path))
+
+        from newcode.claude_cache_client import ClaudeCacheAsyncClient
+        from newcode.gemini_model import GeminiModel
+        from newcode.http_utils import create_async_client
+
+        clients = [
+            create_async_client(),
+            ClaudeCacheAsyncClient(timeout=180),
+        ]
+        for client in clients:
+            assert isinstance(client._transport, CassetteTransport)
+
+        model = GeminiModel(model_name="gemini-x", api_key="k")
+        client = asyncio.run(model._get_client())
+        assert isinstance(client._transport, CassetteTransport)
@@ -0,0 +1,243 @@
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from pydantic_ai.exceptions import FallbackExceptionGroup, ModelHTTPError
+
+from newcode.latency_router_model import (
+    LatencyRouterModel,
+    is_retryable_error,
+)
+
+
+class MockModel:
+    """A simple mock model that implements the required interface."""
+
+    def __init__(self, name, error=None):
+        self._name = name
+        self.error = error
+        self.request = AsyncMock(return_value=f"response_from_{name}")
+        if error is not None:
+            self.request.side_effect = error
+        self.stream_calls = 0
+
+    @property
+    def model_name(self):
+        return self._name
+
+    @property
+    def system(self):
+        return f"system_{self._name}"
+
+    @property
+    def base_url(self):
+        return f"https://api.{self._name}.com"
+
+    def model_attributes(self, model):
+        return {"model_name": self._name}
+
+    def prepare_request(self, model_settings, model_request_parameters):
+        return model_settings, model_request_parameters
+
+    @asynccontextmanager
+    async def request_stream(self, *args, **kwargs):
+        self.stream_calls += 1
+        if self.error is not None:
+            raise self.error
+        yield f"stream_from_{self._name}"
+
+
+def _http_error(status):
+    return ModelHTTPError(status_code=status, model_name="m")
+
+
+class TestRetryableErrors:
+    def test_classification(self):
+        assert is_retryable_error(_http_error(429))
+        assert is_retryable_error(_http_error(503))
+        assert not is_retryable_error(_http_error(400))
+        assert is_retryable_error(httpx.ConnectError("down"))
+        assert not is_retryable_error(ValueError("bug"))
+
+
+class TestLatencyRouterModel:
+    def test_initialization(self):
+        router = LatencyRouterModel(MockModel("a"), MockModel("b"))
+        assert router.model_name == "latency_router:a,b"
+        assert router.system == "system_a"
+        assert router.base_url == "https://api.a.com"
+
+    def test_initialization_validation(self):
+        with pytest.raises(ValueError, match="At least one model"):
+            LatencyRouterModel()
+        with pytest.raises(ValueError, match="ewma_alpha"):
+            LatencyRouterModel(MockModel("a"), ewma_alpha=0)
+        with pytest.raises(ValueError, match="cooldown_seconds"):
+            LatencyRouterModel(MockModel("a"), cooldown_seconds=-1)
+
+    def test_prefers_lowest_expected_latency(self):
+        router = LatencyRouterModel(MockModel("slow"), MockModel("fast"))
+        router._stats[0].latency_ewma = 5.0
+        router._stats[1].latency_ewma = 1.0
+        router._stats[0].requests = router._stats[1].requests = 1
+        assert router._ranked_candidates() == [1, 0]
+
+    def test_outstanding_requests_inflate_score(self):
+        router = LatencyRouterModel(MockModel("a"), MockModel("b"))
+        router._stats[0].latency_ewma = 1.0
+        router._stats[0].ttft_ewma = 0.5
+        router._stats[1].latency_ewma = 1.5
+        router._stats[0].requests = router._stats[1].requests = 1
+        router._stats[0].outstanding = 2  # 1.0 + 2 * 0.5 = 2.0 > 1.5
+        assert router._ranked_candidates() == [1, 0]
+
+    def test_unmeasured_candidates_are_explored(self):
+        router = LatencyRouterModel(MockModel("a"), MockModel("b"))
+        router._stats[0].latency_ewma = 2.0
+        router._stats[0].requests = 1
+        router._stats[0].outstanding = 1
+        assert router._ranked_candidates()[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_faster_second_candidate_ends_up_picked(self):
+        slow = MockModel("slow")
+        fast = MockModel("fast")
+        router = LatencyRouterModel(slow, fast)
+        clock = [0.0]
+
+        def timed(model, seconds):
+            async def respond(*args):
+                clock[0] += seconds
+                return f"response_from_{model.model_name}"
+
+            model.request.side_effect = respond
+
+        timed(slow, 5.0)
+        timed(fast, 1.0)
+        with patch("newcode.latency_router_model.time.monotonic", lambda: clock[0]):
+            for _ in range(10):
+                await router.request([], None, None)
+
+        assert slow.request.await_count == 1
+        assert fast.request.await_count == 9
+
+    def test_cooling_candidates_go_last(self):
+        router = LatencyRouterModel(MockModel("a"), MockModel("b"))
+        router._stats[0].latency_ewma = 0.1
+        router._stats[0].cooldown_until = time.monotonic() + 60
+        assert router._ranked_candidates() == [1, 0]
+
+    @pytest.mark.asyncio
+    async def test_request_records_latency(self):
+        router = LatencyRouterModel(MockModel("a"))
+        result = await router.request([], None, None)
+        assert result == "response_from_a"
+        stats = router.get_stats()["a"]
+        assert stats["requests"] == 1
+        assert stats["outstanding"] == 0
+        assert stats["latency_ewma"] is not None
+        assert stats["ttft_ewma"] is not None
+
+    @pytest.mark.asyncio
+    async def test_request_fails_over_on_retryable_error(self):
+        a = MockModel("a", error=_http_error(429))
+        b = MockModel("b")
+        router = LatencyRouterModel(a, b, cooldown_seconds=10)
+
+        result = await router.request([], None, None)
+
+        assert result == "response_from_b"
+        stats = router.get_stats()
+        assert stats["a"]["failures"] == 1
+        assert stats["a"]["outstanding"] == 0
+        assert 9 < stats["a"]["cooldown_remaining"] <= 10
+        # The throttled candidate is skipped while it cools down
+        assert router._ranked_candidates() == [1, 0]
+
+    @pytest.mark.asyncio
+    async def test_cooldown_grows_with_consecutive_failures(self):
+        a = MockModel("a", error=_http_error(503))
+        router = LatencyRouterModel(a, cooldown_seconds=10)
+        for _ in range(2):
+            with pytest.raises(FallbackExceptionGroup):
+                await router.request([], None, None)
+        assert 19 < router.get_stats()["a"]["cooldown_remaining"] <= 20
+
+    @pytest.mark.asyncio
+    async def test_request_does_not_fail_over_on_other_errors(self):
+        a = MockModel("a", error=_http_error(400))
+        b = MockModel("b")
+        router = LatencyRouterModel(a, b)
+
+        with pytest.raises(ModelHTTPError):
+            await router.request([], None, None)
+        b.request.assert_not_called()
+        assert router.get_stats()["a"]["cooldown_remaining"] == 0
+
+    @pytest.mark.asyncio
+    async def test_request_stream_fails_over(self):
+        a = MockModel("a", error=httpx.ConnectError("down"))
+        b = MockModel("b")
+        router = LatencyRouterModel(a, b)
+
+        async with router.request_stream([], None, None) as response:
+            assert response == "stream_from_b"
+            assert router.get_stats()["b"]["outstanding"] == 1
+
+        stats = router.get_stats()
+        assert stats["b"]["outstanding"] == 0
+        assert stats["b"]["ttft_ewma"] is not None
+        assert stats["a"]["failures"] == 1
+        assert router.base_url == "https://api.b.com"
+
+    @pytest.mark.asyncio
+    async def test_request_stream_all_failed(self):
+        router = LatencyRouterModel(MockModel("a", error=_http_error(502)))
+        with pytest.raises(FallbackExceptionGroup):
+            async with router.request_stream([], None, None):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_error_while_consuming_stream_is_recorded(self):
+        router = LatencyRouterModel(MockModel("a"))
+        with pytest.raises(httpx.ReadError):
+            async with router.request_stream([], None, None):
+                raise httpx.ReadError("reset")
+        stats = router.get_stats()["a"]
+        assert stats["outstanding"] == 0
+        assert stats["failures"] == 1
+
+
+class TestModelFactoryIntegration:
+    def test_latency_router_from_config(self):
+        from newcode.model_factory import ModelFactory
+
+        config = {
+            "model-1": {"type": "openai", "name": "gpt-4"},
+            "model-2": {"type": "openai", "name": "gpt-4-turbo"},
+            "router": {
+                "type": "latency_router",
+                "models": ["model-1", "model-2"],
+                "cooldown_seconds": 5,
+            },
+        }
+
+        with (
+            patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"}),
+            patch("newcode.model_factory.LatencyRouterModel") as mock_router,
+        ):
+            ModelFactory.get_model("router", config)
+
+        args, kwargs = mock_router.call_args
+        assert len(args) == 2
+        assert kwargs["cooldown_seconds"] == 5
+        assert kwargs["ewma_alpha"] == 0.3
+
+    def test_latency_router_requires_models(self):
+        from newcode.model_factory import ModelFactory
+
+        config = {"router": {"type": "latency_router"}}
+        with pytest.raises(ValueError, match="requires a 'models' list"):
+            ModelFactory.get_model("router", config)
@@ -0,0 +1,223 @@
+"""Tests for the shared adaptive rate limiter."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from newcode.rate_limiter import (
+    AdaptiveRateLimiter,
+    _parse_duration,
+    get_rate_limiter,
+    get_rate_limiter_stats,
+    parse_retry_after,
+    reset_rate_limiters,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_limiters():
+    reset_rate_limiters()
+    yield
+    reset_rate_limiters()
+
+
+class TestParsing:
+    def test_parse_duration_seconds(self):
+        assert _parse_duration("12") == 12.0
+        assert _parse_duration("0.5") == 0.5
+
+    def test_parse_duration_openai_style(self):
+        assert _parse_duration("6m0s") == 360.0
+        assert _parse_duration("20ms") == pytest.approx(0.02)
+        assert _parse_duration("1h2m3s") == 3723.0
+
+    def test_parse_duration_rfc3339(self):
+        from datetime import datetime, timedelta, timezone
+
+        reset_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        parsed = _parse_duration(reset_at.isoformat().replace("+00:00", "Z"))
+        assert 28 <= parsed <= 30
+
+    def test_parse_duration_epoch(self):
+        parsed = _parse_duration(str(time.time() + 10))
+        assert 8 <= parsed <= 10
+
+    def test_parse_duration_garbage(self):
+        assert _parse_duration("soon") is None
+        assert _parse_duration("") is None
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+        assert parse_retry_after("nope") is None
+
+
+def _response(status_code, headers=None):
+    return httpx.Response(status_code, headers=headers or {})
+
+
+class TestAdaptiveRateLimiter:
+    def test_unlimited_until_learned(self):
+        limiter = AdaptiveRateLimiter()
+        for _ in range(100):
+            assert limiter.reserve() == 0.0
+
+    def test_learns_anthropic_headers(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.observe(
+            _response(
+                200,
+                {
+                    "anthropic-ratelimit-requests-limit": "60",
+                    "anthropic-ratelimit-requests-remaining": "1",
+                },
+            )
+        )
+        assert limiter.get_stats()["rate"] == 1.0
+        assert limiter.reserve() == 0.0
+        # Bucket is empty now - the next caller is paced at the learned rate
+        assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+        assert limiter.reserve() == pytest.approx(2.0, abs=0.05)
+
+    def test_learns_openai_headers_and_blocks_when_exhausted(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.observe(
+            _response(
+                200,
+                {
+                    "x-ratelimit-limit-requests": "600",
+                    "x-ratelimit-remaining-requests": "0",
+                    "x-ratelimit-reset-requests": "2s",
+                },
+            )
+        )
+        assert limiter.reserve() == pytest.approx(2.0, abs=0.05)
+
+    def test_exhausted_token_limit_blocks(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.observe(
+            _response(
+                200,
+                {
+                    "x-ratelimit-remaining-tokens": "0",
+                    "x-ratelimit-reset-tokens": "1.5s",
+                },
+            )
+        )
+        assert limiter.reserve() == pytest.approx(1.5, abs=0.05)
+
+    def test_retry_after_blocks_all_callers(self):
+        limiter = AdaptiveRateLimiter()
+        pause = limiter.observe(_response(429, {"Retry-After": "3"}))
+        assert pause == 3.0
+        assert limiter.reserve() == pytest.approx(3.0, abs=0.05)
+        assert limiter.get_stats()["throttled_responses"] == 1
+
+    def test_retry_after_ignored_when_headers_not_respected(self):
+        limiter = AdaptiveRateLimiter()
+        response = _response(429, {"Retry-After": "60"})
+        assert limiter.observe(response, respect_headers=False) is None
+        # AIMD probe rate still spaces out the next callers
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() > 0.0
+
+    def test_aimd_decrease_and_release(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.observe(_response(429))
+        assert limiter.get_stats()["rate"] == 1.0
+        limiter.observe(_response(429))
+        assert limiter.get_stats()["rate"] == 0.5
+        for _ in range(500):
+            limiter.observe(_response(200))
+        stats = limiter.get_stats()
+        assert stats["rate"] is None
+        assert stats["adaptive"] is False
+
+    def test_tolerates_mock_responses(self):
+        limiter = AdaptiveRateLimiter()
+        response = MagicMock(spec=httpx.Response)
+        response.status_code = 200
+        assert limiter.observe(response) is None
+        assert limiter.get_stats()["rate"] is None
+
+    @pytest.mark.anyio
+    async def test_acquire_sleeps_and_reports(self):
+        limiter = AdaptiveRateLimiter(name="api.example.com")
+        limiter.observe(_response(429, {"Retry-After": "2"}))
+        with (
+            patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+            patch("newcode.stream_events.publish_stream_event") as mock_event,
+        ):
+            waited = await limiter.acquire()
+        assert waited == pytest.approx(2.0, abs=0.05)
+        mock_sleep.assert_awaited_once()
+        assert mock_event.call_args[0][0] == "rate_limit_wait"
+        stats = limiter.get_stats()
+        assert stats["delayed_requests"] == 1
+        assert stats["total_wait_seconds"] == pytest.approx(2.0, abs=0.05)
+
+
+class TestRegistry:
+    def test_shared_per_host_and_key(self):
+        a = httpx.Request(
+            "POST", "https://api.example.com/v1/x", headers={"x-api-key": "k1"}
+        )
+        b = httpx.Request(
+            "POST", "https://api.example.com/v1/y", headers={"x-api-key": "k1"}
+        )
+        c = httpx.Request(
+            "POST", "https://api.example.com/v1/x", headers={"x-api-key": "k2"}
+        )
+        assert get_rate_limiter(a) is get_rate_limiter(b)
+        assert get_rate_limiter(a) is not get_rate_limiter(c)
+        assert len(get_rate_limiter_stats()) == 2
+
+    def test_key_never_appears_in_name(self):
+        request = httpx.Request(
+            "GET",
+            "https://generativelanguage.googleapis.com/v1?key=secret-key",
+        )
+        limiter = get_rate_limiter(request)
+        assert "secret-key" not in limiter.name
+        assert limiter.name.startswith("generativelanguage.googleapis.com#")
+
+
+class TestRetryingAsyncClientIntegration:
+    @pytest.mark.anyio
+    async def test_limiter_learns_from_responses(self):
+        from newcode.http_utils import RetryingAsyncClient
+
+        client = RetryingAsyncClient(rate_limit=True)
+        request = httpx.Request("POST", "https://api.example.com/v1/chat")
+        response = httpx.Response(
+            200,
+            headers={
+                "x-ratelimit-limit-requests": "120",
+                "x-ratelimit-remaining-requests": "100",
+            },
+        )
+        with patch.object(
+            httpx.AsyncClient, "send", new_callable=AsyncMock, return_value=response
+        ):
+            await client.send(request)
+
+        stats = get_rate_limiter(request).get_stats()
+        assert stats["rate"] == 2.0
+        assert stats["requests"] == 1
+
+    @pytest.mark.anyio
+    async def test_limiter_disabled(self):
+        from newcode.http_utils import RetryingAsyncClient
+
+        client = RetryingAsyncClient(rate_limit=False)
+        request = httpx.Request("POST", "https://api.example.com/v1/chat")
+        with patch.object(
+            httpx.AsyncClient,
+            "send",
+            new_callable=AsyncMock,
+            return_value=httpx.Response(200),
+        ):
+            await client.send(request)
+        assert get_rate_limiter_stats() == {}
@@ -0,0 +1,168 @@
+"""Tests for newcode/stream_events.py."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from newcode import callbacks, stream_events
+from newcode.stream_events import (
+    StreamEvent,
+    has_stream_subscribers,
+    publish_stream_event,
+    subscribe_stream_events,
+    unsubscribe_stream_events,
+)
+
+
+@pytest.fixture
+def bus():
+    """Run with no bus subscribers and no stream_event callbacks."""
+    saved_subscriptions = list(stream_events._subscriptions)
+    saved_callbacks = list(callbacks._callbacks["stream_event"])
+    stream_events.clear_stream_subscriptions()
+    callbacks._callbacks["stream_event"].clear()
+    yield
+    stream_events.clear_stream_subscriptions()
+    stream_events._subscriptions.extend(saved_subscriptions)
+    callbacks._callbacks["stream_event"][:] = saved_callbacks
+
+
+async def _next_tick():
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+class TestStreamEventBus:
+    @pytest.mark.asyncio
+    async def test_no_subscribers_skips_all_work(self, bus):
+        with patch.object(stream_events.asyncio, "get_running_loop") as get_loop:
+            publish_stream_event("part_delta", {"index": 0}, "s1")
+        get_loop.assert_not_called()
+        assert stream_events._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_events_are_batched_per_tick(self, bus):
+        batches = []
+        subscribe_stream_events(batches.append)
+
+        for i in range(3):
+            publish_stream_event("part_delta", {"index": i}, "s1")
+        assert batches == []
+        await _next_tick()
+        publish_stream_event("part_end", {"index": 2}, "s1")
+        await _next_tick()
+
+        assert batches == [
+            [StreamEvent("part_delta", {"index": i}, "s1") for i in range(3)],
+            [StreamEvent("part_end", {"index": 2}, "s1")],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_subscribers_filter_by_event_type(self, bus):
+        ends = []
+        unsubscribe = subscribe_stream_events(ends.append, {"part_end"})
+
+        assert has_stream_subscribers("part_end") is True
+        assert has_stream_subscribers("part_delta") is False
+        publish_stream_event("part_delta", {}, None)
+        publish_stream_event("part_end", {}, None)
+        await _next_tick()
+
+        assert [e.event_type for batch in ends for e in batch] == ["part_end"]
+        assert unsubscribe() is True
+        assert has_stream_subscribers() is False
+
+    @pytest.mark.asyncio
+    async def test_async_handler_and_failures_are_isolated(self, bus):
+        received = []
+
+        async def async_handler(events):
+            received.extend(events)
+
+        subscribe_stream_events(MagicMock(side_effect=RuntimeError("boom")))
+        subscribe_stream_events(async_handler)
+        publish_stream_event("part_start", {}, None)
+        await _next_tick()
+
+        assert [e.event_type for e in received] == ["part_start"]
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_replaces_subscription(self, bus):
+        handler = MagicMock()
+        subscribe_stream_events(handler, {"part_start"})
+        subscribe_stream_events(handler, {"part_end"})
+
+        assert len(stream_events._subscriptions) == 1
+        assert has_stream_subscribers("part_start") is False
+        assert unsubscribe_stream_events(handler) is True
+        assert unsubscribe_stream_events(handler) is False
+
+    @pytest.mark.asyncio
+    async def test_stream_event_callbacks_still_receive_events(self, bus):
+        callback = AsyncMock()
+        callbacks.register_callback("stream_event", callback)
+
+        publish_stream_event("part_delta", {"index": 0}, "s1")
+        publish_stream_event("part_delta", {"index": 1}, "s1")
+        await _next_tick()
+
+        assert [c.args for c in callback.await_args_list] == [
+            ("part_delta", {"index": 0}, "s1"),
+            ("part_delta", {"index": 1}, "s1"),
+        ]
+
+    def test_publish_without_loop_is_dropped(self, bus):
+        subscribe_stream_events(MagicMock())
+        publish_stream_event("part_delta", {}, None)
+        assert stream_events._pending == {}
+
+
+class TestFrontendStreamEvents:
+    def test_skips_when_no_frontend_connected(self):
+        from newcode.plugins.frontend_emitter import register_callbacks
+
+        with (
+            patch.object(register_callbacks, "get_subscriber_count", return_value=0),
+            patch.object(register_callbacks, "emit_event") as emit,
+        ):
+            register_callbacks.on_stream_events([StreamEvent("part_delta", {})])
+        emit.assert_not_called()
+
+    def test_emits_each_event_when_connected(self):
+        from newcode.plugins.frontend_emitter import register_callbacks
+
+        with (
+            patch.object(register_callbacks, "get_subscriber_count", return_value=1),
+            patch.object(register_callbacks, "emit_event") as emit,
+        ):
+            register_callbacks.on_stream_events(
+                [
+                    StreamEvent("part_start", {"index": 0}, "s1"),
+                    StreamEvent("part_end", {"index": 0}, "s1"),
+                ]
+            )
+        assert emit.call_count == 2
+        assert emit.call_args[0][1]["event_type"] == "part_end"
+        assert emit.call_args[0][1]["agent_session_id"] == "s1"
+
+    def test_subscribes_only_while_frontend_connected(self, bus):
+        from newcode.plugins.frontend_emitter import emitter, register_callbacks
+
+        emitter.add_subscriber_count_listener(
+            register_callbacks._on_subscriber_count_change
+        )
+        assert emitter.get_subscriber_count() == 0
+        assert not has_stream_subscribers("part_delta")
+
+        with patch.object(emitter, "get_frontend_emitter_queue_size", return_value=8):
+            first = emitter.subscribe()
+            second = emitter.subscribe()
+        try:
+            assert has_stream_subscribers("part_delta")
+            emitter.unsubscribe(first)
+            assert has_stream_subscribers("part_delta")
+        finally:
+            emitter.unsubscribe(first)
+            emitter.unsubscribe(second)
+        assert not has_stream_subscribers("part_delta")
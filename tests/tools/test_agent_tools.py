@@ -281,3 +281,76 @@ class TestRegisterInvokeAgent:
         ):
             result = await captured["fn"](ctx, agent_name="nonexistent", prompt="hi")
         assert result.error is not None
+
+
+class TestInvokeSubagents:
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_order(self):
+        import asyncio
+
+        from newcode.tools.agent_tools import (
+            AgentInvokeOutput,
+            AgentTask,
+            _invoke_subagents,
+        )
+
+        running = 0
+        peak = 0
+
+        async def fake_invoke(agent_name, prompt, session_id, track_progress):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            error = "boom" if prompt == "p2" else None
+            return AgentInvokeOutput(
+                response=prompt, agent_name=agent_name, error=error
+            )
+
+        tasks = [AgentTask(agent_name="a", prompt=f"p{i}") for i in range(5)]
+        with patch("newcode.tools.agent_tools._invoke_subagent", fake_invoke):
+            result = await _invoke_subagents(tasks, concurrency=2)
+
+        assert peak == 2
+        assert [r.response for r in result.results] == [f"p{i}" for i in range(5)]
+        assert (result.succeeded, result.failed) == (4, 1)
+
+    @pytest.mark.asyncio
+    async def test_tool_rejects_empty_batch(self):
+        from newcode.tools.agent_tools import register_invoke_agents
+
+        agent = MagicMock()
+        captured = {}
+        agent.tool = lambda fn: (captured.update({"fn": fn}), fn)[-1]
+        register_invoke_agents(agent)
+
+        with patch("newcode.tools.agent_tools.emit_error"):
+            result = await captured["fn"](MagicMock(), tasks=[])
+        assert result.results == []
+        assert result.error is not None
+
+    @pytest.mark.asyncio
+    async def test_tool_uses_configured_concurrency(self):
+        from newcode.tools.agent_tools import (
+            AgentBatchInvokeOutput,
+            AgentTask,
+            register_invoke_agents,
+        )
+
+        agent = MagicMock()
+        captured = {}
+        agent.tool = lambda fn: (captured.update({"fn": fn}), fn)[-1]
+        register_invoke_agents(agent)
+
+        tasks = [AgentTask(agent_name="a", prompt="hi")]
+        with (
+            patch("newcode.tools.agent_tools.emit_info"),
+            patch("newcode.config.get_subagent_concurrency", return_value=3),
+            patch(
+                "newcode.tools.agent_tools._invoke_subagents",
+                return_value=AgentBatchInvokeOutput(results=[]),
+            ) as run,
+        ):
+            await captured["fn"](MagicMock(), tasks=tasks)
+        run.assert_called_once_with(tasks, 3)
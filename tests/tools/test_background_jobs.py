@@ -0,0 +1,153 @@
+"""Tests for newcode/tools/background_jobs.py."""
+
+import os
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from newcode.tools.background_jobs import (
+    _kill_background_job,
+    _list_background_jobs,
+    _read_log_bytes,
+    _tail_background_job,
+    _wait_for_background_output,
+    clear_background_jobs,
+    get_background_job,
+    register_background_job,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    clear_background_jobs()
+    yield
+    clear_background_jobs()
+
+
+def _start_job(tmp_path, script, name="job.log"):
+    log_path = tmp_path / name
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-u", "-c", script],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    return register_background_job(proc, "job", str(log_path), str(tmp_path))
+
+
+class TestReadLogBytes:
+    def test_offsets(self, tmp_path):
+        log = tmp_path / "out.log"
+        log.write_bytes(b"one\ntwo\nthree\n")
+
+        assert _read_log_bytes(str(log), 0) == (b"one\ntwo\nthree\n", 0, False)
+        assert _read_log_bytes(str(log), 4) == (b"two\nthree\n", 4, False)
+        assert _read_log_bytes(str(log), -6) == (b"three\n", 8, False)
+        # Offsets past the end mean the log was replaced
+        assert _read_log_bytes(str(log), 100)[1] == 0
+
+    def test_truncates_at_line_boundary(self, tmp_path):
+        log = tmp_path / "out.log"
+        log.write_bytes(b"aaaa\nbbbb\ncccc\n")
+
+        data, start, truncated = _read_log_bytes(str(log), 0, max_bytes=12)
+        assert (data, start, truncated) == (b"aaaa\nbbbb\n", 0, True)
+
+
+class TestJobTools:
+    def test_list_and_tail_incrementally(self, tmp_path):
+        job = _start_job(tmp_path, "print('first'); print('second')")
+        job.process.wait(timeout=10)
+
+        listed = _list_background_jobs().jobs
+        assert [j.pid for j in listed] == [job.pid]
+        assert listed[0].running is False
+        assert listed[0].exit_code == 0
+        assert listed[0].log_size == len(b"first\nsecond\n")
+
+        out = _tail_background_job(job.pid, 0)
+        assert out.output == "first\nsecond\n"
+        assert out.next_offset == listed[0].log_size
+
+        again = _tail_background_job(job.pid, out.next_offset)
+        assert again.output == ""
+        assert again.next_offset == out.next_offset
+
+    def test_unknown_job(self):
+        assert _tail_background_job(424242).error is not None
+
+    @pytest.mark.asyncio
+    async def test_wait_for_pattern(self, tmp_path):
+        job = _start_job(
+            tmp_path,
+            "import time\n"
+            "print('booting')\n"
+            "time.sleep(0.3)\n"
+            "print('Listening on port 8000')\n"
+            "time.sleep(30)\n",
+        )
+        try:
+            out = await _wait_for_background_output(job.pid, r"port (\d+)", timeout=10)
+            assert out.matched is True
+            assert out.match == "port 8000"
+            assert out.output == "booting\nListening on port 8000\n"
+            assert out.running is True
+            assert out.next_offset == len(out.output)
+        finally:
+            with patch("newcode.tools.background_jobs.emit_info"):
+                killed = await _kill_background_job(job.pid)
+        assert killed.success is True
+        assert get_background_job(job.pid).running is False
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_when_job_exits(self, tmp_path):
+        job = _start_job(tmp_path, "print('done')")
+        out = await _wait_for_background_output(job.pid, "never", timeout=10)
+        assert out.matched is False
+        assert out.timed_out is False
+        assert out.exit_code == 0
+        assert out.output == "done\n"
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self, tmp_path):
+        job = _start_job(tmp_path, "import time; time.sleep(30)")
+        try:
+            out = await _wait_for_background_output(job.pid, "x", timeout=0.3)
+            assert out.timed_out is True
+            assert out.matched is False
+        finally:
+            job.process.kill()
+            job.process.wait()
+
+    @pytest.mark.asyncio
+    async def test_wait_invalid_regex(self, tmp_path):
+        job = _start_job(tmp_path, "pass")
+        out = await _wait_for_background_output(job.pid, "(", timeout=1)
+        assert "Invalid regex" in out.error
+
+
+class TestRegistration:
+    @pytest.mark.asyncio
+    async def test_background_shell_command_is_tracked(self, tmp_path):
+        from newcode.tools.command_runner import run_shell_command
+
+        with patch(
+            "newcode.callbacks.on_run_shell_command",
+            new_callable=AsyncMock,
+            return_value=[],
+        ):
+            with patch("newcode.tools.command_runner.get_message_bus"):
+                with patch("newcode.tools.command_runner.emit_info"):
+                    result = await run_shell_command(
+                        MagicMock(), "echo hi", cwd=str(tmp_path), background=True
+                    )
+
+        job = get_background_job(result.pid)
+        assert job is not None
+        assert job.command == "echo hi"
+        assert job.log_file == result.log_file
+        job.process.wait(timeout=10)
+        os.unlink(result.log_file)
@@ -9,6 +9,7 @@ This module targets the 352 uncovered lines in command_runner.py, focusing on:
 - POSIX and Windows-specific code paths
 """
 
+import asyncio
 import signal
 import subprocess
 import sys
@@ -42,6 +43,7 @@ from newcode.tools.command_runner import (
     get_running_shell_process_count,
     is_awaiting_user_input,
     kill_all_running_shell_processes,
+    run_shell_command_async,
     run_shell_command_streaming,
     set_awaiting_user_input,
 )
@@ -174,6 +176,33 @@ class TestRunShellCommandStreaming:
             len(result.stdout.split("\n")[0]) <= MAX_LINE_LENGTH + 20
         )  # +20 for "... [truncated]"
 
+    def test_streaming_long_output_spills_to_file(self, tmp_path):
+        """Only the tail is kept in memory; the full output goes to a file."""
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "for i in range(1000): print(f'line {i}')"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        _register_process(proc)
+
+        with patch("newcode.tools.shell_output.STATE_DIR", str(tmp_path)):
+            with patch.object(command_runner, "get_message_bus"):
+                result = run_shell_command_streaming(
+                    proc, timeout=10, command="many lines", silent=True
+                )
+
+        assert result.success is True
+        lines = result.stdout.split("\n")
+        assert len(lines) == 256
+        assert lines[-1] == "line 999"
+        assert result.output_file is not None
+        with open(result.output_file) as f:
+            spilled = f.read().splitlines()
+        assert spilled[0] == "$ many lines"
+        assert spilled[1:] == [f"line {i}" for i in range(1000)]
+
     def test_streaming_silent_mode(self):
         """Test that silent mode suppresses output emission."""
         proc = subprocess.Popen(
@@ -219,6 +248,108 @@ class TestRunShellCommandStreaming:
         assert result.success is True
 
 
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="POSIX engine")
+class TestRunShellCommandAsync:
+    """Tests for the asyncio subprocess engine."""
+
+    @pytest.mark.asyncio
+    async def test_success_and_stderr(self):
+        with patch.object(command_runner, "get_message_bus"):
+            result = await run_shell_command_async(
+                "echo out; echo err >&2", timeout=10, silent=True
+            )
+
+        assert result.success is True
+        assert result.exit_code == 0
+        assert result.stdout == "out"
+        assert result.stderr == "err"
+        assert get_running_shell_process_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_and_cwd(self, tmp_path):
+        with patch.object(command_runner, "get_message_bus"):
+            result = await run_shell_command_async(
+                "pwd; exit 3", cwd=str(tmp_path), timeout=10, silent=True
+            )
+
+        assert result.success is False
+        assert result.exit_code == 3
+        assert result.stdout == str(tmp_path.resolve())
+        assert result.user_interrupted is False
+
+    @pytest.mark.asyncio
+    async def test_streams_coalesced_lines(self):
+        with patch.object(command_runner, "emit_shell_line") as mock_emit:
+            with patch.object(command_runner, "get_message_bus"):
+                result = await run_shell_command_async(
+                    "printf 'a\\nb\\nc\\n'", timeout=10
+                )
+
+        assert result.stdout == "a\nb\nc"
+        emitted = "\n".join(call.args[0] for call in mock_emit.call_args_list)
+        assert emitted == "a\nb\nc"
+
+    @pytest.mark.asyncio
+    async def test_inactivity_timeout_kills_process_group(self):
+        with patch.object(command_runner, "get_message_bus"):
+            result = await run_shell_command_async(
+                "echo started; sleep 30", timeout=1, silent=True
+            )
+
+        assert result.timeout is True
+        assert result.success is False
+        assert result.stdout == "started"
+        assert result.execution_time < 10
+
+    @pytest.mark.asyncio
+    async def test_carriage_return_progress_counts_as_output(self):
+        command = "for i in 1 2 3 4; do printf '%s%%\\r' $i; sleep 0.6; done; echo done"
+        with patch.object(command_runner, "get_message_bus"):
+            result = await run_shell_command_async(command, timeout=1, silent=True)
+
+        assert result.timeout is False
+        assert result.success is True
+        assert result.stdout == "1%\r\n2%\r\n3%\r\n4%\r\ndone"
+
+    @pytest.mark.asyncio
+    async def test_line_reader_splits_on_any_line_ending(self):
+        stream = asyncio.StreamReader()
+        reader = command_runner._OutputLineReader(stream, limit=8)
+
+        stream.feed_data(b"a\r\nb\rc\r")
+        assert [await reader.readline() for _ in range(3)] == [
+            b"a\r\n",
+            b"b\r",
+            b"c\r",
+        ]
+        # The \n of a \r\n split across reads does not make an empty line
+        stream.feed_data(b"\nd\n0123456789")
+        stream.feed_eof()
+        lines = []
+        while (line := await reader.readline()) is not None:
+            lines.append(line)
+
+        assert lines == [b"d\n", b"01234567", b"89"]
+
+    @pytest.mark.asyncio
+    async def test_kill_all_interrupts_without_blocking(self):
+        async def kill_soon():
+            while get_running_shell_process_count() == 0:
+                await asyncio.sleep(0.05)
+            # Called from another thread, like the Ctrl-X listener
+            assert await asyncio.to_thread(kill_all_running_shell_processes) == 1
+
+        with patch.object(command_runner, "get_message_bus"):
+            result, _ = await asyncio.gather(
+                run_shell_command_async("sleep 30", timeout=60, silent=True),
+                kill_soon(),
+            )
+
+        assert result.success is False
+        assert result.user_interrupted is True
+        assert result.execution_time < 10
+
+
 class TestKeyboardContextManagement:
     """Tests for keyboard context reference counting."""
 
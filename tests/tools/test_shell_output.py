@@ -0,0 +1,146 @@
+"""Tests for frame-rate coalescing of streaming shell output."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from newcode.tools.shell_output import (
+    MAX_SPILL_FILES,
+    OutputRingBuffer,
+    ShellOutputCapture,
+    ShellOutputCoalescer,
+)
+
+
+@pytest.fixture
+def spill_dir(tmp_path):
+    with patch("newcode.tools.shell_output.STATE_DIR", str(tmp_path)):
+        yield tmp_path / "shell_output"
+
+
+def _coalescer(**kwargs):
+    emitted = []
+    coalescer = ShellOutputCoalescer(
+        "stdout", emit=lambda chunk, stream: emitted.append((chunk, stream)), **kwargs
+    )
+    return coalescer, emitted
+
+
+def test_lines_within_a_frame_are_joined():
+    coalescer, emitted = _coalescer(frame_rate=1)
+    for i in range(3):
+        coalescer.add(f"line {i}")
+    assert emitted == []
+    assert coalescer.has_pending
+
+    coalescer.flush()
+    assert emitted == [("line 0\nline 1\nline 2", "stdout")]
+    assert not coalescer.has_pending
+
+
+def test_flushes_when_frame_is_due():
+    with patch("newcode.tools.shell_output.time.monotonic") as clock:
+        clock.return_value = 100.0
+        coalescer, emitted = _coalescer(frame_rate=30)
+        coalescer.add("a")
+        assert emitted == []
+
+        clock.return_value = 100.05
+        coalescer.add("b")
+        assert emitted == [("a\nb", "stdout")]
+
+
+def test_flushes_at_size_threshold():
+    coalescer, emitted = _coalescer(frame_rate=1, max_chunk_chars=10)
+    coalescer.add("12345")
+    coalescer.add("67890")
+    assert emitted == [("12345\n67890", "stdout")]
+
+
+def test_carriage_return_lines_emitted_alone():
+    coalescer, emitted = _coalescer(frame_rate=1)
+    coalescer.add("before")
+    coalescer.add("10%\r50%\r")
+    coalescer.add("after")
+    coalescer.flush()
+    assert [chunk for chunk, _ in emitted] == ["before", "10%\r50%\r", "after"]
+
+
+def test_time_until_due():
+    with patch("newcode.tools.shell_output.time.monotonic") as clock:
+        clock.return_value = 10.0
+        coalescer, _ = _coalescer(frame_rate=10)
+        # Nothing pending: wait the full idle timeout
+        assert coalescer.time_until_due(0.5) == 0.5
+        coalescer.add("x")
+        clock.return_value = 10.04
+        assert abs(coalescer.time_until_due(0.5) - 0.06) < 1e-9
+        clock.return_value = 11.0
+        assert coalescer.time_until_due(0.5) == 0.0
+
+
+def test_ring_buffer_bounded_by_lines_and_bytes():
+    buffer = OutputRingBuffer(max_lines=3, max_bytes=12)
+    for line in ["aaaa", "bbbb", "cccc", "dddd"]:
+        buffer.append(line)
+    # 3 lines * 5 bytes > 12, so only the last two fit
+    assert buffer.lines == ["cccc", "dddd"]
+    assert buffer.total_lines == 4
+    assert buffer.dropped_lines == 2
+    assert buffer.text() == "cccc\ndddd"
+
+
+def test_capture_small_output_never_spills(spill_dir):
+    capture = ShellOutputCapture("echo hi", spill=True, max_lines=10)
+    capture.add("stdout", "hi")
+    capture.add("stderr", "warn")
+    assert capture.close() is None
+    assert capture.stdout.text() == "hi"
+    assert capture.stderr.text() == "warn"
+    assert not spill_dir.exists() or not any(spill_dir.iterdir())
+
+
+def test_capture_spills_full_output_once_lossy(spill_dir):
+    capture = ShellOutputCapture(
+        "build", spill=True, max_lines=2, truncate=lambda line: line[:5]
+    )
+    capture.add("stdout", "one")
+    capture.add("stderr", "two")
+    capture.add("stdout", "three")
+    assert capture.add("stdout", "a very long line") == "a ver"
+
+    path = capture.close()
+    assert path is not None and os.path.dirname(path) == str(spill_dir)
+    with open(path) as f:
+        assert f.read() == "$ build\none\ntwo\nthree\na very long line\n"
+    assert capture.stdout.lines == ["three", "a ver"]
+    # Lines after close are kept in memory only
+    capture.add("stdout", "late")
+    with open(path) as f:
+        assert "late" not in f.read()
+
+
+def test_capture_without_spill(spill_dir):
+    capture = ShellOutputCapture(spill=False, max_lines=1)
+    for i in range(5):
+        capture.add("stdout", str(i))
+    assert capture.lossy
+    assert capture.close() is None
+    assert capture.stdout.text() == "4"
+
+
+def test_old_spill_files_pruned(spill_dir):
+    spill_dir.mkdir(parents=True)
+    for i in range(MAX_SPILL_FILES + 5):
+        (spill_dir / f"shell_{i:03d}.log").write_text("x")
+        os.utime(spill_dir / f"shell_{i:03d}.log", (i, i))
+
+    capture = ShellOutputCapture(spill=True, max_lines=1)
+    capture.add("stdout", "a")
+    capture.add("stdout", "b")
+    capture.close()
+
+    remaining = sorted(p.name for p in spill_dir.glob("shell_*.log"))
+    assert len(remaining) == MAX_SPILL_FILES
+    assert "shell_000.log" not in remaining
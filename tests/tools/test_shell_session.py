@@ -0,0 +1,204 @@
+"""Tests for newcode/tools/shell_session.py and session-mode shell commands."""
+
+import asyncio
+import shutil
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from newcode.tools import command_runner
+from newcode.tools.command_runner import (
+    get_running_shell_process_count,
+    kill_all_running_shell_processes,
+    run_shell_command_in_session,
+)
+from newcode.tools.shell_session import (
+    _SESSIONS,
+    ShellSession,
+    ShellSessionClosed,
+    close_shell_session,
+    close_shell_sessions,
+    get_shell_session,
+)
+from newcode.tools.subagent_context import subagent_context
+
+pytestmark = pytest.mark.skipif(
+    sys.platform.startswith("win") or shutil.which("bash") is None,
+    reason="requires a POSIX system with bash",
+)
+
+
+@pytest.fixture
+async def session():
+    session = ShellSession(shutil.which("bash"))
+    yield session
+    await session.close()
+
+
+async def _run(session, command, **kwargs):
+    with patch.object(command_runner, "get_message_bus"):
+        return await run_shell_command_in_session(
+            session, command, silent=True, **kwargs
+        )
+
+
+class TestShellSession:
+    @pytest.mark.asyncio
+    async def test_state_persists_between_commands(self, session, tmp_path):
+        first = await _run(session, f"cd {tmp_path} && export GREETING=hello")
+        assert first.success is True
+        assert first.stdout == ""
+        pid = session.pid
+
+        second = await _run(session, "pwd; echo $GREETING")
+        assert second.stdout == f"{tmp_path}\nhello"
+        assert session.pid == pid
+
+    @pytest.mark.asyncio
+    async def test_exit_status_and_merged_stderr(self, session):
+        result = await _run(session, "echo out; echo err >&2; false")
+        assert result.success is False
+        assert result.exit_code == 1
+        assert result.stdout == "out\nerr"
+        assert result.user_interrupted is False
+
+    @pytest.mark.asyncio
+    async def test_output_without_trailing_newline(self, session):
+        result = await _run(session, "printf 'a\\n\\nb'")
+        assert result.stdout == "a\n\nb"
+
+    @pytest.mark.asyncio
+    async def test_syntax_error_does_not_hang(self, session):
+        result = await _run(session, "echo 'unterminated", timeout=5)
+        assert result.timeout is False
+        assert result.exit_code == 2
+
+        after = await _run(session, "echo still here")
+        assert after.stdout == "still here"
+
+    @pytest.mark.asyncio
+    async def test_stdin_readers_do_not_swallow_sentinel(self, session):
+        result = await _run(session, "cat; read x; echo read=$?", timeout=5)
+        assert result.timeout is False
+        assert result.stdout == "read=1"
+
+    @pytest.mark.asyncio
+    async def test_cwd_argument_changes_directory(self, session, tmp_path):
+        result = await _run(session, "pwd", cwd=str(tmp_path))
+        assert result.stdout == str(tmp_path)
+
+    @pytest.mark.asyncio
+    async def test_timeout_restarts_session(self, session):
+        await _run(session, "export MARKER=1")
+        old_pid = session.pid
+
+        result = await _run(session, "echo started; sleep 30", timeout=1)
+        assert result.timeout is True
+        assert result.stdout == "started"
+        assert "new one" in result.error
+
+        after = await _run(session, "echo ${MARKER:-unset}")
+        assert after.stdout == "unset"
+        assert session.pid != old_pid
+
+    @pytest.mark.asyncio
+    async def test_exit_ends_session(self, session):
+        result = await _run(session, "exit 3")
+        assert result.success is False
+        assert result.exit_code == 3
+        assert (await _run(session, "echo back")).stdout == "back"
+
+    @pytest.mark.asyncio
+    async def test_kill_all_interrupts_session_command(self, session):
+        async def kill_soon():
+            while get_running_shell_process_count() == 0:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.2)
+            assert await asyncio.to_thread(kill_all_running_shell_processes) == 1
+
+        result, _ = await asyncio.gather(
+            _run(session, "sleep 30", timeout=60), kill_soon()
+        )
+        assert result.success is False
+        assert result.user_interrupted is True
+        assert result.execution_time < 10
+
+
+class TestSessionRegistry:
+    @pytest.mark.asyncio
+    async def test_one_session_per_key(self):
+        try:
+            main = get_shell_session("main")
+            assert get_shell_session("main") is main
+            assert get_shell_session("retriever") is not main
+        finally:
+            await close_shell_sessions()
+
+    @pytest.mark.asyncio
+    async def test_close_one_session(self):
+        try:
+            get_shell_session("a")
+            get_shell_session("b")
+            await close_shell_session("a")
+            await close_shell_session("missing")
+            assert set(_SESSIONS) == {"b"}
+        finally:
+            await close_shell_sessions()
+
+    @pytest.mark.asyncio
+    async def test_parallel_subagent_invocations_get_own_shells(self, tmp_path):
+        async def invocation(session_id, directory):
+            with subagent_context("husky", session_id):
+                await command_runner._run_command_inner(
+                    f"cd {directory}", None, 10, "g", silent=True
+                )
+                await asyncio.sleep(0.1)
+                return await command_runner._run_command_inner(
+                    "pwd", None, 10, "g", silent=True
+                )
+
+        (tmp_path / "one").mkdir()
+        (tmp_path / "two").mkdir()
+        with (
+            patch("newcode.config.get_shell_session_enabled", return_value=True),
+            patch.object(command_runner, "get_message_bus"),
+        ):
+            try:
+                one, two = await asyncio.gather(
+                    invocation("husky-session-1", tmp_path / "one"),
+                    invocation("husky-session-2", tmp_path / "two"),
+                )
+            finally:
+                await close_shell_sessions()
+        assert one.stdout == str(tmp_path / "one")
+        assert two.stdout == str(tmp_path / "two")
+
+    @pytest.mark.asyncio
+    async def test_no_bash_means_no_session(self):
+        with patch("newcode.tools.shell_session._find_shell", return_value=None):
+            assert get_shell_session("nobash") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_start_raises(self):
+        session = ShellSession("/bin/false")
+        with pytest.raises((ShellSessionClosed, OSError)):
+            await session.start()
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_run_shell_command_uses_session_when_enabled(self):
+        with (
+            patch("newcode.config.get_shell_session_enabled", return_value=True),
+            patch.object(command_runner, "get_message_bus"),
+        ):
+            try:
+                await command_runner._run_command_inner(
+                    "cd /", None, 10, "g", silent=True
+                )
+                result = await command_runner._run_command_inner(
+                    "pwd", None, 10, "g", silent=True
+                )
+            finally:
+                await close_shell_sessions()
+        assert result.stdout == "/"
@@ -22,6 +22,7 @@ subagent_context = subagent_context_module.subagent_context
 is_subagent = subagent_context_module.is_subagent
 get_subagent_name = subagent_context_module.get_subagent_name
 get_subagent_depth = subagent_context_module.get_subagent_depth
+get_subagent_session_id = subagent_context_module.get_subagent_session_id
 
 
 class TestSubagentContextBasics:
@@ -47,6 +48,16 @@ class TestSubagentContextBasics:
         assert get_subagent_name() is None
         assert get_subagent_depth() == 0
 
+    def test_context_tracks_session_id(self):
+        """Test that the invocation's session id is set and restored."""
+        with subagent_context("husky", "husky-session-a1"):
+            assert get_subagent_session_id() == "husky-session-a1"
+            with subagent_context("terrier"):
+                assert get_subagent_session_id() is None
+            assert get_subagent_session_id() == "husky-session-a1"
+
+        assert get_subagent_session_id() is None
+
     def test_context_restores_on_exit(self):
         """Test that context properly restores state on exit."""
         initial_depth = get_subagent_depth()